@@ -1,17 +1,44 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.utils.html import format_html
-from django.db.models import Count, Q
+from django.db import IntegrityError
 from django.urls import path
 from django.shortcuts import render
-from django.http import HttpResponse
-import csv
-from datetime import datetime
+from django.utils import timezone
 
-from .models import Asistencia
+from taller_formularios.busqueda import BusquedaAdminMixin
+from taller_formularios.proyeccion import ProyeccionAdminMixin
+
+from . import estadisticas, reportes
+from .duracion import MINUTOS_ASISTENCIA_COMPLETA, formatear_minutos
+from .exportacion import respuesta_csv
+from .forms import ImportarAsistenciasForm, RangoFechasForm, ReporteForm
+from .importacion import importar_archivo
+from .models import Asistencia, AsistenciaArchivada, ResumenPersona
+
+MAX_ERRORES_MOSTRADOS = 200
+
+
+class DuracionListFilter(admin.SimpleListFilter):
+	title = 'duración'
+	parameter_name = 'duracion'
+
+	def lookups(self, request, model_admin):
+		return [
+			('completa', 'Completa (4h o más)'),
+			('parcial', 'Parcial (menos de 4h)'),
+		]
+
+	def queryset(self, request, queryset):
+		if self.value() == 'completa':
+			return queryset.filter(duracion_minutos__gte=MINUTOS_ASISTENCIA_COMPLETA)
+		if self.value() == 'parcial':
+			return queryset.filter(duracion_minutos__lt=MINUTOS_ASISTENCIA_COMPLETA)
+		return queryset
 
 
 @admin.register(Asistencia)
-class AsistenciaAdmin(admin.ModelAdmin):
+class AsistenciaAdmin(ProyeccionAdminMixin, BusquedaAdminMixin, admin.ModelAdmin):
 	"""
 	Configuración personalizada para el modelo Asistencia en el admin
 	"""
@@ -27,8 +54,22 @@ class AsistenciaAdmin(admin.ModelAdmin):
 		'fecha_creacion'
 	]
     
+	# Columnas que lee la lista de cambios (list_display y sus métodos)
+	campos_lista = [
+		'id',
+		'nombre_completo',
+		'documento_identidad',
+		'fecha_asistencia',
+		'hora_ingreso',
+		'hora_salida',
+		'presente',
+		'duracion_minutos',
+		'fecha_creacion'
+	]
+    
 	list_filter = [
 		'presente',
+		DuracionListFilter,
 		'fecha_asistencia',
 		'fecha_creacion',
 		('fecha_asistencia', admin.DateFieldListFilter),
@@ -109,6 +150,21 @@ class AsistenciaAdmin(admin.ModelAdmin):
 				self.admin_site.admin_view(self.reporte_mensual_view),
 				name='asistencia_reporte_mensual'
 			),
+			path(
+				'reportes/',
+				self.admin_site.admin_view(self.reporte_view),
+				name='asistencia_reporte'
+			),
+			path(
+				'exportar-csv/',
+				self.admin_site.admin_view(self.exportar_rango_csv_view),
+				name='asistencia_exportar_csv'
+			),
+			path(
+				'importar/',
+				self.admin_site.admin_view(self.importar_view),
+				name='asistencia_importar'
+			),
 		]
 		return custom_urls + urls
     
@@ -124,19 +180,21 @@ class AsistenciaAdmin(admin.ModelAdmin):
 	estado_presente.admin_order_field = 'presente'
     
 	def duracion_display(self, obj):
-		duracion = obj.get_duracion_display()
-		if obj.duracion_asistencia and obj.duracion_asistencia >= 4:
+		minutos = obj.duracion_minutos
+		duracion = formatear_minutos(minutos)
+		if minutos and minutos >= MINUTOS_ASISTENCIA_COMPLETA:
 			return format_html(
 				'<span style="color: green; font-weight: bold;">{}</span>',
 				duracion
 			)
-		elif obj.duracion_asistencia and obj.duracion_asistencia < 4:
+		elif minutos:
 			return format_html(
 				'<span style="color: orange;">{}</span>',
 				duracion
 			)
 		return duracion
 	duracion_display.short_description = 'Duración'
+	duracion_display.admin_order_field = 'duracion_minutos'
     
 	def marcar_presente(self, request, queryset):
 		updated = queryset.update(presente=True)
@@ -155,61 +213,99 @@ class AsistenciaAdmin(admin.ModelAdmin):
 	marcar_ausente.short_description = "Marcar seleccionados como ausente"
     
 	def exportar_seleccionados_csv(self, request, queryset):
-		response = HttpResponse(content_type='text/csv')
-		response['Content-Disposition'] = 'attachment; filename="asistencias_seleccionadas.csv"'
-        
-		writer = csv.writer(response)
-		writer.writerow([
-			'ID', 'Nombre Completo', 'Documento', 'Correo', 'Fecha',
-			'Hora Ingreso', 'Hora Salida', 'Presente', 'Duración', 'Observaciones'
-		])
+		return respuesta_csv(queryset, 'asistencias_seleccionadas.csv')
+	exportar_seleccionados_csv.short_description = "Exportar seleccionados a CSV"
+    
+	def exportar_rango_csv_view(self, request):
+		if not self.has_view_permission(request):
+			raise PermissionDenied
+
+		form = RangoFechasForm(request.GET or None)
+		if form.is_valid():
+			desde = form.cleaned_data['desde']
+			hasta = form.cleaned_data['hasta']
+			queryset = Asistencia.objects.filter(
+				fecha_asistencia__range=(desde, hasta)
+			).order_by('fecha_asistencia', 'hora_ingreso')
+			return respuesta_csv(
+				queryset,
+				f'asistencias_{desde:%Y%m%d}_{hasta:%Y%m%d}.csv'
+			)
         
-		for obj in queryset:
-			writer.writerow([
-				str(obj.id),
-				obj.nombre_completo,
-				obj.documento_identidad,
-				obj.correo_electronico,
-				obj.fecha_asistencia.strftime('%d/%m/%Y'),
-				obj.hora_ingreso.strftime('%H:%M'),
-				obj.hora_salida.strftime('%H:%M'),
-				'Sí' if obj.presente else 'No',
-				obj.get_duracion_display(),
-				obj.observaciones or ''
-			])
+		context = {
+			'title': 'Exportar asistencias a CSV',
+			'form': form,
+			'opts': self.model._meta,
+		}
+		return render(request, 'admin/asistencia_exportar_csv.html', context)
+    
+	def importar_view(self, request):
+		if not self.has_add_permission(request):
+			raise PermissionDenied
+
+		form = ImportarAsistenciasForm(request.POST or None, request.FILES or None)
+		resultado = None
+		if request.method == 'POST' and form.is_valid():
+			archivo = form.cleaned_data['archivo']
+			try:
+				resultado = importar_archivo(
+					archivo,
+					archivo.name,
+					guardar=not form.cleaned_data['solo_validar']
+				)
+			except ValidationError as e:
+				form.add_error('archivo', e)
+			else:
+				self.message_user(
+					request,
+					f'{resultado.creados} registro(s) importado(s), '
+					f'{len(resultado.errores)} fila(s) con errores.'
+				)
         
-		self.message_user(
-			request,
-			f'{queryset.count()} registro(s) exportado(s) a CSV.'
-		)
-		return response
-	exportar_seleccionados_csv.short_description = "Exportar seleccionados a CSV"
+		context = {
+			'title': 'Importar asistencias',
+			'form': form,
+			'resultado': resultado,
+			'errores': resultado.errores[:MAX_ERRORES_MOSTRADOS] if resultado else [],
+			'opts': self.model._meta,
+		}
+		return render(request, 'admin/asistencia_importar.html', context)
     
 	def duplicar_registros(self, request, queryset):
-		duplicados = 0
-		for obj in queryset:
-			obj.pk = None  # Crear nuevo objeto
-			obj.id = None
-			obj.fecha_asistencia = datetime.now().date()
-			obj.save()
-			duplicados += 1
+		try:
+			nuevas, omitidos = queryset.duplicar_en_fecha()
+		except IntegrityError:
+			self.message_user(
+				request,
+				'No se pudieron duplicar los registros: otro usuario registró '
+				'asistencias para hoy al mismo tiempo. Intente de nuevo.',
+				level=messages.ERROR
+			)
+			return
         
 		self.message_user(
 			request,
-			f'{duplicados} registro(s) duplicado(s) para hoy.'
+			f'{len(nuevas)} registro(s) duplicado(s) para hoy.'
 		)
+		if omitidos:
+			self.message_user(
+				request,
+				f'{len(omitidos)} registro(s) omitido(s) porque ya tienen asistencia hoy: '
+				f'{", ".join(omitidos[:20])}{"..." if len(omitidos) > 20 else ""}',
+				level=messages.WARNING
+			)
 	duplicar_registros.short_description = "Duplicar seleccionados para hoy"
     
 	def estadisticas_view(self, request):
-		total_registros = Asistencia.objects.count()
-		total_presentes = Asistencia.objects.filter(presente=True).count()
-		total_ausentes = Asistencia.objects.filter(presente=False).count()
+		resumen = estadisticas.resumen_periodos()
+		total_registros = resumen['total']
+		total_presentes = resumen['total_presentes']
+		total_ausentes = resumen['total_ausentes']
         
-		stats_mes = Asistencia.objects.estadisticas_mes_actual()
+		stats_mes = Asistencia.objects.estadisticas_mes_actual(resumen)
         
-		personas_activas = Asistencia.objects.values('nombre_completo', 'documento_identidad')\
-			.annotate(total=Count('id'), presentes=Count('id', filter=Q(presente=True)))\
-			.order_by('-total')[:10]
+		# Top 10 por el índice del resumen por persona (sin GROUP BY)
+		personas_activas = ResumenPersona.objects.ranking(10)
         
 		context = {
 			'title': 'Estadísticas de Asistencia',
@@ -219,42 +315,59 @@ class AsistenciaAdmin(admin.ModelAdmin):
 			'porcentaje_asistencia': round((total_presentes / total_registros * 100), 2) if total_registros > 0 else 0,
 			'stats_mes': stats_mes,
 			'personas_activas': personas_activas,
+			'cache': estadisticas.contadores.como_dict(),
 			'opts': self.model._meta,
 		}
         
 		return render(request, 'admin/asistencia_estadisticas.html', context)
     
 	def reporte_mensual_view(self, request):
-		from django.db.models import Count
-		from datetime import datetime, timedelta
-        
-		today = datetime.now().date()
-		primer_dia = today.replace(day=1)
+		today = timezone.localdate()
         
-		registros_mes = Asistencia.objects.filter(
-			fecha_asistencia__gte=primer_dia,
-			fecha_asistencia__lte=today
-		)
-        
-		stats_diarios = registros_mes.values('fecha_asistencia')\
-			.annotate(
-				total=Count('id'),
-				presentes=Count('id', filter=Q(presente=True)),
-				ausentes=Count('id', filter=Q(presente=False))
-			).order_by('fecha_asistencia')
+		# Días del mes desde la caché de estadísticas (resumen diario al fallar)
+		stats_diarios = estadisticas.dias_del_mes(today)
         
 		context = {
 			'title': f'Reporte Mensual - {today.strftime("%B %Y")}',
 			'mes': today.strftime("%B %Y"),
-			'total_registros': registros_mes.count(),
-			'total_presentes': registros_mes.filter(presente=True).count(),
-			'total_ausentes': registros_mes.filter(presente=False).count(),
+			'total_registros': sum(d['total'] for d in stats_diarios),
+			'total_presentes': sum(d['presentes'] for d in stats_diarios),
+			'total_ausentes': sum(d['ausentes'] for d in stats_diarios),
 			'stats_diarios': stats_diarios,
 			'opts': self.model._meta,
 		}
         
 		return render(request, 'admin/asistencia_reporte_mensual.html', context)
     
+	def reporte_view(self, request):
+		if not self.has_view_permission(request):
+			raise PermissionDenied
+
+		form = ReporteForm(request.GET or None)
+		reporte = trabajo = None
+		if form.is_valid():
+			datos = form.cleaned_data
+			parametros = (datos['desde'], datos['hasta'], datos['agrupacion'], datos['hora_entrada'])
+			# Los rangos largos se calculan en segundo plano; la página se
+			# recarga hasta que el resultado está en la caché
+			if reportes.en_linea(datos['desde'], datos['hasta']):
+				reporte = reportes.calcular(*parametros)
+			else:
+				trabajo = reportes.solicitar(*parametros)[1]
+				reporte = trabajo['resultado']
+			if reporte is not None and datos['formato'] != 'html':
+				return reportes.respuesta(reporte, datos['formato'])
+        
+		context = {
+			'title': 'Reporte de asistencia',
+			'form': form,
+			'reporte': reporte,
+			'trabajo': trabajo,
+			'en_curso': trabajo is not None and trabajo['estado'] in (reportes.PENDIENTE, reportes.PROCESANDO),
+			'opts': self.model._meta,
+		}
+		return render(request, 'admin/asistencia_reporte.html', context)
+    
 	def get_queryset(self, request):
 		queryset = super().get_queryset(request)
 		return queryset.select_related()
@@ -262,18 +375,30 @@ class AsistenciaAdmin(admin.ModelAdmin):
 	def changelist_view(self, request, extra_context=None):
 		extra_context = extra_context or {}
         
+		resumen = estadisticas.resumen_periodos()
 		extra_context['stats_rapidas'] = {
-			'total_hoy': Asistencia.objects.filter(
-				fecha_asistencia=datetime.now().date()
-			).count(),
-			'presentes_hoy': Asistencia.objects.filter(
-				fecha_asistencia=datetime.now().date(),
-				presente=True
-			).count(),
-			'total_mes': Asistencia.objects.filter(
-				fecha_asistencia__month=datetime.now().month,
-				fecha_asistencia__year=datetime.now().year
-			).count()
+			'total_hoy': resumen['total_hoy'],
+			'presentes_hoy': resumen['presentes_hoy'],
+			'total_mes': resumen['total_mes'],
 		}
         
 		return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(AsistenciaArchivada)
+class AsistenciaArchivadaAdmin(admin.ModelAdmin):
+	"""
+	Consulta de las asistencias archivadas (solo lectura: se llenan con el
+	comando archivar_asistencias)
+	"""
+	list_display = ['nombre_completo', 'documento_identidad', 'fecha_asistencia', 'presente', 'fecha_archivado']
+	list_filter = ['presente']
+	search_fields = ['documento_identidad', 'nombre_completo']
+	date_hierarchy = 'fecha_asistencia'
+	show_full_result_count = False
+
+	def has_add_permission(self, request):
+		return False
+
+	def has_change_permission(self, request, obj=None):
+		return False
@@ -0,0 +1,131 @@
+"""
+Recurso de la API JSON para asistencias (ver taller_formularios/api.py) y
+registro de entrada y salida de los kioscos (ver kiosco.py)
+"""
+from django.core.exceptions import ValidationError
+from django.urls import path
+from django.utils import timezone
+
+from taller_formularios.api import ErrorAPI, RecursoAPI, VistaAPI, leer_json, respuesta_json
+
+from . import ingesta, kiosco
+from .forms import AsistenciaForm
+from .managers import CAMPOS_HORA
+from .models import MENSAJE_ARCHIVADA, Asistencia
+
+MENSAJE_DUPLICADO = 'Ya existe un registro con este documento para esta fecha.'
+MENSAJE_REPETIDO = 'Documento repetido para la misma fecha dentro del lote.'
+
+
+class RecursoAsistencias(RecursoAPI):
+    modelo = Asistencia
+    formulario = AsistenciaForm
+    campos = (
+        'id', 'nombre_completo', 'documento_identidad', 'correo_electronico',
+        'fecha_asistencia', 'hora_ingreso', 'hora_salida', 'presente',
+        'observaciones', 'duracion_minutos', 'fecha_creacion', 'fecha_actualizacion',
+    )
+    filtros = {
+        'documento': 'documento_identidad',
+        'fecha': 'fecha_asistencia',
+        'desde': 'fecha_asistencia__gte',
+        'hasta': 'fecha_asistencia__lte',
+        'presente': 'presente',
+    }
+
+    def valores_por_defecto(self):
+        return {'fecha_asistencia': timezone.localdate(), 'presente': True}
+
+    def validar_lote(self, instancias):
+        """
+        Unicidad (documento, fecha) de todo el lote con una consulta, como
+        en la importación; las filas que se actualizan no chocan consigo mismas
+        """
+        if not instancias:
+            return {}
+        for instancia in instancias:
+            instancia.normalizar()
+        fechas = [a.fecha_asistencia for a in instancias]
+        existentes = set(
+            Asistencia.objects.filter(
+                documento_identidad__in={a.documento_identidad for a in instancias},
+                fecha_asistencia__range=(min(fechas), max(fechas)),
+            )
+            .exclude(pk__in=[a.pk for a in instancias if not a._state.adding])
+            .order_by()
+            .values_list('documento_identidad', 'fecha_asistencia')
+        )
+        archivadas = Asistencia.objects.claves_archivadas(
+            {a.documento_identidad for a in instancias}, min(fechas), max(fechas)
+        )
+        errores = {}
+        vistas = set()
+        for indice, instancia in enumerate(instancias):
+            clave = (instancia.documento_identidad, instancia.fecha_asistencia)
+            if clave in existentes:
+                errores[indice] = {'documento_identidad': [{'message': MENSAJE_DUPLICADO, 'code': 'unique'}]}
+            elif clave in archivadas:
+                errores[indice] = {'documento_identidad': [{'message': MENSAJE_ARCHIVADA, 'code': 'unique'}]}
+            elif clave in vistas:
+                errores[indice] = {'documento_identidad': [{'message': MENSAJE_REPETIDO, 'code': 'unique'}]}
+            vistas.add(clave)
+        return errores
+
+    def crear(self, instancias):
+        # bulk_create mantiene resúmenes, duración e índice de búsqueda
+        return Asistencia.objects.bulk_create(instancias)
+
+    def actualizar(self, instancias, campos):
+        # Las horas se reescriben juntas: duracion_minutos depende de ambas
+        if CAMPOS_HORA & campos:
+            campos = campos | CAMPOS_HORA
+        Asistencia.objects.bulk_update(instancias, campos)
+        return instancias
+
+
+class VistaKiosco(VistaAPI):
+    """
+    POST {"documento": "...", "tipo": "entrada" | "salida"}; para una persona
+    sin registros previos, también "nombre_completo" y "correo_electronico".
+    Responde la fila del día y si el escaneo repetía la hora ya registrada.
+    Con INGESTA_DIFERIDA responde 202 con la fila como quedará al volcar la
+    bitácora y el id del evento (ver ingesta.py).
+    """
+
+    def post(self, request):
+        datos = leer_json(request)
+        if not isinstance(datos, dict):
+            raise ErrorAPI('Se esperaba un objeto JSON')
+        tipo = datos.get('tipo', kiosco.ENTRADA)
+        if tipo not in kiosco.TIPOS:
+            raise ErrorAPI(f'tipo debe ser {" o ".join(kiosco.TIPOS)}')
+        escaneo = {
+            'nombre': datos.get('nombre_completo', ''),
+            'correo': datos.get('correo_electronico', ''),
+        }
+        try:
+            if ingesta.diferida():
+                evento, fila, repetida = ingesta.encolar(datos.get('documento'), tipo, **escaneo)
+            else:
+                fila, repetida = kiosco.registrar(datos.get('documento'), tipo, **escaneo)
+        except ValidationError as e:
+            raise ErrorAPI('Datos inválidos', detalle=e.messages)
+        except kiosco.PersonaDesconocida:
+            raise ErrorAPI(
+                'Documento sin registros: envíe nombre_completo y correo_electronico', estado=404
+            )
+        except kiosco.SinEntrada:
+            raise ErrorAPI('No hay entrada registrada hoy para este documento', estado=409)
+        if ingesta.diferida():
+            return respuesta_json(
+                {**fila, 'tipo': tipo, 'repetida': repetida, 'evento': evento, 'pendiente': True},
+                status=202,
+            )
+        return respuesta_json({**fila, 'tipo': tipo, 'repetida': repetida})
+
+
+app_name = 'api_asistencias'
+
+urlpatterns = RecursoAsistencias().urls(conversor_pk='uuid') + [
+    path('kiosco/', VistaKiosco.as_view(), name='kiosco'),
+]
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
 
+# Campos del índice de texto completo y su peso en el ranking
+CAMPOS_BUSQUEDA = ['nombre_completo', 'documento_identidad', 'correo_electronico']
+PESOS_BUSQUEDA = ['A', 'A', 'B']
+
 
 class AsistenciaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'asistencia'
+
+    def ready(self):
+        from taller_formularios import busqueda
+
+        from . import signals  # noqa: F401
+        from .models import Asistencia
+
+        busqueda.registrar(Asistencia, CAMPOS_BUSQUEDA, PESOS_BUSQUEDA)
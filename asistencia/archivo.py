@@ -0,0 +1,265 @@
+"""
+Archivo histórico de asistencias
+
+Las vistas y estadísticas de uso diario solo miran el mes en curso, así que
+las filas anteriores al horizonte de archivo (ASISTENCIA_ARCHIVO_DIAS,
+redondeado al inicio de mes) se mueven fuera de la tabla de Asistencia por
+lotes, cada uno en su propia transacción:
+
+- destino 'tabla' (por defecto): a AsistenciaArchivada. Los resúmenes diario
+  y por persona y Asistencia.objects.historial() siguen incluyéndolas.
+- destino 'csv' o 'parquet': a archivos CSV comprimidos con gzip o Parquet
+  (requiere pyarrow) en ASISTENCIA_ARCHIVO_CARPETA, uno por mes y lote. Las
+  filas salen de la base de datos; en la misma transacción se suman a
+  TotalArchivadoDiario y TotalArchivadoPersona, que los recálculos de los
+  resúmenes incluyen. Se leen con leer_archivos().
+
+Mover filas no cambia los totales, así que no se recalculan los resúmenes;
+las filas archivadas sí se quitan del índice de búsqueda.
+
+La unicidad (documento, fecha) abarca AsistenciaArchivada:
+Asistencia.validate_unique, el kiosco, la importación y la API rechazan un
+día ya archivado en la tabla (Asistencia.objects.claves_archivadas). Lo
+archivado en archivos solo deja totales y no se comprueba.
+"""
+import csv
+import gzip
+import os
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router, transaction
+from django.utils import timezone
+
+from taller_formularios import busqueda
+
+from .managers import CAMPOS_HISTORIAL
+from .models import Asistencia, AsistenciaArchivada, TotalArchivadoDiario, TotalArchivadoPersona
+
+DESTINOS = ('tabla', 'csv', 'parquet')
+TAMANO_LOTE = 5000
+
+
+def horizonte_dias():
+    return getattr(settings, 'ASISTENCIA_ARCHIVO_DIAS', 400)
+
+
+def fecha_limite(hoy=None, dias=None):
+    """Primer día del mes que contiene hoy - dias: se archiva lo anterior"""
+    hoy = hoy or timezone.localdate()
+    dias = horizonte_dias() if dias is None else dias
+    return (hoy - timedelta(days=dias)).replace(day=1)
+
+
+def carpeta_archivo():
+    return Path(getattr(settings, 'ASISTENCIA_ARCHIVO_CARPETA', settings.BASE_DIR / 'archivo'))
+
+
+def archivar(antes_de=None, destino='tabla', lote=TAMANO_LOTE, carpeta=None):
+    """
+    Mueve las asistencias con fecha anterior a `antes_de` (por defecto
+    fecha_limite()) al destino indicado. Retorna el número de filas movidas.
+    """
+    if destino not in DESTINOS:
+        raise ValueError(f'Destino desconocido: {destino}')
+    limite = antes_de or fecha_limite()
+    carpeta = Path(carpeta) if carpeta else carpeta_archivo()
+    base = Asistencia._base_manager
+    using = router.db_for_write(Asistencia)
+
+    movidas = 0
+    numero_lote = 0
+    while True:
+        with transaction.atomic(using=using):
+            filas = list(
+                base.filter(fecha_asistencia__lt=limite)
+                .order_by('fecha_asistencia', 'pk')
+                .values(*CAMPOS_HISTORIAL)[:lote]
+            )
+            if not filas:
+                break
+            if destino == 'tabla':
+                AsistenciaArchivada.objects.bulk_create(
+                    [AsistenciaArchivada(**fila) for fila in filas], ignore_conflicts=True
+                )
+            else:
+                numero_lote += 1
+                _escribir_archivos(filas, destino, carpeta, numero_lote)
+                _sumar_totales(filas)
+
+            pks = [fila['id'] for fila in filas]
+            busqueda.quitar_objetos(Asistencia, pks, using=using)
+            # Sin señales: los totales no cambian y el índice ya se actualizó
+            base.filter(pk__in=pks)._raw_delete(using)
+        movidas += len(filas)
+    return movidas
+
+
+def _sumar_totales(filas):
+    """Suma las filas archivadas en archivos a los totales por día y por persona"""
+    dias = {}
+    personas = {}
+    # Las filas vienen ordenadas por fecha: nombre y correo quedan los más recientes
+    for fila in filas:
+        fecha = fila['fecha_asistencia']
+        minutos = fila['duracion_minutos'] or 0
+        dia = dias.setdefault(fecha, TotalArchivadoDiario(fecha_asistencia=fecha))
+        dia.total += 1
+        dia.presentes += fila['presente']
+        dia.ausentes += not fila['presente']
+        dia.minutos_totales += minutos
+
+        persona = personas.setdefault(fila['documento_identidad'], TotalArchivadoPersona(
+            documento_identidad=fila['documento_identidad'],
+            primera_asistencia=fecha,
+        ))
+        persona.nombre_completo = fila['nombre_completo']
+        persona.correo_electronico = fila['correo_electronico']
+        persona.ultima_asistencia = fecha
+        persona.total_dias += 1
+        persona.dias_presente += fila['presente']
+        persona.minutos_totales += minutos
+
+    for anterior in TotalArchivadoDiario.objects.filter(fecha_asistencia__in=dias):
+        dia = dias[anterior.fecha_asistencia]
+        dia.total += anterior.total
+        dia.presentes += anterior.presentes
+        dia.ausentes += anterior.ausentes
+        dia.minutos_totales += anterior.minutos_totales
+    for anterior in TotalArchivadoPersona.objects.filter(documento_identidad__in=personas):
+        persona = personas[anterior.documento_identidad]
+        if anterior.ultima_asistencia > persona.ultima_asistencia:
+            persona.nombre_completo = anterior.nombre_completo
+            persona.correo_electronico = anterior.correo_electronico
+            persona.ultima_asistencia = anterior.ultima_asistencia
+        persona.primera_asistencia = min(persona.primera_asistencia, anterior.primera_asistencia)
+        persona.total_dias += anterior.total_dias
+        persona.dias_presente += anterior.dias_presente
+        persona.minutos_totales += anterior.minutos_totales
+
+    TotalArchivadoDiario.objects.bulk_create(
+        dias.values(),
+        update_conflicts=True,
+        unique_fields=['fecha_asistencia'],
+        update_fields=['total', 'presentes', 'ausentes', 'minutos_totales'],
+    )
+    TotalArchivadoPersona.objects.bulk_create(
+        personas.values(),
+        update_conflicts=True,
+        unique_fields=['documento_identidad'],
+        update_fields=[
+            'nombre_completo', 'correo_electronico', 'primera_asistencia',
+            'ultima_asistencia', 'total_dias', 'dias_presente', 'minutos_totales',
+        ],
+    )
+
+
+# Archivos
+
+def _ruta(carpeta, mes, numero_lote, extension):
+    sello = timezone.now().strftime('%Y%m%dT%H%M%S')
+    return carpeta / f'{mes:%Y}' / f'asistencias-{mes:%Y-%m}-{sello}-{numero_lote:04d}.{extension}'
+
+
+def _por_mes(filas):
+    meses = {}
+    for fila in filas:
+        meses.setdefault(fila['fecha_asistencia'].replace(day=1), []).append(fila)
+    return meses
+
+
+def _escribir_archivos(filas, destino, carpeta, numero_lote):
+    escribir = _escribir_parquet if destino == 'parquet' else _escribir_csv
+    for mes, filas_mes in _por_mes(filas).items():
+        ruta = _ruta(carpeta, mes, numero_lote, 'parquet' if destino == 'parquet' else 'csv.gz')
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_name(ruta.name + '.tmp')
+        escribir(temporal, filas_mes)
+        # Si la transacción falla queda un archivo huérfano, nunca uno a medias;
+        # sus filas se vuelven a archivar y leer_archivos() las lee una vez
+        os.replace(temporal, ruta)
+
+
+def _texto_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return '1' if valor else '0'
+    if isinstance(valor, (date, time)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def _escribir_csv(ruta, filas):
+    with gzip.open(ruta, 'wt', encoding='utf-8', newline='') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(CAMPOS_HISTORIAL)
+        for fila in filas:
+            escritor.writerow([_texto_csv(fila[campo]) for campo in CAMPOS_HISTORIAL])
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImproperlyConfigured('El archivo en Parquet requiere pyarrow.')
+    return pyarrow
+
+
+def _escribir_parquet(ruta, filas):
+    pa = _pyarrow()
+    columnas = {campo: [fila[campo] for fila in filas] for campo in CAMPOS_HISTORIAL}
+    columnas['id'] = [str(pk) for pk in columnas['id']]
+    pa.parquet.write_table(pa.table(columnas), ruta)
+
+
+def _leer_csv(ruta):
+    conversores = {
+        'fecha_asistencia': date.fromisoformat,
+        'hora_ingreso': time.fromisoformat,
+        'hora_salida': lambda v: time.fromisoformat(v) if v else None,
+        'presente': lambda v: v == '1',
+        'duracion_minutos': lambda v: int(v) if v else None,
+        'observaciones': lambda v: v or None,
+        'fecha_creacion': datetime.fromisoformat,
+        'fecha_actualizacion': datetime.fromisoformat,
+    }
+    with gzip.open(ruta, 'rt', encoding='utf-8', newline='') as archivo:
+        for fila in csv.DictReader(archivo):
+            yield {campo: conversores.get(campo, str)(valor) for campo, valor in fila.items()}
+
+
+def _leer_parquet(ruta):
+    pa = _pyarrow()
+    yield from pa.parquet.read_table(ruta).to_pylist()
+
+
+def leer_archivos(desde=None, hasta=None, carpeta=None):
+    """
+    Recorre las asistencias archivadas en archivos con fecha entre desde y
+    hasta (inclusive). Solo abre los archivos de los meses del rango. Una
+    fila repetida en un archivo huérfano (ver _escribir_archivos) se entrega
+    una sola vez.
+    """
+    carpeta = Path(carpeta) if carpeta else carpeta_archivo()
+    rutas = sorted(carpeta.glob('*/asistencias-*.csv.gz')) + sorted(carpeta.glob('*/asistencias-*.parquet'))
+    vistas = set()
+    for ruta in rutas:
+        mes = date.fromisoformat(ruta.name[len('asistencias-'):][:7] + '-01')
+        if desde and mes < desde.replace(day=1):
+            continue
+        if hasta and mes > hasta:
+            continue
+        leer = _leer_parquet if ruta.suffix == '.parquet' else _leer_csv
+        for fila in leer(ruta):
+            if desde and fila['fecha_asistencia'] < desde:
+                continue
+            if hasta and fila['fecha_asistencia'] > hasta:
+                continue
+            if fila['id'] in vistas:
+                continue
+            vistas.add(fila['id'])
+            yield fila
@@ -0,0 +1,62 @@
+"""
+Cálculo de la duración de una asistencia a partir de sus horas
+"""
+from datetime import datetime, timedelta
+
+# Duración mínima (en minutos) de una asistencia completa
+MINUTOS_ASISTENCIA_COMPLETA = 4 * 60
+
+
+def calcular_duracion(fecha, hora_ingreso, hora_salida):
+    """
+    Calcula la duración en horas entre hora_ingreso y hora_salida
+    """
+    if hora_ingreso and hora_salida:
+        # Convertir a datetime para calcular diferencia
+        ingreso = datetime.combine(fecha, hora_ingreso)
+        salida = datetime.combine(fecha, hora_salida)
+
+        # Si la salida es al día siguiente
+        if hora_salida < hora_ingreso:
+            salida = datetime.combine(fecha + timedelta(days=1), hora_salida)
+
+        duracion = salida - ingreso
+        return duracion.total_seconds() / 3600  # Retorna en horas
+    return None
+
+
+def calcular_minutos(hora_ingreso, hora_salida):
+    """
+    Duración en minutos completos entre hora_ingreso y hora_salida
+    """
+    if not (hora_ingreso and hora_salida):
+        return None
+    segundos = (
+        (hora_salida.hour - hora_ingreso.hour) * 3600
+        + (hora_salida.minute - hora_ingreso.minute) * 60
+        + (hora_salida.second - hora_ingreso.second)
+    )
+    # Si la salida es al día siguiente
+    if segundos < 0:
+        segundos += 24 * 3600
+    return segundos // 60
+
+
+def formatear_duracion(duracion):
+    """
+    Formatea una duración en horas como "Xh Ym"
+    """
+    if duracion:
+        horas = int(duracion)
+        minutos = int((duracion - horas) * 60)
+        return f"{horas}h {minutos}m"
+    return "No disponible"
+
+
+def formatear_minutos(minutos):
+    """
+    Formatea una duración en minutos como "Xh Ym"
+    """
+    if minutos:
+        return f"{minutos // 60}h {minutos % 60}m"
+    return "No disponible"
@@ -0,0 +1,209 @@
+"""
+Panel en vivo: los contadores de la lista de asistencias por eventos del
+servidor (Server-Sent Events)
+
+Las pantallas de recepción mantienen abierta una conexión con
+/asistencia/panel/eventos/ y reciben un evento "valores" al conectar y un
+evento "deltas" ({contador: diferencia}) con cada cambio. Bajo ASGI cada
+conexión es una corrutina que espera sin ocupar un hilo ni consultar la base.
+
+Publicación y suscripción en el proceso: cada escritura que invalida las
+estadísticas envía, al confirmarse, la señal estadisticas.cambiaron (desde
+las señales de Asistencia y Solicitud y desde las escrituras masivas). El
+aviso solo despierta al hilo del panel, que recalcula los valores una vez
+(los avisos que lleguen mientras tanto se juntan en el siguiente cálculo)
+y despierta a las pantallas, que solo comparan diccionarios en memoria.
+Con cualquier número de pantallas, el costo es un cálculo por cambio.
+
+Los cambios hechos en otros procesos y el cambio de día se ven con el
+recálculo periódico (PANEL_EN_VIVO_INTERVALO segundos) mientras haya
+pantallas conectadas. Ese recálculo lee la base (una agregación sobre
+ResumenDiario y un conteo de solicitudes) en lugar de la caché de
+estadísticas, que con locmem es la de este proceso y no ve esos cambios.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+from . import estadisticas
+
+logger = logging.getLogger(__name__)
+
+CONTADORES = ('total_registros', 'presentes_hoy', 'presentes_semana', 'presentes_mes', 'total_solicitudes')
+# Milisegundos que espera el navegador antes de reconectar
+REINTENTO = 3000
+# Comentario periódico para que los proxies no cierren la conexión inactiva
+LATIDO = 15
+
+
+def intervalo():
+    return getattr(settings, 'PANEL_EN_VIVO_INTERVALO', 30)
+
+
+def duracion():
+    return getattr(settings, 'PANEL_EN_VIVO_DURACION', 300)
+
+
+def _valores(resumen, total_solicitudes):
+    return {
+        'total_registros': resumen['total'],
+        'presentes_hoy': resumen['presentes_hoy'],
+        'presentes_semana': resumen['presentes_semana'],
+        'presentes_mes': resumen['presentes_mes'],
+        'total_solicitudes': total_solicitudes,
+    }
+
+
+def calcular():
+    """Valores de los contadores, desde la caché de estadísticas"""
+    return _valores(estadisticas.resumen_periodos(), estadisticas.resumen_solicitudes()['total'])
+
+
+def consultar():
+    """Valores de los contadores leídos de la base, sin pasar por la caché"""
+    from solicitudes.models import Solicitud
+
+    from .models import ResumenDiario
+    return _valores(ResumenDiario.objects.resumen_periodos(), Solicitud.objects.count())
+
+
+def diferencias(anteriores, actuales):
+    return {
+        contador: actuales[contador] - anteriores.get(contador, 0)
+        for contador in actuales
+        if actuales[contador] != anteriores.get(contador)
+    }
+
+
+class PanelEnVivo:
+    """
+    Últimos valores del panel en este proceso, con un número de versión que
+    sube cuando cambian, y las pantallas que esperan el siguiente cambio
+    """
+
+    def __init__(self, calcular=calcular, consultar=consultar):
+        self._calcular = calcular
+        self._consultar = consultar
+        self._lock = threading.Lock()
+        self._lock_calculo = threading.Lock()
+        self._esperas = set()
+        self._cambio = threading.Event()
+        self._hilo = None
+        self._vencidos = True
+        self._calculados = 0.0
+        self.version = 0
+        self.valores = None
+        self.calculos = 0
+
+    def notificar(self, **kwargs):
+        """Receptor de estadisticas.cambiaron"""
+        self._vencidos = True
+        if self._esperas:
+            self._cambio.set()
+
+    def actuales(self):
+        """
+        (versión, valores). Se recalculan si hubo un aviso de cambio o pasó
+        el intervalo desde el último cálculo; si no, no se consulta nada.
+        """
+        if self._vencidos:
+            return self.recalcular()
+        if time.monotonic() - self._calculados >= intervalo():
+            return self.recalcular(periodico=True)
+        return self.version, self.valores
+
+    def recalcular(self, periodico=False):
+        """
+        Recalcula los valores desde la caché de estadísticas o, en el
+        recálculo periódico, desde la base
+        """
+        with self._lock_calculo:
+            self._vencidos = False
+            valores = self._consultar() if periodico else self._calcular()
+            with self._lock:
+                self.calculos += 1
+                self._calculados = time.monotonic()
+                esperas = []
+                if valores != self.valores:
+                    self.valores = valores
+                    self.version += 1
+                    esperas = list(self._esperas)
+                version = self.version
+        for bucle, evento in esperas:
+            try:
+                bucle.call_soon_threadsafe(evento.set)
+            except RuntimeError:
+                # El bucle de esa conexión ya se cerró
+                pass
+        return version, valores
+
+    async def esperar(self, version, plazo):
+        """
+        Espera a que la versión sea otra que `version` o a que pase el plazo
+        (segundos). Retorna (versión, valores).
+        """
+        evento = asyncio.Event()
+        espera = (asyncio.get_running_loop(), evento)
+        with self._lock:
+            if self.version != version:
+                return self.version, self.valores
+            self._esperas.add(espera)
+        self._iniciar()
+        try:
+            await asyncio.wait_for(evento.wait(), plazo)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._esperas.discard(espera)
+        return self.version, self.valores
+
+    def _iniciar(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._mantener, name='panel-en-vivo', daemon=True)
+                self._hilo.start()
+
+    def _mantener(self):
+        while True:
+            avisado = self._cambio.wait(intervalo())
+            self._cambio.clear()
+            if not self._esperas:
+                continue
+            close_old_connections()
+            try:
+                self.recalcular(periodico=not avisado)
+            except Exception:
+                logger.exception('Error recalculando el panel en vivo')
+            finally:
+                close_old_connections()
+
+
+panel = PanelEnVivo()
+
+
+def evento_sse(nombre, version, datos, reintento=None):
+    lineas = [f'retry: {reintento}'] if reintento else []
+    lineas += [f'event: {nombre}', f'id: {version}', f'data: {json.dumps(datos, cls=DjangoJSONEncoder)}']
+    return '\n'.join(lineas) + '\n\n'
+
+
+async def flujo(version, valores):
+    """Eventos de una conexión: los valores y luego los cambios, durante PANEL_EN_VIVO_DURACION"""
+    yield evento_sse('valores', version, valores, reintento=REINTENTO)
+    fin = time.monotonic() + duracion()
+    while (restante := fin - time.monotonic()) > 0:
+        nueva, actuales = await panel.esperar(version, min(restante, LATIDO))
+        if nueva == version:
+            yield ': latido\n\n'
+            continue
+        deltas = diferencias(valores, actuales)
+        version, valores = nueva, actuales
+        if deltas:
+            yield evento_sse('deltas', version, deltas)
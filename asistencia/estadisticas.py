@@ -0,0 +1,408 @@
+"""
+Caché de las estadísticas de asistencia y solicitudes
+
+Los contadores se arman a partir de entradas por día y por mes guardadas en
+el framework de caché de Django (alias ESTADISTICAS_CACHE, locmem por
+defecto). El día de hoy expira tras ESTADISTICAS_TTL_HOY segundos y las
+demás entradas (días y meses pasados, solicitudes) tras
+ESTADISTICAS_TTL_PASADOS: la invalidación solo alcanza a la caché del proceso
+que escribe, y con una caché por proceso la duración acota cuánto tarda en
+verse en los demás. Cuando cambian las asistencias de una fecha se descartan
+solo la entrada de ese día y la de su mes.
+
+Todas las claves llevan la versión de su espacio ('asistencia' o
+'solicitudes'). Al subir la versión se invalida el espacio completo; esto
+ocurre con las señales de Solicitud y al reconstruir el resumen diario.
+
+El panel de la lista de asistencias se guarda además como fragmentos de
+plantilla ({% cache %}) cuya clave lleva la marca de escritura de cada
+espacio (`marca`), así que cualquier escritura los invalida. La vista pasa
+los valores con `contexto_panel`, que no consulta nada mientras los
+fragmentos estén en la caché.
+
+Al confirmarse cada escritura que invalida un espacio se envía la señal
+`cambiaron` (la usa el panel en vivo, ver en_vivo.py).
+"""
+import threading
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .managers import ventanas_de_fecha
+
+PREFIJO = 'estadisticas'
+CAMPOS_DIA = ('total', 'presentes', 'ausentes', 'minutos')
+
+# Argumento: espacio ('asistencia' o 'solicitudes')
+cambiaron = Signal()
+
+
+class Contadores:
+    """Aciertos y fallos de la caché de estadísticas en este proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def registrar(self, aciertos=0, fallos=0):
+        with self._lock:
+            self.aciertos += aciertos
+            self.fallos += fallos
+
+    def como_dict(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas * 100, 2) if consultas else 0,
+            }
+
+    def reiniciar(self):
+        with self._lock:
+            self.aciertos = self.fallos = 0
+
+
+contadores = Contadores()
+
+
+def _cache():
+    return caches[getattr(settings, 'ESTADISTICAS_CACHE', 'default')]
+
+
+def _ttl_hoy():
+    return getattr(settings, 'ESTADISTICAS_TTL_HOY', 60)
+
+
+def _ttl_pasados():
+    return getattr(settings, 'ESTADISTICAS_TTL_PASADOS', 3600)
+
+
+def _clave_version(espacio):
+    return f'{PREFIJO}:version:{espacio}'
+
+
+def version(espacio):
+    cache = _cache()
+    clave = _clave_version(espacio)
+    actual = cache.get(clave)
+    if actual is None:
+        cache.add(clave, 1, timeout=None)
+        actual = cache.get(clave, 1)
+    return actual
+
+
+def _ahora_y_al_confirmar(funcion):
+    """
+    Ejecuta la invalidación de inmediato y otra vez al confirmar la
+    transacción, para descartar lo que otro proceso haya guardado entre
+    tanto con los datos anteriores
+    """
+    funcion()
+    transaction.on_commit(funcion)
+
+
+def _avisar_al_confirmar(espacio):
+    transaction.on_commit(lambda: cambiaron.send(sender=None, espacio=espacio))
+
+
+def invalidar(espacio='asistencia'):
+    """Sube la versión del espacio: todas sus claves dejan de usarse"""
+    _ahora_y_al_confirmar(lambda: _subir_version(espacio))
+    _avisar_al_confirmar(espacio)
+
+
+def _subir_version(espacio):
+    _incrementar(_clave_version(espacio), inicial=2)
+
+
+def _incrementar(clave, inicial=1):
+    cache = _cache()
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, inicial, timeout=None)
+
+
+def _clave_escrituras(espacio):
+    return f'{PREFIJO}:escrituras:{espacio}'
+
+
+def marca(espacio):
+    """
+    Cambia con cada escritura del espacio (versión y contador de escrituras
+    por fecha): clave de los fragmentos de plantilla del panel
+    """
+    return f'{version(espacio)}.{_cache().get(_clave_escrituras(espacio), 0)}'
+
+
+def _prefijo(espacio):
+    """Prefijo versionado de las claves de un espacio"""
+    return f'{PREFIJO}:{espacio}:v{version(espacio)}'
+
+
+def _obtener(clave, calcular, timeout=None):
+    cache = _cache()
+    valor = cache.get(clave)
+    if valor is not None:
+        contadores.registrar(aciertos=1)
+        return valor
+    contadores.registrar(fallos=1)
+    valor = calcular()
+    cache.set(clave, valor, timeout=_ttl_pasados() if timeout is None else timeout)
+    return valor
+
+
+def _clave_dia(prefijo, fecha):
+    return f'{prefijo}:dia:{fecha.isoformat()}'
+
+
+def _clave_mes(prefijo, fecha):
+    return f'{prefijo}:mes:{fecha:%Y-%m}'
+
+
+def invalidar_fechas(fechas):
+    """
+    Descarta las entradas de los días indicados y de sus meses.
+    La llama el mantenimiento del resumen diario en cada escritura.
+    """
+    fechas = {f for f in fechas if isinstance(f, date)}
+    if fechas:
+        _ahora_y_al_confirmar(lambda: _descartar_fechas(fechas))
+        _avisar_al_confirmar('asistencia')
+
+
+def _descartar_fechas(fechas):
+    prefijo = _prefijo('asistencia')
+    claves = [_clave_dia(prefijo, f) for f in fechas]
+    claves += list({_clave_mes(prefijo, f) for f in fechas})
+    primer_dia = _cache().get(f'{prefijo}:primer_dia')
+    if not primer_dia or min(fechas) < primer_dia:
+        claves.append(f'{prefijo}:primer_dia')
+    _cache().delete_many(claves)
+    _incrementar(_clave_escrituras('asistencia'))
+
+
+def _resumen_diario():
+    from .models import ResumenDiario
+    return ResumenDiario.objects
+
+
+def _como_valores(fila=None):
+    if fila is None:
+        return dict.fromkeys(CAMPOS_DIA, 0)
+    return {
+        'total': fila.total,
+        'presentes': fila.presentes,
+        'ausentes': fila.ausentes,
+        'minutos': int(fila.duracion_total.total_seconds() // 60),
+    }
+
+
+def _sumar(valores):
+    resultado = dict.fromkeys(CAMPOS_DIA, 0)
+    for v in valores:
+        for campo in CAMPOS_DIA:
+            resultado[campo] += v[campo]
+    return resultado
+
+
+def totales_dias(fechas, hoy=None, prefijo=None):
+    """
+    Totales por día {fecha: {total, presentes, ausentes, minutos}}.
+    Lee todas las entradas con un get_many y calcula las que falten con una
+    sola consulta sobre el resumen diario.
+    """
+    hoy = hoy or timezone.localdate()
+    prefijo = prefijo or _prefijo('asistencia')
+    fechas = sorted(set(fechas))
+    claves = {f: _clave_dia(prefijo, f) for f in fechas}
+    cache = _cache()
+    encontradas = cache.get_many(claves.values())
+
+    resultado = {}
+    faltantes = []
+    for fecha, clave in claves.items():
+        if clave in encontradas:
+            resultado[fecha] = encontradas[clave]
+        else:
+            faltantes.append(fecha)
+    contadores.registrar(aciertos=len(resultado), fallos=len(faltantes))
+
+    if faltantes:
+        filas = {r.fecha: r for r in _resumen_diario().filter(fecha__in=faltantes)}
+        pasadas = {}
+        for fecha in faltantes:
+            resultado[fecha] = _como_valores(filas.get(fecha))
+            if fecha < hoy:
+                pasadas[claves[fecha]] = resultado[fecha]
+            else:
+                cache.set(claves[fecha], resultado[fecha], timeout=_ttl_hoy())
+        if pasadas:
+            cache.set_many(pasadas, timeout=_ttl_pasados())
+    return resultado
+
+
+def totales_mes(fecha, hoy=None, prefijo=None):
+    """
+    Totales del mes que contiene la fecha. Un mes pasado se guarda completo
+    por ESTADISTICAS_TTL_PASADOS; el mes en curso se suma a partir de sus días.
+    """
+    hoy = hoy or timezone.localdate()
+    prefijo = prefijo or _prefijo('asistencia')
+    inicio = fecha.replace(day=1)
+    if inicio < hoy.replace(day=1):
+        def calcular():
+            fin = (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            return _sumar(totales_dias(_dias(inicio, fin), hoy, prefijo).values())
+        return _obtener(_clave_mes(prefijo, inicio), calcular)
+    return _sumar(totales_dias(_dias(inicio, hoy), hoy, prefijo).values())
+
+
+def _dias(inicio, fin):
+    return [inicio + timedelta(days=i) for i in range((fin - inicio).days + 1)]
+
+
+def _meses(inicio, fin):
+    actual = inicio.replace(day=1)
+    while actual <= fin:
+        yield actual
+        actual = (actual + timedelta(days=32)).replace(day=1)
+
+
+def _primer_dia(prefijo):
+    def calcular():
+        primero = _resumen_diario().order_by('fecha').values_list('fecha', flat=True).first()
+        # Se guarda False para distinguir "sin datos" de "sin calcular"
+        return primero or False
+    return _obtener(f'{prefijo}:primer_dia', calcular) or None
+
+
+def resumen_periodos(fecha=None):
+    """
+    Mismas claves que ResumenDiario.objects.resumen_periodos, armadas con
+    las entradas cacheadas de días y meses
+    """
+    hoy = fecha or timezone.localdate()
+    prefijo = _prefijo('asistencia')
+    semana, _ = ventanas_de_fecha(hoy)
+
+    # Un mes por entrada desde el primer día con datos; el último es el actual
+    primer_dia = _primer_dia(prefijo)
+    meses = []
+    if primer_dia and primer_dia <= hoy:
+        meses = [totales_mes(mes, hoy, prefijo) for mes in _meses(primer_dia, hoy)]
+    global_ = _sumar(meses)
+    del_mes = meses[-1] if meses else _sumar([])
+
+    dias_semana = totales_dias(_dias(*semana), hoy, prefijo)
+    del_dia = dias_semana[hoy]
+
+    return {
+        'total': global_['total'],
+        'total_presentes': global_['presentes'],
+        'total_ausentes': global_['ausentes'],
+        'total_hoy': del_dia['total'],
+        'presentes_hoy': del_dia['presentes'],
+        'presentes_semana': sum(d['presentes'] for d in dias_semana.values()),
+        'total_mes': del_mes['total'],
+        'presentes_mes': del_mes['presentes'],
+        'ausentes_mes': del_mes['ausentes'],
+    }
+
+
+def dias_del_mes(hoy=None):
+    """Días del mes en curso con registros, para el reporte mensual"""
+    hoy = hoy or timezone.localdate()
+    dias = totales_dias(_dias(hoy.replace(day=1), hoy), hoy)
+    return [
+        {
+            'fecha': fecha,
+            'total': valores['total'],
+            'presentes': valores['presentes'],
+            'ausentes': valores['ausentes'],
+            'horas_totales': round(valores['minutos'] / 60, 2),
+        }
+        for fecha, valores in sorted(dias.items())
+        if valores['total']
+    ]
+
+
+def resumen_solicitudes(cantidad=5):
+    """Total de solicitudes y las más recientes, cacheados hasta el próximo cambio"""
+    from solicitudes.lecturas import SolicitudReciente
+    from solicitudes.models import Solicitud
+
+    def calcular():
+        recientes = SolicitudReciente.proyectar(Solicitud.objects.order_by('-fecha_solicitud'))
+        return {
+            'total': Solicitud.objects.count(),
+            'ultimas': SolicitudReciente.envolver(recientes[:cantidad]),
+        }
+    return _obtener(f'{_prefijo("solicitudes")}:resumen:{cantidad}', calcular)
+
+
+def resumen_solicitudes_o_vacio():
+    try:
+        return resumen_solicitudes()
+    except Exception:
+        # Si la app solicitudes no está disponible, garantizar que las claves existan
+        return {'total': 0, 'ultimas': []}
+
+
+def contexto_panel(hoy=None, resumen=None, solicitudes=None):
+    """
+    Contexto del panel de la lista de asistencias. Las estadísticas se
+    calculan al usarse por primera vez: si los fragmentos de la plantilla
+    están en la caché, la página se sirve sin calcularlas. `resumen` y
+    `solicitudes` reciben valores ya calculados (la vista asíncrona los
+    calcula a la vez antes de renderizar).
+    """
+    hoy = hoy or timezone.localdate()
+    if resumen is None:
+        resumen = SimpleLazyObject(lambda: resumen_periodos(hoy))
+    if solicitudes is None:
+        solicitudes = SimpleLazyObject(resumen_solicitudes_o_vacio)
+    return {
+        'total_registros': SimpleLazyObject(lambda: resumen['total']),
+        'presentes_hoy': SimpleLazyObject(lambda: resumen['presentes_hoy']),
+        'presentes_semana': SimpleLazyObject(lambda: resumen['presentes_semana']),
+        'presentes_mes': SimpleLazyObject(lambda: resumen['presentes_mes']),
+        'total_solicitudes': SimpleLazyObject(lambda: solicitudes['total']),
+        'ultimas_solicitudes': SimpleLazyObject(lambda: solicitudes['ultimas']),
+        # Claves y duración de los fragmentos {% cache %} de la plantilla
+        'panel_fecha': hoy,
+        'panel_asistencia': marca('asistencia'),
+        'panel_solicitudes': marca('solicitudes'),
+        'panel_ttl': getattr(settings, 'PANEL_FRAGMENTOS_TTL', _ttl_hoy()),
+        'panel_en_vivo': getattr(settings, 'PANEL_EN_VIVO', False),
+    }
+
+
+# Fragmentos {% cache %} de asistencia_list.html: (nombre, variables de la clave)
+FRAGMENTOS_PANEL = (
+    ('panel_total_solicitudes', ('panel_solicitudes',)),
+    ('panel_estadisticas', ('panel_asistencia', 'panel_fecha')),
+    ('panel_ultimas_solicitudes', ('panel_solicitudes',)),
+)
+
+
+def fragmentos_en_cache(contexto):
+    """True si todos los fragmentos del panel están en la caché de plantillas"""
+    claves = [
+        make_template_fragment_key(nombre, [contexto[v] for v in variables])
+        for nombre, variables in FRAGMENTOS_PANEL
+    ]
+    # Misma caché que usa la etiqueta {% cache %}
+    try:
+        cache = caches['template_fragments']
+    except InvalidCacheBackendError:
+        cache = caches['default']
+    return len(cache.get_many(claves)) == len(claves)
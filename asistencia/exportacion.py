@@ -0,0 +1,79 @@
+"""
+Exportación CSV en streaming de asistencias
+
+Las filas se leen con values_list(...).iterator(chunk_size) y se escriben por
+bloques, de modo que la memoria usada no crece con el número de registros.
+"""
+import csv
+import io
+
+from django.http import StreamingHttpResponse
+
+from .duracion import formatear_minutos
+
+ENCABEZADOS_CSV = [
+    'ID', 'Nombre Completo', 'Documento', 'Correo', 'Fecha',
+    'Hora Ingreso', 'Hora Salida', 'Presente', 'Duración', 'Observaciones'
+]
+
+CAMPOS_CSV = [
+    'id', 'nombre_completo', 'documento_identidad', 'correo_electronico',
+    'fecha_asistencia', 'hora_ingreso', 'hora_salida', 'presente',
+    'duracion_minutos', 'observaciones'
+]
+
+TAMANO_BLOQUE = 2000
+
+
+def _hora(valor):
+    return valor.strftime('%H:%M') if valor else ''
+
+
+def formatear_fila(fila):
+    """Convierte una tupla de CAMPOS_CSV en la fila del archivo"""
+    (pk, nombre, documento, correo, fecha,
+     ingreso, salida, presente, minutos, observaciones) = fila
+    return [
+        str(pk),
+        nombre,
+        documento,
+        correo,
+        fecha.strftime('%d/%m/%Y'),
+        _hora(ingreso),
+        _hora(salida),
+        'Sí' if presente else 'No',
+        formatear_minutos(minutos),
+        observaciones or '',
+    ]
+
+
+def bloques_csv(queryset, chunk_size=TAMANO_BLOQUE):
+    """
+    Genera el contenido CSV en bloques de chunk_size filas
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(ENCABEZADOS_CSV)
+
+    filas = queryset.values_list(*CAMPOS_CSV).iterator(chunk_size=chunk_size)
+    for i, fila in enumerate(filas, start=1):
+        escritor.writerow(formatear_fila(fila))
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def respuesta_csv(queryset, nombre_archivo, chunk_size=TAMANO_BLOQUE):
+    """
+    StreamingHttpResponse con el CSV de las asistencias del queryset
+    """
+    response = StreamingHttpResponse(
+        bloques_csv(queryset, chunk_size),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+    return response
@@ -23,7 +23,74 @@ class AsistenciaForm(forms.ModelForm):
             'observaciones': forms.Textarea(attrs={'rows': 3}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Una fila del kiosco sin salida registrada puede editarse sin inventarla
+        if self.instance.pk and self.instance.hora_salida is None:
+            self.fields['hora_salida'].required = False
+
     def clean(self):
         cleaned = super().clean()
         # Aquí puedes añadir validaciones cruzadas si es necesario
         return cleaned
+
+
+class RangoFechasForm(forms.Form):
+    desde = forms.DateField(
+        label='Desde',
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    hasta = forms.DateField(
+        label='Hasta',
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        desde = cleaned.get('desde')
+        hasta = cleaned.get('hasta')
+        if desde and hasta and desde > hasta:
+            raise forms.ValidationError('La fecha inicial debe ser anterior a la final.')
+        return cleaned
+
+
+class ReporteForm(RangoFechasForm):
+    agrupacion = forms.ChoiceField(
+        label='Agrupar por',
+        choices=[
+            ('dia', 'Día'),
+            ('semana', 'Semana'),
+            ('mes', 'Mes'),
+            ('persona', 'Persona'),
+        ],
+        initial='dia'
+    )
+    hora_entrada = forms.TimeField(
+        label='Hora de entrada',
+        required=False,
+        help_text='Ingresos posteriores cuentan como llegada tarde',
+        widget=forms.TimeInput(attrs={'type': 'time'})
+    )
+    formato = forms.ChoiceField(
+        label='Formato',
+        choices=[('html', 'HTML'), ('csv', 'CSV'), ('json', 'JSON')],
+        initial='html'
+    )
+
+
+class ImportarAsistenciasForm(forms.Form):
+    archivo = forms.FileField(
+        label='Archivo',
+        help_text='Archivo CSV o XLSX con una fila de encabezados',
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,.xlsx'})
+    )
+    solo_validar = forms.BooleanField(
+        label='Solo validar (no guardar)',
+        required=False
+    )
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data.get('archivo')
+        if archivo and not archivo.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Formato no soportado. Use archivos CSV o XLSX.')
+        return archivo
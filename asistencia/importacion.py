@@ -0,0 +1,325 @@
+"""
+Importación masiva de asistencias desde archivos CSV o XLSX
+
+El archivo se valida por lotes con las reglas de validators.ESQUEMA, la unicidad
+(documento_identidad, fecha_asistencia) se comprueba con una sola consulta
+para todo el lote y las filas válidas se insertan con bulk_create por bloques.
+"""
+import csv
+import io
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError
+from django.utils import timezone
+
+from . import validators
+from .models import MENSAJE_ARCHIVADA, Asistencia
+
+# Encabezados aceptados (normalizados) para cada campo del modelo
+ALIAS_COLUMNAS = {
+    'nombre_completo': 'nombre_completo',
+    'nombre': 'nombre_completo',
+    'documento_identidad': 'documento_identidad',
+    'documento': 'documento_identidad',
+    'correo_electronico': 'correo_electronico',
+    'correo': 'correo_electronico',
+    'email': 'correo_electronico',
+    'fecha_asistencia': 'fecha_asistencia',
+    'fecha': 'fecha_asistencia',
+    'hora_ingreso': 'hora_ingreso',
+    'hora_salida': 'hora_salida',
+    'presente': 'presente',
+    'observaciones': 'observaciones',
+}
+
+COLUMNAS_OBLIGATORIAS = [
+    'nombre_completo', 'documento_identidad', 'correo_electronico',
+    'fecha_asistencia', 'hora_ingreso', 'hora_salida',
+]
+
+# Además de ISO 8601 (AAAA-MM-DD, HH:MM[:SS]), que se interpreta sin strptime
+FORMATOS_FECHA = ['%d/%m/%Y', '%d-%m-%Y']
+FORMATOS_HORA = ['%H:%M', '%H:%M:%S']
+VALORES_VERDADEROS = {'si', 'sí', 'true', '1', 'x', 'presente', 'yes'}
+VALORES_FALSOS = {'no', 'false', '0', 'ausente'}
+
+TAMANO_LOTE = 1000
+
+MENSAJE_DUPLICADO = 'Ya existe un registro con este documento para esta fecha.'
+
+
+@dataclass
+class ResultadoImportacion:
+    """Resumen de una importación: filas creadas y errores por fila"""
+    total_filas: int = 0
+    validas: int = 0
+    creados: int = 0
+    errores: list = field(default_factory=list)
+
+    def agregar_error(self, numero_fila, errores):
+        self.errores.append((numero_fila, errores))
+
+
+def _normalizar_encabezado(valor):
+    texto = unicodedata.normalize('NFKD', str(valor or '').strip().lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return texto.replace(' ', '_')
+
+
+def _mapear_encabezados(encabezados):
+    columnas = [ALIAS_COLUMNAS.get(_normalizar_encabezado(e)) for e in encabezados]
+    faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in columnas]
+    if faltantes:
+        raise ValidationError(
+            'Faltan columnas obligatorias: ' + ', '.join(faltantes)
+        )
+    return columnas
+
+
+def _filas_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    try:
+        yield from csv.reader(texto, dialecto)
+    finally:
+        texto.detach()
+
+
+def _filas_xlsx(archivo):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValidationError('La importación de archivos XLSX requiere openpyxl.')
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        yield from libro.active.iter_rows(values_only=True)
+    finally:
+        libro.close()
+
+
+def leer_filas(archivo, nombre):
+    """
+    Lee un archivo CSV o XLSX (abierto en modo binario) y genera
+    (numero_fila, {campo: valor}) por cada fila de datos
+    """
+    extension = nombre.lower().rsplit('.', 1)[-1]
+    if extension == 'csv':
+        filas = _filas_csv(archivo)
+    elif extension == 'xlsx':
+        filas = _filas_xlsx(archivo)
+    else:
+        raise ValidationError('Formato no soportado. Use archivos CSV o XLSX.')
+
+    encabezados = next(filas, None)
+    if encabezados is None:
+        raise ValidationError('El archivo está vacío.')
+    columnas = _mapear_encabezados(encabezados)
+
+    for numero, valores in enumerate(filas, start=2):
+        if not any(v not in (None, '') for v in valores):
+            continue
+        yield numero, {
+            campo: valor
+            for campo, valor in zip(columnas, valores)
+            if campo
+        }
+
+
+def _texto(valor):
+    return '' if valor is None else str(valor).strip()
+
+
+def _convertir_fecha(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = _texto(valor)
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        pass
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValidationError('Fecha inválida, use AAAA-MM-DD o DD/MM/AAAA.')
+
+
+def _convertir_hora(valor):
+    if isinstance(valor, datetime):
+        return valor.time()
+    if isinstance(valor, time):
+        return valor
+    texto = _texto(valor)
+    try:
+        return time.fromisoformat(texto)
+    except ValueError:
+        pass
+    for formato in FORMATOS_HORA:
+        try:
+            return datetime.strptime(texto, formato).time()
+        except ValueError:
+            continue
+    raise ValidationError('Hora inválida, use HH:MM.')
+
+
+def _convertir_presente(valor):
+    if valor is None or valor == '':
+        return True
+    if isinstance(valor, bool):
+        return valor
+    texto = _texto(valor).lower()
+    if texto in VALORES_VERDADEROS:
+        return True
+    if texto in VALORES_FALSOS:
+        return False
+    raise ValidationError('Valor de presente inválido, use Sí o No.')
+
+
+def validar_fila(datos, hoy):
+    """
+    Convierte una fila ya leída y le aplica las reglas de validators.ESQUEMA.
+    Retorna (asistencia, errores) con todos los errores de la fila.
+    """
+    errores = {}
+    limpios = {}
+
+    def aplicar(campo, funcion):
+        try:
+            limpios[campo] = funcion(datos.get(campo))
+        except ValidationError as e:
+            errores[campo] = e.messages
+
+    def obligatorio(valor):
+        texto = _texto(valor)
+        if not texto:
+            raise ValidationError(validators.OBLIGATORIO)
+        return texto
+
+    def correo(valor):
+        texto = _texto(valor).lower()
+        validate_email(texto)
+        return texto
+
+    def observaciones(valor):
+        return _texto(valor) or None
+
+    aplicar('nombre_completo', obligatorio)
+    aplicar('documento_identidad', obligatorio)
+    aplicar('correo_electronico', correo)
+    aplicar('fecha_asistencia', _convertir_fecha)
+    aplicar('hora_ingreso', _convertir_hora)
+    aplicar('hora_salida', _convertir_hora)
+    aplicar('presente', _convertir_presente)
+    aplicar('observaciones', observaciones)
+
+    for campo, mensajes in validators.ESQUEMA.errores(limpios, {'hoy': hoy}).items():
+        errores.setdefault(campo, mensajes)
+
+    if errores:
+        return None, errores
+    asistencia = Asistencia(**limpios)
+    asistencia.normalizar()
+    return asistencia, {}
+
+
+def _claves_existentes(asistencias):
+    """
+    Pares (documento, fecha) ya registrados para los documentos del lote en
+    su rango de fechas: uno en las asistencias vivas, otro en las archivadas
+    """
+    if not asistencias:
+        return set(), set()
+    fechas = [a.fecha_asistencia for a in asistencias]
+    documentos = {a.documento_identidad for a in asistencias}
+    existentes = Asistencia.objects.filter(
+        documento_identidad__in=documentos,
+        fecha_asistencia__range=(min(fechas), max(fechas)),
+    ).order_by().values_list('documento_identidad', 'fecha_asistencia')
+    archivadas = Asistencia.objects.claves_archivadas(documentos, min(fechas), max(fechas))
+    return set(existentes.iterator(chunk_size=5000)), archivadas
+
+
+def _crear_omitiendo_conflictos(nuevas, lote):
+    """
+    Inserta (numero_fila, asistencia) omitiendo los pares que otro proceso
+    registró después de la comprobación. Retorna los números de fila omitidos.
+    """
+    Asistencia.objects.bulk_create([a for _, a in nuevas], batch_size=lote, ignore_conflicts=True)
+    guardadas = set()
+    for i in range(0, len(nuevas), lote):
+        guardadas.update(
+            Asistencia._base_manager
+            .filter(pk__in=[a.pk for _, a in nuevas[i:i + lote]])
+            .values_list('pk', flat=True)
+        )
+    return [numero for numero, a in nuevas if a.pk not in guardadas]
+
+
+def importar_asistencias(filas, guardar=True, lote=TAMANO_LOTE):
+    """
+    Valida e importa filas (numero_fila, datos) como asistencias.
+    Las filas con errores se reportan y no se insertan.
+    """
+    resultado = ResultadoImportacion()
+    hoy = timezone.localdate()
+    validas = []
+
+    for numero, datos in filas:
+        resultado.total_filas += 1
+        asistencia, errores = validar_fila(datos, hoy)
+        if errores:
+            resultado.agregar_error(numero, errores)
+        else:
+            validas.append((numero, asistencia))
+
+    existentes, archivadas = _claves_existentes([a for _, a in validas])
+    vistas = set()
+    nuevas = []
+    for numero, asistencia in validas:
+        clave = (asistencia.documento_identidad, asistencia.fecha_asistencia)
+        if clave in existentes:
+            resultado.agregar_error(numero, {'documento_identidad': [MENSAJE_DUPLICADO]})
+        elif clave in archivadas:
+            resultado.agregar_error(numero, {'documento_identidad': [MENSAJE_ARCHIVADA]})
+        elif clave in vistas:
+            resultado.agregar_error(numero, {
+                'documento_identidad': ['Documento repetido para la misma fecha dentro del archivo.']
+            })
+        else:
+            vistas.add(clave)
+            nuevas.append((numero, asistencia))
+
+    resultado.validas = len(nuevas)
+
+    if guardar and nuevas:
+        try:
+            Asistencia.objects.bulk_create([a for _, a in nuevas], batch_size=lote)
+            omitidas = []
+        except IntegrityError:
+            # Otra escritura registró alguno de los pares después de la
+            # comprobación: bulk_create se deshizo entero, se reintenta sin ellos
+            omitidas = _crear_omitiendo_conflictos(nuevas, lote)
+        for numero in omitidas:
+            resultado.agregar_error(numero, {'documento_identidad': [MENSAJE_DUPLICADO]})
+        resultado.creados = len(nuevas) - len(omitidas)
+
+    resultado.errores.sort(key=lambda error: error[0])
+    return resultado
+
+
+def importar_archivo(archivo, nombre, guardar=True, lote=TAMANO_LOTE):
+    """Lee e importa un archivo CSV/XLSX abierto en modo binario"""
+    return importar_asistencias(leer_filas(archivo, nombre), guardar=guardar, lote=lote)
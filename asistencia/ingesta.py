@@ -0,0 +1,500 @@
+"""
+Ingesta diferida de los escaneos de los kioscos (write-behind)
+
+Con INGESTA_DIFERIDA el kiosco no escribe en Asistencia: cada escaneo se
+valida y se anota en una bitácora de solo agregado, una base SQLite propia
+en modo WAL (INGESTA_BITACORA), con un INSERT de una fila que no compite por
+el bloqueo de escritura de la base principal. Un hilo por proceso vuelca la
+bitácora cada INGESTA_INTERVALO_MS o al juntar INGESTA_LOTE eventos:
+
+- Los eventos se leen en orden de llegada y se combinan por fila del día
+  con las mismas reglas de kiosco.registrar (la primera entrada fija
+  hora_ingreso, la última salida manda).
+- Cada lote es una transacción: una consulta por las filas existentes, un
+  INSERT ... ON CONFLICT para las nuevas y un UPDATE por lotes para las que
+  cambiaron. Los resúmenes se recalculan una vez por lote, no por escaneo.
+- Los eventos se borran de la bitácora después de confirmar la transacción.
+- Si un lote falla se aplica evento por evento. Un evento que falla se
+  queda en la bitácora (y con él los siguientes de su fila, para no
+  alterar el orden) con un intento más; al llegar a INGESTA_REINTENTOS pasa
+  a la tabla `fallidos` con el error, y el resto sigue volcándose. Los
+  errores de conexión o de bloqueo (OperationalError) no cuentan: cortan
+  el volcado y se reintenta en el siguiente ciclo.
+
+Un solo proceso vuelca a la vez (bloqueo de archivo junto a la bitácora).
+Si el proceso muere a mitad de un lote los eventos siguen en la bitácora y
+el siguiente volcado (el hilo de cualquier proceso o el comando
+volcar_ingesta) los aplica de nuevo: aplicar dos veces el mismo lote deja
+el mismo resultado.
+
+Leer lo propio: la respuesta del kiosco es la fila del día proyectada con
+los eventos aún pendientes (`estado`), la misma que quedará al volcarlos.
+El resto de las vistas ve el escaneo tras el volcado.
+"""
+import logging
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, router, transaction
+
+from . import kiosco
+from .models import Asistencia
+from .resumen import resumen_diferido
+
+try:
+    import fcntl
+except ImportError:  # Windows: el turno solo excluye hilos del mismo proceso
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CAMPOS = kiosco.CAMPOS_RESPUESTA + ('correo_electronico',)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    documento TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    hora TEXT NOT NULL,
+    nombre TEXT NOT NULL DEFAULT '',
+    correo TEXT NOT NULL DEFAULT '',
+    fila TEXT,
+    intentos INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS eventos_documento_fecha ON eventos (documento, fecha);
+CREATE TABLE IF NOT EXISTS fallidos (
+    id INTEGER PRIMARY KEY,
+    documento TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    hora TEXT NOT NULL,
+    nombre TEXT NOT NULL DEFAULT '',
+    correo TEXT NOT NULL DEFAULT '',
+    fila TEXT,
+    intentos INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    fecha_fallo TEXT NOT NULL DEFAULT (datetime('now'))
+);
+"""
+
+COLUMNAS_EVENTO = 'id, documento, fecha, tipo, hora, nombre, correo, fila, intentos'
+
+# Fallas de la base que no dependen del evento: no cuentan como intento
+TRANSITORIOS = (OperationalError, InterfaceError)
+
+
+def diferida():
+    return getattr(settings, 'INGESTA_DIFERIDA', False)
+
+
+def asincrona():
+    return getattr(settings, 'INGESTA_ASINCRONA', True)
+
+
+def tamano_lote():
+    return getattr(settings, 'INGESTA_LOTE', 500)
+
+
+def intervalo():
+    return getattr(settings, 'INGESTA_INTERVALO_MS', 200) / 1000
+
+
+def reintentos():
+    return getattr(settings, 'INGESTA_REINTENTOS', 3)
+
+
+def ruta_bitacora():
+    return Path(getattr(settings, 'INGESTA_BITACORA', None) or Path(settings.BASE_DIR) / 'ingesta.sqlite3')
+
+
+class Bitacora:
+    """
+    Eventos pendientes en orden de llegada. Cada hilo usa su propia conexión
+    en autocommit: agregar un evento es una transacción de una fila.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self._local = threading.local()
+        self._lock_turno = threading.Lock()
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            conexion = sqlite3.connect(
+                self.ruta,
+                timeout=getattr(settings, 'SQLITE_ESPERA_MS', 20000) / 1000,
+                isolation_level=None,
+            )
+            conexion.row_factory = sqlite3.Row
+            conexion.execute('PRAGMA journal_mode=WAL')
+            # FULL sincroniza cada evento con el disco; NORMAL sobrevive a la
+            # caída del proceso pero no a la del sistema
+            conexion.execute(f"PRAGMA synchronous={getattr(settings, 'INGESTA_SINCRONIA', 'FULL')}")
+            conexion.executescript(ESQUEMA)
+            columnas = {c['name'] for c in conexion.execute('PRAGMA table_info(eventos)')}
+            if 'intentos' not in columnas:
+                # Bitácora creada antes de contar los intentos
+                conexion.execute('ALTER TABLE eventos ADD COLUMN intentos INTEGER NOT NULL DEFAULT 0')
+            self._local.conexion = conexion
+        return conexion
+
+    def cerrar(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+    @staticmethod
+    def _evento(fila):
+        return {
+            'id': fila['id'],
+            'documento': fila['documento'],
+            'fecha': date.fromisoformat(fila['fecha']),
+            'tipo': fila['tipo'],
+            'hora': time.fromisoformat(fila['hora']),
+            'nombre': fila['nombre'],
+            'correo': fila['correo'],
+            'fila': fila['fila'] and uuid.UUID(fila['fila']),
+        }
+
+    def agregar(self, evento):
+        """Anota el evento y retorna su id"""
+        cursor = self._conexion().execute(
+            'INSERT INTO eventos (documento, fecha, tipo, hora, nombre, correo, fila) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                evento['documento'], evento['fecha'].isoformat(), evento['tipo'],
+                evento['hora'].isoformat(), evento['nombre'], evento['correo'],
+                evento['fila'] and str(evento['fila']),
+            ),
+        )
+        return cursor.lastrowid
+
+    def pendientes(self, documento, fecha):
+        filas = self._conexion().execute(
+            'SELECT * FROM eventos WHERE documento = ? AND fecha = ? ORDER BY id',
+            (documento, fecha.isoformat()),
+        )
+        return [self._evento(fila) for fila in filas]
+
+    def leer(self, limite, desde=0):
+        """Los `limite` eventos más antiguos con id > desde"""
+        filas = self._conexion().execute(
+            'SELECT * FROM eventos WHERE id > ? ORDER BY id LIMIT ?', (desde, limite)
+        )
+        return [self._evento(fila) for fila in filas]
+
+    def confirmar(self, hasta, desde=0):
+        """Borra los eventos ya aplicados (desde < id <= hasta)"""
+        self._conexion().execute('DELETE FROM eventos WHERE id > ? AND id <= ?', (desde, hasta))
+
+    def fallo(self, id_evento, error, maximo):
+        """
+        Suma un intento al evento; al llegar a `maximo` lo pasa a la tabla
+        fallidos. Retorna True si lo apartó.
+        """
+        conexion = self._conexion()
+        conexion.execute('BEGIN IMMEDIATE')
+        try:
+            conexion.execute('UPDATE eventos SET intentos = intentos + 1 WHERE id = ?', (id_evento,))
+            apartado = conexion.execute(
+                f'INSERT INTO fallidos ({COLUMNAS_EVENTO}, error) '
+                f'SELECT {COLUMNAS_EVENTO}, ? FROM eventos WHERE id = ? AND intentos >= ?',
+                (error, id_evento, maximo),
+            ).rowcount > 0
+            if apartado:
+                conexion.execute('DELETE FROM eventos WHERE id = ?', (id_evento,))
+        except BaseException:
+            conexion.execute('ROLLBACK')
+            raise
+        conexion.execute('COMMIT')
+        return apartado
+
+    def fallidos(self):
+        """Eventos apartados tras agotar los reintentos, en orden de llegada"""
+        filas = self._conexion().execute('SELECT * FROM fallidos ORDER BY id')
+        return [dict(self._evento(fila), intentos=fila['intentos'], error=fila['error']) for fila in filas]
+
+    def contar(self):
+        return self._conexion().execute('SELECT COUNT(*) FROM eventos').fetchone()[0]
+
+    def contar_fallidos(self):
+        return self._conexion().execute('SELECT COUNT(*) FROM fallidos').fetchone()[0]
+
+    @contextmanager
+    def turno(self):
+        """
+        Da True si este hilo obtuvo el turno de volcado, False si otro hilo
+        o proceso está volcando
+        """
+        if not self._lock_turno.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.ruta.with_name(self.ruta.name + '.turno'), 'a') as archivo:
+                try:
+                    fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(archivo, fcntl.LOCK_UN)
+        finally:
+            self._lock_turno.release()
+
+
+_bitacoras = {}
+_lock_bitacoras = threading.Lock()
+
+
+def bitacora():
+    ruta = ruta_bitacora()
+    with _lock_bitacoras:
+        if ruta not in _bitacoras:
+            _bitacoras[ruta] = Bitacora(ruta)
+        return _bitacoras[ruta]
+
+
+def aplicar_evento(fila, evento):
+    """
+    Efecto de un evento sobre la fila del día (dict con CAMPOS o None), con
+    las reglas de kiosco.registrar. Retorna (fila, repetida); la fila es None
+    si el evento no tiene sobre qué aplicarse (una salida sin entrada).
+    """
+    if evento['tipo'] == kiosco.ENTRADA:
+        if fila is not None:
+            return dict(fila, presente=True), True
+        if evento['fila'] is None:
+            # La fila existía al anotar el evento y se eliminó después
+            return None, False
+        return {
+            'id': evento['fila'],
+            'nombre_completo': evento['nombre'],
+            'documento_identidad': evento['documento'],
+            'correo_electronico': evento['correo'],
+            'fecha_asistencia': evento['fecha'],
+            'hora_ingreso': evento['hora'],
+            'hora_salida': None,
+            'presente': True,
+        }, False
+    if fila is None:
+        return None, False
+    return dict(fila, hora_salida=evento['hora']), fila['hora_salida'] == evento['hora']
+
+
+def estado(documento, fecha):
+    """Fila del día (dict con CAMPOS o None) con los eventos pendientes aplicados"""
+    # La bitácora se lee antes que la tabla: si un volcado termina entre
+    # las dos lecturas, los eventos se aplican dos veces sin cambiar nada
+    pendientes = bitacora().pendientes(documento, fecha)
+    fila = Asistencia._base_manager\
+        .filter(documento_identidad=documento, fecha_asistencia=fecha)\
+        .values(*CAMPOS)\
+        .first()
+    for evento in pendientes:
+        fila, _ = aplicar_evento(fila, evento)
+    return fila
+
+
+def encolar(documento, tipo, momento=None, nombre='', correo=''):
+    """
+    Valida el escaneo y lo anota en la bitácora. Retorna (evento, fila,
+    repetida) como kiosco.registrar, más el id del evento; la fila es la del
+    día tal como quedará al volcarlo. Lanza ValidationError,
+    PersonaDesconocida o SinEntrada.
+    """
+    documento, fecha, hora, momento = kiosco.preparar(documento, tipo, momento)
+    fila = estado(documento, fecha)
+    evento = {
+        'documento': documento, 'fecha': fecha, 'tipo': tipo, 'hora': hora,
+        'nombre': '', 'correo': '', 'fila': None,
+    }
+    if fila is None:
+        if tipo == kiosco.SALIDA:
+            raise kiosco.SinEntrada(documento)
+        kiosco.validar_no_archivada(documento, fecha)
+        nombre, correo = kiosco.datos_persona(documento, nombre, correo)
+        nueva = Asistencia(nombre_completo=nombre, documento_identidad=documento, correo_electronico=correo)
+        nueva.normalizar()
+        evento.update(nombre=nueva.nombre_completo, correo=nueva.correo_electronico, fila=nueva.pk)
+    elif tipo == kiosco.SALIDA:
+        kiosco.validar_salida(fila, hora)
+    evento['id'] = bitacora().agregar(evento)
+    _avisar()
+    fila, repetida = aplicar_evento(fila, evento)
+    return evento['id'], {campo: fila[campo] for campo in kiosco.CAMPOS_RESPUESTA}, repetida
+
+
+def _instancia(fila):
+    return Asistencia(
+        pk=fila['id'],
+        nombre_completo=fila['nombre_completo'],
+        documento_identidad=fila['documento_identidad'],
+        correo_electronico=fila['correo_electronico'],
+        fecha_asistencia=fila['fecha_asistencia'],
+        hora_ingreso=fila['hora_ingreso'],
+        hora_salida=fila['hora_salida'],
+        presente=fila['presente'],
+    )
+
+
+def aplicar(eventos):
+    """
+    Aplica un lote de eventos, en orden de llegada, en una transacción.
+    Retorna cuántos se descartaron por no tener fila sobre la que aplicarse.
+    """
+    base = Asistencia._base_manager
+    with transaction.atomic(using=router.db_for_write(Asistencia)), resumen_diferido():
+        existentes = {
+            (fila['documento_identidad'], fila['fecha_asistencia']): fila
+            for fila in base.select_for_update()
+            .filter(
+                documento_identidad__in={e['documento'] for e in eventos},
+                fecha_asistencia__in={e['fecha'] for e in eventos},
+            )
+            .order_by()
+            .values(*CAMPOS)
+        }
+        finales = dict(existentes)
+        descartados = 0
+        for evento in eventos:
+            clave = (evento['documento'], evento['fecha'])
+            fila, _ = aplicar_evento(finales.get(clave), evento)
+            if fila is None:
+                descartados += 1
+                logger.warning('Evento de ingesta %s sin fila del día: %s', evento['id'], clave)
+            else:
+                finales[clave] = fila
+
+        nuevas = [_instancia(f) for clave, f in finales.items() if clave not in existentes]
+        cambiadas = [
+            _instancia(f) for clave, f in finales.items()
+            if clave in existentes and f != existentes[clave]
+        ]
+        # bulk_create y bulk_update mantienen duración e índice de búsqueda;
+        # los resúmenes se recalculan al salir de resumen_diferido
+        if nuevas:
+            Asistencia.objects.bulk_create(
+                nuevas,
+                update_conflicts=True,
+                unique_fields=['documento_identidad', 'fecha_asistencia'],
+                update_fields=['presente', 'fecha_actualizacion'],
+            )
+        if cambiadas:
+            Asistencia.objects.bulk_update(cambiadas, ['presente', 'hora_salida'])
+    return descartados
+
+
+def _aplicar_por_evento(registro, eventos):
+    """
+    Aplica uno por uno los eventos de un lote que falló y retorna cuántos
+    se aplicaron. Un evento que falla se queda (o se aparta, ver
+    Bitacora.fallo) y los siguientes de su fila esperan al próximo volcado.
+    """
+    aplicados = 0
+    detenidas = set()
+    for evento in eventos:
+        clave = (evento['documento'], evento['fecha'])
+        if clave in detenidas:
+            continue
+        try:
+            aplicar([evento])
+        except TRANSITORIOS:
+            raise
+        except Exception as error:
+            logger.exception('Error aplicando el evento de ingesta %s: %s', evento['id'], clave)
+            if not registro.fallo(evento['id'], repr(error), reintentos()):
+                detenidas.add(clave)
+            continue
+        registro.confirmar(evento['id'], desde=evento['id'] - 1)
+        aplicados += 1
+    return aplicados
+
+
+def volcar(lote=None):
+    """
+    Aplica los eventos pendientes por lotes hasta recorrer la bitácora y
+    retorna cuántos se aplicaron. Si otro proceso está volcando retorna 0.
+    """
+    lote = lote or tamano_lote()
+    registro = bitacora()
+    aplicados = 0
+    with registro.turno() as obtenido:
+        if not obtenido:
+            return 0
+        # Los eventos que fallaron se quedan atrás: cada lote empieza después del anterior
+        desde = 0
+        while True:
+            eventos = registro.leer(lote, desde)
+            if not eventos:
+                break
+            try:
+                aplicar(eventos)
+            except TRANSITORIOS:
+                raise
+            except Exception:
+                aplicados += _aplicar_por_evento(registro, eventos)
+            else:
+                registro.confirmar(eventos[-1]['id'], desde=desde)
+                aplicados += len(eventos)
+            desde = eventos[-1]['id']
+    return aplicados
+
+
+# Volcado en segundo plano
+
+_hilo = None
+_lock_hilo = threading.Lock()
+_aviso = threading.Event()
+_anotados = 0
+
+
+def _avisar():
+    """Cuenta el evento anotado y despierta al hilo al juntar un lote"""
+    global _anotados
+    if not asincrona():
+        return
+    with _lock_hilo:
+        _anotados += 1
+        if _anotados >= tamano_lote():
+            _aviso.set()
+    _iniciar_volcador()
+
+
+def _iniciar_volcador():
+    global _hilo
+    with _lock_hilo:
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_volcar_en_hilo, name='ingesta', daemon=True)
+            _hilo.start()
+
+
+def _volcar_en_hilo():
+    global _anotados
+    while True:
+        _aviso.wait(intervalo())
+        _aviso.clear()
+        with _lock_hilo:
+            _anotados = 0
+        close_old_connections()
+        try:
+            volcar()
+        except Exception:
+            # Los eventos siguen en la bitácora; se reintenta en el siguiente ciclo
+            logger.exception('Error volcando la bitácora de ingesta')
+        finally:
+            close_old_connections()
@@ -0,0 +1,209 @@
+"""
+Registro de entrada y salida desde los kioscos de la entrada
+
+El kiosco solo conoce el documento y la hora del escaneo. Cada escaneo es un
+upsert sobre la fila del día, identificada por la restricción única
+(documento_identidad, fecha_asistencia), en lugar de leer y luego escribir:
+
+- entrada: INSERT ... ON CONFLICT DO UPDATE. La primera entrada del día fija
+  hora_ingreso; las repetidas solo marcan presente. Nombre y correo salen de
+  la caché de personas conocidas de este proceso (ResumenPersona en un
+  fallo) o de los datos enviados para una persona nueva.
+- salida: la fila del día se bloquea (SELECT ... FOR UPDATE; en SQLite la
+  transacción IMMEDIATE ya serializa las escrituras) y se actualizan
+  hora_salida y duracion_minutos, con la misma regla de duración que los
+  formularios (validar_salida). La última salida del día manda.
+
+La hora de salida queda vacía hasta que se registra. Los resúmenes se
+mantienen igual que en las demás escrituras.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import router, transaction
+from django.utils import timezone
+
+from taller_formularios import validacion
+
+from .duracion import calcular_minutos
+from .models import MENSAJE_ARCHIVADA, Asistencia, ResumenPersona
+from .resumen import actualizar_resumen
+from .validators import validar_rango_horas
+
+ENTRADA = 'entrada'
+SALIDA = 'salida'
+TIPOS = (ENTRADA, SALIDA)
+
+CAMPOS_RESPUESTA = (
+    'id', 'nombre_completo', 'documento_identidad', 'fecha_asistencia',
+    'hora_ingreso', 'hora_salida', 'presente',
+)
+
+
+class PersonaDesconocida(Exception):
+    """Entrada de un documento sin registros previos y sin nombre ni correo"""
+
+
+class SinEntrada(Exception):
+    """Salida de un documento que no registró entrada en el día"""
+
+
+class Personas:
+    """
+    Caché en proceso de {documento: (nombre, correo)}, con un máximo de
+    entradas (se descartan las menos usadas) y una duración que acota cuánto
+    tarda en verse un cambio de nombre hecho desde otro proceso
+    """
+
+    def __init__(self, maximo=None, ttl=None):
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._maximo = maximo
+        self._ttl = ttl
+
+    @property
+    def maximo(self):
+        return self._maximo or getattr(settings, 'KIOSCO_PERSONAS_MAXIMO', 10000)
+
+    @property
+    def ttl(self):
+        return self._ttl or getattr(settings, 'KIOSCO_PERSONAS_TTL', 300)
+
+    def obtener(self, documento):
+        """(nombre, correo) de la persona o None si no tiene registros"""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(documento)
+            if entrada is not None and entrada[1] > ahora:
+                self._entradas.move_to_end(documento)
+                return entrada[0]
+        datos = ResumenPersona.objects\
+            .filter(documento_identidad=documento)\
+            .values_list('nombre_completo', 'correo_electronico')\
+            .first()
+        if datos is not None:
+            self.recordar(documento, *datos)
+        return datos
+
+    def recordar(self, documento, nombre, correo):
+        with self._lock:
+            self._entradas[documento] = ((nombre, correo), time.monotonic() + self.ttl)
+            self._entradas.move_to_end(documento)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+
+    def olvidar(self, documento):
+        with self._lock:
+            self._entradas.pop(documento, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+personas = Personas()
+
+
+def datos_persona(documento, nombre, correo):
+    """Nombre y correo para una fila nueva: los enviados o los conocidos"""
+    if nombre and correo:
+        validacion.aplicar(validacion.nombre_completo, nombre)
+        validate_email(correo)
+        return nombre, correo
+    conocida = personas.obtener(documento)
+    if conocida is None:
+        raise PersonaDesconocida(documento)
+    return conocida
+
+
+def preparar(documento, tipo, momento=None):
+    """Valida el escaneo; retorna (documento, fecha, hora, momento) en hora local"""
+    if tipo not in TIPOS:
+        raise ValueError(f'Tipo de registro desconocido: {tipo}')
+    documento = (documento or '').strip()
+    validacion.aplicar(validacion.documento_identidad, documento)
+    momento = timezone.localtime(momento)
+    return documento, momento.date(), momento.time().replace(microsecond=0), momento
+
+
+def validar_no_archivada(documento, fecha):
+    """Una fila nueva no puede repetir un día ya archivado (ver archivo.py)"""
+    if Asistencia.objects.claves_archivadas([documento], fecha, fecha):
+        raise ValidationError(MENSAJE_ARCHIVADA)
+
+
+def validar_salida(fila, hora):
+    """La salida debe quedar entre 30 minutos y 12 horas después del ingreso"""
+    if fila['hora_salida'] != hora:
+        validar_rango_horas(fila['hora_ingreso'], hora)
+
+
+def registrar(documento, tipo, momento=None, nombre='', correo=''):
+    """
+    Registra la entrada o la salida del documento en la fecha de `momento`
+    (ahora por defecto). Retorna (fila, repetida): la fila del día con
+    CAMPOS_RESPUESTA y si el escaneo repetía un registro ya hecho (una
+    entrada sobre una fila existente o una salida a la misma hora).
+    Lanza ValidationError, PersonaDesconocida o SinEntrada.
+    """
+    documento, fecha, hora, momento = preparar(documento, tipo, momento)
+    if tipo == ENTRADA:
+        return _entrada(documento, fecha, hora, momento, nombre, correo)
+    return _salida(documento, fecha, hora, momento)
+
+
+def _entrada(documento, fecha, hora, momento, nombre, correo):
+    nombre, correo = datos_persona(documento, nombre, correo)
+    nueva = Asistencia(
+        nombre_completo=nombre,
+        documento_identidad=documento,
+        correo_electronico=correo,
+        fecha_asistencia=fecha,
+        hora_ingreso=hora,
+        hora_salida=None,
+        presente=True,
+    )
+    nueva.normalizar()
+    with transaction.atomic(using=router.db_for_write(Asistencia)):
+        # bulk_create mantiene resúmenes e índice de búsqueda
+        Asistencia.objects.bulk_create(
+            [nueva],
+            update_conflicts=True,
+            unique_fields=['documento_identidad', 'fecha_asistencia'],
+            update_fields=['presente', 'fecha_actualizacion'],
+        )
+        fila = Asistencia._base_manager\
+            .filter(documento_identidad=documento, fecha_asistencia=fecha)\
+            .values(*CAMPOS_RESPUESTA)\
+            .get()
+        if fila['id'] == nueva.pk:
+            # Fila nueva: se deshace si el día ya estaba archivado
+            validar_no_archivada(documento, fecha)
+    # Si hubo conflicto la fila del día conserva su id, no el de la nueva
+    return fila, fila['id'] != nueva.pk
+
+
+def _salida(documento, fecha, hora, momento):
+    base = Asistencia._base_manager
+    with transaction.atomic(using=router.db_for_write(Asistencia)):
+        fila = base.select_for_update()\
+            .filter(documento_identidad=documento, fecha_asistencia=fecha)\
+            .values(*CAMPOS_RESPUESTA)\
+            .first()
+        if fila is None:
+            raise SinEntrada(documento)
+        validar_salida(fila, hora)
+        repetida = fila['hora_salida'] == hora
+        if not repetida:
+            base.filter(pk=fila['id']).update(
+                hora_salida=hora,
+                duracion_minutos=calcular_minutos(fila['hora_ingreso'], hora),
+                fecha_actualizacion=momento,
+            )
+            # La escritura no pasa por save() ni por AsistenciaQuerySet.update
+            actualizar_resumen({fecha}, {documento})
+    return dict(fila, hora_salida=hora), repetida
@@ -0,0 +1,40 @@
+"""
+Modelos de lectura de asistencias: las columnas que usa cada lista
+"""
+from taller_formularios.proyeccion import Lectura
+
+from .duracion import calcular_duracion, formatear_duracion
+from .models import Asistencia
+
+
+class AsistenciaEnLista(Lectura):
+    """Fila de asistencia_list.html; fecha_creacion es la clave de orden y de cursor"""
+    modelo = Asistencia
+    campos = (
+        'pk',
+        'nombre_completo',
+        'documento_identidad',
+        'correo_electronico',
+        'fecha_asistencia',
+        'hora_ingreso',
+        'hora_salida',
+        'presente',
+        'fecha_creacion',
+    )
+
+
+class AsistenciaDePersona(Lectura):
+    """Fila del historial en persona_detail.html"""
+    modelo = Asistencia
+    campos = (
+        'pk',
+        'fecha_asistencia',
+        'hora_ingreso',
+        'hora_salida',
+        'presente',
+    )
+
+    def get_duracion_display(self):
+        return formatear_duracion(
+            calcular_duracion(self.fecha_asistencia, self.hora_ingreso, self.hora_salida)
+        )
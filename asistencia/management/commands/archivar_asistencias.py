@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from asistencia.archivo import DESTINOS, TAMANO_LOTE, archivar, fecha_limite
+
+
+class Command(BaseCommand):
+    help = 'Mueve las asistencias anteriores al horizonte de archivo a la tabla o a archivos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--destino',
+            choices=DESTINOS,
+            default='tabla',
+            help='Tabla AsistenciaArchivada, CSV comprimido o Parquet'
+        )
+        parser.add_argument(
+            '--dias',
+            type=int,
+            help='Horizonte en días (por defecto ASISTENCIA_ARCHIVO_DIAS)'
+        )
+        parser.add_argument(
+            '--antes-de',
+            type=date.fromisoformat,
+            help='Fecha AAAA-MM-DD: archiva lo anterior (ignora --dias)'
+        )
+        parser.add_argument(
+            '--carpeta',
+            help='Carpeta de los archivos (por defecto ASISTENCIA_ARCHIVO_CARPETA)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help='Filas movidas por transacción'
+        )
+
+    def handle(self, *args, **options):
+        limite = options['antes_de'] or fecha_limite(dias=options['dias'])
+        try:
+            movidas = archivar(
+                antes_de=limite,
+                destino=options['destino'],
+                lote=options['lote'],
+                carpeta=options['carpeta'],
+            )
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'{movidas} asistencia(s) anteriores a {limite:%d/%m/%Y} archivadas ({options["destino"]}).'
+        ))
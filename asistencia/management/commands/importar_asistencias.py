@@ -0,0 +1,46 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from asistencia.importacion import TAMANO_LOTE, importar_archivo
+
+
+class Command(BaseCommand):
+    help = 'Importa asistencias desde un archivo CSV o XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo CSV o XLSX')
+        parser.add_argument(
+            '--solo-validar',
+            action='store_true',
+            help='Valida el archivo sin guardar registros'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help='Número de filas por inserción (bulk_create)'
+        )
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        try:
+            with open(ruta, 'rb') as archivo:
+                resultado = importar_archivo(
+                    archivo,
+                    ruta,
+                    guardar=not options['solo_validar'],
+                    lote=options['lote']
+                )
+        except OSError as e:
+            raise CommandError(f'No se pudo abrir el archivo: {e}')
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+
+        for numero, errores in resultado.errores:
+            for campo, mensajes in errores.items():
+                self.stderr.write(f'Fila {numero}: {campo}: {" ".join(mensajes)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado.total_filas} fila(s) leídas, {resultado.validas} válidas, '
+            f'{resultado.creados} registro(s) creados, {len(resultado.errores)} con errores.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from taller_formularios import busqueda
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de asistencias y solicitudes'
+
+    def handle(self, *args, **options):
+        for modelo in busqueda.modelos_registrados():
+            with transaction.atomic():
+                filas = busqueda.reconstruir(modelo)
+            self.stdout.write(self.style.SUCCESS(
+                f'{modelo._meta.verbose_name_plural}: {filas} fila(s) indexadas.'
+            ))
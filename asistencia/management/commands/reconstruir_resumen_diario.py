@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from asistencia.models import ResumenDiario, ResumenPersona
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero los resúmenes diario y por persona de asistencia'
+
+    def handle(self, *args, **options):
+        dias = ResumenDiario.objects.reconstruir()
+        personas = ResumenPersona.objects.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'Resumen diario reconstruido: {dias} día(s).'
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Resumen por persona reconstruido: {personas} persona(s).'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from asistencia import ingesta
+
+
+class Command(BaseCommand):
+    help = 'Aplica a la base los escaneos pendientes en la bitácora de ingesta de los kioscos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            help='Eventos aplicados por transacción (por defecto INGESTA_LOTE)'
+        )
+
+    def handle(self, *args, **options):
+        pendientes = ingesta.bitacora().contar()
+        aplicados = ingesta.volcar(lote=options['lote'])
+        if pendientes and not aplicados:
+            self.stdout.write(self.style.WARNING(
+                f'Otro proceso está volcando la bitácora ({pendientes} evento(s) pendientes).'
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(f'{aplicados} evento(s) aplicados.'))
+        fallidos = ingesta.bitacora().contar_fallidos()
+        if fallidos:
+            self.stdout.write(self.style.WARNING(
+                f'{fallidos} evento(s) apartados en la tabla fallidos de {ingesta.ruta_bitacora()}.'
+            ))
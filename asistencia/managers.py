@@ -1,8 +1,273 @@
-from django.db import models
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import Avg, Count, F, Max, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from taller_formularios import busqueda
+
+from .duracion import MINUTOS_ASISTENCIA_COMPLETA, calcular_minutos
+from .resumen import actualizar_resumen, resumen_diferido
+
+CAMPOS_HORA = {'hora_ingreso', 'hora_salida'}
+# Campos que alimentan el ResumenDiario
+CAMPOS_DIARIOS = {'fecha_asistencia', 'presente', 'duracion_minutos'} | CAMPOS_HORA
+# Columnas comunes a Asistencia y AsistenciaArchivada
+CAMPOS_HISTORIAL = (
+    'id', 'nombre_completo', 'documento_identidad', 'correo_electronico',
+    'fecha_asistencia', 'hora_ingreso', 'hora_salida', 'presente',
+    'duracion_minutos', 'observaciones', 'fecha_creacion', 'fecha_actualizacion',
+)
+# Campos que alimentan el ResumenPersona
+CAMPOS_PERSONA = {
+    'documento_identidad', 'nombre_completo', 'correo_electronico',
+    'fecha_asistencia', 'presente',
+} | CAMPOS_HORA
+
+
+def ventanas_de_fecha(fecha):
+    """
+    Retorna los límites (inicio, fin) de la semana y del mes que contienen la fecha
+    """
+    inicio_semana = fecha - timedelta(days=fecha.weekday())
+    fin_semana = inicio_semana + timedelta(days=6)
+    inicio_mes = fecha.replace(day=1)
+    fin_mes = (inicio_mes + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return (inicio_semana, fin_semana), (inicio_mes, fin_mes)
+
+
+def agregados_diarios():
+    """
+    Expresiones de agregación de Asistencia que alimentan el ResumenDiario
+    """
+    return {
+        'total': Count('pk'),
+        'presentes': Count('pk', filter=Q(presente=True)),
+        'ausentes': Count('pk', filter=Q(presente=False)),
+        'minutos_totales': Sum('duracion_minutos'),
+    }
+
+
+def agregados_persona():
+    """
+    Expresiones de agregación de Asistencia que alimentan el ResumenPersona
+    """
+    return {
+        'primera': Min('fecha_asistencia'),
+        'ultima': Max('fecha_asistencia'),
+        'dias': Count('pk'),
+        'presentes': Count('pk', filter=Q(presente=True)),
+        'minutos_totales': Sum('duracion_minutos'),
+    }
+
+
+def sincronizar_duracion(queryset):
+    """
+    Recalcula duracion_minutos de las filas del queryset con una actualización
+    por cada par distinto (hora_ingreso, hora_salida)
+    """
+    pares = queryset.order_by()\
+        .values_list('hora_ingreso', 'hora_salida')\
+        .distinct()
+    for hora_ingreso, hora_salida in list(pares):
+        queryset.filter(hora_ingreso=hora_ingreso, hora_salida=hora_salida)\
+            .update(duracion_minutos=calcular_minutos(hora_ingreso, hora_salida))
+
+
+def combinar_con_archivo(filas, archivadas, clave, sumas=(), minimos=(), maximos=()):
+    """
+    Combina filas agregadas de Asistencia con las archivadas (AsistenciaArchivada
+    o los totales de lo archivado en archivos) que tienen la misma clave. Para
+    los demás valores (nombre, correo) manda la fila viva, que es la más reciente.
+    """
+    combinadas = {fila[clave]: dict(fila) for fila in archivadas}
+    for fila in filas:
+        anterior = combinadas.get(fila[clave])
+        if anterior is not None:
+            fila = dict(fila)
+            for campo in sumas:
+                fila[campo] = (fila[campo] or 0) + (anterior[campo] or 0)
+            for campo in minimos:
+                fila[campo] = min(fila[campo], anterior[campo])
+            for campo in maximos:
+                fila[campo] = max(fila[campo], anterior[campo])
+        combinadas[fila[clave]] = fila
+    return list(combinadas.values())
+
+
+class AsistenciaQuerySet(models.QuerySet):
+    """
+    QuerySet que mantiene el resumen diario al día en las operaciones masivas
+    (update, bulk_update, delete y bulk_create no pasan por save())
+    """
+
+    def _fechas(self):
+        return set(
+            self.order_by().values_list('fecha_asistencia', flat=True).distinct()
+        )
+
+    def _documentos(self):
+        return set(
+            self.order_by().values_list('documento_identidad', flat=True).distinct()
+        )
+
+    def update(self, **kwargs):
+        # auto_now solo actúa en save(); sin esto los ETag de la API no cambiarían
+        kwargs.setdefault('fecha_actualizacion', timezone.now())
+        with transaction.atomic(using=self.db):
+            cambia_fecha = 'fecha_asistencia' in kwargs
+            cambia_documento = 'documento_identidad' in kwargs
+            cambian_horas = bool(CAMPOS_HORA & kwargs.keys())
+            indice = busqueda.indice_de(self.model)
+            cambia_texto = bool(indice and set(indice.campos) & kwargs.keys())
+            recorrer = cambia_fecha or cambia_documento or cambian_horas or cambia_texto
+            if recorrer:
+                pks = list(self.values_list('pk', flat=True))
+            fechas = self._fechas()
+            documentos = self._documentos() if CAMPOS_PERSONA & kwargs.keys() else set()
+            filas = super().update(**kwargs)
+
+            if recorrer:
+                for i in range(0, len(pks), 500):
+                    afectadas = self.model._base_manager.using(self.db).filter(pk__in=pks[i:i + 500])
+                    if cambian_horas:
+                        sincronizar_duracion(afectadas)
+                    if cambia_fecha:
+                        fechas.update(afectadas.values_list('fecha_asistencia', flat=True))
+                    if cambia_documento:
+                        documentos.update(afectadas.values_list('documento_identidad', flat=True))
+                    if cambia_texto:
+                        busqueda.reindexar(afectadas)
+            actualizar_resumen(fechas, documentos)
+        return filas
+
+    update.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        fields = set(fields)
+        if CAMPOS_HORA & fields:
+            for obj in objs:
+                obj.duracion_minutos = calcular_minutos(obj.hora_ingreso, obj.hora_salida)
+            fields.add('duracion_minutos')
+        ahora = timezone.now()
+        for obj in objs:
+            obj.fecha_actualizacion = ahora
+        fields.add('fecha_actualizacion')
+
+        with transaction.atomic(using=self.db):
+            # Fechas y documentos anteriores: las filas pueden moverse de día o persona
+            anteriores = self.model._base_manager.using(self.db)\
+                .filter(pk__in=[obj.pk for obj in objs])\
+                .values_list('fecha_asistencia', 'documento_identidad')
+            fechas = {obj.fecha_asistencia for obj in objs}
+            documentos = {obj.documento_identidad for obj in objs}
+            for fecha, documento in anteriores:
+                fechas.add(fecha)
+                documentos.add(documento)
+
+            filas = super().bulk_update(objs, fields, batch_size=batch_size)
+
+            indice = busqueda.indice_de(self.model)
+            if indice and set(indice.campos) & fields:
+                busqueda.indexar_objetos(self.model, objs, using=self.db)
+            actualizar_resumen(fechas, documentos if CAMPOS_PERSONA & fields else set())
+        return filas
+
+    bulk_update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db), resumen_diferido():
+            return super().delete()
+
+    delete.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.duracion_minutos = calcular_minutos(obj.hora_ingreso, obj.hora_salida)
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            actualizar_resumen(
+                {obj.fecha_asistencia for obj in objs},
+                {obj.documento_identidad for obj in objs},
+            )
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Algunas filas pudieron omitirse: se indexa lo que quedó guardado
+                busqueda.reindexar(
+                    self.model._base_manager.using(self.db).filter(pk__in=[o.pk for o in objs])
+                )
+            else:
+                busqueda.indexar_objetos(self.model, objs, using=self.db)
+        return objs
+
+    def duplicar_en_fecha(self, fecha=None):
+        """
+        Copia las asistencias del queryset a la fecha indicada (hoy por defecto)
+        con un número fijo de consultas. Los documentos que ya tienen registro
+        en esa fecha se omiten. Retorna (creadas, documentos_omitidos).
+        """
+        fecha = fecha or timezone.localdate()
+        campos = [
+            'nombre_completo', 'documento_identidad', 'correo_electronico',
+            'hora_ingreso', 'hora_salida', 'presente', 'observaciones',
+        ]
+
+        with transaction.atomic(using=self.db):
+            ocupados = set(
+                self.model._base_manager.filter(
+                    fecha_asistencia=fecha,
+                    documento_identidad__in=self.order_by().values('documento_identidad'),
+                ).values_list('documento_identidad', flat=True)
+            )
+
+            nuevas = []
+            omitidos = []
+            for fila in self.values(*campos):
+                documento = fila['documento_identidad']
+                if documento in ocupados:
+                    omitidos.append(documento)
+                    continue
+                ocupados.add(documento)
+                nuevas.append(self.model(fecha_asistencia=fecha, **fila))
+
+            if nuevas:
+                self.bulk_create(nuevas)
+
+        return nuevas, omitidos
 
-class AsistenciaManager(models.Manager):
+    duplicar_en_fecha.alters_data = True
+
+    def completas(self):
+        """Asistencias con la duración mínima de una asistencia completa"""
+        return self.filter(duracion_minutos__gte=MINUTOS_ASISTENCIA_COMPLETA)
+
+    def horas_por_persona(self):
+        """Total y promedio de minutos por persona, calculados en SQL"""
+        return self.order_by()\
+            .values('documento_identidad', 'nombre_completo')\
+            .annotate(
+                registros=Count('pk'),
+                minutos_totales=Coalesce(Sum('duracion_minutos'), 0),
+                minutos_promedio=Avg('duracion_minutos'),
+            )\
+            .order_by('-minutos_totales')
+
+    def horas_por_dia(self):
+        """Total y promedio de minutos por día, calculados en SQL"""
+        return self.order_by()\
+            .values('fecha_asistencia')\
+            .annotate(
+                registros=Count('pk'),
+                minutos_totales=Coalesce(Sum('duracion_minutos'), 0),
+                minutos_promedio=Avg('duracion_minutos'),
+            )\
+            .order_by('fecha_asistencia')
+
+
+class AsistenciaManager(models.Manager.from_queryset(AsistenciaQuerySet)):
     """
     Manager personalizado para consultas optimizadas de Asistencia
     """
@@ -18,19 +283,257 @@ class AsistenciaManager(models.Manager):
         """Retorna asistencias para una fecha específica"""
         return self.filter(fecha_asistencia=fecha)
 
-    def estadisticas_mes_actual(self):
+    def resumen_periodos(self, fecha=None):
+        """
+        Contadores globales y de las ventanas día, semana y mes de la fecha
+        indicada, calculados en una sola consulta sobre el resumen diario
+        """
+        resumen = apps.get_model('asistencia', 'ResumenDiario')
+        return resumen.objects.resumen_periodos(fecha)
+
+    def historial(self, *campos, **filtros):
+        """
+        Asistencias vivas y archivadas (ver archivo.py) como un solo queryset
+        de diccionarios (UNION ALL). Los filtros se aplican a ambas tablas
+        antes de unirlas; el resultado admite order_by, cortes y count().
+        """
+        archivada = apps.get_model('asistencia', 'AsistenciaArchivada')
+        campos = campos or CAMPOS_HISTORIAL
+        vivas = self.filter(**filtros).order_by().values(*campos)
+        archivadas = archivada.objects.filter(**filtros).order_by().values(*campos)
+        return vivas.union(archivadas, all=True)
+
+    def claves_archivadas(self, documentos, desde, hasta):
+        """
+        Pares (documento, fecha) de esos documentos y ese rango que ya están
+        en AsistenciaArchivada: la unicidad por día abarca las dos tablas
+        """
+        archivada = apps.get_model('asistencia', 'AsistenciaArchivada')
+        return set(
+            archivada.objects.filter(
+                documento_identidad__in=documentos,
+                fecha_asistencia__range=(desde, hasta),
+            ).order_by().values_list('documento_identidad', 'fecha_asistencia')
+        )
+
+    def estadisticas_mes_actual(self, resumen=None):
         """Retorna estadísticas del mes actual"""
-        hoy = timezone.now().date()
-        inicio_mes = hoy.replace(day=1)
+        resumen = resumen or self.resumen_periodos()
 
         return {
-            'total': self.filter(fecha_asistencia__gte=inicio_mes).count(),
-            'presentes': self.filter(
-                fecha_asistencia__gte=inicio_mes,
-                presente=True
-            ).count(),
-            'ausentes': self.filter(
-                fecha_asistencia__gte=inicio_mes,
-                presente=False
-            ).count()
+            'total': resumen['total_mes'],
+            'presentes': resumen['presentes_mes'],
+            'ausentes': resumen['ausentes_mes'],
         }
+
+
+class ResumenDiarioManager(models.Manager):
+    """
+    Manager del resumen diario materializado
+    """
+
+    def _filas_diarias(self, asistencias):
+        return asistencias.order_by()\
+            .values(fecha=F('fecha_asistencia'))\
+            .annotate(**agregados_diarios())
+
+    def _filas_historicas(self, **filtros):
+        """Filas diarias de las asistencias vivas sumadas a las archivadas"""
+        asistencia = apps.get_model('asistencia', 'Asistencia')
+        archivada = apps.get_model('asistencia', 'AsistenciaArchivada')
+        en_archivos = apps.get_model('asistencia', 'TotalArchivadoDiario')
+        sumas = ('total', 'presentes', 'ausentes', 'minutos_totales')
+        filas = combinar_con_archivo(
+            self._filas_diarias(asistencia._base_manager.filter(**filtros)),
+            self._filas_diarias(archivada._base_manager.filter(**filtros)),
+            'fecha',
+            sumas=sumas,
+        )
+        totales = en_archivos.objects.filter(**filtros).order_by()\
+            .values('total', 'presentes', 'ausentes', 'minutos_totales', fecha=F('fecha_asistencia'))
+        return combinar_con_archivo(filas, totales, 'fecha', sumas=sumas)
+
+    def _construir(self, fila):
+        return self.model(
+            fecha=fila['fecha'],
+            total=fila['total'],
+            presentes=fila['presentes'],
+            ausentes=fila['ausentes'],
+            duracion_total=timedelta(minutes=fila['minutos_totales'] or 0),
+        )
+
+    def recalcular(self, fechas, lote=500):
+        """
+        Recalcula el resumen de las fechas indicadas a partir de sus asistencias
+        """
+        fechas = sorted(set(fechas))
+
+        with transaction.atomic(using=self.db):
+            for i in range(0, len(fechas), lote):
+                bloque = fechas[i:i + lote]
+                filas = self._filas_historicas(fecha_asistencia__in=bloque)
+                resumenes = [self._construir(fila) for fila in filas]
+
+                vacias = set(bloque) - {r.fecha for r in resumenes}
+                if vacias:
+                    self.filter(fecha__in=vacias).delete()
+                if resumenes:
+                    self.bulk_create(
+                        resumenes,
+                        update_conflicts=True,
+                        unique_fields=['fecha'],
+                        update_fields=['total', 'presentes', 'ausentes', 'duracion_total'],
+                    )
+
+    def reconstruir(self, lote=1000):
+        """
+        Reconstruye el resumen completo desde cero. Retorna el número de días
+        """
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            filas = self._filas_historicas()
+            resumenes = [self._construir(fila) for fila in filas]
+            self.bulk_create(resumenes, batch_size=lote)
+
+        from . import estadisticas
+        estadisticas.invalidar('asistencia')
+        return len(resumenes)
+
+    def resumen_periodos(self, fecha=None):
+        """
+        Contadores globales y de las ventanas día, semana y mes de la fecha
+        indicada, en una sola consulta de agregación condicional
+        """
+        hoy = fecha or timezone.localdate()
+        semana, mes = ventanas_de_fecha(hoy)
+
+        def suma(campo, filtro=None):
+            return Coalesce(Sum(campo, filter=filtro), 0)
+
+        en_hoy = Q(fecha=hoy)
+        en_semana = Q(fecha__range=semana)
+        en_mes = Q(fecha__range=mes)
+
+        contadores = {
+            'total': suma('total'),
+            'total_presentes': suma('presentes'),
+            'total_ausentes': suma('ausentes'),
+            'total_hoy': suma('total', en_hoy),
+            'presentes_hoy': suma('presentes', en_hoy),
+            'presentes_semana': suma('presentes', en_semana),
+            'total_mes': suma('total', en_mes),
+            'presentes_mes': suma('presentes', en_mes),
+            'ausentes_mes': suma('ausentes', en_mes),
+        }
+        # Los alias no pueden coincidir con los campos del modelo (total, ...)
+        resultado = self.order_by().aggregate(
+            **{f'r_{nombre}': expr for nombre, expr in contadores.items()}
+        )
+        return {nombre: resultado[f'r_{nombre}'] for nombre in contadores}
+
+    def rango(self, inicio, fin=None):
+        """Retorna el resumen de los días entre inicio y fin (inclusive)"""
+        return self.filter(fecha__range=(inicio, fin or timezone.localdate()))
+
+
+class ResumenPersonaManager(models.Manager):
+    """
+    Manager del resumen materializado por persona (documento_identidad)
+    """
+
+    def _filas_persona(self, asistencias):
+        # Nombre y correo del registro más reciente, por el índice (documento, fecha)
+        reciente = asistencias.model._base_manager\
+            .filter(documento_identidad=OuterRef('documento_identidad'))\
+            .order_by('-fecha_asistencia')
+        return asistencias.order_by()\
+            .values('documento_identidad')\
+            .annotate(
+                **agregados_persona(),
+                nombre=Subquery(reciente.values('nombre_completo')[:1]),
+                correo=Subquery(reciente.values('correo_electronico')[:1]),
+            )
+
+    def _filas_historicas(self, **filtros):
+        """Filas por persona de las asistencias vivas combinadas con las archivadas"""
+        asistencia = apps.get_model('asistencia', 'Asistencia')
+        archivada = apps.get_model('asistencia', 'AsistenciaArchivada')
+        en_archivos = apps.get_model('asistencia', 'TotalArchivadoPersona')
+        combinacion = {
+            'sumas': ('dias', 'presentes', 'minutos_totales'),
+            'minimos': ('primera',),
+            'maximos': ('ultima',),
+        }
+        filas = combinar_con_archivo(
+            self._filas_persona(asistencia._base_manager.filter(**filtros)),
+            self._filas_persona(archivada._base_manager.filter(**filtros)),
+            'documento_identidad',
+            **combinacion,
+        )
+        totales = en_archivos.objects.filter(**filtros).order_by().values(
+            'documento_identidad', 'minutos_totales',
+            nombre=F('nombre_completo'),
+            correo=F('correo_electronico'),
+            primera=F('primera_asistencia'),
+            ultima=F('ultima_asistencia'),
+            dias=F('total_dias'),
+            presentes=F('dias_presente'),
+        )
+        return combinar_con_archivo(filas, totales, 'documento_identidad', **combinacion)
+
+    def _construir(self, fila):
+        return self.model(
+            documento_identidad=fila['documento_identidad'],
+            nombre_completo=fila['nombre'],
+            correo_electronico=fila['correo'],
+            primera_asistencia=fila['primera'],
+            ultima_asistencia=fila['ultima'],
+            total_dias=fila['dias'],
+            dias_presente=fila['presentes'],
+            duracion_total=timedelta(minutes=fila['minutos_totales'] or 0),
+        )
+
+    def recalcular(self, documentos, lote=500):
+        """
+        Recalcula el resumen de los documentos indicados a partir de sus asistencias
+        """
+        documentos = sorted(set(documentos))
+        campos = [
+            'nombre_completo', 'correo_electronico', 'primera_asistencia',
+            'ultima_asistencia', 'total_dias', 'dias_presente', 'duracion_total',
+        ]
+
+        with transaction.atomic(using=self.db):
+            for i in range(0, len(documentos), lote):
+                bloque = documentos[i:i + lote]
+                filas = self._filas_historicas(documento_identidad__in=bloque)
+                resumenes = [self._construir(fila) for fila in filas]
+
+                sin_registros = set(bloque) - {r.documento_identidad for r in resumenes}
+                if sin_registros:
+                    self.filter(documento_identidad__in=sin_registros).delete()
+                if resumenes:
+                    self.bulk_create(
+                        resumenes,
+                        update_conflicts=True,
+                        unique_fields=['documento_identidad'],
+                        update_fields=campos,
+                    )
+
+    def reconstruir(self, lote=1000):
+        """
+        Reconstruye el resumen de todas las personas. Retorna el número de personas
+        """
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            resumenes = [self._construir(fila) for fila in self._filas_historicas()]
+            self.bulk_create(resumenes, batch_size=lote)
+
+        return len(resumenes)
+
+    def ranking(self, limite=10, orden='-total_dias'):
+        """
+        Las `limite` personas con más días (u otro orden indexado),
+        resuelto con ORDER BY ... LIMIT sobre el resumen
+        """
+        return self.order_by(orden, 'documento_identidad')[:limite]
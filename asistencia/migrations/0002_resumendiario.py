@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:35
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+
+
+def poblar_resumen(apps, schema_editor):
+    Asistencia = apps.get_model('asistencia', 'Asistencia')
+    ResumenDiario = apps.get_model('asistencia', 'ResumenDiario')
+
+    duracion = ExpressionWrapper(
+        F('hora_salida') - F('hora_ingreso'),
+        output_field=DurationField()
+    )
+    filas = Asistencia.objects.order_by()\
+        .values('fecha_asistencia')\
+        .annotate(
+            total=Count('pk'),
+            presentes=Count('pk', filter=Q(presente=True)),
+            ausentes=Count('pk', filter=Q(presente=False)),
+            duracion_total=Sum(duracion),
+        )
+
+    ResumenDiario.objects.bulk_create([
+        ResumenDiario(
+            fecha=fila['fecha_asistencia'],
+            total=fila['total'],
+            presentes=fila['presentes'],
+            ausentes=fila['ausentes'],
+            duracion_total=fila['duracion_total'] or datetime.timedelta(0),
+        )
+        for fila in filas
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True, verbose_name='Fecha')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total registros')),
+                ('presentes', models.PositiveIntegerField(default=0, verbose_name='Presentes')),
+                ('ausentes', models.PositiveIntegerField(default=0, verbose_name='Ausentes')),
+                ('duracion_total', models.DurationField(default=datetime.timedelta, verbose_name='Duración total')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario',
+                'verbose_name_plural': 'Resúmenes diarios',
+                'ordering': ['fecha'],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:43
+
+from django.db import migrations, models
+
+
+def calcular_minutos(hora_ingreso, hora_salida):
+    segundos = (
+        (hora_salida.hour - hora_ingreso.hour) * 3600
+        + (hora_salida.minute - hora_ingreso.minute) * 60
+        + (hora_salida.second - hora_ingreso.second)
+    )
+    if segundos < 0:
+        segundos += 24 * 3600
+    return segundos // 60
+
+
+def calcular_duracion_minutos(apps, schema_editor):
+    Asistencia = apps.get_model('asistencia', 'Asistencia')
+
+    # Una actualización por cada par distinto de horas
+    pares = Asistencia.objects.order_by()\
+        .values_list('hora_ingreso', 'hora_salida')\
+        .distinct()
+    for hora_ingreso, hora_salida in list(pares):
+        Asistencia.objects.filter(hora_ingreso=hora_ingreso, hora_salida=hora_salida)\
+            .update(duracion_minutos=calcular_minutos(hora_ingreso, hora_salida))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0002_resumendiario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asistencia',
+            name='duracion_minutos',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, help_text='Minutos entre la hora de ingreso y la hora de salida', null=True, verbose_name='Duración (minutos)'),
+        ),
+        migrations.RunPython(calcular_duracion_minutos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from taller_formularios import busqueda
+
+CAMPOS = ['nombre_completo', 'documento_identidad', 'correo_electronico']
+PESOS = ['A', 'A', 'B']
+
+
+def crear_indice(apps, schema_editor):
+    Asistencia = apps.get_model('asistencia', 'Asistencia')
+    busqueda.crear_indice(schema_editor, Asistencia, CAMPOS, PESOS)
+
+
+def eliminar_indice(apps, schema_editor):
+    Asistencia = apps.get_model('asistencia', 'Asistencia')
+    busqueda.eliminar_indice(schema_editor, Asistencia, CAMPOS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0003_asistencia_duracion_minutos'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
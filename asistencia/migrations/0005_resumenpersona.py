@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:52
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery, Sum
+
+
+def poblar_resumen(apps, schema_editor):
+    Asistencia = apps.get_model('asistencia', 'Asistencia')
+    ResumenPersona = apps.get_model('asistencia', 'ResumenPersona')
+
+    reciente = Asistencia.objects\
+        .filter(documento_identidad=OuterRef('documento_identidad'))\
+        .order_by('-fecha_asistencia')
+    filas = Asistencia.objects.order_by()\
+        .values('documento_identidad')\
+        .annotate(
+            primera=Min('fecha_asistencia'),
+            ultima=Max('fecha_asistencia'),
+            dias=Count('pk'),
+            presentes=Count('pk', filter=Q(presente=True)),
+            minutos_totales=Sum('duracion_minutos'),
+            nombre=Subquery(reciente.values('nombre_completo')[:1]),
+            correo=Subquery(reciente.values('correo_electronico')[:1]),
+        )
+
+    ResumenPersona.objects.bulk_create([
+        ResumenPersona(
+            documento_identidad=fila['documento_identidad'],
+            nombre_completo=fila['nombre'],
+            correo_electronico=fila['correo'],
+            primera_asistencia=fila['primera'],
+            ultima_asistencia=fila['ultima'],
+            total_dias=fila['dias'],
+            dias_presente=fila['presentes'],
+            duracion_total=datetime.timedelta(minutes=fila['minutos_totales'] or 0),
+        )
+        for fila in filas.iterator(chunk_size=1000)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0004_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenPersona',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documento_identidad', models.CharField(max_length=20, unique=True, verbose_name='Documento de Identidad')),
+                ('nombre_completo', models.CharField(help_text='Nombre del registro más reciente', max_length=150, verbose_name='Nombre Completo')),
+                ('correo_electronico', models.EmailField(help_text='Correo del registro más reciente', max_length=254, verbose_name='Correo Electrónico')),
+                ('primera_asistencia', models.DateField(verbose_name='Primera asistencia')),
+                ('ultima_asistencia', models.DateField(verbose_name='Última asistencia')),
+                ('total_dias', models.PositiveIntegerField(default=0, verbose_name='Días registrados')),
+                ('dias_presente', models.PositiveIntegerField(default=0, verbose_name='Días presente')),
+                ('duracion_total', models.DurationField(default=datetime.timedelta, verbose_name='Duración total')),
+            ],
+            options={
+                'verbose_name': 'Resumen por persona',
+                'verbose_name_plural': 'Resúmenes por persona',
+                'ordering': ['-total_dias', 'documento_identidad'],
+                'indexes': [models.Index(fields=['-total_dias', 'documento_identidad'], name='asistencia__total_d_d11cbc_idx'), models.Index(fields=['-duracion_total', 'documento_identidad'], name='asistencia__duracio_7d10d1_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0005_resumenpersona'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AsistenciaArchivada',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('nombre_completo', models.CharField(max_length=150, verbose_name='Nombre Completo')),
+                ('documento_identidad', models.CharField(max_length=20, verbose_name='Documento de Identidad')),
+                ('correo_electronico', models.EmailField(max_length=254, verbose_name='Correo Electrónico')),
+                ('fecha_asistencia', models.DateField(verbose_name='Fecha de Asistencia')),
+                ('hora_ingreso', models.TimeField(verbose_name='Hora de Ingreso')),
+                ('hora_salida', models.TimeField(verbose_name='Hora de Salida')),
+                ('presente', models.BooleanField(default=True, verbose_name='Presente')),
+                ('duracion_minutos', models.PositiveIntegerField(blank=True, null=True, verbose_name='Duración (minutos)')),
+                ('observaciones', models.TextField(blank=True, null=True, verbose_name='Observaciones')),
+                ('fecha_creacion', models.DateTimeField(verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(verbose_name='Última Actualización')),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de archivo')),
+            ],
+            options={
+                'verbose_name': 'Asistencia archivada',
+                'verbose_name_plural': 'Asistencias archivadas',
+                'ordering': ['-fecha_asistencia', '-hora_ingreso'],
+                'indexes': [models.Index(fields=['fecha_asistencia'], name='asistencia__fecha_a_5ee4b4_idx'), models.Index(fields=['documento_identidad', 'fecha_asistencia'], name='asistencia__documen_f00f34_idx')],
+            },
+        ),
+    ]
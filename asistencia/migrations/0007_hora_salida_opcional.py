@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0006_asistenciaarchivada'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='asistencia',
+            name='hora_salida',
+            field=models.TimeField(help_text='Hora de salida', null=True, verbose_name='Hora de Salida'),
+        ),
+        migrations.AlterField(
+            model_name='asistenciaarchivada',
+            name='hora_salida',
+            field=models.TimeField(null=True, verbose_name='Hora de Salida'),
+        ),
+    ]
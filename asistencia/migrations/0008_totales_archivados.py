@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0007_hora_salida_opcional'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TotalArchivadoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_asistencia', models.DateField(unique=True, verbose_name='Fecha de Asistencia')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total registros')),
+                ('presentes', models.PositiveIntegerField(default=0, verbose_name='Presentes')),
+                ('ausentes', models.PositiveIntegerField(default=0, verbose_name='Ausentes')),
+                ('minutos_totales', models.PositiveIntegerField(default=0, verbose_name='Minutos totales')),
+            ],
+            options={
+                'verbose_name': 'Total archivado por día',
+                'verbose_name_plural': 'Totales archivados por día',
+                'ordering': ['fecha_asistencia'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TotalArchivadoPersona',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documento_identidad', models.CharField(max_length=20, unique=True, verbose_name='Documento de Identidad')),
+                ('nombre_completo', models.CharField(max_length=150, verbose_name='Nombre Completo')),
+                ('correo_electronico', models.EmailField(max_length=254, verbose_name='Correo Electrónico')),
+                ('primera_asistencia', models.DateField(verbose_name='Primera asistencia')),
+                ('ultima_asistencia', models.DateField(verbose_name='Última asistencia')),
+                ('total_dias', models.PositiveIntegerField(default=0, verbose_name='Días registrados')),
+                ('dias_presente', models.PositiveIntegerField(default=0, verbose_name='Días presente')),
+                ('minutos_totales', models.PositiveIntegerField(default=0, verbose_name='Minutos totales')),
+            ],
+            options={
+                'verbose_name': 'Total archivado por persona',
+                'verbose_name_plural': 'Totales archivados por persona',
+                'ordering': ['documento_identidad'],
+            },
+        ),
+    ]
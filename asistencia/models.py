@@ -1,15 +1,20 @@
 from django.db import models
-from django.core.exceptions import ValidationError
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.utils import timezone
 from django.urls import reverse
-from datetime import datetime
+from datetime import timedelta
 import uuid
 
-from .managers import AsistenciaManager
+from taller_formularios.seguimiento import SeguimientoCambiosMixin
+
+from .duracion import calcular_duracion, calcular_minutos, formatear_duracion
+from .managers import AsistenciaManager, ResumenDiarioManager, ResumenPersonaManager
 from . import validators
 
+MENSAJE_ARCHIVADA = 'Ya existe un registro archivado con este documento para esta fecha.'
+
 
-class Asistencia(models.Model):
+class Asistencia(SeguimientoCambiosMixin, models.Model):
 	"""
 	Modelo para registrar la asistencia de personas
 	Implementa validaciones robustas y métodos de utilidad
@@ -55,7 +60,9 @@ class Asistencia(models.Model):
 		help_text="Hora de entrada"
 	)
 
+	# Vacía mientras la persona no registre su salida (kiosco); los formularios la exigen
 	hora_salida = models.TimeField(
+		null=True,
 		verbose_name="Hora de Salida",
 		help_text="Hora de salida"
 	)
@@ -67,6 +74,16 @@ class Asistencia(models.Model):
 		help_text="Indica si la persona estuvo presente"
 	)
 
+	# Duración precalculada (se mantiene en save() y en las operaciones masivas)
+	duracion_minutos = models.PositiveIntegerField(
+		null=True,
+		blank=True,
+		editable=False,
+		db_index=True,
+		verbose_name="Duración (minutos)",
+		help_text="Minutos entre la hora de ingreso y la hora de salida"
+	)
+
 	# Campo opcional
 	observaciones = models.TextField(
 		blank=True,
@@ -105,44 +122,34 @@ class Asistencia(models.Model):
 
 	def clean(self):
 		"""
-		Validaciones a nivel de modelo
+		Validaciones a nivel de modelo (reglas compartidas en validators.ESQUEMA).
+		En filas ya guardadas solo se revisan las reglas de los campos modificados.
 		"""
-		errors = {}
-
-		# Validar que la fecha no sea futura
-		if self.fecha_asistencia and self.fecha_asistencia > timezone.now().date():
-			errors['fecha_asistencia'] = "La fecha de asistencia no puede ser futura."
-
-		# Validar que hora_salida sea posterior a hora_ingreso
-		if self.hora_ingreso and self.hora_salida:
-			if self.hora_salida <= self.hora_ingreso:
-				errors['hora_salida'] = "La hora de salida debe ser posterior a la hora de ingreso."
-
-		# Validar documento de identidad (solo números)
-		if self.documento_identidad:
-			if not self.documento_identidad.isdigit():
-				errors['documento_identidad'] = "El documento debe contener solo números."
-			elif len(self.documento_identidad) < 6:
-				errors['documento_identidad'] = "El documento debe tener al menos 6 dígitos."
-
-		# Validar nombre completo
-		if self.nombre_completo:
-			if len(self.nombre_completo.strip()) < 2:
-				errors['nombre_completo'] = "El nombre debe tener al menos 2 caracteres."
-
-			# Verificar que contenga al menos dos palabras
-			palabras = self.nombre_completo.strip().split()
-			if len(palabras) < 2:
-				errors['nombre_completo'] = "Debe ingresar nombre y apellido."
-
-		if errors:
-			raise ValidationError(errors)
+		validators.ESQUEMA.validar(self, campos=self.campos_modificados())
 
-	def save(self, *args, **kwargs):
+	def validate_unique(self, exclude=None):
+		"""
+		Además de unique_together, el par (documento, fecha) no debe estar en
+		AsistenciaArchivada. Como la consulta de unique_together, se omite si
+		no cambió ninguno de los dos campos.
 		"""
-		Override del método save para ejecutar validaciones
+		super().validate_unique(exclude=exclude)
+		campos = {'documento_identidad', 'fecha_asistencia'}
+		cambios = self.campos_modificados()
+		if (exclude and campos & set(exclude)) or (cambios is not None and not campos & cambios):
+			return
+		if not (self.documento_identidad and self.fecha_asistencia):
+			return
+		archivadas = Asistencia.objects.claves_archivadas(
+			[self.documento_identidad], self.fecha_asistencia, self.fecha_asistencia
+		)
+		if archivadas:
+			raise ValidationError({NON_FIELD_ERRORS: [MENSAJE_ARCHIVADA]})
+
+	def normalizar(self):
+		"""
+		Normaliza nombre, documento y correo (save() y las altas masivas)
 		"""
-		# Normalizar datos
 		if self.nombre_completo:
 			self.nombre_completo = self.nombre_completo.strip().title()
 
@@ -152,9 +159,19 @@ class Asistencia(models.Model):
 		if self.correo_electronico:
 			self.correo_electronico = self.correo_electronico.lower().strip()
 
+	def save(self, *args, **kwargs):
+		"""
+		Override del método save para ejecutar validaciones. Sobre una fila
+		cargada, full_clean() y la escritura se limitan a los campos modificados
+		(ver SeguimientoCambiosMixin).
+		"""
+		self.normalizar()
+
 		# Ejecutar validaciones
 		self.full_clean()
 
+		self.duracion_minutos = calcular_minutos(self.hora_ingreso, self.hora_salida)
+
 		super().save(*args, **kwargs)
 
 	def __str__(self):
@@ -175,21 +192,11 @@ class Asistencia(models.Model):
 		"""
 		Calcula la duración de la asistencia en horas
 		"""
-		if self.hora_ingreso and self.hora_salida:
-			# Convertir a datetime para calcular diferencia
-			ingreso = datetime.combine(self.fecha_asistencia, self.hora_ingreso)
-			salida = datetime.combine(self.fecha_asistencia, self.hora_salida)
-
-			# Si la salida es al día siguiente
-			if self.hora_salida < self.hora_ingreso:
-				salida = datetime.combine(
-					self.fecha_asistencia + timezone.timedelta(days=1),
-					self.hora_salida
-				)
-
-			duracion = salida - ingreso
-			return duracion.total_seconds() / 3600  # Retorna en horas
-		return None
+		return calcular_duracion(
+			self.fecha_asistencia,
+			self.hora_ingreso,
+			self.hora_salida
+		)
 
 	@property
 	def es_asistencia_completa(self):
@@ -211,9 +218,216 @@ class Asistencia(models.Model):
 		"""
 		Retorna la duración formateada
 		"""
-		duracion = self.duracion_asistencia
-		if duracion:
-			horas = int(duracion)
-			minutos = int((duracion - horas) * 60)
-			return f"{horas}h {minutos}m"
-		return "No disponible"
+		return formatear_duracion(self.duracion_asistencia)
+
+
+class ResumenDiario(models.Model):
+	"""
+	Resumen materializado de la asistencia de un día.
+	Se mantiene al día desde los hooks de escritura de Asistencia
+	y se puede reconstruir con el comando reconstruir_resumen_diario
+	"""
+
+	fecha = models.DateField(
+		unique=True,
+		verbose_name="Fecha"
+	)
+
+	total = models.PositiveIntegerField(
+		default=0,
+		verbose_name="Total registros"
+	)
+
+	presentes = models.PositiveIntegerField(
+		default=0,
+		verbose_name="Presentes"
+	)
+
+	ausentes = models.PositiveIntegerField(
+		default=0,
+		verbose_name="Ausentes"
+	)
+
+	duracion_total = models.DurationField(
+		default=timedelta,
+		verbose_name="Duración total"
+	)
+
+	objects = ResumenDiarioManager()
+
+	class Meta:
+		verbose_name = "Resumen diario"
+		verbose_name_plural = "Resúmenes diarios"
+		ordering = ['fecha']
+
+	def __str__(self):
+		return f"{self.fecha}: {self.presentes}/{self.total} presentes"
+
+	@property
+	def horas_totales(self):
+		"""
+		Duración total del día en horas
+		"""
+		return round(self.duracion_total.total_seconds() / 3600, 2)
+
+
+class ResumenPersona(models.Model):
+	"""
+	Resumen materializado del historial de asistencia de una persona,
+	identificada por su documento. Se mantiene al día desde los hooks de
+	escritura de Asistencia, igual que ResumenDiario
+	"""
+
+	documento_identidad = models.CharField(
+		max_length=20,
+		unique=True,
+		verbose_name="Documento de Identidad"
+	)
+
+	nombre_completo = models.CharField(
+		max_length=150,
+		verbose_name="Nombre Completo",
+		help_text="Nombre del registro más reciente"
+	)
+
+	correo_electronico = models.EmailField(
+		verbose_name="Correo Electrónico",
+		help_text="Correo del registro más reciente"
+	)
+
+	primera_asistencia = models.DateField(
+		verbose_name="Primera asistencia"
+	)
+
+	ultima_asistencia = models.DateField(
+		verbose_name="Última asistencia"
+	)
+
+	total_dias = models.PositiveIntegerField(
+		default=0,
+		verbose_name="Días registrados"
+	)
+
+	dias_presente = models.PositiveIntegerField(
+		default=0,
+		verbose_name="Días presente"
+	)
+
+	duracion_total = models.DurationField(
+		default=timedelta,
+		verbose_name="Duración total"
+	)
+
+	objects = ResumenPersonaManager()
+
+	class Meta:
+		verbose_name = "Resumen por persona"
+		verbose_name_plural = "Resúmenes por persona"
+		ordering = ['-total_dias', 'documento_identidad']
+		indexes = [
+			# Rankings con ORDER BY ... LIMIT
+			models.Index(fields=['-total_dias', 'documento_identidad']),
+			models.Index(fields=['-duracion_total', 'documento_identidad']),
+		]
+
+	def __str__(self):
+		return f"{self.nombre_completo} ({self.documento_identidad})"
+
+	def get_absolute_url(self):
+		return reverse('asistencia:persona', kwargs={'documento': self.documento_identidad})
+
+	@property
+	def horas_totales(self):
+		"""
+		Duración total acumulada en horas
+		"""
+		return round(self.duracion_total.total_seconds() / 3600, 2)
+
+	@property
+	def porcentaje_asistencia(self):
+		"""
+		Porcentaje de días marcados como presente
+		"""
+		if not self.total_dias:
+			return 0
+		return round(self.dias_presente / self.total_dias * 100, 2)
+
+
+class AsistenciaArchivada(models.Model):
+	"""
+	Asistencias anteriores al horizonte de archivo (ver archivo.py). Mismas
+	columnas que Asistencia, sin validaciones: las filas llegan ya validadas
+	y no se editan. Los resúmenes y Asistencia.objects.historial() las incluyen
+	"""
+
+	id = models.UUIDField(primary_key=True, editable=False)
+	nombre_completo = models.CharField(max_length=150, verbose_name="Nombre Completo")
+	documento_identidad = models.CharField(max_length=20, verbose_name="Documento de Identidad")
+	correo_electronico = models.EmailField(verbose_name="Correo Electrónico")
+	fecha_asistencia = models.DateField(verbose_name="Fecha de Asistencia")
+	hora_ingreso = models.TimeField(verbose_name="Hora de Ingreso")
+	hora_salida = models.TimeField(null=True, verbose_name="Hora de Salida")
+	presente = models.BooleanField(default=True, verbose_name="Presente")
+	duracion_minutos = models.PositiveIntegerField(null=True, blank=True, verbose_name="Duración (minutos)")
+	observaciones = models.TextField(blank=True, null=True, verbose_name="Observaciones")
+	fecha_creacion = models.DateTimeField(verbose_name="Fecha de Creación")
+	fecha_actualizacion = models.DateTimeField(verbose_name="Última Actualización")
+	fecha_archivado = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de archivo")
+
+	class Meta:
+		verbose_name = "Asistencia archivada"
+		verbose_name_plural = "Asistencias archivadas"
+		ordering = ['-fecha_asistencia', '-hora_ingreso']
+		indexes = [
+			models.Index(fields=['fecha_asistencia']),
+			models.Index(fields=['documento_identidad', 'fecha_asistencia']),
+		]
+
+	def __str__(self):
+		return f"{self.nombre_completo} - {self.fecha_asistencia} (archivada)"
+
+
+class TotalArchivadoDiario(models.Model):
+	"""
+	Totales por día de las asistencias archivadas en archivos (destinos csv
+	y parquet). Esas filas salen de la base de datos, así que el
+	ResumenDiario las suma desde aquí al recalcularse
+	"""
+
+	fecha_asistencia = models.DateField(unique=True, verbose_name="Fecha de Asistencia")
+	total = models.PositiveIntegerField(default=0, verbose_name="Total registros")
+	presentes = models.PositiveIntegerField(default=0, verbose_name="Presentes")
+	ausentes = models.PositiveIntegerField(default=0, verbose_name="Ausentes")
+	minutos_totales = models.PositiveIntegerField(default=0, verbose_name="Minutos totales")
+
+	class Meta:
+		verbose_name = "Total archivado por día"
+		verbose_name_plural = "Totales archivados por día"
+		ordering = ['fecha_asistencia']
+
+	def __str__(self):
+		return f"{self.fecha_asistencia}: {self.total} archivadas"
+
+
+class TotalArchivadoPersona(models.Model):
+	"""
+	Totales por persona de las asistencias archivadas en archivos, que el
+	ResumenPersona suma al recalcularse
+	"""
+
+	documento_identidad = models.CharField(max_length=20, unique=True, verbose_name="Documento de Identidad")
+	nombre_completo = models.CharField(max_length=150, verbose_name="Nombre Completo")
+	correo_electronico = models.EmailField(verbose_name="Correo Electrónico")
+	primera_asistencia = models.DateField(verbose_name="Primera asistencia")
+	ultima_asistencia = models.DateField(verbose_name="Última asistencia")
+	total_dias = models.PositiveIntegerField(default=0, verbose_name="Días registrados")
+	dias_presente = models.PositiveIntegerField(default=0, verbose_name="Días presente")
+	minutos_totales = models.PositiveIntegerField(default=0, verbose_name="Minutos totales")
+
+	class Meta:
+		verbose_name = "Total archivado por persona"
+		verbose_name_plural = "Totales archivados por persona"
+		ordering = ['documento_identidad']
+
+	def __str__(self):
+		return f"{self.documento_identidad}: {self.total_dias} archivadas"
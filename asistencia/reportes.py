@@ -0,0 +1,309 @@
+"""
+Reportes de asistencia por periodos
+
+Un reporte cubre un rango de fechas agrupado por día, semana, mes o persona
+y da, por grupo: total, presentes, ausentes, tasa de presencia, duración
+promedio de los presentes y llegadas tarde (ingreso posterior a la hora de entrada,
+ASISTENCIA_HORA_ENTRADA por defecto).
+
+El rango se recorre por tramos de un mes: cada tramo es un GROUP BY sobre
+Asistencia y otro sobre AsistenciaArchivada, de modo que la base de datos
+agrega y a Python solo llegan las filas ya agrupadas. Todas las métricas se
+derivan de sumas, así que los tramos se combinan sumando.
+
+Los rangos de más de REPORTES_DIAS_EN_LINEA días se calculan en un grupo de
+hilos (`solicitar`); el estado, el progreso y el resultado quedan en la caché
+(REPORTES_CACHE) durante REPORTES_TTL segundos. Con varios procesos la caché
+debe ser compartida (Redis, Memcached) para consultar el progreso desde
+cualquiera de ellos.
+"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.http import HttpResponse
+
+from .managers import combinar_con_archivo
+from .models import Asistencia, AsistenciaArchivada
+
+logger = logging.getLogger(__name__)
+
+AGRUPACIONES = {
+    'dia': 'Día',
+    'semana': 'Semana',
+    'mes': 'Mes',
+    'persona': 'Persona',
+}
+SUMAS = ('total', 'presentes', 'con_duracion', 'minutos', 'tardanzas')
+
+PENDIENTE = 'pendiente'
+PROCESANDO = 'procesando'
+LISTO = 'listo'
+ERROR = 'error'
+
+ENCABEZADOS_CSV = [
+    'Grupo', 'Nombre', 'Total', 'Presentes', 'Ausentes', 'Tasa de presencia (%)',
+    'Duración promedio (min)', 'Llegadas tarde',
+]
+
+
+def hora_entrada():
+    valor = getattr(settings, 'ASISTENCIA_HORA_ENTRADA', '08:00')
+    return valor if isinstance(valor, time) else time.fromisoformat(valor)
+
+
+def dias_en_linea():
+    return getattr(settings, 'REPORTES_DIAS_EN_LINEA', 92)
+
+
+def asincronos():
+    return getattr(settings, 'REPORTES_ASINCRONOS', True)
+
+
+def tramos(desde, hasta):
+    """Divide [desde, hasta] en tramos de un mes calendario"""
+    inicio = desde
+    while inicio <= hasta:
+        siguiente = (inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+        fin = min(siguiente - timedelta(days=1), hasta)
+        yield inicio, fin
+        inicio = siguiente
+
+
+def _agrupar(modelo, desde, hasta, agrupacion, entrada):
+    claves = {
+        'dia': F('fecha_asistencia'),
+        'semana': TruncWeek('fecha_asistencia'),
+        'mes': TruncMonth('fecha_asistencia'),
+        'persona': F('documento_identidad'),
+    }
+    extra = {'nombre': Max('nombre_completo')} if agrupacion == 'persona' else {}
+    return list(
+        modelo._base_manager
+        .filter(fecha_asistencia__range=(desde, hasta))
+        .annotate(clave=claves[agrupacion])
+        .order_by()
+        .values('clave')
+        .annotate(
+            total=Count('pk'),
+            presentes=Count('pk', filter=Q(presente=True)),
+            con_duracion=Count('duracion_minutos', filter=Q(presente=True)),
+            minutos=Sum('duracion_minutos', filter=Q(presente=True)),
+            tardanzas=Count('pk', filter=Q(presente=True, hora_ingreso__gt=entrada)),
+            **extra,
+        )
+    )
+
+
+def _fila(agrupada, agrupacion):
+    total = agrupada['total']
+    presentes = agrupada['presentes']
+    clave = agrupada['clave']
+    if agrupacion == 'semana':
+        etiqueta = f'{clave:%G}-S{clave:%V}'
+    elif agrupacion == 'mes':
+        etiqueta = f'{clave:%Y-%m}'
+    else:
+        etiqueta = str(clave)
+    return {
+        'clave': clave,
+        'etiqueta': etiqueta,
+        'nombre': agrupada.get('nombre', ''),
+        'total': total,
+        'presentes': presentes,
+        'ausentes': total - presentes,
+        'tasa_presencia': round(presentes / total * 100, 2) if total else 0,
+        'duracion_promedio': (
+            round(agrupada['minutos'] / agrupada['con_duracion'], 1)
+            if agrupada['con_duracion'] else None
+        ),
+        'tardanzas': agrupada['tardanzas'],
+    }
+
+
+def calcular(desde, hasta, agrupacion='dia', entrada=None, progreso=None):
+    """
+    Calcula el reporte. `progreso(hechos, total)` se llama tras cada tramo.
+    Retorna {'parametros', 'filas', 'totales'}.
+    """
+    if agrupacion not in AGRUPACIONES:
+        raise ValueError(f'Agrupación desconocida: {agrupacion}')
+    entrada = entrada or hora_entrada()
+    lista_tramos = list(tramos(desde, hasta))
+
+    acumulado = []
+    for hechos, (inicio, fin) in enumerate(lista_tramos, start=1):
+        for modelo in (AsistenciaArchivada, Asistencia):
+            acumulado = combinar_con_archivo(
+                _agrupar(modelo, inicio, fin, agrupacion, entrada), acumulado, 'clave',
+                sumas=SUMAS, maximos=('nombre',) if agrupacion == 'persona' else (),
+            )
+        if progreso:
+            progreso(hechos, len(lista_tramos))
+
+    acumulado.sort(key=lambda fila: fila['clave'])
+    totales = {campo: sum(fila[campo] or 0 for fila in acumulado) for campo in SUMAS}
+    return {
+        'parametros': {
+            'desde': desde,
+            'hasta': hasta,
+            'agrupacion': agrupacion,
+            'hora_entrada': entrada,
+        },
+        'filas': [_fila(fila, agrupacion) for fila in acumulado],
+        'totales': _fila({'clave': '', **totales}, 'total'),
+    }
+
+
+# Formatos de salida
+
+# Una celda que empieza así es una fórmula para las hojas de cálculo
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def texto_csv(valor):
+    """Texto de una celda CSV, con ' delante si se leería como fórmula"""
+    if valor and valor.startswith(INICIO_FORMULA):
+        return f"'{valor}"
+    return valor
+
+
+def a_csv(reporte):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(ENCABEZADOS_CSV)
+    for fila in reporte['filas'] + [dict(reporte['totales'], etiqueta='Total')]:
+        escritor.writerow([
+            texto_csv(fila['etiqueta']),
+            texto_csv(fila['nombre']),
+            fila['total'],
+            fila['presentes'],
+            fila['ausentes'],
+            fila['tasa_presencia'],
+            '' if fila['duracion_promedio'] is None else fila['duracion_promedio'],
+            fila['tardanzas'],
+        ])
+    return buffer.getvalue()
+
+
+def a_json(reporte):
+    return json.dumps(reporte, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def respuesta(reporte, formato):
+    """Descarga del reporte en CSV o JSON"""
+    parametros = reporte['parametros']
+    nombre = f"reporte_{parametros['agrupacion']}_{parametros['desde']:%Y%m%d}_{parametros['hasta']:%Y%m%d}"
+    if formato == 'csv':
+        contenido, tipo = a_csv(reporte), 'text/csv; charset=utf-8'
+    else:
+        contenido, tipo = a_json(reporte), 'application/json'
+    response = HttpResponse(contenido, content_type=tipo)
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{formato}"'
+    return response
+
+
+# Trabajos en segundo plano
+
+def _cache():
+    return caches[getattr(settings, 'REPORTES_CACHE', 'default')]
+
+
+def _ttl():
+    return getattr(settings, 'REPORTES_TTL', 600)
+
+
+def clave_trabajo(desde, hasta, agrupacion, entrada=None):
+    entrada = entrada or hora_entrada()
+    firma = f'{desde.isoformat()}|{hasta.isoformat()}|{agrupacion}|{entrada.isoformat()}'
+    return hashlib.sha1(firma.encode()).hexdigest()
+
+
+def _clave_cache(clave):
+    return f'reportes:{clave}'
+
+
+def estado(clave):
+    """Estado del trabajo: {'estado', 'progreso', 'resultado', 'error'} o None"""
+    return _cache().get(_clave_cache(clave))
+
+
+def _guardar_estado(clave, **valores):
+    _cache().set(_clave_cache(clave), {
+        'estado': PENDIENTE, 'progreso': 0, 'resultado': None, 'error': '', **valores,
+    }, timeout=_ttl())
+
+
+_executor = None
+_lock_executor = threading.Lock()
+
+
+def _grupo_hilos():
+    global _executor
+    with _lock_executor:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPORTES_HILOS', 1),
+                thread_name_prefix='reportes',
+            )
+        return _executor
+
+
+def ejecutar(clave, desde, hasta, agrupacion, entrada=None):
+    """Calcula el reporte dejando el progreso y el resultado en la caché"""
+    def progreso(hechos, total):
+        _guardar_estado(clave, estado=PROCESANDO, progreso=int(hechos * 100 / total))
+
+    _guardar_estado(clave, estado=PROCESANDO)
+    try:
+        resultado = calcular(desde, hasta, agrupacion, entrada, progreso=progreso)
+    except Exception as e:
+        logger.exception('Error calculando el reporte %s', clave)
+        _guardar_estado(clave, estado=ERROR, error=str(e)[:1000])
+        return None
+    _guardar_estado(clave, estado=LISTO, progreso=100, resultado=resultado)
+    return resultado
+
+
+def _ejecutar_en_hilo(*args):
+    close_old_connections()
+    try:
+        ejecutar(*args)
+    finally:
+        close_old_connections()
+
+
+def solicitar(desde, hasta, agrupacion='dia', entrada=None):
+    """
+    Retorna (clave, estado) del reporte. Si no hay un trabajo en curso o un
+    resultado en la caché, lo encola; solo uno por combinación de parámetros.
+    Un trabajo que falló se vuelve a intentar.
+    """
+    entrada = entrada or hora_entrada()
+    clave = clave_trabajo(desde, hasta, agrupacion, entrada)
+    anterior = estado(clave)
+    if anterior and anterior['estado'] == ERROR:
+        _cache().delete(_clave_cache(clave))
+    nuevo = {'estado': PENDIENTE, 'progreso': 0, 'resultado': None, 'error': ''}
+    if _cache().add(_clave_cache(clave), nuevo, timeout=_ttl()):
+        if asincronos():
+            _grupo_hilos().submit(_ejecutar_en_hilo, clave, desde, hasta, agrupacion, entrada)
+        else:
+            ejecutar(clave, desde, hasta, agrupacion, entrada)
+    return clave, estado(clave) or nuevo
+
+
+def en_linea(desde, hasta):
+    """Si el rango es lo bastante corto para calcularse dentro de la petición"""
+    return (hasta - desde).days < dias_en_linea()
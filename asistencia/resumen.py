@@ -0,0 +1,72 @@
+"""
+Mantenimiento de los resúmenes materializados de asistencia
+
+Las escrituras sobre Asistencia notifican aquí las fechas y los documentos
+afectados. El resumen de cada fecha (ResumenDiario) y de cada persona
+(ResumenPersona) se recalcula solo a partir de sus propias filas, de modo
+que el costo depende del tamaño del día o del historial de la persona y no
+del tamaño de la tabla.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from django.apps import apps
+from django.utils import timezone
+
+_estado = threading.local()
+
+
+def _como_fecha(valor):
+    """Normaliza un valor de fecha_asistencia (date o datetime) a date"""
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.date()
+    return valor
+
+
+def actualizar_resumen(fechas, documentos=()):
+    """
+    Recalcula el resumen de las fechas y de los documentos indicados.
+    Dentro de un bloque `resumen_diferido` solo los acumula.
+    """
+    fechas = {_como_fecha(f) for f in fechas if isinstance(f, date)}
+    documentos = {d for d in documentos if d}
+    if not fechas and not documentos:
+        return
+
+    pendientes = getattr(_estado, 'pendientes', None)
+    if pendientes is not None:
+        pendientes['fechas'].update(fechas)
+        pendientes['documentos'].update(documentos)
+        return
+
+    if fechas:
+        from . import estadisticas
+
+        apps.get_model('asistencia', 'ResumenDiario').objects.recalcular(fechas)
+        estadisticas.invalidar_fechas(fechas)
+    if documentos:
+        apps.get_model('asistencia', 'ResumenPersona').objects.recalcular(documentos)
+
+
+@contextmanager
+def resumen_diferido():
+    """
+    Agrupa las actualizaciones de los resúmenes hechas dentro del bloque
+    y las aplica una sola vez al salir sin errores
+    """
+    if getattr(_estado, 'pendientes', None) is not None:
+        # Bloque anidado: el bloque externo aplica los cambios
+        yield
+        return
+
+    _estado.pendientes = {'fechas': set(), 'documentos': set()}
+    try:
+        yield
+        pendientes = _estado.pendientes
+    finally:
+        _estado.pendientes = None
+
+    actualizar_resumen(pendientes['fechas'], pendientes['documentos'])
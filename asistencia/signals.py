@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from solicitudes.models import Solicitud
+
+from . import en_vivo, estadisticas, kiosco
+from .managers import CAMPOS_DIARIOS, CAMPOS_PERSONA
+from .models import Asistencia
+from .resumen import actualizar_resumen
+
+
+@receiver(pre_save, sender=Asistencia)
+def recordar_valores_anteriores(sender, instance, **kwargs):
+    """
+    Guarda la fecha y el documento previos para recalcular también
+    el día y la persona de origen
+    """
+    instance._fecha_anterior = None
+    instance._documento_anterior = None
+    if instance._state.adding:
+        return
+    # Si la fila se cargó de la base de datos ya se conocen sus valores
+    cargados = instance.valores_cargados()
+    if 'fecha_asistencia' in cargados and 'documento_identidad' in cargados:
+        instance._fecha_anterior = cargados['fecha_asistencia']
+        instance._documento_anterior = cargados['documento_identidad']
+        return
+    anterior = sender._base_manager\
+        .filter(pk=instance.pk)\
+        .values_list('fecha_asistencia', 'documento_identidad')\
+        .first()
+    if anterior:
+        instance._fecha_anterior, instance._documento_anterior = anterior
+
+
+@receiver(post_save, sender=Asistencia)
+def actualizar_resumen_al_guardar(sender, instance, update_fields=None, **kwargs):
+    # Con update_fields solo se recalcula lo que depende de esas columnas
+    fechas = {getattr(instance, '_fecha_anterior', None), instance.fecha_asistencia}
+    documentos = {getattr(instance, '_documento_anterior', None), instance.documento_identidad}
+    if update_fields is not None:
+        if not CAMPOS_DIARIOS & update_fields:
+            fechas = set()
+        if not CAMPOS_PERSONA & update_fields:
+            documentos = set()
+    actualizar_resumen(fechas, documentos)
+    # El nombre o el correo pudieron cambiar: el kiosco vuelve a leerlos
+    kiosco.personas.olvidar(instance.documento_identidad)
+
+
+@receiver(post_delete, sender=Asistencia)
+def actualizar_resumen_al_eliminar(sender, instance, **kwargs):
+    actualizar_resumen({instance.fecha_asistencia}, {instance.documento_identidad})
+
+
+@receiver(post_save, sender=Solicitud)
+@receiver(post_delete, sender=Solicitud)
+def invalidar_estadisticas_solicitudes(sender, **kwargs):
+    estadisticas.invalidar('solicitudes')
+
+
+@receiver(estadisticas.cambiaron)
+def avisar_panel_en_vivo(sender, **kwargs):
+    en_vivo.panel.notificar(**kwargs)
@@ -0,0 +1,171 @@
+import json
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.models import Asistencia, ResumenDiario
+
+from .utils import crear_asistencia
+
+TOKEN = {'HTTP_AUTHORIZATION': 'Bearer secreto'}
+
+
+def datos_asistencia(documento, **extra):
+    datos = {
+        'nombre_completo': 'luis gómez',
+        'documento_identidad': documento,
+        'correo_electronico': 'LUIS@Example.com',
+        'hora_ingreso': '08:00',
+        'hora_salida': '10:30',
+    }
+    datos.update(extra)
+    return datos
+
+
+@override_settings(API_TOKENS=['secreto'])
+class ApiAsistenciasTest(TestCase):
+    def setUp(self):
+        self.url = reverse('api_asistencias:lista')
+
+    def enviar(self, metodo, url, datos, **extra):
+        return getattr(self.client, metodo)(
+            url, json.dumps(datos), content_type='application/json', **{**TOKEN, **extra}
+        )
+
+    def test_lista_con_campos_y_cursor(self):
+        for i in range(5):
+            crear_asistencia(f'50000{i}')
+
+        response = self.client.get(self.url, {'campos': 'documento_identidad', 'limite': 2})
+        datos = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(datos['resultados'][0]), {'id', 'documento_identidad'})
+        self.assertEqual(len(datos['resultados']), 2)
+
+        vistos = [r['documento_identidad'] for r in datos['resultados']]
+        while datos['siguiente']:
+            datos = self.client.get(self.url, {'limite': 2, 'cursor': datos['siguiente']}).json()
+            vistos += [r['documento_identidad'] for r in datos['resultados']]
+        self.assertEqual(sorted(vistos), [f'50000{i}' for i in range(5)])
+
+    def test_filtros_y_errores_de_parametros(self):
+        crear_asistencia('600001')
+        crear_asistencia('600002', presente=False)
+
+        datos = self.client.get(self.url, {'presente': 'false'}).json()
+        self.assertEqual([r['documento_identidad'] for r in datos['resultados']], ['600002'])
+        self.assertEqual(self.client.get(self.url, {'fecha': 'ayer'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'campos': 'clave'}).status_code, 400)
+
+    def test_etag_responde_304_hasta_que_cambian_los_datos(self):
+        asistencia = crear_asistencia('700001')
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Asistencia.objects.filter(pk=asistencia.pk).update(observaciones='Tarde')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        detalle = reverse('api_asistencias:detalle', args=[asistencia.pk])
+        etag = self.client.get(detalle)['ETag']
+        self.assertEqual(self.client.get(detalle, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_escritura_requiere_token(self):
+        response = self.client.post(self.url, json.dumps(datos_asistencia('800001')),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Asistencia.objects.exists())
+
+    def test_alta_en_lote(self):
+        with CaptureQueriesContext(connection) as uno:
+            self.enviar('post', self.url, [datos_asistencia('810000')])
+        lote = [datos_asistencia(f'80000{i}') for i in range(3)]
+        with CaptureQueriesContext(connection) as varios:
+            response = self.enviar('post', self.url, lote)
+
+        # Las consultas no crecen con el tamaño del lote
+        self.assertEqual(len(varios), len(uno))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['resultados']), 3)
+        asistencia = Asistencia.objects.get(documento_identidad='800000')
+        self.assertEqual(asistencia.nombre_completo, 'Luis Gómez')
+        self.assertEqual(asistencia.correo_electronico, 'luis@example.com')
+        self.assertEqual(asistencia.duracion_minutos, 150)
+        self.assertTrue(asistencia.presente)
+        self.assertEqual(ResumenDiario.objects.get(fecha=timezone.localdate()).total, 4)
+
+    def test_lote_con_errores_no_guarda_nada(self):
+        crear_asistencia('900001')
+        lote = [
+            datos_asistencia('900002'),
+            datos_asistencia('900001'),
+            datos_asistencia('900003', hora_salida='07:00'),
+            datos_asistencia('900002'),
+            datos_asistencia('900004', clave='x'),
+        ]
+        response = self.enviar('post', self.url, lote)
+
+        self.assertEqual(response.status_code, 400)
+        errores = response.json()['detalle']
+        self.assertEqual(set(errores), {'2', '4'})
+        self.assertIn('hora_salida', errores['2'])
+        self.assertEqual(Asistencia.objects.count(), 1)
+
+        # Con las filas inválidas corregidas aparecen los errores de unicidad
+        response = self.enviar('post', self.url, [lote[0], lote[1], lote[3]])
+        self.assertEqual(set(response.json()['detalle']), {'1', '2'})
+
+    def test_lote_vacio(self):
+        for metodo in ('post', 'patch'):
+            response = self.enviar(metodo, self.url, [])
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['error'], 'El lote está vacío')
+
+    def test_actualizacion_en_lote(self):
+        ayer = timezone.localdate() - timedelta(days=1)
+        a = crear_asistencia('910001')
+        b = crear_asistencia('910002')
+        cambios = [
+            {'id': str(a.pk), 'hora_salida': '09:00'},
+            {'id': str(b.pk), 'fecha_asistencia': ayer.isoformat()},
+        ]
+        response = self.enviar('patch', self.url, cambios)
+
+        self.assertEqual(response.status_code, 200)
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual(a.duracion_minutos, 60)
+        self.assertEqual(b.fecha_asistencia, ayer)
+        self.assertEqual(ResumenDiario.objects.get(fecha=ayer).total, 1)
+        self.assertEqual(ResumenDiario.objects.get(fecha=timezone.localdate()).total, 1)
+
+    def test_actualizacion_de_un_elemento(self):
+        a = crear_asistencia('920001')
+        crear_asistencia('920002')
+        detalle = reverse('api_asistencias:detalle', args=[a.pk])
+
+        response = self.enviar('patch', detalle, {'observaciones': 'Llegó tarde'})
+        self.assertEqual(response.json()['observaciones'], 'Llegó tarde')
+
+        response = self.enviar('patch', detalle, {'documento_identidad': '920002'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_actualizacion_de_una_fila_sin_salida(self):
+        # Fila abierta por el kiosco: la salida sigue vacía
+        a = crear_asistencia('930001')
+        Asistencia.objects.filter(pk=a.pk).update(hora_salida=None)
+        detalle = reverse('api_asistencias:detalle', args=[a.pk])
+
+        response = self.enviar('patch', detalle, {'observaciones': 'Sin salida'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['hora_salida'])
+
+        response = self.enviar('patch', detalle, {'hora_salida': '07:00'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,154 @@
+import io
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from asistencia import archivo, kiosco, reportes
+from asistencia.importacion import importar_archivo
+from asistencia.models import (
+    MENSAJE_ARCHIVADA, Asistencia, AsistenciaArchivada, ResumenDiario, ResumenPersona,
+)
+from taller_formularios import busqueda
+
+from .utils import crear_asistencia
+
+
+class ArchivoTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.limite = date(2024, 6, 1)
+        self.antiguas = [
+            crear_asistencia('111111', fecha=date(2024, 4, 10)),
+            crear_asistencia('111111', fecha=date(2024, 5, 20), presente=False),
+            crear_asistencia('222222', fecha=date(2024, 5, 20)),
+        ]
+        self.reciente = crear_asistencia('111111', fecha=date(2024, 6, 3))
+        self.carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.carpeta, ignore_errors=True)
+
+    def test_fecha_limite_al_inicio_de_mes(self):
+        self.assertEqual(archivo.fecha_limite(hoy=date(2025, 3, 15), dias=40), date(2025, 2, 1))
+
+    def test_archivar_en_tabla_por_lotes(self):
+        movidas = archivo.archivar(antes_de=self.limite, lote=2)
+
+        self.assertEqual(movidas, 3)
+        self.assertEqual(list(Asistencia.objects.values_list('pk', flat=True)), [self.reciente.pk])
+        self.assertEqual(AsistenciaArchivada.objects.count(), 3)
+        self.assertEqual(archivo.archivar(antes_de=self.limite), 0)
+        self.assertFalse(busqueda.buscar(Asistencia.objects.all(), '222222').exists())
+
+    def test_resumenes_siguen_incluyendo_lo_archivado(self):
+        archivo.archivar(antes_de=self.limite)
+        # Recalcular desde cero debe dar los mismos totales
+        ResumenDiario.objects.reconstruir()
+        ResumenPersona.objects.reconstruir()
+
+        self.assertEqual(ResumenDiario.objects.get(fecha=date(2024, 5, 20)).total, 2)
+        persona = ResumenPersona.objects.get(documento_identidad='111111')
+        self.assertEqual(persona.total_dias, 3)
+        self.assertEqual(persona.dias_presente, 2)
+        self.assertEqual(persona.primera_asistencia, date(2024, 4, 10))
+        self.assertEqual(persona.ultima_asistencia, date(2024, 6, 3))
+
+        # Un cambio en vivo recalcula la persona sin perder su historial archivado
+        self.reciente.refresh_from_db()
+        self.reciente.presente = False
+        self.reciente.save()
+        self.assertEqual(ResumenPersona.objects.get(documento_identidad='111111').total_dias, 3)
+
+    def test_historial_une_vivas_y_archivadas(self):
+        archivo.archivar(antes_de=self.limite)
+
+        historial = Asistencia.objects.historial(documento_identidad='111111')
+        self.assertEqual(historial.count(), 3)
+        fechas = [f['fecha_asistencia'] for f in historial.order_by('-fecha_asistencia')]
+        self.assertEqual(fechas, [date(2024, 6, 3), date(2024, 5, 20), date(2024, 4, 10)])
+        self.assertEqual(
+            list(Asistencia.objects.historial('documento_identidad', fecha_asistencia__gte=date(2024, 5, 1))
+                 .order_by('documento_identidad')),
+            [{'documento_identidad': '111111'}] * 2 + [{'documento_identidad': '222222'}],
+        )
+
+    def test_archivar_en_csv_comprimido(self):
+        with override_settings(ASISTENCIA_ARCHIVO_CARPETA=self.carpeta):
+            call_command(
+                'archivar_asistencias', '--destino', 'csv', '--antes-de', '2024-06-01',
+                verbosity=0, stdout=io.StringIO(),
+            )
+            filas = list(archivo.leer_archivos(desde=date(2024, 5, 1)))
+
+        self.assertEqual(Asistencia.objects.count(), 1)
+        self.assertFalse(AsistenciaArchivada.objects.exists())
+        self.assertEqual(len(filas), 2)
+        fila = next(f for f in filas if f['documento_identidad'] == '111111')
+        original = self.antiguas[1]
+        self.assertEqual(fila['id'], str(original.pk))
+        self.assertEqual(fila['fecha_asistencia'], original.fecha_asistencia)
+        self.assertEqual(fila['hora_salida'], original.hora_salida)
+        self.assertIs(fila['presente'], False)
+        self.assertEqual(fila['duracion_minutos'], 240)
+        # Los resúmenes conservan los totales de lo archivado
+        self.assertEqual(ResumenDiario.objects.get(fecha=date(2024, 5, 20)).total, 2)
+
+    def test_recalcular_tras_archivar_en_archivos(self):
+        archivo.archivar(antes_de=self.limite, destino='csv', lote=2, carpeta=self.carpeta)
+        # Un cambio en vivo recalcula la persona con los totales de los archivos
+        self.reciente.refresh_from_db()
+        self.reciente.presente = False
+        self.reciente.save()
+        persona = ResumenPersona.objects.get(documento_identidad='111111')
+        self.assertEqual((persona.total_dias, persona.dias_presente), (3, 1))
+        self.assertEqual(persona.primera_asistencia, date(2024, 4, 10))
+
+        ResumenDiario.objects.reconstruir()
+        ResumenPersona.objects.reconstruir()
+        self.assertEqual(ResumenDiario.objects.get(fecha=date(2024, 5, 20)).total, 2)
+        self.assertEqual(ResumenPersona.objects.get(documento_identidad='222222').total_dias, 1)
+        self.assertEqual(ResumenPersona.objects.get(documento_identidad='111111').total_dias, 3)
+
+    def test_archivo_huerfano_no_repite_filas(self):
+        archivo.archivar(antes_de=self.limite, destino='csv', carpeta=self.carpeta)
+        # Copia de un lote cuya transacción falló y se volvió a archivar
+        for ruta in list(Path(self.carpeta).glob('*/*.csv.gz')):
+            shutil.copy(ruta, ruta.with_name(ruta.name.replace('-0001.', '-0002.')))
+
+        filas = list(archivo.leer_archivos(carpeta=self.carpeta))
+        self.assertEqual(sorted(f['id'] for f in filas), sorted(str(a.pk) for a in self.antiguas))
+
+    def test_no_se_repite_un_dia_archivado(self):
+        archivo.archivar(antes_de=self.limite)
+        fecha = date(2024, 5, 20)
+
+        with self.assertRaises(ValidationError) as error:
+            crear_asistencia('111111', fecha=fecha)
+        self.assertEqual(error.exception.messages, [MENSAJE_ARCHIVADA])
+
+        contenido = (
+            'Nombre Completo;Documento;Correo;Fecha;Hora Ingreso;Hora Salida;Presente\n'
+            'Ana Pérez;111111;ana@example.com;20/05/2024;08:00;12:00;Sí\n'
+        )
+        resultado = importar_archivo(io.BytesIO(contenido.encode()), 'lista.csv')
+        self.assertEqual(resultado.creados, 0)
+        self.assertEqual(resultado.errores[0][1], {'documento_identidad': [MENSAJE_ARCHIVADA]})
+
+        momento = timezone.make_aware(datetime.combine(fecha, time(8, 0)))
+        with self.assertRaises(ValidationError):
+            kiosco.registrar('111111', kiosco.ENTRADA, momento, 'Ana Pérez', 'ana@example.com')
+
+        self.assertFalse(Asistencia.objects.filter(fecha_asistencia=fecha).exists())
+        reporte = reportes.calcular(fecha, fecha, 'dia')
+        self.assertEqual(reporte['totales']['total'], 2)
+
+    def test_vistas_del_mes_no_cambian(self):
+        hoy = crear_asistencia('333333')
+        archivo.archivar(antes_de=self.limite)
+        self.assertEqual(Asistencia.objects.por_fecha(hoy.fecha_asistencia).get(), hoy)
+        self.assertEqual(ResumenDiario.objects.get(fecha=hoy.fecha_asistencia).total, 1)
@@ -0,0 +1,76 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from asistencia.models import Asistencia
+from taller_formularios import busqueda
+
+from .utils import crear_asistencia
+
+
+class BusquedaAsistenciasTest(TestCase):
+    def buscar(self, texto):
+        return set(busqueda.buscar(Asistencia.objects.all(), texto))
+
+    def test_indexa_asistencias_creadas_en_bloque(self):
+        Asistencia.objects.bulk_create([
+            Asistencia(
+                nombre_completo='José Martínez', documento_identidad='555001',
+                correo_electronico='jose@example.com', fecha_asistencia=date(2024, 3, 1),
+                hora_ingreso=time(8, 0), hora_salida=time(12, 0),
+            ),
+        ])
+        self.assertEqual(
+            [a.documento_identidad for a in self.buscar('jose martinez')],
+            ['555001'],
+        )
+
+    def test_actualizacion_masiva_reindexa_el_texto(self):
+        asistencia = crear_asistencia('555002')
+        Asistencia.objects.filter(pk=asistencia.pk).update(nombre_completo='Lucía Rojas')
+
+        self.assertEqual(self.buscar('lucia'), {asistencia})
+        self.assertEqual(self.buscar('perez'), set())
+
+    def test_eliminacion_masiva_quita_del_indice(self):
+        crear_asistencia('555003')
+        Asistencia.objects.all().delete()
+        self.assertEqual(self.buscar('ana'), set())
+
+    def test_admin_usa_el_indice(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        self.client.login(username='admin', password='clave')
+        crear_asistencia('555004', nombre_completo='Pedro Gómez')
+        crear_asistencia('555005')
+
+        response = self.client.get(
+            reverse('admin:asistencia_asistencia_changelist'), {'q': 'gomez'}
+        )
+        self.assertEqual(
+            [a.documento_identidad for a in response.context['cl'].result_list],
+            ['555004'],
+        )
+
+    def test_admin_ordena_por_relevancia(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        self.client.login(username='admin', password='clave')
+        # Coincide en nombre y correo, pero es la más antigua
+        crear_asistencia('555006', fecha=date(2024, 3, 1), nombre_completo='Pedro Gómez',
+                         correo_electronico='gomez@example.com')
+        crear_asistencia('555007', fecha=date(2024, 3, 2), nombre_completo='Luis Gómez')
+        url = reverse('admin:asistencia_asistencia_changelist')
+
+        response = self.client.get(url, {'q': 'gomez'})
+        self.assertEqual(
+            [a.documento_identidad for a in response.context['cl'].result_list],
+            ['555006', '555007'],
+        )
+
+        # Una columna elegida manda sobre la relevancia
+        response = self.client.get(url, {'q': 'gomez', 'o': '-2'})
+        self.assertEqual(
+            [a.documento_identidad for a in response.context['cl'].result_list],
+            ['555007', '555006'],
+        )
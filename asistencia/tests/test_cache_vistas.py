@@ -0,0 +1,129 @@
+import uuid
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import AsyncRequestFactory
+from django.urls import reverse
+
+from asistencia import estadisticas
+from asistencia.vistas_async import AsistenciaDetailAsyncView
+
+from .utils import crear_asistencia
+
+
+class DetalleCondicionalTest(TestCase):
+    def setUp(self):
+        self.asistencia = crear_asistencia('100001')
+        self.url = reverse('asistencia:detail', args=[self.asistencia.pk])
+
+    def test_responde_304_si_no_cambio(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        # Solo la consulta de la fecha de actualización, sin renderizar
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_cambio_invalida_la_version(self):
+        etag = self.client.get(self.url)['ETag']
+        self.asistencia.observaciones = 'Llegó con retraso'
+        self.asistencia.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Llegó con retraso')
+
+    def test_otro_usuario_o_token_renderiza(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.client.force_login(User.objects.create_user('usuario', password='clave'))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Rotación del token CSRF (p. ej. al iniciar sesión)
+        etag = response['ETag']
+        self.client.cookies.pop(settings.CSRF_COOKIE_NAME)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_mensajes_pendientes_renderizan_sin_validadores(self):
+        etag = self.client.get(self.url)['ETag']
+        # El registro redirige y deja el mensaje para la siguiente página
+        response = self.client.post(reverse('asistencia:create'), {
+            'nombre_completo': 'Luis Gómez',
+            'documento_identidad': '100002',
+            'correo_electronico': 'luis@example.com',
+            'fecha_asistencia': self.asistencia.fecha_asistencia.isoformat(),
+            'hora_ingreso': '08:00',
+            'hora_salida': '12:00',
+            'presente': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Asistencia registrada exitosamente.')
+        self.assertFalse(response.has_header('ETag'))
+
+        # Ya mostrado, la copia guardada vuelve a servir
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_inexistente(self):
+        url = reverse('asistencia:detail', args=[uuid.uuid4()])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    async def test_vista_asincrona(self):
+        factory = AsyncRequestFactory()
+        vista = AsistenciaDetailAsyncView.as_view()
+
+        def peticion(**headers):
+            request = factory.get(self.url, headers=headers)
+            # El secreto que CsrfViewMiddleware lee de la cookie
+            request.META['CSRF_COOKIE'] = 'a' * 32
+            return request
+
+        response = await vista(peticion(), pk=self.asistencia.pk)
+        response = await vista(peticion(**{'If-None-Match': response['ETag']}), pk=self.asistencia.pk)
+
+        self.assertEqual(response.status_code, 304)
+
+
+class FragmentosPanelTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('asistencia:list')
+
+    def test_fragmentos_evitan_calcular_estadisticas(self):
+        crear_asistencia('100001')
+        self.client.get(self.url)
+
+        with mock.patch.object(estadisticas, 'resumen_periodos') as resumen, \
+                mock.patch.object(estadisticas, 'resumen_solicitudes') as solicitudes:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        resumen.assert_not_called()
+        solicitudes.assert_not_called()
+
+    def test_escritura_invalida_el_panel(self):
+        crear_asistencia('100001')
+        self.assertEqual(self.client.get(self.url).context['total_registros'], 1)
+        self.client.get(self.url)
+
+        crear_asistencia('100002')
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.context['total_registros'], 2)
+        for contador in ('total_registros', 'presentes_hoy', 'presentes_semana', 'presentes_mes'):
+            self.assertContains(response, f'data-panel="{contador}">2</div>')
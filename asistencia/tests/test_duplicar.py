@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.models import Asistencia, ResumenDiario
+
+from .utils import crear_asistencia
+
+
+class DuplicarEnFechaTest(TestCase):
+    def setUp(self):
+        self.hoy = timezone.localdate()
+        self.ayer = self.hoy - timedelta(days=1)
+
+    def consultas_al_duplicar(self, cantidad, inicio):
+        for i in range(inicio, inicio + cantidad):
+            crear_asistencia(f'{100000 + i}', fecha=self.ayer)
+        seleccion = Asistencia.objects.filter(
+            fecha_asistencia=self.ayer,
+            documento_identidad__gte=f'{100000 + inicio}'
+        )
+        with CaptureQueriesContext(connection) as consultas:
+            nuevas, omitidos = seleccion.duplicar_en_fecha()
+        self.assertEqual(len(nuevas), cantidad)
+        return len(consultas)
+
+    def test_consultas_constantes(self):
+        self.assertEqual(
+            self.consultas_al_duplicar(3, inicio=0),
+            self.consultas_al_duplicar(30, inicio=100)
+        )
+
+    def test_omite_documentos_con_registro_hoy(self):
+        crear_asistencia('100001', fecha=self.ayer)
+        crear_asistencia('100002', fecha=self.ayer)
+        crear_asistencia('100002', fecha=self.ayer - timedelta(days=1))
+        crear_asistencia('100003', fecha=self.ayer, observaciones='Turno noche')
+        crear_asistencia('100001')
+
+        nuevas, omitidos = Asistencia.objects.exclude(fecha_asistencia=self.hoy).duplicar_en_fecha()
+
+        self.assertEqual(omitidos, ['100001', '100002'])
+        self.assertEqual(len(nuevas), 2)
+        self.assertEqual(Asistencia.objects.filter(fecha_asistencia=self.hoy).count(), 3)
+        copia = Asistencia.objects.get(documento_identidad='100003', fecha_asistencia=self.hoy)
+        self.assertEqual(copia.observaciones, 'Turno noche')
+        self.assertEqual(ResumenDiario.objects.get(fecha=self.hoy).total, 3)
+
+    def test_accion_admin(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura')
+        self.client.force_login(admin)
+        origen = crear_asistencia('100001', fecha=self.ayer)
+        crear_asistencia('100002', fecha=self.ayer)
+        crear_asistencia('100002')
+
+        response = self.client.post(
+            reverse('admin:asistencia_asistencia_changelist'),
+            {
+                'action': 'duplicar_registros',
+                '_selected_action': [
+                    str(pk) for pk in
+                    Asistencia.objects.filter(fecha_asistencia=self.ayer).values_list('pk', flat=True)
+                ],
+            },
+            follow=True
+        )
+
+        mensajes = [str(m) for m in response.context['messages']]
+        self.assertIn('1 registro(s) duplicado(s) para hoy.', mensajes)
+        self.assertTrue(any('omitido' in m and '100002' in m for m in mensajes))
+        self.assertTrue(
+            Asistencia.objects.filter(
+                documento_identidad=origen.documento_identidad,
+                fecha_asistencia=self.hoy
+            ).exists()
+        )
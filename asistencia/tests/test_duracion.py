@@ -0,0 +1,94 @@
+from datetime import time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.duracion import calcular_minutos
+from asistencia.models import Asistencia, ResumenDiario
+
+from .utils import crear_asistencia
+
+
+class DuracionMinutosTest(TestCase):
+    def setUp(self):
+        self.hoy = timezone.localdate()
+
+    def test_calcular_minutos(self):
+        self.assertEqual(calcular_minutos(time(8, 0), time(12, 30)), 270)
+        self.assertEqual(calcular_minutos(time(22, 0), time(2, 0)), 240)
+        self.assertIsNone(calcular_minutos(None, time(2, 0)))
+
+    def test_save_guarda_duracion(self):
+        asistencia = crear_asistencia('100001', hora_salida=time(10, 15))
+        self.assertEqual(asistencia.duracion_minutos, 135)
+
+        asistencia.hora_salida = time(17, 0)
+        asistencia.save()
+        asistencia.refresh_from_db()
+        self.assertEqual(asistencia.duracion_minutos, 540)
+
+    def test_update_masivo_recalcula_duracion(self):
+        crear_asistencia('100001', hora_ingreso=time(7, 0))
+        crear_asistencia('100002', hora_ingreso=time(9, 0))
+
+        Asistencia.objects.update(hora_salida=time(15, 0))
+
+        self.assertEqual(
+            dict(Asistencia.objects.values_list('documento_identidad', 'duracion_minutos')),
+            {'100001': 480, '100002': 360}
+        )
+        self.assertEqual(
+            ResumenDiario.objects.get(fecha=self.hoy).duracion_total,
+            timedelta(hours=14)
+        )
+
+    def test_bulk_create_calcula_duracion(self):
+        Asistencia.objects.bulk_create([
+            Asistencia(
+                nombre_completo='Ana Pérez',
+                documento_identidad='100001',
+                correo_electronico='ana@example.com',
+                fecha_asistencia=self.hoy,
+                hora_ingreso=time(8, 0),
+                hora_salida=time(9, 30),
+            )
+        ])
+
+        self.assertEqual(Asistencia.objects.get().duracion_minutos, 90)
+
+    def test_agregados_en_sql(self):
+        crear_asistencia('100001', hora_salida=time(12, 0))
+        crear_asistencia('100001', fecha=self.hoy - timedelta(days=1), hora_salida=time(10, 0))
+        crear_asistencia('100002', hora_salida=time(9, 0))
+
+        with self.assertNumQueries(1):
+            personas = list(Asistencia.objects.horas_por_persona())
+
+        self.assertEqual(personas[0]['documento_identidad'], '100001')
+        self.assertEqual(personas[0]['minutos_totales'], 360)
+        self.assertEqual(personas[0]['minutos_promedio'], 180)
+        self.assertEqual(Asistencia.objects.completas().count(), 1)
+
+        dias = list(Asistencia.objects.horas_por_dia())
+        self.assertEqual([d['minutos_totales'] for d in dias], [120, 300])
+
+    def test_admin_ordena_y_filtra_por_duracion(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura')
+        self.client.force_login(admin)
+        crear_asistencia('100001', hora_salida=time(12, 0))
+        crear_asistencia('100002', hora_salida=time(9, 0))
+
+        url = reverse('admin:asistencia_asistencia_changelist')
+        response = self.client.get(url, {'o': '7'})
+        self.assertEqual(
+            [a.documento_identidad for a in response.context['cl'].result_list],
+            ['100002', '100001']
+        )
+
+        response = self.client.get(url, {'duracion': 'completa'})
+        self.assertEqual(
+            [a.documento_identidad for a in response.context['cl'].result_list],
+            ['100001']
+        )
@@ -0,0 +1,79 @@
+import asyncio
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from asistencia import en_vivo
+from asistencia.models import ResumenDiario
+
+from .utils import crear_asistencia
+
+
+class PanelEnVivoTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.panel = en_vivo.PanelEnVivo()
+        reemplazo = mock.patch.object(en_vivo, 'panel', self.panel)
+        reemplazo.start()
+        self.addCleanup(reemplazo.stop)
+
+    def test_deltas_con_cada_cambio(self):
+        version, valores = self.panel.actuales()
+        # Sin cambios no se vuelve a calcular
+        with self.assertNumQueries(0):
+            self.assertEqual(self.panel.actuales(), (version, valores))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_asistencia('900001')
+        nueva, actuales = self.panel.actuales()
+
+        self.assertEqual(nueva, version + 1)
+        self.assertEqual(en_vivo.diferencias(valores, actuales), {
+            'total_registros': 1, 'presentes_hoy': 1, 'presentes_semana': 1, 'presentes_mes': 1,
+        })
+        self.assertEqual(self.panel.calculos, 2)
+
+    def test_recalculo_periodico_lee_la_base(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_asistencia('900001')
+        _, valores = self.panel.actuales()
+        # Escritura de otro proceso: la caché de este no se entera
+        ResumenDiario.objects.update(presentes=F('presentes') + 2)
+
+        self.assertEqual(self.panel.recalcular()[1], valores)
+        _, actuales = self.panel.recalcular(periodico=True)
+        self.assertEqual(en_vivo.diferencias(valores, actuales), {
+            'presentes_hoy': 2, 'presentes_semana': 2, 'presentes_mes': 2,
+        })
+
+    def test_muchas_pantallas_un_calculo_por_cambio(self):
+        valores = iter([{'presentes_hoy': 1}, {'presentes_hoy': 3}])
+        panel = en_vivo.PanelEnVivo(calcular=lambda: next(valores))
+        version, _ = panel.actuales()
+
+        async def pantallas():
+            esperas = [asyncio.create_task(panel.esperar(version, 5)) for _ in range(20)]
+            await asyncio.sleep(0.05)
+            await asyncio.get_running_loop().run_in_executor(None, panel.recalcular)
+            return await asyncio.gather(*esperas)
+
+        resultados = asyncio.run(pantallas())
+
+        self.assertEqual(set(v for v, _ in resultados), {version + 1})
+        self.assertEqual(panel.calculos, 2)
+
+    @override_settings(PANEL_EN_VIVO_DURACION=0)
+    async def test_eventos_bajo_asgi(self):
+        response = await self.async_client.get(reverse('asistencia:panel_eventos'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        eventos = [parte async for parte in response.streaming_content]
+        self.assertTrue(eventos[0].startswith(b'retry: '))
+        self.assertIn(b'event: valores', eventos[0])
+
+    def test_bajo_wsgi_responde_los_valores(self):
+        response = self.client.get(reverse('asistencia:panel_eventos'))
+        self.assertFalse(response.streaming)
+        self.assertIn(b'"presentes_hoy": 0', response.content)
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from asistencia import estadisticas
+from asistencia.models import Asistencia, ResumenDiario
+from solicitudes.models import Solicitud
+
+from .utils import crear_asistencia
+
+
+class EstadisticasCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        estadisticas.contadores.reiniciar()
+        self.hoy = timezone.localdate()
+        crear_asistencia('100001')
+        crear_asistencia('100002', presente=False)
+        crear_asistencia('100003', fecha=self.hoy - timedelta(days=40))
+        crear_asistencia('100004', fecha=self.hoy - timedelta(days=70), presente=False)
+
+    def test_coincide_con_el_resumen_sin_cache(self):
+        self.assertEqual(
+            estadisticas.resumen_periodos(),
+            ResumenDiario.objects.resumen_periodos()
+        )
+
+    def test_segunda_lectura_sin_consultas(self):
+        primera = estadisticas.resumen_periodos()
+        fallos = estadisticas.contadores.fallos
+
+        with self.assertNumQueries(0):
+            segunda = estadisticas.resumen_periodos()
+
+        self.assertEqual(primera, segunda)
+        self.assertEqual(estadisticas.contadores.fallos, fallos)
+        self.assertGreater(estadisticas.contadores.aciertos, 0)
+
+    def test_escritura_en_fecha_pasada_invalida_su_dia_y_mes(self):
+        estadisticas.resumen_periodos()
+        asistencia = Asistencia.objects.get(documento_identidad='100003')
+        asistencia.presente = False
+        asistencia.save()
+
+        resumen = estadisticas.resumen_periodos()
+
+        self.assertEqual(resumen['total_presentes'], 1)
+        self.assertEqual(resumen, ResumenDiario.objects.resumen_periodos())
+
+    def test_fecha_anterior_al_primer_dia(self):
+        estadisticas.resumen_periodos()
+        crear_asistencia('100005', fecha=self.hoy - timedelta(days=120))
+
+        self.assertEqual(estadisticas.resumen_periodos()['total'], 5)
+
+    def test_actualizacion_masiva_invalida(self):
+        estadisticas.resumen_periodos()
+        Asistencia.objects.filter(fecha_asistencia=self.hoy).update(presente=True)
+
+        resumen = estadisticas.resumen_periodos()
+
+        self.assertEqual(resumen['presentes_hoy'], 2)
+        self.assertEqual(resumen, ResumenDiario.objects.resumen_periodos())
+
+    def test_dias_del_mes(self):
+        dias = estadisticas.dias_del_mes(self.hoy)
+
+        self.assertEqual(dias[-1]['fecha'], self.hoy)
+        self.assertEqual(dias[-1]['total'], 2)
+        self.assertEqual(dias[-1]['presentes'], 1)
+        self.assertEqual(dias[-1]['horas_totales'], 8.0)
+
+
+class ResumenSolicitudesCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def crear_solicitud(self, asunto):
+        return Solicitud.objects.create(
+            nombre_solicitante='Ana Pérez',
+            documento_identidad='100001',
+            correo_electronico='ana@example.com',
+            tipo_solicitud='peticion',
+            asunto=asunto,
+            descripcion_detallada='Detalle',
+        )
+
+    def test_guardar_solicitud_invalida_el_resumen(self):
+        self.crear_solicitud('Primera')
+        self.assertEqual(estadisticas.resumen_solicitudes()['total'], 1)
+
+        with self.assertNumQueries(0):
+            estadisticas.resumen_solicitudes()
+
+        self.crear_solicitud('Segunda')
+        resumen = estadisticas.resumen_solicitudes()
+
+        self.assertEqual(resumen['total'], 2)
+        self.assertIn('Segunda', [s.asunto for s in resumen['ultimas']])
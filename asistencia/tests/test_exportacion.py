@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.exportacion import bloques_csv
+from asistencia.models import Asistencia
+
+from .utils import crear_asistencia
+
+
+def leer_csv(contenido):
+    return list(csv.reader(io.StringIO(contenido)))
+
+
+class ExportacionCsvTest(TestCase):
+    def setUp(self):
+        self.hoy = timezone.localdate()
+        crear_asistencia('100001')
+        crear_asistencia('100002', presente=False)
+        crear_asistencia('100003', fecha=self.hoy - timedelta(days=10))
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura')
+        self.client.force_login(admin)
+
+    def test_bloques_csv_por_lotes(self):
+        bloques = list(bloques_csv(Asistencia.objects.all(), chunk_size=2))
+
+        self.assertEqual(len(bloques), 2)
+        filas = leer_csv(''.join(bloques))
+        self.assertEqual(filas[0][0], 'ID')
+        self.assertEqual(len(filas), 4)
+        self.assertEqual(filas[1][8], '4h 0m')
+
+    def test_accion_exporta_en_streaming(self):
+        response = self.client.post(
+            reverse('admin:asistencia_asistencia_changelist'),
+            {
+                'action': 'exportar_seleccionados_csv',
+                '_selected_action': [str(pk) for pk in Asistencia.objects.values_list('pk', flat=True)],
+            }
+        )
+
+        self.assertTrue(response.streaming)
+        filas = leer_csv(b''.join(response.streaming_content).decode())
+        self.assertEqual(len(filas), 4)
+        # La descarga no deja mensajes pendientes para la siguiente página
+        response = self.client.get(reverse('admin:asistencia_asistencia_changelist'))
+        self.assertEqual(list(response.context['messages']), [])
+
+    def test_exportar_rango_de_fechas(self):
+        response = self.client.get(
+            reverse('admin:asistencia_exportar_csv'),
+            {'desde': self.hoy.isoformat(), 'hasta': self.hoy.isoformat()}
+        )
+
+        self.assertTrue(response.streaming)
+        filas = leer_csv(b''.join(response.streaming_content).decode())
+        self.assertEqual(len(filas), 3)
+
+    def test_rango_invalido_muestra_formulario(self):
+        response = self.client.get(
+            reverse('admin:asistencia_exportar_csv'),
+            {'desde': self.hoy.isoformat(), 'hasta': (self.hoy - timedelta(days=1)).isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertTrue(response.context['form'].errors)
+
+    def test_rango_requiere_permiso_de_ver(self):
+        personal = User.objects.create_user('personal', 'personal@example.com', 'clave', is_staff=True)
+        self.client.force_login(personal)
+
+        response = self.client.get(
+            reverse('admin:asistencia_exportar_csv'),
+            {'desde': self.hoy.isoformat(), 'hasta': self.hoy.isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,129 @@
+import io
+import os
+import tempfile
+from datetime import time, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.importacion import importar_archivo
+from asistencia.models import Asistencia, ResumenDiario
+
+from .utils import crear_asistencia
+
+ENCABEZADOS = 'Nombre Completo;Documento;Correo;Fecha;Hora Ingreso;Hora Salida;Presente\n'
+
+
+class ImportacionAsistenciasTest(TestCase):
+    def setUp(self):
+        self.hoy = timezone.localdate()
+
+    def csv(self, *filas):
+        contenido = ENCABEZADOS + ''.join(f'{fila}\n' for fila in filas)
+        return io.BytesIO(contenido.encode('utf-8'))
+
+    def fila(self, documento, fecha=None, nombre='maría gómez', ingreso='08:00', salida='12:00', presente='Sí'):
+        fecha = fecha or self.hoy
+        return f'{nombre};{documento};Maria@Example.com;{fecha:%d/%m/%Y};{ingreso};{salida};{presente}'
+
+    def test_importa_filas_validas_con_bulk_create(self):
+        filas = [self.fila(f'{100001 + i}') for i in range(49)]
+        archivo = self.csv(*filas, self.fila('100100', presente='No'))
+
+        # unicidad del lote (tabla viva y archivada), inserción, resúmenes
+        # diario y por persona e índice de búsqueda (con sus savepoints), más
+        # la parte archivada de cada resumen (tabla y totales de archivos): no
+        # depende del número de filas
+        with self.assertNumQueries(18):
+            resultado = importar_archivo(archivo, 'lista.csv')
+
+        self.assertEqual(resultado.creados, 50)
+        self.assertEqual(resultado.errores, [])
+        asistencia = Asistencia.objects.get(documento_identidad='100001')
+        self.assertEqual(asistencia.nombre_completo, 'María Gómez')
+        self.assertEqual(asistencia.correo_electronico, 'maria@example.com')
+        self.assertEqual(asistencia.hora_salida, time(12, 0))
+        self.assertEqual(ResumenDiario.objects.get(fecha=self.hoy).ausentes, 1)
+
+    def test_reporta_errores_por_fila(self):
+        crear_asistencia('100003')
+        archivo = self.csv(
+            self.fila('100001'),
+            self.fila('12a', nombre='Ana'),
+            self.fila('100001'),
+            self.fila('100003'),
+            self.fila('100004', fecha=self.hoy + timedelta(days=1)),
+            self.fila('100005', ingreso='08:00', salida='08:10'),
+        )
+
+        resultado = importar_archivo(archivo, 'lista.csv')
+
+        self.assertEqual(resultado.creados, 1)
+        errores = dict(resultado.errores)
+        self.assertEqual(sorted(errores), [3, 4, 5, 6, 7])
+        self.assertEqual(sorted(errores[3]), ['documento_identidad', 'nombre_completo'])
+        self.assertIn('documento_identidad', errores[4])
+        self.assertIn('documento_identidad', errores[5])
+        self.assertIn('fecha_asistencia', errores[6])
+        self.assertIn('hora_salida', errores[7])
+
+    def test_registro_simultaneo_se_reporta(self):
+        archivo = self.csv(self.fila('100001'), self.fila('100002'))
+        # Otro proceso registra 100002 entre la comprobación y la inserción
+        with mock.patch('asistencia.importacion._claves_existentes', return_value=(set(), set())):
+            crear_asistencia('100002')
+            resultado = importar_archivo(archivo, 'lista.csv')
+
+        self.assertEqual(resultado.creados, 1)
+        self.assertEqual([numero for numero, _ in resultado.errores], [3])
+        self.assertTrue(Asistencia.objects.filter(documento_identidad='100001').exists())
+        self.assertEqual(ResumenDiario.objects.get(fecha=self.hoy).total, 2)
+
+    def test_solo_validar_no_guarda(self):
+        resultado = importar_archivo(self.csv(self.fila('100001')), 'lista.csv', guardar=False)
+
+        self.assertEqual(resultado.validas, 1)
+        self.assertEqual(resultado.creados, 0)
+        self.assertFalse(Asistencia.objects.exists())
+
+    def test_importa_xlsx(self):
+        from openpyxl import Workbook
+
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(['nombre_completo', 'documento_identidad', 'correo_electronico',
+                     'fecha_asistencia', 'hora_ingreso', 'hora_salida'])
+        hoja.append(['Luis Torres', '100001', 'luis@example.com', self.hoy, time(7, 30), time(15, 0)])
+        archivo = io.BytesIO()
+        libro.save(archivo)
+        archivo.seek(0)
+
+        resultado = importar_archivo(archivo, 'lista.xlsx')
+
+        self.assertEqual(resultado.creados, 1)
+
+    def test_comando_importar(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.csv', delete=False) as archivo:
+            archivo.write(self.csv(self.fila('100001'), self.fila('1')).getvalue())
+        self.addCleanup(os.remove, archivo.name)
+
+        salida, errores = io.StringIO(), io.StringIO()
+        call_command('importar_asistencias', archivo.name, stdout=salida, stderr=errores)
+
+        self.assertEqual(Asistencia.objects.count(), 1)
+        self.assertIn('Fila 3', errores.getvalue())
+
+    def test_vista_admin_importar(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura')
+        self.client.force_login(admin)
+        archivo = SimpleUploadedFile('lista.csv', self.csv(self.fila('100001')).getvalue())
+
+        response = self.client.post(reverse('admin:asistencia_importar'), {'archivo': archivo})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['resultado'].creados, 1)
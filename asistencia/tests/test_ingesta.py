@@ -0,0 +1,144 @@
+import io
+import json
+import tempfile
+from datetime import time, timedelta
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia import ingesta, kiosco
+from asistencia.models import Asistencia, ResumenDiario, ResumenPersona
+
+from .test_kiosco import a_las
+from .utils import crear_asistencia
+
+
+class IngestaTest(TestCase):
+    def setUp(self):
+        kiosco.personas.limpiar()
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.ruta = Path(carpeta.name) / 'ingesta.sqlite3'
+        ajustes = override_settings(INGESTA_BITACORA=self.ruta, INGESTA_ASINCRONA=False)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.addCleanup(lambda: ingesta.bitacora().cerrar())
+        self.fecha = a_las(0, 0).date()
+        crear_asistencia('900001', fecha=self.fecha - timedelta(days=5), nombre_completo='Marta Gil')
+
+    def test_lee_lo_propio_antes_del_volcado(self):
+        _, fila, repetida = ingesta.encolar('900001', kiosco.ENTRADA, a_las(7, 55))
+        self.assertFalse(repetida)
+        self.assertEqual(fila['hora_ingreso'], time(7, 55))
+        self.assertFalse(Asistencia.objects.filter(fecha_asistencia=self.fecha).exists())
+
+        # La salida ve la entrada pendiente
+        _, fila, _ = ingesta.encolar('900001', kiosco.SALIDA, a_las(16, 25))
+        self.assertEqual(fila['hora_salida'], time(16, 25))
+        with self.assertRaises(kiosco.SinEntrada):
+            ingesta.encolar('900002', kiosco.SALIDA, a_las(17, 0))
+
+        self.assertEqual(ingesta.volcar(), 2)
+        asistencia = Asistencia.objects.get(fecha_asistencia=self.fecha)
+        self.assertEqual(asistencia.pk, fila['id'])
+        self.assertEqual(asistencia.duracion_minutos, 510)
+        self.assertEqual(ingesta.bitacora().contar(), 0)
+
+    def test_un_lote_combina_los_eventos_de_la_fila(self):
+        crear_asistencia('900003', fecha=self.fecha, presente=False)
+        ingesta.encolar('900001', kiosco.ENTRADA, a_las(7, 55))
+        ingesta.encolar('900001', kiosco.ENTRADA, a_las(8, 10))
+        ingesta.encolar('900003', kiosco.ENTRADA, a_las(8, 15))
+        ingesta.encolar('900001', kiosco.SALIDA, a_las(12, 0))
+        ingesta.encolar('900001', kiosco.SALIDA, a_las(16, 0))
+
+        ingesta.volcar()
+
+        filas = Asistencia.objects.filter(fecha_asistencia=self.fecha).order_by('documento_identidad')
+        self.assertEqual(
+            [(a.documento_identidad, a.hora_ingreso, a.hora_salida, a.presente) for a in filas],
+            [('900001', time(7, 55), time(16, 0), True), ('900003', time(8, 0), time(12, 0), True)],
+        )
+        resumen = ResumenDiario.objects.get(fecha=self.fecha)
+        self.assertEqual((resumen.total, resumen.presentes), (2, 2))
+        self.assertEqual(ResumenPersona.objects.get(documento_identidad='900001').total_dias, 2)
+
+    def test_recuperacion_tras_una_caida(self):
+        ingesta.encolar('900001', kiosco.ENTRADA, a_las(7, 55))
+        ingesta.encolar(
+            '900002', kiosco.ENTRADA, a_las(8, 5), nombre='pedro soto', correo='pedro@example.com'
+        )
+        ingesta.encolar('900001', kiosco.SALIDA, a_las(16, 0))
+
+        # El proceso muere después de confirmar la transacción y antes de
+        # borrar los eventos: el siguiente volcado los aplica de nuevo
+        ingesta.aplicar(ingesta.bitacora().leer(10))
+        ingesta.bitacora().cerrar()
+        ingesta._bitacoras.clear()
+
+        self.assertEqual(ingesta.bitacora().contar(), 3)
+        call_command('volcar_ingesta', stdout=io.StringIO())
+
+        self.assertEqual(ingesta.bitacora().contar(), 0)
+        filas = Asistencia.objects.filter(fecha_asistencia=self.fecha)
+        self.assertEqual(filas.count(), 2)
+        self.assertEqual(filas.get(documento_identidad='900002').nombre_completo, 'Pedro Soto')
+        self.assertEqual(ResumenDiario.objects.get(fecha=self.fecha).total, 2)
+
+    @override_settings(INGESTA_REINTENTOS=2)
+    def test_evento_que_siempre_falla_se_aparta(self):
+        ajena = crear_asistencia('900009', fecha=self.fecha - timedelta(days=1))
+        ingesta.encolar('900001', kiosco.ENTRADA, a_las(7, 55))
+        # Entrada nueva cuyo id ya usa otra fila: el INSERT falla siempre
+        malo = ingesta.bitacora().agregar({
+            'documento': '900002', 'fecha': self.fecha, 'tipo': kiosco.ENTRADA,
+            'hora': time(8, 0), 'nombre': 'Pedro Soto', 'correo': '', 'fila': ajena.pk,
+        })
+        ingesta.bitacora().agregar({
+            'documento': '900002', 'fecha': self.fecha, 'tipo': kiosco.SALIDA,
+            'hora': time(16, 0), 'nombre': '', 'correo': '', 'fila': None,
+        })
+        ingesta.encolar('900001', kiosco.SALIDA, a_las(16, 0))
+
+        with self.assertLogs('asistencia.ingesta', 'ERROR'):
+            self.assertEqual(ingesta.volcar(), 2)
+        # El resto del lote se aplicó; la salida de la misma fila espera
+        self.assertEqual(
+            Asistencia.objects.get(documento_identidad='900001', fecha_asistencia=self.fecha).hora_salida,
+            time(16, 0),
+        )
+        self.assertEqual(ingesta.bitacora().contar(), 2)
+        self.assertEqual(ingesta.bitacora().contar_fallidos(), 0)
+
+        with self.assertLogs('asistencia.ingesta', 'ERROR'):
+            # Segundo intento: se aparta y la salida queda sin fila (descartada)
+            self.assertEqual(ingesta.volcar(), 1)
+        self.assertEqual(ingesta.bitacora().contar(), 0)
+        fallidos = ingesta.bitacora().fallidos()
+        self.assertEqual([(f['id'], f['intentos']) for f in fallidos], [(malo, 2)])
+        self.assertIn('IntegrityError', fallidos[0]['error'])
+        self.assertFalse(Asistencia.objects.filter(documento_identidad='900002').exists())
+
+    def test_un_volcado_a_la_vez(self):
+        ingesta.encolar('900001', kiosco.ENTRADA, a_las(7, 55))
+        # Otra instancia sobre el mismo archivo hace las veces de otro proceso
+        with ingesta.Bitacora(self.ruta).turno() as obtenido:
+            self.assertTrue(obtenido)
+            self.assertEqual(ingesta.volcar(), 0)
+        self.assertEqual(ingesta.volcar(), 1)
+
+    @override_settings(API_TOKENS=['secreto'], INGESTA_DIFERIDA=True)
+    def test_api_responde_202(self):
+        response = self.client.post(
+            reverse('api_asistencias:kiosco'),
+            json.dumps({'documento': '900001', 'tipo': 'entrada'}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer secreto',
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()['pendiente'])
+        self.assertEqual(response.json()['fecha_asistencia'], timezone.localdate().isoformat())
+        self.assertEqual(ingesta.bitacora().contar(), 1)
@@ -0,0 +1,71 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from taller_formularios.instrumentacion import InstrumentacionMiddleware, estadisticas
+
+from .utils import crear_asistencia
+
+
+@override_settings(INSTRUMENTACION=True)
+class InstrumentacionTest(TestCase):
+    def setUp(self):
+        estadisticas.reiniciar()
+        crear_asistencia('100001')
+
+    def test_cabecera_server_timing_y_log(self):
+        with self.assertLogs('taller_formularios.instrumentacion', 'INFO') as logs:
+            response = self.client.get(reverse('asistencia:list'))
+
+        cabecera = response['Server-Timing']
+        self.assertIn('vista;desc="asistencia:list"', cabecera)
+        self.assertIn('sql;dur=', cabecera)
+        self.assertIn('plantillas;dur=', cabecera)
+
+        registro = json.loads(logs.records[0].getMessage())
+        self.assertEqual(registro['vista'], 'asistencia:list')
+        self.assertEqual(registro['estado'], 200)
+        self.assertGreater(registro['consultas'], 0)
+        self.assertGreater(registro['plantillas_ms'], 0)
+        self.assertLessEqual(len(registro['lentas']), 3)
+
+    def test_acumula_por_nombre_de_url_en_el_admin(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        self.client.login(username='admin', password='clave')
+        with self.assertLogs('taller_formularios.instrumentacion', 'INFO'):
+            self.client.get(reverse('asistencia:list'))
+            self.client.get(reverse('asistencia:list'))
+            response = self.client.get(reverse('instrumentacion'))
+
+        vistas = {v['vista']: v for v in response.context['vistas']}
+        self.assertEqual(vistas['asistencia:list']['peticiones'], 2)
+        self.assertContains(response, 'asistencia:list')
+
+        with self.assertLogs('taller_formularios.instrumentacion', 'INFO'):
+            self.client.post(reverse('instrumentacion'), {'reiniciar': '1'})
+        # Solo queda la propia petición de reinicio
+        self.assertEqual([v['vista'] for v in estadisticas.resumen()], ['instrumentacion'])
+
+    def test_solo_superusuarios_reinician(self):
+        self.client.force_login(User.objects.create_user('personal', password='clave', is_staff=True))
+        with self.assertLogs('taller_formularios.instrumentacion', 'INFO'):
+            self.client.get(reverse('asistencia:list'))
+            response = self.client.get(reverse('instrumentacion'))
+            self.assertNotContains(response, 'name="reiniciar"')
+            response = self.client.post(reverse('instrumentacion'), {'reiniciar': '1'})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('asistencia:list', [v['vista'] for v in estadisticas.resumen()])
+
+
+class InstrumentacionDesactivadaTest(TestCase):
+    def test_middleware_se_retira_de_la_cadena(self):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        with self.assertRaises(MiddlewareNotUsed):
+            InstrumentacionMiddleware(lambda request: None)
+
+        response = self.client.get(reverse('asistencia:list'))
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,121 @@
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia import kiosco
+from asistencia.models import Asistencia, ResumenDiario
+
+from .utils import crear_asistencia
+
+
+def a_las(hora, minuto, dias_atras=1):
+    fecha = timezone.localdate() - timedelta(days=dias_atras)
+    return timezone.make_aware(datetime.combine(fecha, time(hora, minuto)))
+
+
+class KioscoTest(TestCase):
+    def setUp(self):
+        kiosco.personas.limpiar()
+        crear_asistencia('900001', fecha=timezone.localdate() - timedelta(days=5), nombre_completo='Marta Gil')
+
+    def test_entrada_y_salida_sobre_la_fila_del_dia(self):
+        fila, repetida = kiosco.registrar('900001', kiosco.ENTRADA, a_las(7, 55))
+        self.assertFalse(repetida)
+        self.assertEqual(fila['nombre_completo'], 'Marta Gil')
+        self.assertIsNone(fila['hora_salida'])
+
+        # Un segundo escaneo de entrada no mueve la hora de ingreso
+        fila, repetida = kiosco.registrar('900001', kiosco.ENTRADA, a_las(8, 2))
+        self.assertTrue(repetida)
+        self.assertEqual(fila['hora_ingreso'], time(7, 55))
+
+        fila, repetida = kiosco.registrar('900001', kiosco.SALIDA, a_las(16, 25))
+        self.assertFalse(repetida)
+        asistencia = Asistencia.objects.get(pk=fila['id'])
+        self.assertEqual(asistencia.hora_salida, time(16, 25))
+        self.assertEqual(asistencia.duracion_minutos, 510)
+        self.assertEqual(Asistencia.objects.filter(documento_identidad='900001').count(), 2)
+
+        resumen = ResumenDiario.objects.get(fecha=a_las(0, 0).date())
+        self.assertEqual((resumen.total, resumen.presentes), (1, 1))
+        self.assertEqual(resumen.duracion_total, timedelta(minutes=510))
+
+    def test_marca_presente_una_fila_de_ausencia(self):
+        crear_asistencia('900001', fecha=a_las(0, 0).date(), presente=False)
+
+        fila, repetida = kiosco.registrar('900001', kiosco.ENTRADA, a_las(9, 0))
+
+        self.assertTrue(fila['presente'])
+        self.assertEqual(fila['hora_ingreso'], time(8, 0))
+        self.assertTrue(repetida)
+
+    def test_persona_nueva_y_errores(self):
+        with self.assertRaises(kiosco.PersonaDesconocida):
+            kiosco.registrar('900002', kiosco.ENTRADA, a_las(8, 0))
+        with self.assertRaises(kiosco.SinEntrada):
+            kiosco.registrar('900002', kiosco.SALIDA, a_las(17, 0))
+        with self.assertRaises(ValidationError):
+            kiosco.registrar('12', kiosco.ENTRADA, a_las(8, 0))
+
+        fila, _ = kiosco.registrar(
+            '900002', kiosco.ENTRADA, a_las(8, 0), nombre='pedro soto', correo='PEDRO@example.com'
+        )
+        self.assertEqual(fila['nombre_completo'], 'Pedro Soto')
+
+    def test_salida_con_la_regla_de_duracion(self):
+        kiosco.registrar('900001', kiosco.ENTRADA, a_las(8, 0))
+        for hora in (a_las(8, 10), a_las(20, 30)):
+            with self.assertRaises(ValidationError):
+                kiosco.registrar('900001', kiosco.SALIDA, hora)
+        self.assertIsNone(Asistencia.objects.get(fecha_asistencia=a_las(0, 0).date()).hora_salida)
+
+    def test_cache_de_personas(self):
+        self.assertEqual(kiosco.personas.obtener('900001'), ('Marta Gil', 'ana@example.com'))
+        with self.assertNumQueries(0):
+            kiosco.personas.obtener('900001')
+
+        # Guardar una asistencia de la persona la saca de la caché
+        crear_asistencia('900001', nombre_completo='Marta Gil Ruiz')
+        self.assertEqual(kiosco.personas.obtener('900001')[0], 'Marta Gil Ruiz')
+
+        personas = kiosco.Personas(maximo=1)
+        personas.recordar('1', 'Uno', 'uno@example.com')
+        personas.recordar('2', 'Dos', 'dos@example.com')
+        self.assertEqual(list(personas._entradas), ['2'])
+
+
+@override_settings(API_TOKENS=['secreto'])
+class ApiKioscoTest(TestCase):
+    def setUp(self):
+        kiosco.personas.limpiar()
+        self.url = reverse('api_asistencias:kiosco')
+        crear_asistencia('900001', fecha=timezone.localdate() - timedelta(days=5))
+
+    def enviar(self, datos, token='secreto'):
+        return self.client.post(
+            self.url, json.dumps(datos), content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+
+    def test_registro(self):
+        response = self.enviar({'documento': '900001', 'tipo': 'entrada'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tipo'], 'entrada')
+        self.assertFalse(response.json()['repetida'])
+
+        self.assertTrue(self.enviar({'documento': '900001'}).json()['repetida'])
+        # Menos de 30 minutos después del ingreso
+        response = self.enviar({'documento': '900001', 'tipo': 'salida'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Datos inválidos')
+
+    def test_errores(self):
+        self.assertEqual(self.enviar({'documento': '900001'}, token='otro').status_code, 401)
+        self.assertEqual(self.enviar({'documento': '900001', 'tipo': 'pausa'}).status_code, 400)
+        self.assertEqual(self.enviar({'documento': 'abc'}).status_code, 400)
+        self.assertEqual(self.enviar({'documento': '900009'}).status_code, 404)
+        self.assertEqual(self.enviar({'documento': '900009', 'tipo': 'salida'}).status_code, 409)
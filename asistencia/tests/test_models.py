@@ -1,5 +1,5 @@
 from django.test import TestCase
-from ..asistencia.models import Asistencia
+from asistencia.models import Asistencia
 
 
 class AsistenciaModelTest(TestCase):
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from asistencia.models import Asistencia
+from taller_formularios.paginacion import PaginadorCursor
+
+from .utils import crear_asistencia
+
+
+class PaginadorCursorTest(TestCase):
+    def setUp(self):
+        for i in range(12):
+            crear_asistencia(f'{100000 + i}')
+        self.esperado = list(
+            Asistencia.objects.order_by('-fecha_creacion', '-pk').values_list('pk', flat=True)
+        )
+
+    def pks(self, pagina):
+        return [a.pk for a in pagina]
+
+    def test_recorre_todas_las_paginas_y_regresa(self):
+        paginador = PaginadorCursor(Asistencia.objects.all(), 5, contar_total=False)
+
+        primera = paginador.pagina()
+        segunda = paginador.pagina(primera.cursor_siguiente)
+        tercera = paginador.pagina(segunda.cursor_siguiente)
+
+        self.assertEqual(self.pks(primera) + self.pks(segunda) + self.pks(tercera), self.esperado)
+        self.assertFalse(primera.has_previous())
+        self.assertFalse(tercera.has_next())
+        self.assertIsNone(tercera.total)
+
+        anterior = paginador.pagina(tercera.cursor_anterior)
+        self.assertEqual(self.pks(anterior), self.pks(segunda))
+        self.assertEqual(self.pks(paginador.pagina(anterior.cursor_anterior)), self.pks(primera))
+
+    def test_desempata_por_pk(self):
+        Asistencia.objects.update(fecha_creacion=Asistencia.objects.first().fecha_creacion)
+        paginador = PaginadorCursor(Asistencia.objects.all(), 5)
+
+        primera = paginador.pagina()
+        segunda = paginador.pagina(primera.cursor_siguiente)
+
+        self.assertEqual(primera.total, 12)
+        self.assertFalse(set(self.pks(primera)) & set(self.pks(segunda)))
+
+    @override_settings(PAGINACION_CURSOR=True, PAGINACION_CONTAR_TOTAL=False)
+    def test_vista_con_cursor(self):
+        url = reverse('asistencia:list')
+        cache.clear()
+        self.client.get(url)
+
+        # Solo la página: sin COUNT y con las estadísticas en caché
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertTrue(response.context['paginacion_cursor'])
+        self.assertEqual(len(response.context['object_list']), 12)
+
+        response = self.client.get(url, {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 404)
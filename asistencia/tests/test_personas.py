@@ -0,0 +1,118 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.models import Asistencia, ResumenPersona
+
+from .utils import crear_asistencia
+
+
+class ResumenPersonaTest(TestCase):
+    def setUp(self):
+        self.hoy = timezone.localdate()
+
+    def persona(self, documento):
+        return ResumenPersona.objects.filter(documento_identidad=documento).first()
+
+    def test_crear_actualiza_resumen_de_la_persona(self):
+        crear_asistencia('100001', fecha=self.hoy - timedelta(days=3))
+        crear_asistencia('100001', fecha=self.hoy - timedelta(days=1), presente=False)
+        crear_asistencia('100001', fecha=self.hoy, nombre_completo='Ana María Pérez',
+                         hora_salida=time(10, 0))
+
+        persona = self.persona('100001')
+        self.assertEqual(persona.nombre_completo, 'Ana María Pérez')
+        self.assertEqual(persona.primera_asistencia, self.hoy - timedelta(days=3))
+        self.assertEqual(persona.ultima_asistencia, self.hoy)
+        self.assertEqual(persona.total_dias, 3)
+        self.assertEqual(persona.dias_presente, 2)
+        self.assertEqual(persona.horas_totales, 10)
+
+    def test_cambio_de_documento_recalcula_ambas_personas(self):
+        asistencia = crear_asistencia('100001')
+        asistencia.documento_identidad = '100002'
+        asistencia.save()
+
+        self.assertIsNone(self.persona('100001'))
+        self.assertEqual(self.persona('100002').total_dias, 1)
+
+    def test_operaciones_masivas_mantienen_el_resumen(self):
+        for dias in range(3):
+            crear_asistencia('100001', fecha=self.hoy - timedelta(days=dias))
+
+        Asistencia.objects.filter(documento_identidad='100001').update(presente=False)
+        self.assertEqual(self.persona('100001').dias_presente, 0)
+
+        Asistencia.objects.filter(fecha_asistencia=self.hoy).delete()
+        self.assertEqual(self.persona('100001').total_dias, 2)
+
+        Asistencia.objects.all().delete()
+        self.assertIsNone(self.persona('100001'))
+
+    def test_ranking_usa_order_by_limit(self):
+        for i, dias in enumerate([1, 3, 2]):
+            for d in range(dias):
+                crear_asistencia(f'20000{i}', fecha=self.hoy - timedelta(days=d))
+
+        with self.assertNumQueries(1) as contexto:
+            ranking = [p.documento_identidad for p in ResumenPersona.objects.ranking(2)]
+        self.assertEqual(ranking, ['200001', '200002'])
+        sql = contexto.captured_queries[0]['sql']
+        self.assertIn('LIMIT 2', sql)
+        self.assertNotIn('GROUP BY', sql)
+
+    def test_reconstruir(self):
+        crear_asistencia('100001')
+        ResumenPersona.objects.all().delete()
+
+        call_command('reconstruir_resumen_diario', stdout=StringIO())
+        self.assertEqual(self.persona('100001').total_dias, 1)
+
+
+class PersonaDetailViewTest(TestCase):
+    def setUp(self):
+        self.hoy = timezone.localdate()
+        for dias in range(30):
+            crear_asistencia('100001', fecha=self.hoy - timedelta(days=dias))
+        crear_asistencia('100002')
+        self.url = reverse('asistencia:persona', args=['100001'])
+
+    def test_muestra_resumen_e_historial_paginado(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.context['persona'].total_dias, 30)
+        asistencias = list(response.context['asistencias'])
+        self.assertEqual(len(asistencias), 25)
+        self.assertEqual(asistencias[0].fecha_asistencia, self.hoy)
+        propias = set(Asistencia.objects.filter(documento_identidad='100001').values_list('pk', flat=True))
+        self.assertTrue(all(a.pk in propias for a in asistencias))
+
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(len(response.context['asistencias']), 5)
+
+    @override_settings(PAGINACION_CURSOR=True)
+    def test_historial_por_cursor(self):
+        pagina = self.client.get(self.url).context['page_obj']
+        response = self.client.get(self.url, {'cursor': pagina.cursor_siguiente})
+
+        fechas = [a.fecha_asistencia for a in response.context['asistencias']]
+        self.assertEqual(fechas[0], self.hoy - timedelta(days=25))
+        self.assertEqual(len(fechas), 5)
+
+    def test_documento_desconocido_404(self):
+        response = self.client.get(reverse('asistencia:persona', args=['999999']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_estadisticas_admin_usan_el_ranking(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        self.client.login(username='admin', password='clave')
+
+        response = self.client.get(reverse('admin:asistencia_estadisticas'))
+        personas = list(response.context['personas_activas'])
+        self.assertEqual(personas[0].documento_identidad, '100001')
+        self.assertContains(response, self.url)
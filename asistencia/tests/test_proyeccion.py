@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.lecturas import AsistenciaEnLista
+from asistencia.models import Asistencia
+from solicitudes.test import crear_solicitud
+from taller_formularios.proyeccion import CampoNoProyectado
+
+from .utils import crear_asistencia
+
+
+class ProyeccionListasTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hoy = timezone.localdate()
+
+    def crear(self, cantidad, inicio=0):
+        for i in range(inicio, inicio + cantidad):
+            crear_asistencia(f'{100000 + i}', observaciones='x' * 400)
+            crear_asistencia('999999', fecha=self.hoy - timedelta(days=i))
+            crear_solicitud(i)
+
+    def consultas(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as capturadas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in capturadas.captured_queries]
+
+    def assertSinNMasUno(self, url):
+        # Un campo diferido leído en la plantilla agrega una consulta por fila
+        self.crear(2)
+        pocas = len(self.consultas(url))
+        self.crear(6, inicio=2)
+        self.assertEqual(len(self.consultas(url)), pocas)
+
+    def test_lista_sin_n_mas_uno(self):
+        self.assertSinNMasUno(reverse('asistencia:list'))
+
+    def test_historial_de_persona_sin_n_mas_uno(self):
+        self.assertSinNMasUno(reverse('asistencia:persona', args=['999999']))
+
+    def test_admin_sin_n_mas_uno(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        self.assertSinNMasUno(reverse('admin:asistencia_asistencia_changelist'))
+
+    def test_admin_solicitudes_sin_n_mas_uno(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        self.assertSinNMasUno(reverse('admin:solicitudes_solicitud_changelist'))
+
+    def test_solo_lee_las_columnas_de_la_plantilla(self):
+        self.crear(2)
+        sql = ' '.join(self.consultas(reverse('asistencia:list')))
+        self.assertIn('"asistencia_asistencia"."nombre_completo"', sql)
+        self.assertNotIn('"observaciones"', sql)
+        self.assertNotIn('"fecha_actualizacion"', sql)
+        # Últimas solicitudes: sin la descripción completa
+        self.assertNotIn('"descripcion_detallada"', sql)
+
+    def test_campo_no_proyectado_falla_en_la_plantilla(self):
+        asistencia = crear_asistencia('100001', observaciones='Llegó tarde')
+        fila = AsistenciaEnLista.leer(Asistencia.objects.all())[0]
+
+        self.assertEqual(fila, asistencia)
+        self.assertEqual(Template('{{ a.nombre_completo }}').render(Context({'a': fila})), 'Ana Pérez')
+        with self.assertRaises(CampoNoProyectado):
+            Template('{{ a.observaciones }}').render(Context({'a': fila}))
@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from asistencia import archivo, reportes
+
+from .utils import crear_asistencia
+
+
+class ReportesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        crear_asistencia('111111', fecha=date(2024, 1, 29), hora_ingreso=time(8, 30))
+        crear_asistencia('222222', fecha=date(2024, 1, 29), presente=False)
+        crear_asistencia('111111', fecha=date(2024, 2, 2), hora_salida=time(10, 0))
+        crear_asistencia('111111', fecha=date(2024, 3, 4), hora_ingreso=time(9, 0), hora_salida=time(11, 0))
+
+    def test_tramos_por_mes(self):
+        self.assertEqual(list(reportes.tramos(date(2024, 1, 15), date(2024, 3, 2))), [
+            (date(2024, 1, 15), date(2024, 1, 31)),
+            (date(2024, 2, 1), date(2024, 2, 29)),
+            (date(2024, 3, 1), date(2024, 3, 2)),
+        ])
+
+    def test_por_semana_combina_tramos_y_archivo(self):
+        # La semana del 29/01 cruza el cambio de mes y parte queda archivada
+        archivo.archivar(antes_de=date(2024, 2, 1))
+        reporte = reportes.calcular(date(2024, 1, 1), date(2024, 3, 31), 'semana', time(8, 0))
+
+        semana = reporte['filas'][0]
+        self.assertEqual(semana['clave'], date(2024, 1, 29))
+        self.assertEqual(semana['etiqueta'], '2024-S05')
+        self.assertEqual(semana['total'], 3)
+        self.assertEqual(semana['presentes'], 2)
+        self.assertEqual(semana['ausentes'], 1)
+        self.assertEqual(semana['tasa_presencia'], 66.67)
+        self.assertEqual(semana['tardanzas'], 1)
+        self.assertEqual(semana['duracion_promedio'], 165.0)  # solo presentes: (210 + 120) / 2
+        self.assertEqual(reporte['totales']['total'], 4)
+        self.assertEqual(reporte['totales']['tardanzas'], 2)
+
+    def test_por_persona_con_hora_de_entrada(self):
+        filas = reportes.calcular(date(2024, 1, 1), date(2024, 3, 31), 'persona', time(8, 45))['filas']
+
+        self.assertEqual([f['clave'] for f in filas], ['111111', '222222'])
+        self.assertEqual(filas[0]['total'], 3)
+        self.assertEqual(filas[0]['tardanzas'], 1)
+        self.assertEqual(filas[0]['nombre'], 'Ana Pérez')
+
+    def test_consultas_por_tramo(self):
+        # Dos GROUP BY por mes (tabla viva y archivo), sin importar las filas
+        with self.assertNumQueries(6):
+            reportes.calcular(date(2024, 1, 1), date(2024, 3, 31), 'dia')
+
+    def test_formatos(self):
+        reporte = reportes.calcular(date(2024, 1, 1), date(2024, 3, 31), 'mes')
+
+        filas = list(csv.reader(io.StringIO(reportes.a_csv(reporte))))
+        self.assertEqual(filas[0], reportes.ENCABEZADOS_CSV)
+        self.assertEqual(filas[1][:5], ['2024-01', '', '2', '1', '1'])
+        self.assertEqual(filas[-1][0], 'Total')
+        datos = json.loads(reportes.a_json(reporte))
+        self.assertEqual(datos['parametros']['hora_entrada'], '08:00:00')
+        self.assertEqual([f['clave'] for f in datos['filas']], ['2024-01-01', '2024-02-01', '2024-03-01'])
+
+    def test_csv_no_deja_formulas(self):
+        reporte = reportes.calcular(date(2024, 1, 1), date(2024, 3, 31), 'persona')
+        # Los datos archivados o cargados en bloque no pasan por el validador del modelo
+        reporte['filas'][1]['nombre'] = '=HYPERLINK("http://x")'
+
+        filas = list(csv.reader(io.StringIO(reportes.a_csv(reporte))))
+        self.assertEqual(filas[1][:2], ['111111', 'Ana Pérez'])
+        self.assertEqual(filas[2][:2], ['222222', '\'=HYPERLINK("http://x")'])
+
+    @override_settings(REPORTES_ASINCRONOS=False)
+    def test_trabajo_en_segundo_plano_queda_en_cache(self):
+        clave, trabajo = reportes.solicitar(date(2024, 1, 1), date(2024, 3, 31), 'mes')
+
+        self.assertEqual(trabajo['estado'], reportes.LISTO)
+        self.assertEqual(trabajo['progreso'], 100)
+        self.assertEqual(trabajo['resultado']['totales']['total'], 4)
+        with self.assertNumQueries(0):
+            self.assertEqual(reportes.solicitar(date(2024, 1, 1), date(2024, 3, 31), 'mes'), (clave, trabajo))
+
+
+class ReporteAdminTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        crear_asistencia('111111', fecha=date(2024, 1, 10))
+        self.url = reverse('admin:asistencia_reporte')
+
+    def test_rango_corto_en_linea(self):
+        response = self.client.get(self.url, {
+            'desde': '2024-01-01', 'hasta': '2024-01-31', 'agrupacion': 'dia', 'formato': 'html',
+        })
+        self.assertContains(response, '2024-01-10')
+
+        response = self.client.get(self.url, {
+            'desde': '2024-01-01', 'hasta': '2024-01-31', 'agrupacion': 'dia', 'formato': 'csv',
+        })
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('reporte_dia_20240101_20240131.csv', response['Content-Disposition'])
+
+    def test_requiere_permiso_de_ver(self):
+        self.client.force_login(User.objects.create_user('personal', password='clave', is_staff=True))
+        response = self.client.get(self.url, {
+            'desde': '2024-01-01', 'hasta': '2024-01-31', 'agrupacion': 'dia', 'formato': 'csv',
+        })
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(REPORTES_ASINCRONOS=False, REPORTES_DIAS_EN_LINEA=31)
+    def test_rango_largo_usa_el_trabajo(self):
+        parametros = {'desde': '2024-01-01', 'hasta': '2024-12-31', 'agrupacion': 'mes', 'formato': 'json'}
+        response = self.client.get(self.url, parametros)
+
+        self.assertEqual(response.json()['totales']['total'], 1)
+        clave = reportes.clave_trabajo(date(2024, 1, 1), date(2024, 12, 31), 'mes')
+        self.assertEqual(reportes.estado(clave)['estado'], reportes.LISTO)
+
+    @override_settings(REPORTES_DIAS_EN_LINEA=31)
+    def test_trabajo_en_curso_recarga_la_pagina(self):
+        clave = reportes.clave_trabajo(date(2024, 1, 1), date(2024, 12, 31), 'mes')
+        reportes._guardar_estado(clave, estado=reportes.PROCESANDO, progreso=40)
+
+        response = self.client.get(self.url, {
+            'desde': '2024-01-01', 'hasta': '2024-12-31', 'agrupacion': 'mes', 'formato': 'csv',
+        })
+        self.assertContains(response, '40%')
+        self.assertContains(response, 'http-equiv="refresh"')
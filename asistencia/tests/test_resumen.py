@@ -0,0 +1,85 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from asistencia.models import Asistencia, ResumenDiario
+
+from .utils import crear_asistencia
+
+
+class ResumenDiarioTest(TestCase):
+    def setUp(self):
+        self.hoy = timezone.localdate()
+        self.ayer = self.hoy - timedelta(days=1)
+
+    def resumen(self, fecha):
+        return ResumenDiario.objects.filter(fecha=fecha).first()
+
+    def test_crear_actualiza_resumen(self):
+        crear_asistencia('100001')
+        crear_asistencia('100002', presente=False)
+
+        resumen = self.resumen(self.hoy)
+        self.assertEqual(resumen.total, 2)
+        self.assertEqual(resumen.presentes, 1)
+        self.assertEqual(resumen.ausentes, 1)
+        self.assertEqual(resumen.duracion_total, timedelta(hours=8))
+
+    def test_cambio_de_fecha_recalcula_ambos_dias(self):
+        asistencia = crear_asistencia('100001')
+        asistencia.fecha_asistencia = self.ayer
+        asistencia.save()
+
+        self.assertIsNone(self.resumen(self.hoy))
+        self.assertEqual(self.resumen(self.ayer).total, 1)
+
+    def test_eliminar_actualiza_resumen(self):
+        asistencia = crear_asistencia('100001')
+        crear_asistencia('100002')
+        asistencia.delete()
+
+        self.assertEqual(self.resumen(self.hoy).total, 1)
+
+        Asistencia.objects.all().delete()
+        self.assertFalse(ResumenDiario.objects.exists())
+
+    def test_update_masivo_actualiza_resumen(self):
+        crear_asistencia('100001')
+        crear_asistencia('100002')
+
+        Asistencia.objects.all().update(presente=False)
+        resumen = self.resumen(self.hoy)
+        self.assertEqual(resumen.presentes, 0)
+        self.assertEqual(resumen.ausentes, 2)
+
+        Asistencia.objects.all().update(fecha_asistencia=self.ayer)
+        self.assertIsNone(self.resumen(self.hoy))
+        self.assertEqual(self.resumen(self.ayer).total, 2)
+
+    def test_bulk_create_actualiza_resumen(self):
+        base = crear_asistencia('100001')
+        Asistencia.objects.bulk_create([
+            Asistencia(
+                nombre_completo=base.nombre_completo,
+                documento_identidad='100002',
+                correo_electronico=base.correo_electronico,
+                fecha_asistencia=self.ayer,
+                hora_ingreso=base.hora_ingreso,
+                hora_salida=base.hora_salida,
+            )
+        ])
+
+        self.assertEqual(self.resumen(self.ayer).total, 1)
+
+    def test_comando_reconstruir(self):
+        crear_asistencia('100001')
+        crear_asistencia('100002', fecha=self.ayer)
+        ResumenDiario.objects.all().delete()
+
+        call_command('reconstruir_resumen_diario', stdout=io.StringIO())
+
+        self.assertEqual(ResumenDiario.objects.count(), 2)
+        self.assertEqual(Asistencia.objects.resumen_periodos()['total'], 2)
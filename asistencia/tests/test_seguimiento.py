@@ -0,0 +1,104 @@
+from datetime import time, timedelta
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.models import Asistencia, ResumenDiario
+
+from .utils import crear_asistencia
+
+
+class SeguimientoCambiosTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        crear_asistencia('123456')
+        self.asistencia = Asistencia.objects.get(documento_identidad='123456')
+
+    def test_campos_modificados(self):
+        self.assertEqual(self.asistencia.campos_modificados(), set())
+        self.asistencia.presente = False
+        self.assertEqual(self.asistencia.campos_modificados(), {'presente'})
+        self.assertIsNone(Asistencia(documento_identidad='1').campos_modificados())
+
+    def test_guardar_sin_cambios_no_consulta(self):
+        with self.assertNumQueries(0):
+            self.asistencia.save()
+
+    def test_cambiar_presente_escribe_solo_esa_columna(self):
+        self.asistencia.presente = False
+        with CaptureQueriesContext(connection) as consultas:
+            self.asistencia.save()
+
+        sql = [c['sql'] for c in consultas]
+        actualizaciones = [s for s in sql if s.startswith('UPDATE "asistencia_asistencia"')]
+        self.assertEqual(len(actualizaciones), 1)
+        self.assertIn('"presente"', actualizaciones[0])
+        self.assertNotIn('"nombre_completo"', actualizaciones[0])
+        # Ni la consulta de unicidad, ni la lectura previa de pre_save, ni el índice
+        self.assertFalse([s for s in sql if s.startswith('SELECT 1 AS "a"')])
+        self.assertFalse([s for s in sql if s.startswith('SELECT')
+                          and 'WHERE "asistencia_asistencia"."id" =' in s])
+        self.assertFalse([s for s in sql if 'busqueda_' in s])
+        self.assertEqual(ResumenDiario.objects.get(fecha=timezone.localdate()).ausentes, 1)
+
+    def test_observaciones_no_recalcula_resumenes(self):
+        self.asistencia.observaciones = 'Llegó tarde'
+        with self.assertNumQueries(1):
+            self.asistencia.save()
+
+    def test_cambiar_documento_valida_unicidad(self):
+        crear_asistencia('654321')
+        self.asistencia.documento_identidad = '654321'
+        with self.assertRaises(ValidationError) as error:
+            self.asistencia.save()
+        self.assertIn('__all__', error.exception.message_dict)
+
+    def test_solo_revalida_las_reglas_de_los_campos_modificados(self):
+        # Fila con un nombre que no cumple las reglas (p. ej. anterior a ellas)
+        Asistencia.objects.filter(pk=self.asistencia.pk).update(nombre_completo='Ana')
+        asistencia = Asistencia.objects.get(pk=self.asistencia.pk)
+        asistencia.presente = False
+        asistencia.save()
+
+        asistencia.nombre_completo = 'Bea'
+        with self.assertRaises(ValidationError):
+            asistencia.save()
+
+    def test_cambio_de_horas_actualiza_la_duracion(self):
+        self.asistencia.hora_salida = time(10, 0)
+        self.asistencia.save()
+        self.asistencia.refresh_from_db()
+        self.assertEqual(self.asistencia.duracion_minutos, 120)
+
+    def test_cambio_de_fecha_usa_los_valores_cargados(self):
+        ayer = timezone.localdate() - timedelta(days=1)
+        self.asistencia.fecha_asistencia = ayer
+        self.asistencia.save()
+
+        self.assertFalse(ResumenDiario.objects.filter(fecha=timezone.localdate(), total__gt=0).exists())
+        self.assertEqual(ResumenDiario.objects.get(fecha=ayer).total, 1)
+
+    def test_vista_de_edicion_no_repite_consultas(self):
+        url = reverse('asistencia:update', args=[self.asistencia.pk])
+        datos = {
+            'nombre_completo': 'Ana Pérez',
+            'documento_identidad': '123456',
+            'correo_electronico': 'ana@example.com',
+            'fecha_asistencia': timezone.localdate().isoformat(),
+            'hora_ingreso': '08:00',
+            'hora_salida': '12:00',
+            'observaciones': 'Sin novedad',
+        }
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post(url, datos)
+
+        self.assertEqual(response.status_code, 302)
+        unicidad = [c for c in consultas if 'SELECT 1 AS "a"' in c['sql']]
+        self.assertEqual(unicidad, [])
+        self.asistencia.refresh_from_db()
+        self.assertFalse(self.asistencia.presente)
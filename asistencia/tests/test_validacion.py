@@ -0,0 +1,73 @@
+from datetime import time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from asistencia import validators
+from asistencia.forms import AsistenciaForm
+from taller_formularios import validacion
+
+
+def registro(**extra):
+    datos = {
+        'nombre_completo': 'Ana Pérez',
+        'documento_identidad': '123456',
+        'fecha_asistencia': timezone.localdate(),
+        'hora_ingreso': time(8, 0),
+        'hora_salida': time(12, 0),
+    }
+    datos.update(extra)
+    return datos
+
+
+class EsquemaTest(SimpleTestCase):
+    def test_registro_valido(self):
+        self.assertEqual(validators.ESQUEMA.errores(registro()), {})
+
+    def test_devuelve_todos_los_errores_a_la_vez(self):
+        errores = validators.ESQUEMA.errores(registro(
+            nombre_completo='Ana',
+            documento_identidad='12a',
+            fecha_asistencia=timezone.localdate() + timedelta(days=1),
+            hora_salida=time(8, 10),
+        ))
+        self.assertEqual(
+            set(errores),
+            {'nombre_completo', 'documento_identidad', 'fecha_asistencia', 'hora_salida'},
+        )
+        self.assertEqual(errores['hora_salida'],
+                         ['La diferencia mínima entre ingreso y salida debe ser 30 minutos.'])
+
+    def test_cruzada_se_omite_si_un_campo_falta(self):
+        self.assertEqual(validators.ESQUEMA.errores(registro(hora_ingreso=None)), {})
+
+    def test_lote(self):
+        lote = [registro(), registro(documento_identidad='000000'), registro(nombre_completo='A. B')]
+        errores = validators.ESQUEMA.errores_lote(lote)
+        self.assertEqual(set(errores), {1, 2})
+        self.assertEqual(errores[1], {'documento_identidad': ['El documento no puede ser solo ceros.']})
+
+    def test_telefono(self):
+        regla = validacion.telefono(minimo=7, maximo=10, prefijo_celular='3')
+        self.assertIsNone(regla('300 123 4567'))
+        self.assertEqual(str(regla('600 123 4567')), 'Los números de celular deben iniciar con 3.')
+        self.assertEqual(str(regla('12345')), 'El número de teléfono debe tener al menos 7 dígitos.')
+
+    def test_validadores_de_campo(self):
+        with self.assertRaises(ValidationError):
+            validators.validar_nombre_completo('Ana 123')
+        with self.assertRaises(ValidationError):
+            validators.validar_rango_horas(time(8, 0), time(21, 0))
+        validators.validar_documento_identidad('1234567')
+
+
+class ModeloYFormularioTest(TestCase):
+    def test_formulario_usa_las_reglas_del_esquema(self):
+        datos = registro(nombre_completo='Ana', correo_electronico='ana@example.com', presente=True)
+        datos['hora_salida'] = time(8, 15)
+        form = AsistenciaForm(data=datos)
+
+        self.assertFalse(form.is_valid())
+        self.assertIn('nombre_completo', form.errors)
+        self.assertIn('hora_salida', form.errors)
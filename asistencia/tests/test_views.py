@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from asistencia.models import Asistencia
+
+from .utils import crear_asistencia
+
+
+class ResumenPeriodosTest(TestCase):
+    def test_resumen_periodos_cuenta_cada_ventana(self):
+        hoy = timezone.localdate()
+        crear_asistencia('100001')
+        crear_asistencia('100002', presente=False)
+        crear_asistencia('100003', fecha=hoy - timedelta(days=40))
+
+        with self.assertNumQueries(1):
+            resumen = Asistencia.objects.resumen_periodos()
+
+        self.assertEqual(resumen['total'], 3)
+        self.assertEqual(resumen['total_presentes'], 2)
+        self.assertEqual(resumen['total_ausentes'], 1)
+        self.assertEqual(resumen['total_hoy'], 2)
+        self.assertEqual(resumen['presentes_hoy'], 1)
+        self.assertEqual(resumen['presentes_semana'], 1)
+        self.assertEqual(resumen['total_mes'], 2)
+        self.assertEqual(resumen['ausentes_mes'], 1)
+
+    def test_estadisticas_mes_actual(self):
+        crear_asistencia('100001')
+        crear_asistencia('100002', presente=False)
+
+        self.assertEqual(
+            Asistencia.objects.estadisticas_mes_actual(),
+            {'total': 2, 'presentes': 1, 'ausentes': 1}
+        )
+
+
+class AsistenciaListViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_numero_de_consultas_fijo(self):
+        for i in range(30):
+            crear_asistencia(f'2000{i:02d}')
+        cache.clear()
+
+        # Con la caché fría: paginación (count + página), total y últimas
+        # solicitudes, primer día con datos y días del resumen diario; no
+        # depende del número de asistencias
+        with self.assertNumQueries(7):
+            self.client.get(reverse('asistencia:list'))
+
+        # Con las estadísticas en caché solo quedan count + página
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('asistencia:list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_registros'], 30)
+        self.assertEqual(response.context['presentes_hoy'], 30)
+
+
+class AsistenciaAdminReportesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        from django.contrib.auth.models import User
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura')
+        self.client.force_login(self.admin)
+
+    def test_reporte_mensual_lee_resumen_diario(self):
+        crear_asistencia('100001')
+        crear_asistencia('100002', presente=False)
+
+        response = self.client.get(reverse('admin:asistencia_reporte_mensual'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_registros'], 2)
+        self.assertEqual(response.context['total_presentes'], 1)
+        self.assertEqual(len(response.context['stats_diarios']), 1)
+
+    def test_estadisticas_y_changelist(self):
+        crear_asistencia('100001')
+
+        response = self.client.get(reverse('admin:asistencia_estadisticas'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_registros'], 1)
+
+        response = self.client.get(reverse('admin:asistencia_asistencia_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stats_rapidas']['presentes_hoy'], 1)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.client import AsyncRequestFactory
+
+from asistencia import vistas_async
+from asistencia.vistas_async import AsistenciaDetailAsyncView, AsistenciaListAsyncView
+from taller_formularios.asincrono import en_paralelo
+
+from .utils import crear_asistencia
+
+
+async def renderizar(response):
+    return await sync_to_async(response.render)()
+
+
+class VistasAsincronasTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.asistencias = [crear_asistencia(f'3000{i:02d}') for i in range(30)]
+
+    async def test_lista_con_panel(self):
+        request = self.factory.get('/asistencia/', {'page': 2})
+        response = await renderizar(await AsistenciaListAsyncView.as_view()(request))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context_data['page_obj'].number, 2)
+        self.assertEqual(len(response.context_data['object_list']), 5)
+        self.assertEqual(response.context_data['total_registros'], 30)
+        self.assertEqual(response.context_data['presentes_hoy'], 30)
+        self.assertEqual(response.context_data['total_solicitudes'], 0)
+
+    async def test_panel_en_paralelo_solo_sin_fragmentos(self):
+        with mock.patch.object(vistas_async, 'en_paralelo', wraps=en_paralelo) as paralelo:
+            await renderizar(await AsistenciaListAsyncView.as_view()(self.factory.get('/asistencia/')))
+            self.assertEqual(paralelo.call_count, 1)
+
+            # Con los fragmentos en la caché no se calcula nada
+            response = await renderizar(
+                await AsistenciaListAsyncView.as_view()(self.factory.get('/asistencia/'))
+            )
+            self.assertEqual(paralelo.call_count, 1)
+        self.assertContains(response, 'data-panel="total_registros">30<')
+
+    async def test_pagina_invalida(self):
+        from django.http import Http404
+
+        request = self.factory.get('/asistencia/', {'page': 9})
+        with self.assertRaises(Http404):
+            await AsistenciaListAsyncView.as_view()(request)
+
+    @override_settings(PAGINACION_CURSOR=True, PAGINACION_CONTAR_TOTAL=False)
+    async def test_lista_con_cursor(self):
+        request = self.factory.get('/asistencia/')
+        response = await AsistenciaListAsyncView.as_view()(request)
+
+        self.assertTrue(response.context_data['paginacion_cursor'])
+        self.assertTrue(response.context_data['page_obj'].has_next())
+
+    async def test_detalle(self):
+        asistencia = self.asistencias[0]
+        request = self.factory.get(f'/asistencia/{asistencia.pk}/')
+        response = await renderizar(
+            await AsistenciaDetailAsyncView.as_view()(request, pk=asistencia.pk)
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, asistencia.documento_identidad)
+
+    async def test_mismo_contexto_que_la_vista_sincrona(self):
+        from asistencia.views import AsistenciaListView
+
+        sincrona = await sync_to_async(
+            lambda: AsistenciaListView.as_view()(RequestFactory().get('/asistencia/')).render()
+        )()
+        asincrona = await AsistenciaListAsyncView.as_view()(self.factory.get('/asistencia/'))
+
+        ignoradas = {'view', 'asistencia_list'}
+        self.assertEqual(set(sincrona.context_data) - ignoradas, set(asincrona.context_data) - ignoradas)
+        self.assertEqual(
+            [a.pk for a in sincrona.context_data['object_list']],
+            [a.pk for a in asincrona.context_data['object_list']],
+        )
+
+
+class EnParaleloTest(TransactionTestCase):
+    def test_ejecuta_las_funciones_a_la_vez(self):
+        # Cada función espera a la otra: solo termina si corren en paralelo
+        barrera = threading.Barrier(2, timeout=5)
+
+        def esperar(valor):
+            def funcion():
+                barrera.wait()
+                return valor
+            return funcion
+
+        self.assertEqual(asyncio.run(en_paralelo(esperar(1), esperar(2))), [1, 2])
+
+    def test_cada_hilo_usa_su_conexion(self):
+        crear_asistencia('400001')
+
+        def contar():
+            from asistencia.models import Asistencia
+            return Asistencia.objects.count()
+
+        self.assertEqual(asyncio.run(en_paralelo(contar, contar)), [1, 1])
+
+    def test_panel_calculado_en_paralelo(self):
+        cache.clear()
+        crear_asistencia('400002')
+        request = AsyncRequestFactory().get('/asistencia/')
+
+        contexto = asyncio.run(AsistenciaListAsyncView(request=request).contexto_panel())
+
+        self.assertEqual(contexto['total_registros'], 1)
+        self.assertEqual(contexto['presentes_hoy'], 1)
+        self.assertEqual(contexto['total_solicitudes'], 0)
@@ -0,0 +1,19 @@
+from datetime import time
+
+from django.utils import timezone
+
+from asistencia.models import Asistencia
+
+
+def crear_asistencia(documento, fecha=None, presente=True, **extra):
+    datos = {
+        'nombre_completo': 'Ana Pérez',
+        'documento_identidad': documento,
+        'correo_electronico': 'ana@example.com',
+        'fecha_asistencia': fecha or timezone.localdate(),
+        'hora_ingreso': time(8, 0),
+        'hora_salida': time(12, 0),
+        'presente': presente,
+    }
+    datos.update(extra)
+    return Asistencia.objects.create(**datos)
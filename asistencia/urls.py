@@ -1,12 +1,23 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, vistas_async
 
 app_name = 'asistencia'
 
+# Bajo ASGI la lista y el detalle pueden servirse con sus versiones asíncronas
+if getattr(settings, 'VISTAS_ASINCRONAS', False):
+    lista = vistas_async.AsistenciaListAsyncView.as_view()
+    detalle = vistas_async.AsistenciaDetailAsyncView.as_view()
+else:
+    lista = views.AsistenciaListView.as_view()
+    detalle = views.AsistenciaDetailView.as_view()
+
 urlpatterns = [
-    path('', views.AsistenciaListView.as_view(), name='list'),
+    path('', lista, name='list'),
     path('create/', views.AsistenciaCreateView.as_view(), name='create'),
-    path('<uuid:pk>/', views.AsistenciaDetailView.as_view(), name='detail'),
+    path('<uuid:pk>/', detalle, name='detail'),
     path('<uuid:pk>/update/', views.AsistenciaUpdateView.as_view(), name='update'),
     path('<uuid:pk>/delete/', views.AsistenciaDeleteView.as_view(), name='delete'),
+    path('personas/<str:documento>/', views.PersonaDetailView.as_view(), name='persona'),
+    path('panel/eventos/', vistas_async.PanelEventosView.as_view(), name='panel_eventos'),
 ]
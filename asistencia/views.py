@@ -2,11 +2,14 @@ from django.views import generic
 from django.views.generic import TemplateView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.utils import timezone
-from datetime import datetime, timedelta
-from .models import Asistencia
+from django.shortcuts import get_object_or_404
+from . import estadisticas
+from .lecturas import AsistenciaDePersona, AsistenciaEnLista
+from .models import Asistencia, ResumenPersona
 from .forms import AsistenciaForm
-from solicitudes.models import Solicitud
+from taller_formularios.condicional import GetCondicionalMixin
+from taller_formularios.paginacion import PaginacionCursorMixin
+from taller_formularios.proyeccion import ProyeccionListMixin
 
 
 class AsistenciaCreateView(generic.CreateView):
@@ -20,60 +23,55 @@ class AsistenciaCreateView(generic.CreateView):
 		return super().form_valid(form)
 
 
-class AsistenciaListView(generic.ListView):
+class AsistenciaListView(ProyeccionListMixin, PaginacionCursorMixin, generic.ListView):
     model = Asistencia
+    lectura = AsistenciaEnLista
     template_name = 'asistencia/asistencia_list.html'
+    context_object_name = 'asistencia_list'
     paginate_by = 25
     ordering = ['-fecha_creacion']
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Obtener el queryset
-        qs = self.get_queryset()
-        
-        # Obtener la fecha actual
-        hoy = timezone.now().date()
-        
-        # Calcular inicio y fin de la semana
-        inicio_semana = hoy - timedelta(days=hoy.weekday())
-        fin_semana = inicio_semana + timedelta(days=6)
-        
-        # Calcular inicio y fin del mes
-        inicio_mes = hoy.replace(day=1)
-        if hoy.month == 12:
-            fin_mes = hoy.replace(year=hoy.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            fin_mes = hoy.replace(month=hoy.month + 1, day=1) - timedelta(days=1)
-        
-        # Estadísticas
-        context['total_registros'] = qs.count()
-        context['presentes_hoy'] = qs.filter(fecha_asistencia=hoy, presente=True).count()
-        context['presentes_semana'] = qs.filter(
-            fecha_asistencia__range=[inicio_semana, fin_semana],
-            presente=True
-        ).count()
-        context['presentes_mes'] = qs.filter(
-            fecha_asistencia__range=[inicio_mes, fin_mes],
-            presente=True
-        ).count()
-        # Añadir estadísticas y últimos registros de solicitudes
-        try:
-            context['total_solicitudes'] = Solicitud.objects.count()
-            context['ultimas_solicitudes'] = Solicitud.objects.all().order_by('-fecha_solicitud')[:5]
-        except Exception:
-            # Si la app solicitudes no está disponible, garantizar que las claves existan
-            context['total_solicitudes'] = 0
-            context['ultimas_solicitudes'] = []
+        # Estadísticas desde la caché (ver estadisticas.py); solo se calculan
+        # si los fragmentos del panel no están en la caché de plantillas
+        context.update(estadisticas.contexto_panel())
         
         return context
 
 
-class AsistenciaDetailView(generic.DetailView):
+class AsistenciaDetailView(GetCondicionalMixin, generic.DetailView):
 	model = Asistencia
 	template_name = 'asistencia/asistencia_detail.html'
 
 
+class PersonaDetailView(ProyeccionListMixin, PaginacionCursorMixin, generic.ListView):
+    """
+    Resumen de una persona e historial paginado de sus asistencias,
+    leído por el índice (documento_identidad, fecha_asistencia)
+    """
+    template_name = 'asistencia/persona_detail.html'
+    context_object_name = 'asistencias'
+    lectura = AsistenciaDePersona
+    paginate_by = 25
+    # La fecha es única por persona, así que basta como cursor
+    campos_cursor = ('-fecha_asistencia',)
+
+    def get_queryset(self):
+        self.persona = get_object_or_404(
+            ResumenPersona, documento_identidad=self.kwargs['documento']
+        )
+        return Asistencia.objects\
+            .filter(documento_identidad=self.persona.documento_identidad)\
+            .order_by('-fecha_asistencia')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['persona'] = self.persona
+        return context
+
+
 class AsistenciaUpdateView(generic.UpdateView):
 	model = Asistencia
 	form_class = AsistenciaForm
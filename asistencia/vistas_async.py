@@ -0,0 +1,138 @@
+"""
+Versiones asíncronas de la lista (con el panel de estadísticas) y el detalle
+de asistencias, para servir bajo ASGI (ver taller_formularios/asgi.py).
+
+Usan el ORM asíncrono de Django para la página y el conteo. Las
+estadísticas del panel solo se calculan si falta alguno de sus fragmentos en
+la caché de plantillas; en ese caso las de asistencia y las de solicitudes
+corren a la vez con en_paralelo (taller_formularios/asincrono.py), cada una
+en un hilo con su propia conexión, antes de renderizar. Renderizan las mismas plantillas y el mismo contexto que
+las vistas síncronas; se activan con VISTAS_ASINCRONAS = True.
+
+PanelEventosView sirve los eventos del panel en vivo (ver en_vivo.py).
+"""
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.views import View
+
+from taller_formularios import condicional
+from taller_formularios.asincrono import en_paralelo
+from taller_formularios.paginacion import PaginacionCursorMixin, PaginadorCursor
+
+from . import en_vivo, estadisticas
+from .lecturas import AsistenciaEnLista
+from .models import Asistencia
+
+
+class AsistenciaListAsyncView(PaginacionCursorMixin, View):
+    template_name = 'asistencia/asistencia_list.html'
+    paginate_by = 25
+    ordering = ['-fecha_creacion']
+
+    lectura = AsistenciaEnLista
+
+    def get_queryset(self):
+        return self.lectura.proyectar(Asistencia.objects.order_by(*self.ordering))
+
+    async def paginar(self, queryset):
+        """Retorna (paginador, página) con el ORM asíncrono"""
+        if self.usa_paginacion_cursor():
+            paginador = PaginadorCursor(
+                queryset,
+                self.paginate_by,
+                campos=self.campos_cursor,
+                contar_total=self.debe_contar_total(),
+            )
+            pagina = await sync_to_async(paginador.pagina)(self.request.GET.get('cursor'))
+            pagina.object_list = self.lectura.envolver(pagina.object_list)
+            return paginador, pagina
+
+        paginador = Paginator(queryset, self.paginate_by)
+        # Paginator.count es un cached_property: se fija con el conteo asíncrono
+        paginador.count = await queryset.acount()
+        numero = self.request.GET.get('page') or 1
+        if numero == 'last':
+            numero = paginador.num_pages
+        try:
+            pagina = paginador.page(numero)
+        except InvalidPage as e:
+            raise Http404(f'Página inválida ({numero}): {e}')
+        pagina.object_list = self.lectura.envolver([fila async for fila in pagina.object_list])
+        return paginador, pagina
+
+    async def contexto_panel(self):
+        """Contexto del panel; con fragmentos faltantes calcula las estadísticas a la vez"""
+        hoy = timezone.localdate()
+        contexto = estadisticas.contexto_panel(hoy)
+        if estadisticas.fragmentos_en_cache(contexto):
+            return contexto
+        resumen, solicitudes = await en_paralelo(
+            lambda: estadisticas.resumen_periodos(hoy),
+            estadisticas.resumen_solicitudes_o_vacio,
+        )
+        return estadisticas.contexto_panel(hoy, resumen, solicitudes)
+
+    async def get(self, request, *args, **kwargs):
+        paginador, pagina = await self.paginar(self.get_queryset())
+        context = {
+            'view': self,
+            'paginator': paginador,
+            'page_obj': pagina,
+            'is_paginated': pagina.has_other_pages(),
+            'object_list': pagina.object_list,
+            'asistencia_list': pagina.object_list,
+            'paginacion_cursor': self.usa_paginacion_cursor(),
+            **await self.contexto_panel(),
+        }
+        return TemplateResponse(request, self.template_name, context)
+
+
+class AsistenciaDetailAsyncView(View):
+    template_name = 'asistencia/asistencia_detail.html'
+
+    async def get(self, request, pk, *args, **kwargs):
+        # GET condicional como en la vista síncrona (ver taller_formularios/condicional.py)
+        modificado = await Asistencia.objects.filter(pk=pk)\
+            .values_list('fecha_actualizacion', flat=True).afirst()
+        if modificado is None:
+            raise Http404('No se encontró la asistencia.')
+        # La sesión y los mensajes se leen de la base: en el hilo del ORM
+        respuesta = await sync_to_async(condicional.no_modificada)(request, pk, modificado)
+        if respuesta is not None:
+            return respuesta
+
+        asistencia = await Asistencia.objects.filter(pk=pk).afirst()
+        if asistencia is None:
+            raise Http404('No se encontró la asistencia.')
+        context = {'view': self, 'object': asistencia, 'asistencia': asistencia}
+        return await sync_to_async(condicional.con_validadores)(
+            request, TemplateResponse(request, self.template_name, context), pk, modificado
+        )
+
+
+class PanelEventosView(View):
+    """
+    text/event-stream con los contadores del panel. Bajo WSGI una conexión
+    abierta ocuparía un hilo: se responden solo los valores actuales y el
+    navegador vuelve a pedirlos tras en_vivo.REINTENTO milisegundos.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        version, valores = await sync_to_async(en_vivo.panel.actuales)()
+        if isinstance(request, ASGIRequest):
+            response = StreamingHttpResponse(
+                en_vivo.flujo(version, valores), content_type='text/event-stream'
+            )
+        else:
+            response = HttpResponse(
+                en_vivo.evento_sse('valores', version, valores, reintento=en_vivo.REINTENTO),
+                content_type='text/event-stream',
+            )
+        response['Cache-Control'] = 'no-cache'
+        # Sin búfer en nginx para que cada evento salga al momento
+        response['X-Accel-Buffering'] = 'no'
+        return response
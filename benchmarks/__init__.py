@@ -0,0 +1,5 @@
+"""
+Benchmarks del proyecto. Se ejecutan desde la raíz del repositorio:
+
+    python -m benchmarks.exportacion_csv
+"""
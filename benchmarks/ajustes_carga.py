@@ -0,0 +1,21 @@
+"""
+Configuración para las pruebas de carga: la del proyecto con una base de
+datos SQLite desechable indicada por CARGA_BD. Con CARGA_SQLITE=basico se
+usa SQLite sin ajustes (sin WAL ni conexiones persistentes) para comparar.
+"""
+import os
+
+from taller_formularios.settings import *  # noqa: F401,F403
+from taller_formularios.settings import CONN_MAX_AGE, SQLITE_OPCIONES
+
+BASICO = os.environ.get('CARGA_SQLITE') == 'basico'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['CARGA_BD'],
+        'CONN_MAX_AGE': 0 if BASICO else CONN_MAX_AGE,
+        'OPTIONS': {} if BASICO else SQLITE_OPCIONES,
+    }
+}
+DEBUG = False
@@ -0,0 +1,79 @@
+"""
+Peticiones por segundo de la lista de asistencias con y sin los fragmentos
+del panel en caché, y del detalle con y sin GET condicional.
+
+    python -m benchmarks.cache_vistas [--filas 20000] [--segundos 3]
+
+Las peticiones pasan por el cliente de pruebas de Django (middleware,
+vista, plantilla), en un solo proceso y sin red, así que mide el costo del
+servidor. "antes" es la lista sin fragmentos (PANEL_FRAGMENTOS_TTL = 0,
+con las estadísticas igual servidas desde su caché) y el detalle pedido sin
+If-None-Match; "después", la lista con los fragmentos y el detalle con el
+ETag de la respuesta anterior (304).
+"""
+import argparse
+import time
+
+from .entorno import base_de_datos_temporal, sembrar_asistencias
+
+SOLICITUDES = 20
+
+
+def peticiones_por_segundo(cliente, url, segundos, **cabeceras):
+    cliente.get(url, **cabeceras)
+    hechas = 0
+    inicio = time.perf_counter()
+    fin = inicio + segundos
+    while time.perf_counter() < fin:
+        cliente.get(url, **cabeceras)
+        hechas += 1
+    return hechas / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=20000)
+    parser.add_argument('--segundos', type=float, default=3)
+    opciones = parser.parse_args()
+
+    with base_de_datos_temporal():
+        from django.core.cache import cache
+        from django.test import Client, override_settings
+        from django.urls import reverse
+
+        from asistencia.models import Asistencia, ResumenDiario
+        from solicitudes.models import Solicitud
+
+        sembrar_asistencias(opciones.filas)
+        ResumenDiario.objects.reconstruir()
+        for i in range(SOLICITUDES):
+            Solicitud.objects.create(
+                nombre_solicitante='Persona De Prueba',
+                documento_identidad=str(200000 + i),
+                correo_electronico='persona@example.com',
+                telefono_contacto='3001234567',
+                tipo_solicitud='academica',
+                asunto=f'Solicitud de prueba {i}',
+                descripcion_detallada='Descripción de la solicitud de prueba.',
+            )
+        cache.clear()
+
+        cliente = Client()
+        lista = reverse('asistencia:list')
+        detalle = reverse('asistencia:detail', args=[Asistencia.objects.values_list('pk', flat=True).first()])
+        etag = cliente.get(detalle)['ETag']
+
+        print(f'{opciones.filas} filas, {opciones.segundos:g} s por caso (peticiones/s)')
+        print(f"{'vista':<10} {'antes':>10} {'después':>10}")
+        with override_settings(PANEL_FRAGMENTOS_TTL=0):
+            antes = peticiones_por_segundo(cliente, lista, opciones.segundos)
+        despues = peticiones_por_segundo(cliente, lista, opciones.segundos)
+        print(f"{'lista':<10} {antes:>10.1f} {despues:>10.1f}")
+
+        antes = peticiones_por_segundo(cliente, detalle, opciones.segundos)
+        despues = peticiones_por_segundo(cliente, detalle, opciones.segundos, HTTP_IF_NONE_MATCH=etag)
+        print(f"{'detalle':<10} {antes:>10.1f} {despues:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
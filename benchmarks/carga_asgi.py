@@ -0,0 +1,161 @@
+"""
+Prueba de carga: peticiones por segundo y latencia p50/p99 de la lista con
+panel y del detalle de asistencias, servidas con WSGI (gunicorn, vistas
+síncronas) y con ASGI (gunicorn + uvicorn, vistas asíncronas).
+
+    python -m benchmarks.carga_asgi [--filas 20000] [--procesos 2]
+                                    [--concurrencia 32] [--segundos 10]
+
+Necesita gunicorn y uvicorn instalados. Cada servidor arranca contra la
+misma base de datos SQLite sembrada en un directorio temporal. El generador
+de carga usa hilos con conexiones HTTP persistentes (solo biblioteca
+estándar); con concurrencias altas conviene más núcleos que procesos del
+servidor para que el cliente no sea el cuello de botella.
+"""
+import argparse
+import http.client
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .entorno import RAIZ
+
+SERVIDORES = {
+    'WSGI': ['taller_formularios.wsgi:application'],
+    'ASGI': ['taller_formularios.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def preparar_base_de_datos(ruta, filas):
+    """Migra y siembra la base de datos desechable; retorna un id de asistencia"""
+    os.environ['CARGA_BD'] = ruta
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.ajustes_carga'
+
+    from .entorno import configurar, sembrar_asistencias
+    configurar()
+
+    from django.core.management import call_command
+
+    from asistencia.models import Asistencia
+
+    call_command('migrate', verbosity=0)
+    sembrar_asistencias(filas, dias=90)
+    return str(Asistencia.objects.values_list('pk', flat=True).first())
+
+
+def esperar_servidor(puerto, limite=30):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            with socket.create_connection(('127.0.0.1', puerto), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'El servidor no respondió en el puerto {puerto}')
+
+
+def generar_carga(puerto, ruta, concurrencia, segundos):
+    """Retorna (peticiones por segundo, latencias en ms, errores)"""
+    latencias = []
+    errores = 0
+    bloqueo = threading.Lock()
+    fin = time.monotonic() + segundos
+
+    def cliente():
+        nonlocal errores
+        propias = []
+        fallidas = 0
+        conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+        while time.monotonic() < fin:
+            inicio = time.perf_counter()
+            try:
+                conexion.request('GET', ruta)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                if respuesta.status != 200:
+                    fallidas += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                fallidas += 1
+                conexion.close()
+                conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+                continue
+            propias.append((time.perf_counter() - inicio) * 1000)
+        conexion.close()
+        with bloqueo:
+            latencias.extend(propias)
+            errores += fallidas
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as grupo:
+        for _ in range(concurrencia):
+            grupo.submit(cliente)
+    transcurrido = time.perf_counter() - inicio
+    return len(latencias) / transcurrido, sorted(latencias), errores
+
+
+def percentil(valores, p):
+    if not valores:
+        return float('nan')
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=20000)
+    parser.add_argument('--procesos', type=int, default=2)
+    parser.add_argument('--concurrencia', type=int, default=32)
+    parser.add_argument('--segundos', type=int, default=10)
+    opciones = parser.parse_args()
+
+    faltantes = [m for m in ('gunicorn', 'uvicorn') if shutil.which(m) is None]
+    if faltantes:
+        sys.exit(f'Faltan {", ".join(faltantes)}: pip install gunicorn uvicorn')
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        base = os.path.join(carpeta, 'carga.sqlite3')
+        pk = preparar_base_de_datos(base, opciones.filas)
+        rutas = {'lista': '/asistencia/', 'detalle': f'/asistencia/{pk}/'}
+
+        entorno = dict(os.environ, CARGA_BD=base, DJANGO_SETTINGS_MODULE='benchmarks.ajustes_carga')
+        print(f'{opciones.filas} filas, {opciones.procesos} proceso(s), '
+              f'{opciones.concurrencia} clientes, {opciones.segundos} s por caso')
+        print(f"{'servidor':<8} {'vista':<8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errores':>8}")
+
+        for nombre, argumentos in SERVIDORES.items():
+            puerto = puerto_libre()
+            servidor = subprocess.Popen(
+                ['gunicorn', *argumentos, '-w', str(opciones.procesos),
+                 '-b', f'127.0.0.1:{puerto}', '--log-level', 'warning'],
+                cwd=RAIZ, env=entorno,
+            )
+            try:
+                esperar_servidor(puerto)
+                for vista, ruta in rutas.items():
+                    # Calentamiento: caché de estadísticas y conexiones
+                    generar_carga(puerto, ruta, 2, 1)
+                    rps, latencias, errores = generar_carga(
+                        puerto, ruta, opciones.concurrencia, opciones.segundos
+                    )
+                    print(f'{nombre:<8} {vista:<8} {rps:>9.1f} '
+                          f'{percentil(latencias, 50):>9.2f} {percentil(latencias, 99):>9.2f} '
+                          f'{errores:>8}')
+            finally:
+                servidor.terminate()
+                servidor.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Arranque común de los benchmarks: configura Django y crea una base de datos
+de prueba desechable para no tocar la base de datos real
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import time as hora
+from datetime import timedelta
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def configurar():
+    if str(RAIZ) not in sys.path:
+        sys.path.insert(0, str(RAIZ))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taller_formularios.settings')
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def base_de_datos_temporal():
+    """Crea la base de datos de prueba y la destruye al salir"""
+    configurar()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    nombre = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(nombre, verbosity=0)
+        teardown_test_environment()
+
+
+def sembrar_asistencias(cantidad, dias=30, lote=5000, inicio=0):
+    """
+    Inserta `cantidad` asistencias repartidas en los últimos `dias` días
+    """
+    from django.utils import timezone
+
+    from asistencia.models import Asistencia
+
+    hoy = timezone.localdate()
+    for desde in range(inicio, inicio + cantidad, lote):
+        Asistencia.objects.bulk_create([
+            Asistencia(
+                nombre_completo='Persona De Prueba',
+                documento_identidad=str(1000000 + i // dias),
+                correo_electronico=f'persona{i // dias}@example.com',
+                fecha_asistencia=hoy - timedelta(days=i % dias),
+                hora_ingreso=hora(8, 0),
+                hora_salida=hora(16, 30),
+                presente=i % 7 != 0,
+                observaciones='Registro generado para benchmark',
+            )
+            for i in range(desde, min(desde + lote, inicio + cantidad))
+        ])
+
+
+def cronometrar(funcion, repeticiones=1):
+    """Retorna el mejor tiempo (segundos) de `repeticiones` ejecuciones"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor
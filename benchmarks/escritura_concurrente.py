@@ -0,0 +1,249 @@
+"""
+Prueba de carga de escrituras: muchos clientes registrando asistencias a la
+vez con POST a AsistenciaCreateView (/asistencia/create/), servida con
+gunicorn y varios procesos sobre SQLite.
+
+    python -m benchmarks.escritura_concurrente [--filas 20000] [--procesos 4]
+                                               [--concurrencia 32] [--segundos 10]
+                                               [--modo formulario|kiosco]
+
+Compara SQLite sin ajustes (journal por defecto, transacciones DEFERRED, una
+conexión por petición) con la configuración del proyecto (WAL, busy_timeout,
+transacciones IMMEDIATE y conexiones persistentes). Cada caso usa una copia
+de la misma base de datos sembrada. Se cuentan como registros las respuestas
+302 (redirección tras guardar); los 500 son, en general, "database is locked".
+
+Con --modo kiosco cada cliente alterna en /api/asistencias/kiosco/ la
+entrada de un documento nuevo y la salida de uno cuya entrada se sembró una
+hora antes (la salida exige al menos 30 minutos desde el ingreso). Se
+cuentan como registros las respuestas 200, y se agrega el caso "diferida":
+la configuración del proyecto con INGESTA_DIFERIDA (respuestas 202, ver
+asistencia/ingesta.py). Para ese caso se informa además cuánto tarda el
+volcado en vaciar la bitácora después de la carga.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from .carga_asgi import esperar_servidor, percentil, preparar_base_de_datos, puerto_libre
+from .entorno import RAIZ
+
+CASOS = ('basico', 'ajustado')
+RUTA = '/asistencia/create/'
+RUTA_KIOSCO = '/api/asistencias/kiosco/'
+TOKEN_KIOSCO = 'carga'
+# Documentos con la entrada de hoy sembrada, para las salidas del kiosco
+PRIMERA_ABIERTA = 40_000_000
+ABIERTAS = 50_000
+_abiertas = itertools.count(PRIMERA_ABIERTA)
+_TOKEN = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def sesion_csrf(conexion):
+    """GET del formulario: retorna (cookie, token) para los POST del cliente"""
+    conexion.request('GET', RUTA)
+    respuesta = conexion.getresponse()
+    html = respuesta.read().decode()
+    cookies = SimpleCookie()
+    for cabecera in respuesta.headers.get_all('Set-Cookie') or []:
+        cookies.load(cabecera)
+    cookie = cookies['csrftoken'].value
+    return cookie, _TOKEN.search(html).group(1)
+
+
+def peticiones_formulario(conexion, documentos, fecha):
+    """Genera (método, ruta, cuerpo, cabeceras, estados esperados) de cada alta por formulario"""
+    cookie, token = sesion_csrf(conexion)
+    cabeceras = {
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'Cookie': f'csrftoken={cookie}',
+    }
+    while True:
+        cuerpo = urlencode({
+            'csrfmiddlewaretoken': token,
+            'nombre_completo': 'Persona De Carga',
+            'documento_identidad': str(next(documentos)),
+            'correo_electronico': 'carga@example.com',
+            'fecha_asistencia': fecha,
+            'hora_ingreso': '08:00',
+            'hora_salida': '12:00',
+            'presente': 'on',
+        })
+        yield 'POST', RUTA, cuerpo, cabeceras, (302,)
+
+
+def sembrar_entradas(cantidad=ABIERTAS):
+    """Filas de hoy sin salida, con la entrada una hora antes de ahora"""
+    from django.utils import timezone
+
+    from asistencia.models import Asistencia
+
+    ahora = timezone.localtime()
+    ingreso = max(ahora - timedelta(hours=1), ahora.replace(hour=0, minute=0, second=0)).time().replace(microsecond=0)
+    for desde in range(0, cantidad, 5000):
+        Asistencia.objects.bulk_create([
+            Asistencia(
+                nombre_completo='Persona De Carga',
+                documento_identidad=str(PRIMERA_ABIERTA + i),
+                correo_electronico='carga@example.com',
+                fecha_asistencia=ahora.date(),
+                hora_ingreso=ingreso,
+                hora_salida=None,
+            )
+            for i in range(desde, min(desde + 5000, cantidad))
+        ])
+
+
+def peticiones_kiosco(conexion, documentos, fecha):
+    """Entrada de un documento nuevo y salida de uno sembrado (202 si la ingesta es diferida)"""
+    cabeceras = {
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {TOKEN_KIOSCO}',
+    }
+    while True:
+        yield 'POST', RUTA_KIOSCO, json.dumps({
+            'documento': str(next(documentos)),
+            'tipo': 'entrada',
+            'nombre_completo': 'Persona De Carga',
+            'correo_electronico': 'carga@example.com',
+        }), cabeceras, (200, 202)
+        salida = json.dumps({'documento': str(next(_abiertas)), 'tipo': 'salida'})
+        yield 'POST', RUTA_KIOSCO, salida, cabeceras, (200, 202)
+
+
+MODOS = {'formulario': peticiones_formulario, 'kiosco': peticiones_kiosco}
+
+
+def esperar_volcado(bitacora, limite=120):
+    """Segundos hasta que la bitácora de ingesta queda vacía"""
+    inicio = time.perf_counter()
+    conexion = sqlite3.connect(bitacora, timeout=30)
+    try:
+        while time.perf_counter() - inicio < limite:
+            if not conexion.execute('SELECT COUNT(*) FROM eventos').fetchone()[0]:
+                break
+            time.sleep(0.05)
+    finally:
+        conexion.close()
+    return time.perf_counter() - inicio
+
+
+def generar_escrituras(puerto, concurrencia, segundos, documentos, fecha, modo='formulario'):
+    """Retorna (registros por segundo, latencias en ms, errores por estado)"""
+    latencias = []
+    errores = {}
+    bloqueo = threading.Lock()
+    fin = time.monotonic() + segundos
+
+    def cliente():
+        propias = []
+        fallidas = {}
+        conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+        peticiones = MODOS[modo](conexion, documentos, fecha)
+        while time.monotonic() < fin:
+            metodo, ruta, cuerpo, cabeceras, esperado = next(peticiones)
+            inicio = time.perf_counter()
+            try:
+                conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+            except (OSError, http.client.HTTPException):
+                fallidas['conexión'] = fallidas.get('conexión', 0) + 1
+                conexion.close()
+                conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+                continue
+            if respuesta.status not in esperado:
+                fallidas[respuesta.status] = fallidas.get(respuesta.status, 0) + 1
+                continue
+            propias.append((time.perf_counter() - inicio) * 1000)
+        conexion.close()
+        with bloqueo:
+            latencias.extend(propias)
+            for estado, cantidad in fallidas.items():
+                errores[estado] = errores.get(estado, 0) + cantidad
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as grupo:
+        for futuro in [grupo.submit(cliente) for _ in range(concurrencia)]:
+            futuro.result()
+    transcurrido = time.perf_counter() - inicio
+    return len(latencias) / transcurrido, sorted(latencias), errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=20000)
+    parser.add_argument('--procesos', type=int, default=4)
+    parser.add_argument('--concurrencia', type=int, default=32)
+    parser.add_argument('--segundos', type=int, default=10)
+    parser.add_argument('--modo', choices=sorted(MODOS), default='formulario')
+    opciones = parser.parse_args()
+
+    if shutil.which('gunicorn') is None:
+        sys.exit('Falta gunicorn: pip install gunicorn')
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        # La base de datos sembrada queda sin WAL; cada caso trabaja sobre una copia
+        os.environ['CARGA_SQLITE'] = 'basico'
+        plantilla = os.path.join(carpeta, 'plantilla.sqlite3')
+        preparar_base_de_datos(plantilla, opciones.filas)
+        if opciones.modo == 'kiosco':
+            sembrar_entradas()
+        from django.db import connections
+        from django.utils import timezone
+        connections.close_all()
+        fecha = timezone.localdate().isoformat()
+
+        print(f'{opciones.modo}: {opciones.filas} filas, {opciones.procesos} proceso(s), '
+              f'{opciones.concurrencia} clientes, {opciones.segundos} s por caso')
+        print(f"{'sqlite':<9} {'reg/s':>9} {'p50 ms':>9} {'p99 ms':>9}  errores")
+
+        documentos = itertools.count(50_000_000)
+        casos = CASOS + ('diferida',) if opciones.modo == 'kiosco' else CASOS
+        for caso in casos:
+            base = os.path.join(carpeta, f'{caso}.sqlite3')
+            bitacora = os.path.join(carpeta, f'{caso}-ingesta.sqlite3')
+            shutil.copy(plantilla, base)
+            entorno = dict(
+                os.environ, CARGA_BD=base, CARGA_SQLITE='ajustado' if caso == 'diferida' else caso,
+                API_TOKENS=TOKEN_KIOSCO, DJANGO_SETTINGS_MODULE='benchmarks.ajustes_carga',
+                INGESTA_DIFERIDA=str(caso == 'diferida'), INGESTA_BITACORA=bitacora,
+            )
+            puerto = puerto_libre()
+            servidor = subprocess.Popen(
+                ['gunicorn', 'taller_formularios.wsgi:application', '-w', str(opciones.procesos),
+                 '-b', f'127.0.0.1:{puerto}', '--log-level', 'critical'],
+                cwd=RAIZ, env=entorno, stderr=subprocess.DEVNULL,
+            )
+            try:
+                esperar_servidor(puerto)
+                generar_escrituras(puerto, 2, 1, documentos, fecha, opciones.modo)
+                rps, latencias, errores = generar_escrituras(
+                    puerto, opciones.concurrencia, opciones.segundos, documentos, fecha, opciones.modo
+                )
+                detalle = ', '.join(f'{estado}: {cantidad}' for estado, cantidad in errores.items()) or '0'
+                print(f'{caso:<9} {rps:>9.1f} {percentil(latencias, 50):>9.2f} '
+                      f'{percentil(latencias, 99):>9.2f}  {detalle}')
+                if caso == 'diferida':
+                    print(f'{"":<9} bitácora vacía {esperar_volcado(bitacora):.2f} s después de la carga')
+            finally:
+                servidor.terminate()
+                servidor.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
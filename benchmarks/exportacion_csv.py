@@ -0,0 +1,68 @@
+"""
+Memoria pico de la exportación CSV según el número de filas.
+
+Compara la exportación en streaming (values_list + iterator) con la
+referencia anterior, que construía el CSV completo en un HttpResponse
+a partir de instancias del modelo.
+
+    python -m benchmarks.exportacion_csv
+"""
+import csv
+import tracemalloc
+
+from .entorno import base_de_datos_temporal, cronometrar, sembrar_asistencias
+
+TAMANOS = [5000, 20000, 80000]
+
+
+def exportar_en_memoria(queryset):
+    from django.http import HttpResponse
+
+    response = HttpResponse(content_type='text/csv')
+    writer = csv.writer(response)
+    for obj in queryset:
+        writer.writerow([
+            str(obj.id), obj.nombre_completo, obj.documento_identidad,
+            obj.correo_electronico, obj.fecha_asistencia.strftime('%d/%m/%Y'),
+            obj.hora_ingreso.strftime('%H:%M'), obj.hora_salida.strftime('%H:%M'),
+            'Sí' if obj.presente else 'No', obj.get_duracion_display(),
+            obj.observaciones or '',
+        ])
+    return response
+
+
+def exportar_en_streaming(queryset):
+    from asistencia.exportacion import respuesta_csv
+
+    response = respuesta_csv(queryset, 'benchmark.csv')
+    for _ in response.streaming_content:
+        pass
+    return response
+
+
+def memoria_pico(funcion, queryset):
+    tracemalloc.start()
+    segundos = cronometrar(lambda: funcion(queryset))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / (1024 * 1024), segundos
+
+
+def main():
+    with base_de_datos_temporal():
+        from asistencia.models import Asistencia
+
+        print(f"{'filas':>8} | {'memoria (MiB)':>14} {'tiempo (s)':>10} | {'streaming (MiB)':>16} {'tiempo (s)':>10}")
+        sembradas = 0
+        for tamano in TAMANOS:
+            sembrar_asistencias(tamano - sembradas, dias=365, inicio=sembradas)
+            sembradas = tamano
+
+            queryset = Asistencia.objects.all()
+            mem_a, t_a = memoria_pico(exportar_en_memoria, queryset)
+            mem_b, t_b = memoria_pico(exportar_en_streaming, queryset)
+            print(f'{tamano:>8} | {mem_a:>14.1f} {t_a:>10.2f} | {mem_b:>16.1f} {t_b:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Tiempo de importación masiva de asistencias desde CSV.
+
+    python -m benchmarks.importacion
+"""
+import io
+from datetime import timedelta
+
+from .entorno import base_de_datos_temporal, cronometrar
+
+TAMANOS = [10000, 100000]
+DIAS = 60
+
+
+def generar_csv(cantidad, hoy):
+    buffer = io.StringIO()
+    buffer.write('nombre_completo,documento_identidad,correo_electronico,'
+                 'fecha_asistencia,hora_ingreso,hora_salida,presente\n')
+    for i in range(cantidad):
+        fecha = hoy - timedelta(days=i % DIAS)
+        buffer.write(
+            f'Persona De Prueba,{1000000 + i // DIAS},persona{i // DIAS}@example.com,'
+            f'{fecha.isoformat()},08:00,16:30,{"Sí" if i % 7 else "No"}\n'
+        )
+    return buffer.getvalue().encode('utf-8')
+
+
+def main():
+    with base_de_datos_temporal():
+        from django.utils import timezone
+
+        from asistencia.importacion import importar_archivo
+        from asistencia.models import Asistencia
+
+        hoy = timezone.localdate()
+        print(f"{'filas':>8} | {'tiempo (s)':>10} {'filas/s':>10}")
+        for tamano in TAMANOS:
+            Asistencia.objects.all().delete()
+            contenido = generar_csv(tamano, hoy)
+            resultado = {}
+
+            def importar():
+                resultado['r'] = importar_archivo(io.BytesIO(contenido), 'benchmark.csv')
+
+            segundos = cronometrar(importar)
+            assert resultado['r'].creados == tamano, resultado['r'].errores[:3]
+            print(f'{tamano:>8} | {segundos:>10.2f} {tamano / segundos:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
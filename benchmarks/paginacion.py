@@ -0,0 +1,49 @@
+"""
+Latencia de la página 1 frente a la página 10.000 de la lista de asistencias
+con paginación OFFSET (Paginator de Django) y por cursor.
+
+    python -m benchmarks.paginacion
+"""
+from .entorno import base_de_datos_temporal, cronometrar, sembrar_asistencias
+
+POR_PAGINA = 25
+PAGINA_PROFUNDA = 10000
+REPETICIONES = 5
+
+
+def main():
+    with base_de_datos_temporal():
+        from django.core.paginator import Paginator
+
+        from asistencia.models import Asistencia
+        from taller_formularios.paginacion import PaginadorCursor
+
+        filas = POR_PAGINA * PAGINA_PROFUNDA
+        sembrar_asistencias(filas, dias=365)
+        queryset = Asistencia.objects.order_by('-fecha_creacion', '-pk')
+
+        def offset(numero):
+            pagina = Paginator(queryset, POR_PAGINA).page(numero)
+            list(pagina.object_list)
+
+        def cursor(token, contar_total):
+            PaginadorCursor(queryset, POR_PAGINA, contar_total=contar_total).pagina(token)
+
+        anterior = queryset[(PAGINA_PROFUNDA - 1) * POR_PAGINA - 1]
+        token = PaginadorCursor(queryset, POR_PAGINA).codificar(anterior, 'siguiente')
+
+        print(f'{filas} filas, {POR_PAGINA} por página, mejor de {REPETICIONES} (ms)')
+        print(f"{'modo':<26} {'página 1':>10} {'página ' + str(PAGINA_PROFUNDA):>14}")
+        casos = [
+            ('offset + COUNT', lambda: offset(1), lambda: offset(PAGINA_PROFUNDA)),
+            ('cursor + COUNT', lambda: cursor(None, True), lambda: cursor(token, True)),
+            ('cursor sin COUNT', lambda: cursor(None, False), lambda: cursor(token, False)),
+        ]
+        for nombre, primera, profunda in casos:
+            t1 = cronometrar(primera, REPETICIONES) * 1000
+            t2 = cronometrar(profunda, REPETICIONES) * 1000
+            print(f'{nombre:<26} {t1:>10.2f} {t2:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Pantallas de recepción con el panel de asistencias: recargando la lista
+cada pocos segundos frente a una conexión de eventos del servidor (panel en
+vivo, ver asistencia/en_vivo.py), mientras un kiosco registra entradas.
+
+    python -m benchmarks.panel_en_vivo [--filas 20000] [--pantallas 100]
+                                       [--cada 2] [--escrituras 40]
+
+Un solo proceso ASGI (gunicorn + uvicorn): la publicación es en el proceso,
+así que con varios procesos los cambios de los demás se ven con el
+recálculo periódico. El kiosco escribe una entrada cada 0,2 s. Por caso se
+informa la latencia de las escrituras y cuánto tarda cada pantalla en
+mostrar cada escritura (desde que se envía hasta que el contador de la
+pantalla la incluye); en "recarga" también las páginas servidas por segundo.
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .carga_asgi import esperar_servidor, percentil, preparar_base_de_datos, puerto_libre
+from .entorno import RAIZ
+
+RUTA_LISTA = '/asistencia/'
+RUTA_EVENTOS = '/asistencia/panel/eventos/'
+RUTA_KIOSCO = '/api/asistencias/kiosco/'
+TOKEN = 'carga'
+PAUSA_ESCRITURAS = 0.2
+_PRESENTES_HOY = re.compile(r'data-panel="presentes_hoy">(\d+)<')
+
+
+class Pantalla(threading.Thread):
+    """Registra (instante, presentes_hoy) cada vez que cambia lo que muestra"""
+
+    def __init__(self, puerto, modo, cada, fin):
+        super().__init__(daemon=True)
+        self.puerto = puerto
+        self.modo = modo
+        self.cada = cada
+        self.fin = fin
+        self.vistas = []
+        self.latencias = []
+
+    def run(self):
+        if self.modo == 'recarga':
+            self.recargar()
+        else:
+            self.escuchar()
+
+    def mostrar(self, valor):
+        if not self.vistas or self.vistas[-1][1] != valor:
+            self.vistas.append((time.perf_counter(), valor))
+
+    def recargar(self):
+        conexion = http.client.HTTPConnection('127.0.0.1', self.puerto, timeout=60)
+        while time.monotonic() < self.fin:
+            inicio = time.perf_counter()
+            conexion.request('GET', RUTA_LISTA)
+            html = conexion.getresponse().read().decode()
+            self.latencias.append((time.perf_counter() - inicio) * 1000)
+            self.mostrar(int(_PRESENTES_HOY.search(html).group(1)))
+            time.sleep(max(0, self.cada - (time.perf_counter() - inicio)))
+        conexion.close()
+
+    def escuchar(self):
+        conexion = http.client.HTTPConnection('127.0.0.1', self.puerto, timeout=60)
+        conexion.request('GET', RUTA_EVENTOS)
+        respuesta = conexion.getresponse()
+        valor = None
+        evento = None
+        while time.monotonic() < self.fin:
+            linea = respuesta.readline().decode().rstrip('\n')
+            if linea.startswith('event: '):
+                evento = linea[7:]
+            elif linea.startswith('data: '):
+                datos = json.loads(linea[6:])
+                if evento == 'valores':
+                    valor = datos['presentes_hoy']
+                else:
+                    valor += datos.get('presentes_hoy', 0)
+                self.mostrar(valor)
+        conexion.close()
+
+
+def escribir(puerto, cantidad):
+    """Entradas de documentos nuevos; retorna (instantes de envío, latencias en ms)"""
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+    cabeceras = {'Content-Type': 'application/json', 'Authorization': f'Bearer {TOKEN}'}
+    envios = []
+    latencias = []
+    for i in range(cantidad):
+        inicio = time.perf_counter()
+        conexion.request('POST', RUTA_KIOSCO, json.dumps({
+            'documento': str(60_000_000 + i),
+            'nombre_completo': 'Persona De Carga',
+            'correo_electronico': 'carga@example.com',
+        }), cabeceras)
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        if respuesta.status != 200:
+            raise RuntimeError(f'El kiosco respondió {respuesta.status}')
+        envios.append(inicio)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(PAUSA_ESCRITURAS)
+    conexion.close()
+    return envios, latencias
+
+
+def retrasos(pantallas, envios):
+    """Milisegundos desde cada envío hasta que cada pantalla lo muestra"""
+    resultado = []
+    for pantalla in pantallas:
+        inicial = pantalla.vistas[0][1]
+        for numero, enviado in enumerate(envios, start=1):
+            mostrado = next((t for t, valor in pantalla.vistas if valor >= inicial + numero), None)
+            if mostrado is not None:
+                resultado.append(max(0, mostrado - enviado) * 1000)
+    return sorted(resultado)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filas', type=int, default=20000)
+    parser.add_argument('--pantallas', type=int, default=100)
+    parser.add_argument('--cada', type=float, default=2, help='Segundos entre recargas')
+    parser.add_argument('--escrituras', type=int, default=40)
+    opciones = parser.parse_args()
+
+    faltantes = [m for m in ('gunicorn', 'uvicorn') if shutil.which(m) is None]
+    if faltantes:
+        sys.exit(f'Faltan {", ".join(faltantes)}: pip install gunicorn uvicorn')
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        plantilla = os.path.join(carpeta, 'plantilla.sqlite3')
+        preparar_base_de_datos(plantilla, opciones.filas)
+        from django.db import connections
+        connections.close_all()
+
+        print(f'{opciones.filas} filas, {opciones.pantallas} pantallas, '
+              f'{opciones.escrituras} escrituras (una cada {PAUSA_ESCRITURAS:g} s)')
+        print(f"{'caso':<9} {'páginas/s':>10} {'escr. p50':>10} {'escr. p99':>10} "
+              f"{'visto p50':>10} {'visto p99':>10}")
+
+        for modo in ('recarga', 'en_vivo'):
+            base = os.path.join(carpeta, f'{modo}.sqlite3')
+            shutil.copy(plantilla, base)
+            entorno = dict(
+                os.environ, CARGA_BD=base, API_TOKENS=TOKEN,
+                DJANGO_SETTINGS_MODULE='benchmarks.ajustes_carga',
+            )
+            puerto = puerto_libre()
+            servidor = subprocess.Popen(
+                ['gunicorn', 'taller_formularios.asgi:application', '-k', 'uvicorn.workers.UvicornWorker',
+                 '-w', '1', '-b', f'127.0.0.1:{puerto}', '--log-level', 'critical'],
+                cwd=RAIZ, env=entorno, stderr=subprocess.DEVNULL,
+            )
+            try:
+                esperar_servidor(puerto)
+                duracion = opciones.escrituras * PAUSA_ESCRITURAS + opciones.cada + 3
+                fin = time.monotonic() + duracion
+                pantallas = [Pantalla(puerto, modo, opciones.cada, fin) for _ in range(opciones.pantallas)]
+                for pantalla in pantallas:
+                    pantalla.start()
+                time.sleep(1)
+                envios, escrituras = escribir(puerto, opciones.escrituras)
+                for pantalla in pantallas:
+                    pantalla.join()
+                paginas = f'{sum(len(p.latencias) for p in pantallas) / duracion:.1f}' if modo == 'recarga' else '-'
+                vistos = retrasos(pantallas, envios)
+                escrituras.sort()
+                print(f'{modo:<9} {paginas:>10} {percentil(escrituras, 50):>10.1f} '
+                      f'{percentil(escrituras, 99):>10.1f} {percentil(vistos, 50):>10.1f} '
+                      f'{percentil(vistos, 99):>10.1f}')
+            finally:
+                servidor.terminate()
+                servidor.wait(timeout=30)
+        print('Latencias en ms.')
+
+
+if __name__ == '__main__':
+    main()
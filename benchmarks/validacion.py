@@ -0,0 +1,156 @@
+"""
+Validaciones por segundo del motor de reglas (taller_formularios.validacion)
+
+Compara, sobre registros de asistencia ya convertidos (10 % inválidos):
+- la referencia anterior: copias de las funciones de validators.py previas
+  al motor, llamadas campo a campo como en la importación (patrón del nombre
+  como cadena, una ValidationError por error);
+- el Esquema registro a registro (errores) y por lotes (errores_lote);
+- Model.full_clean(), que ahora delega en el Esquema (sin consultas de
+  unicidad).
+
+    python -m benchmarks.validacion [--registros 20000]
+"""
+import argparse
+import re
+from datetime import date, datetime, time, timedelta
+
+from .entorno import configurar, cronometrar
+
+REPETICIONES = 3
+
+
+def generar_registros(cantidad, hoy):
+    registros = []
+    for i in range(cantidad):
+        invalido = i % 10 == 0
+        registros.append({
+            'nombre_completo': 'Ana' if invalido else 'Persona De Prueba',
+            'documento_identidad': f'{1000000 + i}',
+            'correo_electronico': f'persona{i}@example.com',
+            'fecha_asistencia': hoy - timedelta(days=i % 60),
+            'hora_ingreso': time(8, 0),
+            'hora_salida': time(8, 10) if invalido else time(16, 30),
+            'presente': True,
+            'observaciones': '',
+        })
+    return registros
+
+
+def _validar_documento(value):
+    # Copia de validators.validar_documento_identidad antes del motor de reglas
+    from django.core.exceptions import ValidationError
+    from django.utils.translation import gettext_lazy as _
+
+    documento = str(value).strip()
+    if not documento.isdigit():
+        raise ValidationError(_('El documento de identidad debe contener solo números.'))
+    if len(documento) < 6:
+        raise ValidationError(_('El documento debe tener al menos 6 dígitos.'))
+    if len(documento) > 20:
+        raise ValidationError(_('El documento no puede tener más de 20 dígitos.'))
+    if documento == '0' * len(documento):
+        raise ValidationError(_('El documento no puede ser solo ceros.'))
+
+
+def _validar_nombre(value):
+    # Copia de validators.validar_nombre_completo antes del motor de reglas
+    from django.core.exceptions import ValidationError
+    from django.utils.translation import gettext_lazy as _
+
+    nombre = str(value).strip()
+    if len(nombre) < 2:
+        raise ValidationError(_('El nombre debe tener al menos 2 caracteres.'))
+    if len(nombre) > 150:
+        raise ValidationError(_('El nombre no puede exceder los 150 caracteres.'))
+    patron = r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s\.\']+$'
+    if not re.match(patron, nombre):
+        raise ValidationError(_('El nombre solo puede contener letras, espacios, puntos y apostrofes.'))
+    palabras = nombre.split()
+    if len(palabras) < 2:
+        raise ValidationError(_('Debe ingresar al menos nombre y apellido.'))
+    for palabra in palabras:
+        if len(palabra.strip()) < 2:
+            raise ValidationError(_('Cada palabra del nombre debe tener al menos 2 caracteres.'))
+    if len(palabras) > 5:
+        raise ValidationError(_('El nombre no puede tener más de 5 palabras.'))
+
+
+def _validar_rango_horas(hora_inicio, hora_fin):
+    # Copia de validators.validar_rango_horas antes del motor de reglas
+    from django.core.exceptions import ValidationError
+    from django.utils.translation import gettext_lazy as _
+
+    if hora_fin <= hora_inicio:
+        raise ValidationError(_('La hora de salida debe ser posterior a la hora de ingreso.'))
+    inicio_dt = datetime.combine(date.today(), hora_inicio)
+    fin_dt = datetime.combine(date.today(), hora_fin)
+    diferencia = fin_dt - inicio_dt
+    if diferencia.total_seconds() > 12 * 3600:
+        raise ValidationError(_('La diferencia entre ingreso y salida no puede exceder 12 horas.'))
+    if diferencia.total_seconds() < 30 * 60:
+        raise ValidationError(_('La diferencia mínima entre ingreso y salida debe ser 30 minutos.'))
+
+
+def referencia(datos, hoy):
+    """Validación campo a campo con las funciones anteriores, como en la importación"""
+    from django.core.exceptions import ValidationError
+
+    errores = {}
+    for campo, funcion in (('nombre_completo', _validar_nombre),
+                           ('documento_identidad', _validar_documento)):
+        try:
+            funcion(datos[campo])
+        except ValidationError as e:
+            errores[campo] = e.messages
+    if datos['fecha_asistencia'] > hoy:
+        errores['fecha_asistencia'] = ['La fecha de asistencia no puede ser futura.']
+    if len(datos['observaciones'] or '') > 500:
+        errores['observaciones'] = ['Las observaciones no pueden exceder 500 caracteres.']
+    try:
+        _validar_rango_horas(datos['hora_ingreso'], datos['hora_salida'])
+    except ValidationError as e:
+        errores['hora_salida'] = e.messages
+    return errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--registros', type=int, default=20000)
+    opciones = parser.parse_args()
+
+    configurar()
+    from django.core.exceptions import ValidationError
+    from django.utils import timezone
+
+    from asistencia.models import Asistencia
+    from asistencia.validators import ESQUEMA
+
+    hoy = timezone.localdate()
+    registros = generar_registros(opciones.registros, hoy)
+    instancias = [Asistencia(**datos) for datos in registros]
+    contexto = ESQUEMA.contexto()
+
+    def full_clean():
+        for instancia in instancias:
+            try:
+                instancia.full_clean(validate_unique=False)
+            except ValidationError:
+                pass
+
+    casos = {
+        'referencia': lambda: [referencia(datos, hoy) for datos in registros],
+        'esquema': lambda: [ESQUEMA.errores(datos, contexto) for datos in registros],
+        'esquema lote': lambda: ESQUEMA.errores_lote(registros),
+        'full_clean': full_clean,
+    }
+
+    print(f'{opciones.registros} registros, mejor de {REPETICIONES}')
+    print(f"{'caso':<14} | {'tiempo (s)':>10} {'validaciones/s':>15}")
+    for nombre, funcion in casos.items():
+        segundos = cronometrar(funcion, REPETICIONES)
+        print(f'{nombre:<14} | {segundos:>10.3f} {opciones.registros / segundos:>15.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Procesamiento en segundo plano de los adjuntos de Solicitud
+
+Django ya recibe los archivos grandes por bloques en un temporal
+(FILE_UPLOAD_MAX_MEMORY_SIZE / FILE_UPLOAD_TEMP_DIR). En la petición el
+temporal solo se renombra a la carpeta de pendientes y la solicitud se guarda
+con adjunto_estado = 'pendiente'; al confirmar la transacción se encola su id
+y la respuesta sale sin esperar la copia al almacenamiento.
+
+Un grupo de hilos del proceso mueve el archivo al almacenamiento, calcula el
+SHA-256, detecta el tipo MIME por su firma y genera una vista previa de
+imágenes (con Pillow) y PDF (con pdftoppm), si están disponibles. La propia
+tabla hace de cola: lo que quede pendiente tras un reinicio lo procesa el
+comando `procesar_adjuntos`.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.move import file_move_safe
+from django.core.files.uploadedfile import UploadedFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Solicitud
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él no hay vista previa de imágenes
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+TAMANO_BLOQUE = 64 * 1024
+TAMANO_VISTA_PREVIA = (320, 320)
+
+# Firmas (magic numbers) de los tipos que se aceptan en el formulario
+FIRMAS = [
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword'),
+    (b'PK\x03\x04', 'application/zip'),
+]
+
+
+def diferido():
+    return getattr(settings, 'SOLICITUDES_ADJUNTOS_ASINCRONOS', True)
+
+
+def carpeta_pendientes():
+    carpeta = Path(getattr(
+        settings, 'SOLICITUDES_ADJUNTOS_PENDIENTES',
+        Path(settings.MEDIA_ROOT) / 'solicitudes_pendientes'
+    ))
+    carpeta.mkdir(parents=True, exist_ok=True)
+    return carpeta
+
+
+class ArchivoPendiente(File):
+    """
+    Archivo de la carpeta de pendientes. Expone temporary_file_path para que
+    FileSystemStorage lo mueva (rename) en lugar de copiarlo por bloques.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = str(ruta)
+        super().__init__(open(self.ruta, 'rb'), name=os.path.basename(self.ruta))
+
+    def temporary_file_path(self):
+        return self.ruta
+
+
+def preparar(archivo):
+    """
+    Deja el archivo subido en la carpeta de pendientes y retorna su nombre.
+    Un temporal en disco solo se renombra; uno en memoria se escribe por bloques.
+    """
+    extension = os.path.splitext(archivo.name)[1].lower()
+    nombre = f'{uuid.uuid4().hex}{extension}'
+    destino = carpeta_pendientes() / nombre
+    if hasattr(archivo, 'temporary_file_path'):
+        file_move_safe(archivo.temporary_file_path(), str(destino))
+        # Cerrar un TemporaryUploadedFile borra su temporal, que ya se movió
+        # (como en FileSystemStorage._save)
+        try:
+            archivo.close()
+        except FileNotFoundError:
+            pass
+    else:
+        with open(destino, 'wb') as salida:
+            for bloque in archivo.chunks(TAMANO_BLOQUE):
+                salida.write(bloque)
+    return nombre
+
+
+def guardar_formulario(form):
+    """
+    Guarda el formulario de solicitud. Si trae un archivo nuevo y el
+    procesamiento diferido está activo, el adjunto queda pendiente y se
+    encola al confirmar la transacción.
+    """
+    archivo = form.cleaned_data.get('archivo_adjunto')
+    if not isinstance(archivo, UploadedFile):
+        return form.save()
+    if not diferido():
+        form.instance.adjunto_nombre = os.path.basename(archivo.name)[:255]
+        return form.save()
+
+    solicitud = form.save(commit=False)
+    solicitud.archivo_adjunto = None
+    solicitud.adjunto_vista_previa = None
+    solicitud.adjunto_estado = Solicitud.ADJUNTO_PENDIENTE
+    solicitud.adjunto_nombre = os.path.basename(archivo.name)[:255]
+    solicitud.adjunto_pendiente = preparar(archivo)
+    solicitud.adjunto_tamano = None
+    solicitud.adjunto_sha256 = ''
+    solicitud.adjunto_tipo_mime = ''
+    solicitud.adjunto_error = ''
+    with transaction.atomic():
+        solicitud.save()
+        transaction.on_commit(partial(encolar, solicitud.pk))
+    return solicitud
+
+
+_executor = None
+_lock_executor = threading.Lock()
+
+
+def _grupo_hilos():
+    global _executor
+    with _lock_executor:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'SOLICITUDES_ADJUNTOS_HILOS', 2),
+                thread_name_prefix='adjuntos',
+            )
+        return _executor
+
+
+def encolar(pk):
+    """Procesa el adjunto en el grupo de hilos (o en línea si no es diferido)"""
+    if diferido():
+        _grupo_hilos().submit(_procesar_en_hilo, pk)
+    else:
+        procesar(pk)
+
+
+def _procesar_en_hilo(pk):
+    close_old_connections()
+    try:
+        procesar(pk)
+    except Exception:
+        logger.exception('Error no controlado procesando el adjunto de la solicitud %s', pk)
+    finally:
+        close_old_connections()
+
+
+def tipo_mime(cabecera, nombre):
+    """Tipo MIME por la firma del archivo; el nombre solo desempata ZIP y los desconocidos"""
+    for firma, tipo in FIRMAS:
+        if cabecera.startswith(firma):
+            if tipo == 'application/zip':
+                return mimetypes.guess_type(nombre)[0] or tipo
+            return tipo
+    return mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+
+
+def huella(ruta):
+    """SHA-256, tamaño y primeros bytes del archivo, leyéndolo una sola vez"""
+    sha = hashlib.sha256()
+    tamano = 0
+    cabecera = b''
+    with open(ruta, 'rb') as entrada:
+        for bloque in iter(partial(entrada.read, TAMANO_BLOQUE), b''):
+            if not cabecera:
+                cabecera = bloque[:16]
+            sha.update(bloque)
+            tamano += len(bloque)
+    return sha.hexdigest(), tamano, cabecera
+
+
+def vista_previa(ruta, tipo):
+    """Miniatura PNG del archivo, o None si el tipo no tiene o falta la herramienta"""
+    if tipo.startswith('image/') and Image is not None:
+        with Image.open(ruta) as imagen:
+            imagen.thumbnail(TAMANO_VISTA_PREVIA)
+            salida = BytesIO()
+            imagen.convert('RGB').save(salida, format='PNG')
+            return salida.getvalue()
+    if tipo == 'application/pdf' and shutil.which('pdftoppm'):
+        with tempfile.TemporaryDirectory() as carpeta:
+            base = os.path.join(carpeta, 'vista')
+            subprocess.run(
+                ['pdftoppm', '-png', '-singlefile', '-f', '1', '-l', '1',
+                 '-scale-to', str(max(TAMANO_VISTA_PREVIA)), str(ruta), base],
+                check=True, capture_output=True, timeout=60,
+            )
+            with open(f'{base}.png', 'rb') as png:
+                return png.read()
+    return None
+
+
+def procesar(pk):
+    """
+    Procesa el adjunto pendiente de una solicitud. Solo un trabajador puede
+    tomarlo: el cambio a 'procesando' es un UPDATE condicionado al estado.
+    Retorna True si lo procesó.
+    """
+    tomado = Solicitud.objects.filter(
+        pk=pk, adjunto_estado=Solicitud.ADJUNTO_PENDIENTE
+    ).update(
+        adjunto_estado=Solicitud.ADJUNTO_PROCESANDO, fecha_actualizacion=timezone.now(),
+    )
+    if not tomado:
+        return False
+
+    solicitud = Solicitud.objects.get(pk=pk)
+    ruta = carpeta_pendientes() / solicitud.adjunto_pendiente
+    try:
+        sha256, tamano, cabecera = huella(ruta)
+        tipo = tipo_mime(cabecera, solicitud.adjunto_nombre)
+        try:
+            miniatura = vista_previa(ruta, tipo)
+        except Exception:
+            logger.warning('No se pudo generar la vista previa de la solicitud %s', pk, exc_info=True)
+            miniatura = None
+
+        with ArchivoPendiente(ruta) as archivo:
+            # El almacenamiento deduplicado reutiliza el hash ya calculado
+            archivo.sha256 = sha256
+            solicitud.archivo_adjunto.save(solicitud.adjunto_nombre, archivo, save=False)
+        if miniatura:
+            nombre = f'{os.path.splitext(solicitud.adjunto_nombre)[0]}.png'
+            solicitud.adjunto_vista_previa.save(nombre, ContentFile(miniatura), save=False)
+    except Exception as e:
+        logger.exception('Error procesando el adjunto de la solicitud %s', pk)
+        solicitud.adjunto_estado = Solicitud.ADJUNTO_ERROR
+        solicitud.adjunto_error = str(e)[:1000]
+        solicitud.save(update_fields=['adjunto_estado', 'adjunto_error', 'fecha_actualizacion'])
+        return False
+
+    solicitud.adjunto_estado = Solicitud.ADJUNTO_LISTO
+    solicitud.adjunto_pendiente = ''
+    solicitud.adjunto_sha256 = sha256
+    solicitud.adjunto_tamano = tamano
+    solicitud.adjunto_tipo_mime = tipo
+    solicitud.adjunto_error = ''
+    solicitud.save(update_fields=[
+        'archivo_adjunto', 'adjunto_vista_previa', 'adjunto_estado',
+        'adjunto_pendiente', 'adjunto_sha256', 'adjunto_tamano',
+        'adjunto_tipo_mime', 'adjunto_error', 'fecha_actualizacion',
+    ])
+    return True
+
+
+def reintentar(estados=(Solicitud.ADJUNTO_PROCESANDO, Solicitud.ADJUNTO_ERROR)):
+    """Devuelve a la cola los adjuntos interrumpidos o fallidos que aún tienen archivo"""
+    return Solicitud.objects.filter(adjunto_estado__in=estados)\
+        .exclude(adjunto_pendiente='')\
+        .update(
+            adjunto_estado=Solicitud.ADJUNTO_PENDIENTE,
+            adjunto_error='',
+            fecha_actualizacion=timezone.now(),
+        )
+
+
+def procesar_pendientes(limite=None):
+    """Procesa en este hilo los adjuntos pendientes; retorna cuántos procesó"""
+    pendientes = Solicitud.objects.filter(
+        adjunto_estado=Solicitud.ADJUNTO_PENDIENTE
+    ).order_by('pk').values_list('pk', flat=True)
+    if limite:
+        pendientes = pendientes[:limite]
+    return sum(1 for pk in list(pendientes) if procesar(pk))
@@ -1,7 +1,11 @@
 from django.contrib import admin
+
+from taller_formularios.busqueda import BusquedaAdminMixin
+from taller_formularios.proyeccion import ProyeccionAdminMixin
+
 from .models import Solicitud
 @admin.register(Solicitud)
-class SolicitudAdmin(admin.ModelAdmin):
+class SolicitudAdmin(ProyeccionAdminMixin, BusquedaAdminMixin, admin.ModelAdmin):
     list_display = [
         'nombre_solicitante',
         'documento_identidad', 
@@ -11,8 +15,12 @@ class SolicitudAdmin(admin.ModelAdmin):
         'correo_electronico'
     ]
     
+    # Columnas que lee la lista de cambios: sin la descripción ni los adjuntos
+    campos_lista = list_display + ['id']
+    
     list_filter = [
         'tipo_solicitud',
+        'adjunto_estado',
         'fecha_solicitud',
         'fecha_creacion'
     ]
@@ -25,6 +33,13 @@ class SolicitudAdmin(admin.ModelAdmin):
     ]
     
     readonly_fields = [
+        'adjunto_estado',
+        'adjunto_nombre',
+        'adjunto_tamano',
+        'adjunto_sha256',
+        'adjunto_tipo_mime',
+        'adjunto_vista_previa',
+        'adjunto_error',
         'fecha_solicitud',
         'fecha_creacion', 
         'fecha_actualizacion'
@@ -47,6 +62,18 @@ class SolicitudAdmin(admin.ModelAdmin):
                 'archivo_adjunto'
             )
         }),
+        ('Procesamiento del adjunto', {
+            'classes': ('collapse',),
+            'fields': (
+                'adjunto_estado',
+                'adjunto_nombre',
+                'adjunto_tamano',
+                'adjunto_sha256',
+                'adjunto_tipo_mime',
+                'adjunto_vista_previa',
+                'adjunto_error'
+            )
+        }),
         ('Fechas', {
             'fields': (
                 'fecha_solicitud',
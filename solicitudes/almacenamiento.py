@@ -0,0 +1,224 @@
+"""
+Almacenamiento deduplicado por contenido para los adjuntos de Solicitud
+
+Cada archivo se guarda una sola vez bajo su SHA-256
+(`blobs/ab/cd/abcd…`), sin importar su nombre ni cuántas solicitudes lo
+adjunten. El hash se calcula mientras el archivo se escribe por bloques; si
+el contenido ya existía, la copia nueva se descarta.
+
+El registro ArchivoContenido lleva el tamaño y el número de referencias
+desde las filas de Solicitud (lo mantienen las señales de la app). El
+comando `recolectar_adjuntos` elimina los contenidos sin referencias.
+
+Guardar y recolectar se excluyen por la fila de ArchivoContenido: el
+guardado la crea o renueva su `ultimo_uso` antes de mirar el disco, y la
+recolección borra el archivo en la misma transacción que la fila, solo si
+sigue sin referencias y sin uso reciente.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+PREFIJO_BLOBS = 'blobs'
+TAMANO_BLOQUE = 64 * 1024
+_NOMBRE_BLOB = re.compile(rf'^{PREFIJO_BLOBS}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})$')
+
+
+def nombre_blob(sha256):
+    return f'{PREFIJO_BLOBS}/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def sha256_de(nombre):
+    """SHA-256 de un nombre de blob, o None si es un archivo con ruta clásica"""
+    coincidencia = _NOMBRE_BLOB.match(nombre or '')
+    return coincidencia.group(1) if coincidencia else None
+
+
+class AlmacenamientoDeduplicado(FileSystemStorage):
+    """
+    FileSystemStorage que ignora el nombre pedido y guarda por contenido.
+    Los archivos con rutas anteriores (solicitudes/<documento>/...) se
+    siguen leyendo y borrando como en FileSystemStorage.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre final depende del contenido: no hace falta buscar uno libre
+        return name
+
+    def _save(self, name, content):
+        temporal = os.path.join(self.location, PREFIJO_BLOBS, 'tmp')
+        os.makedirs(temporal, exist_ok=True)
+
+        if hasattr(content, 'temporary_file_path'):
+            # Ya está en disco: basta leerlo para el hash y moverlo
+            origen = content.temporary_file_path()
+            sha256, tamano = getattr(content, 'sha256', None), None
+            if not sha256:
+                sha256, tamano = _hash_archivo(origen)
+            tamano = tamano if tamano is not None else os.path.getsize(origen)
+        else:
+            sha256, tamano, origen = _escribir_con_hash(content, temporal)
+
+        from .models import ArchivoContenido
+        nombre = nombre_blob(sha256)
+        destino = self.path(nombre)
+        with transaction.atomic(using=router.db_for_write(ArchivoContenido)):
+            # Primero la fila (bloqueada hasta confirmar): una recolección que
+            # la vea ya no tiene uso antiguo, y una que ya la borró también
+            # borró el archivo, así que el existe de abajo da lo correcto
+            ArchivoContenido.objects.update_or_create(
+                sha256=sha256,
+                defaults={'ultimo_uso': timezone.now()},
+                create_defaults={'tamano': tamano},
+            )
+            if os.path.exists(destino):
+                os.remove(origen)
+            else:
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                file_move_safe(origen, destino, allow_overwrite=True)
+                # mtime de ahora: la recolección de huérfanos usa el mismo plazo de gracia
+                os.utime(destino)
+                if self.file_permissions_mode is not None:
+                    os.chmod(destino, self.file_permissions_mode)
+        return nombre
+
+    def delete(self, name):
+        # Un blob puede estar compartido: solo lo borra la recolección
+        if sha256_de(name):
+            return
+        super().delete(name)
+
+    def borrar_blob(self, sha256):
+        super().delete(nombre_blob(sha256))
+
+
+def _hash_archivo(ruta):
+    sha = hashlib.sha256()
+    tamano = 0
+    with open(ruta, 'rb') as entrada:
+        for bloque in iter(partial(entrada.read, TAMANO_BLOQUE), b''):
+            sha.update(bloque)
+            tamano += len(bloque)
+    return sha.hexdigest(), tamano
+
+
+def _escribir_con_hash(content, carpeta):
+    """Escribe el contenido por bloques en un temporal calculando su hash"""
+    sha = hashlib.sha256()
+    tamano = 0
+    descriptor, ruta = tempfile.mkstemp(dir=carpeta)
+    try:
+        with os.fdopen(descriptor, 'wb') as salida:
+            for bloque in content.chunks(TAMANO_BLOQUE):
+                if isinstance(bloque, str):
+                    bloque = bloque.encode()
+                sha.update(bloque)
+                tamano += len(bloque)
+                salida.write(bloque)
+    except BaseException:
+        os.remove(ruta)
+        raise
+    return sha.hexdigest(), tamano, ruta
+
+
+def recontar_referencias():
+    """
+    Recalcula el contador de referencias de todos los blobs a partir de las
+    filas de Solicitud. Corrige desvíos por escrituras que no pasan por las
+    señales (update() masivos, restauraciones de respaldo).
+    """
+    from .models import ArchivoContenido, Solicitud
+
+    conteo = Counter()
+    for nombres in Solicitud.objects.values_list('archivo_adjunto', 'adjunto_vista_previa').iterator():
+        conteo.update(s for s in map(sha256_de, nombres) if s)
+
+    cambiados = []
+    for blob in ArchivoContenido.objects.only('sha256', 'referencias').iterator():
+        if blob.referencias != conteo[blob.sha256]:
+            blob.referencias = conteo[blob.sha256]
+            cambiados.append(blob)
+    ArchivoContenido.objects.bulk_update(cambiados, ['referencias'], batch_size=500)
+    return len(cambiados)
+
+
+def recolectar(gracia, almacenamiento=None):
+    """
+    Elimina los blobs sin referencias que no se usan desde hace más de
+    `gracia` (timedelta), y los temporales y archivos huérfanos de la carpeta
+    de blobs más antiguos que ese plazo. Retorna el número de blobs borrados.
+    """
+    from .models import ArchivoContenido
+
+    almacenamiento = almacenamiento or almacenamiento_deduplicado
+    limite = timezone.now() - gracia
+    borrados = 0
+    candidatos = ArchivoContenido.objects.filter(referencias=0, ultimo_uso__lt=limite)\
+        .values_list('sha256', flat=True)
+    for sha256 in list(candidatos):
+        with transaction.atomic(using=router.db_for_write(ArchivoContenido)):
+            # Borrado condicionado: si entre tanto se volvió a usar, se
+            # conserva. El archivo se borra antes de confirmar, mientras la
+            # fila borrada detiene a un guardado del mismo contenido.
+            eliminados, _ = ArchivoContenido.objects.filter(
+                sha256=sha256, referencias=0, ultimo_uso__lt=limite
+            ).delete()
+            if eliminados:
+                almacenamiento.borrar_blob(sha256)
+                borrados += 1
+
+    raiz = almacenamiento.path(PREFIJO_BLOBS)
+    if not os.path.isdir(raiz):
+        return borrados
+    conocidos = None
+    for carpeta, _, archivos in os.walk(raiz):
+        for archivo in archivos:
+            ruta = os.path.join(carpeta, archivo)
+            if os.path.getmtime(ruta) >= limite.timestamp():
+                continue
+            if os.path.basename(carpeta) != 'tmp':
+                if conocidos is None:
+                    conocidos = set(ArchivoContenido.objects.values_list('sha256', flat=True))
+                if archivo in conocidos:
+                    continue
+            os.remove(ruta)
+    return borrados
+
+
+almacenamiento_deduplicado = AlmacenamientoDeduplicado()
+
+
+def almacenamiento_adjuntos():
+    """Almacenamiento de los campos de archivo de Solicitud"""
+    if getattr(settings, 'SOLICITUDES_ALMACENAMIENTO_DEDUPLICADO', True):
+        return almacenamiento_deduplicado
+    return default_storage
+
+
+def ajustar_referencias(anteriores, nuevos):
+    """
+    Actualiza el contador de referencias al cambiar los archivos de una fila:
+    resta a los blobs que dejó de usar y suma a los que empezó a usar
+    """
+    from .models import ArchivoContenido
+
+    anteriores = [s for s in map(sha256_de, anteriores) if s]
+    nuevos = [s for s in map(sha256_de, nuevos) if s]
+    for sha256 in nuevos:
+        if sha256 in anteriores:
+            anteriores.remove(sha256)
+            continue
+        ArchivoContenido.objects.filter(sha256=sha256).update(referencias=F('referencias') + 1)
+    for sha256 in anteriores:
+        ArchivoContenido.objects.filter(sha256=sha256, referencias__gt=0)\
+            .update(referencias=F('referencias') - 1)
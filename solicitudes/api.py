@@ -0,0 +1,34 @@
+"""
+Recurso de la API JSON para solicitudes (ver taller_formularios/api.py)
+
+Los adjuntos no pasan por la API: se suben desde el formulario HTML.
+"""
+from taller_formularios.api import RecursoAPI
+
+from .forms import SolicitudForm
+
+
+class SolicitudAPIForm(SolicitudForm):
+    class Meta(SolicitudForm.Meta):
+        fields = [campo for campo in SolicitudForm.Meta.fields if campo != 'archivo_adjunto']
+
+
+class RecursoSolicitudes(RecursoAPI):
+    modelo = SolicitudAPIForm._meta.model
+    formulario = SolicitudAPIForm
+    campos = (
+        'id', 'nombre_solicitante', 'documento_identidad', 'correo_electronico',
+        'telefono_contacto', 'tipo_solicitud', 'asunto', 'descripcion_detallada',
+        'fecha_solicitud', 'adjunto_estado', 'adjunto_nombre', 'adjunto_tamano',
+        'adjunto_tipo_mime', 'fecha_creacion', 'fecha_actualizacion',
+    )
+    filtros = {
+        'tipo': 'tipo_solicitud',
+        'documento': 'documento_identidad',
+        'estado_adjunto': 'adjunto_estado',
+    }
+
+
+app_name = 'api_solicitudes'
+
+urlpatterns = RecursoSolicitudes().urls()
@@ -2,6 +2,13 @@ from django.apps import AppConfig
 import os
 from django.conf import settings
 
+# Campos del índice de texto completo y su peso en el ranking
+CAMPOS_BUSQUEDA = [
+    'nombre_solicitante', 'asunto', 'documento_identidad',
+    'correo_electronico', 'descripcion_detallada',
+]
+PESOS_BUSQUEDA = ['A', 'A', 'A', 'B', 'C']
+
 class SolicitudesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'solicitudes'
@@ -9,6 +16,12 @@ class SolicitudesConfig(AppConfig):
 
     def ready(self):
         """Ensure MEDIA_ROOT exists and has permissive permissions in development."""
+        from taller_formularios import busqueda
+        from . import signals  # noqa: F401
+        from .models import Solicitud
+
+        busqueda.registrar(Solicitud, CAMPOS_BUSQUEDA, PESOS_BUSQUEDA)
+
         try:
             media_root = settings.MEDIA_ROOT
             if media_root:
@@ -2,7 +2,8 @@ from django import forms
 from django.core.exceptions import ValidationError
 from .models import Solicitud
 from django.conf import settings
-import re
+
+from taller_formularios import validacion
 
 class SolicitudForm(forms.ModelForm):
     class Meta:
@@ -53,65 +54,21 @@ class SolicitudForm(forms.ModelForm):
             })
         }
     
-    def clean_nombre_solicitante(self):
-        nombre = self.cleaned_data.get('nombre_solicitante')
-        if nombre:
-            # Validar que contenga al menos dos palabras
-            palabras = nombre.strip().split()
-            if len(palabras) < 2:
-                raise ValidationError('Debe ingresar al menos nombres y apellidos.')
-            
-            # Validar que solo contenga letras y espacios
-            if not re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ\s]+$', nombre):
-                raise ValidationError('El nombre solo debe contener letras y espacios.')
-        
-        return nombre
-    
-    def clean_documento_identidad(self):
-        documento = self.cleaned_data.get('documento_identidad')
-        if documento:
-            # Validar que sea solo números
-            if not documento.isdigit():
-                raise ValidationError('El documento debe contener solo números.')
-            
-            if len(documento) < 6 or len(documento) > 20:
-                raise ValidationError('El documento debe tener entre 6 y 20 dígitos.')
-        
-        return documento
-    
+    # Las reglas de nombre, documento, teléfono, asunto y descripción están en
+    # validators.ESQUEMA y se aplican una vez, en Solicitud.clean(); aquí solo
+    # se normalizan los valores antes de esa validación.
+
     def clean_telefono_contacto(self):
         telefono = self.cleaned_data.get('telefono_contacto')
         if telefono:
-            # Remover espacios y caracteres especiales
-            telefono_limpio = re.sub(r'[^\d]', '', telefono)
-            
-            # Validar longitud
-            if len(telefono_limpio) < 7 or len(telefono_limpio) > 15:
-                raise ValidationError('El teléfono debe tener entre 7 y 15 dígitos.')
-            
-            return telefono_limpio
-        
+            return validacion.solo_digitos(telefono)
         return telefono
-    
+
     def clean_asunto(self):
-        asunto = self.cleaned_data.get('asunto')
-        if asunto:
-            asunto = asunto.strip()
-            if len(asunto) < 5:
-                raise ValidationError('El asunto debe tener al menos 5 caracteres.')
-            if len(asunto) > 200:
-                raise ValidationError('El asunto no puede exceder 200 caracteres.')
-        
-        return asunto
-    
+        return (self.cleaned_data.get('asunto') or '').strip()
+
     def clean_descripcion_detallada(self):
-        descripcion = self.cleaned_data.get('descripcion_detallada')
-        if descripcion:
-            descripcion = descripcion.strip()
-            if len(descripcion) < 20:
-                raise ValidationError('La descripción debe tener al menos 20 caracteres.')
-        
-        return descripcion
+        return (self.cleaned_data.get('descripcion_detallada') or '').strip()
     
     def clean_archivo_adjunto(self):
         archivo = self.cleaned_data.get('archivo_adjunto')
@@ -0,0 +1,38 @@
+"""
+Modelos de lectura de solicitudes: las columnas que usa cada lista
+"""
+from django.db.models.functions import Left
+
+from taller_formularios.proyeccion import Lectura
+
+from .models import Solicitud
+
+# Suficiente para las 15 palabras del resumen sin leer la descripción completa
+LARGO_RESUMEN = 200
+
+
+class SolicitudEnLista(Lectura):
+    """Tarjeta de solicitud_list.html"""
+    modelo = Solicitud
+    campos = (
+        'pk',
+        'nombre_solicitante',
+        'tipo_solicitud',
+        'asunto',
+        'fecha_creacion',
+    )
+    anotaciones = {
+        'descripcion_resumen': Left('descripcion_detallada', LARGO_RESUMEN),
+    }
+
+
+class SolicitudReciente(Lectura):
+    """Fila de "Últimas solicitudes" en la lista de asistencias"""
+    modelo = Solicitud
+    campos = (
+        'pk',
+        'fecha_solicitud',
+        'nombre_solicitante',
+        'tipo_solicitud',
+        'asunto',
+    )
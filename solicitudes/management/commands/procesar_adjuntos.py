@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from solicitudes import adjuntos
+
+
+class Command(BaseCommand):
+    help = 'Procesa los adjuntos de solicitudes que quedaron pendientes en la cola'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reintentar',
+            action='store_true',
+            help='Devuelve a la cola los adjuntos interrumpidos o con error antes de procesar'
+        )
+        parser.add_argument(
+            '--limite',
+            type=int,
+            default=None,
+            help='Máximo de adjuntos a procesar en esta ejecución'
+        )
+
+    def handle(self, *args, **options):
+        if options['reintentar']:
+            reintentados = adjuntos.reintentar()
+            self.stdout.write(f'{reintentados} adjunto(s) devuelto(s) a la cola.')
+
+        procesados = adjuntos.procesar_pendientes(options['limite'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{procesados} adjunto(s) procesado(s).'
+        ))
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from solicitudes.almacenamiento import recolectar, recontar_referencias
+
+
+class Command(BaseCommand):
+    help = 'Elimina los contenidos de adjuntos que ya no usa ninguna solicitud'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recontar',
+            action='store_true',
+            help='Recalcula las referencias desde las solicitudes antes de recolectar'
+        )
+        parser.add_argument(
+            '--gracia',
+            type=int,
+            default=60,
+            help='Minutos sin uso antes de borrar un contenido sin referencias (por defecto 60)'
+        )
+
+    def handle(self, *args, **options):
+        if options['recontar']:
+            corregidos = recontar_referencias()
+            self.stdout.write(f'{corregidos} contador(es) de referencias corregido(s).')
+
+        borrados = recolectar(timedelta(minutes=options['gracia']))
+        self.stdout.write(self.style.SUCCESS(
+            f'{borrados} contenido(s) sin referencias eliminado(s).'
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='solicitudes_fecha_c_b0687e_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+from taller_formularios import busqueda
+
+CAMPOS = [
+    'nombre_solicitante', 'asunto', 'documento_identidad',
+    'correo_electronico', 'descripcion_detallada',
+]
+PESOS = ['A', 'A', 'A', 'B', 'C']
+
+
+def crear_indice(apps, schema_editor):
+    Solicitud = apps.get_model('solicitudes', 'Solicitud')
+    busqueda.crear_indice(schema_editor, Solicitud, CAMPOS, PESOS)
+
+
+def eliminar_indice(apps, schema_editor):
+    Solicitud = apps.get_model('solicitudes', 'Solicitud')
+    busqueda.eliminar_indice(schema_editor, Solicitud, CAMPOS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0002_solicitud_indice_cursor'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:00
+
+import solicitudes.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0003_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_error',
+            field=models.TextField(blank=True, verbose_name='Error de procesamiento'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_estado',
+            field=models.CharField(blank=True, choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('listo', 'Listo'), ('error', 'Error')], default='', max_length=12, verbose_name='Estado del adjunto'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_nombre',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Nombre original del adjunto'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_pendiente',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_sha256',
+            field=models.CharField(blank=True, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_tamano',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Tamaño (bytes)'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_tipo_mime',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Tipo MIME'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='adjunto_vista_previa',
+            field=models.FileField(blank=True, null=True, upload_to=solicitudes.models.upload_to_vistas_previas, verbose_name='Vista previa'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitud',
+            index=models.Index(condition=models.Q(('adjunto_estado__in', ['pendiente', 'procesando'])), fields=['adjunto_estado', 'id'], name='solicitud_adjunto_cola_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:03
+
+import django.utils.timezone
+import solicitudes.almacenamiento
+import solicitudes.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0004_adjunto_procesamiento'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='solicitud',
+            name='adjunto_vista_previa',
+            field=models.FileField(blank=True, null=True, storage=solicitudes.almacenamiento.almacenamiento_adjuntos, upload_to=solicitudes.models.upload_to_vistas_previas, verbose_name='Vista previa'),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='archivo_adjunto',
+            field=models.FileField(blank=True, help_text='Archivo opcional (máximo 5MB)', null=True, storage=solicitudes.almacenamiento.almacenamiento_adjuntos, upload_to=solicitudes.models.upload_to_solicitudes, validators=[solicitudes.models.validar_tamaño_archivo], verbose_name='Archivo adjunto'),
+        ),
+        migrations.CreateModel(
+            name='ArchivoContenido',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('tamano', models.PositiveBigIntegerField(verbose_name='Tamaño (bytes)')),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('ultimo_uso', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Contenido de adjunto',
+                'verbose_name_plural': 'Contenidos de adjuntos',
+                'indexes': [models.Index(condition=models.Q(('referencias', 0)), fields=['ultimo_uso'], name='archivo_sin_referencias_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0005_almacenamiento_deduplicado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='solicitud',
+            name='documento_identidad',
+            field=models.CharField(help_text='Ingrese solo números', max_length=20, verbose_name='Documento de identidad'),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='telefono_contacto',
+            field=models.CharField(help_text='Ingrese solo números (7-15 dígitos)', max_length=15, verbose_name='Teléfono de contacto'),
+        ),
+    ]
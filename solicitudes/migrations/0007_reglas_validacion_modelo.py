@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:24
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0006_reglas_validacion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='solicitud',
+            name='descripcion_detallada',
+            field=models.TextField(help_text='Proporcione una descripción completa de su solicitud (mínimo 20 caracteres)', verbose_name='Descripción detallada'),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='nombre_solicitante',
+            field=models.CharField(help_text='Ingrese nombre y apellido (de 2 a 5 palabras)', max_length=150, verbose_name='Nombre completo del solicitante'),
+        ),
+        migrations.AlterField(
+            model_name='solicitud',
+            name='telefono_contacto',
+            field=models.CharField(help_text='Ingrese solo números (7-15 dígitos)', max_length=15, validators=[django.core.validators.RegexValidator(message='El teléfono debe contener solo números.', regex='^\\d+$')], verbose_name='Teléfono de contacto'),
+        ),
+    ]
@@ -1,8 +1,12 @@
 from django.db import models
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 import os
 
+from .almacenamiento import almacenamiento_adjuntos, nombre_blob
+from .validators import ESQUEMA
+
 def validar_tamaño_archivo(value):
     """Valida que el archivo no exceda 5MB"""
     limit = 5 * 1024 * 1024  # 5MB
@@ -12,6 +16,9 @@ def validar_tamaño_archivo(value):
 def upload_to_solicitudes(instance, filename):
     return f'solicitudes/{instance.documento_identidad}/{filename}'
 
+def upload_to_vistas_previas(instance, filename):
+    return f'solicitudes/{instance.documento_identidad}/vistas/{filename}'
+
 class Solicitud(models.Model):
     TIPO_SOLICITUD_CHOICES = [
         ('academica', 'Académica'),
@@ -19,22 +26,27 @@ class Solicitud(models.Model):
         ('tecnica', 'Técnica'),
         ('otra', 'Otra'),
     ]
+
+    ADJUNTO_PENDIENTE = 'pendiente'
+    ADJUNTO_PROCESANDO = 'procesando'
+    ADJUNTO_LISTO = 'listo'
+    ADJUNTO_ERROR = 'error'
+    ESTADO_ADJUNTO_CHOICES = [
+        (ADJUNTO_PENDIENTE, 'Pendiente'),
+        (ADJUNTO_PROCESANDO, 'Procesando'),
+        (ADJUNTO_LISTO, 'Listo'),
+        (ADJUNTO_ERROR, 'Error'),
+    ]
     
     nombre_solicitante = models.CharField(
         max_length=150,
         verbose_name="Nombre completo del solicitante",
-        help_text="Ingrese el nombre completo"
+        help_text="Ingrese nombre y apellido (de 2 a 5 palabras)"
     )
     
     documento_identidad = models.CharField(
         max_length=20,
         verbose_name="Documento de identidad",
-        validators=[
-            RegexValidator(
-                regex=r'^\d+$',
-                message='El documento de identidad debe contener solo números.'
-            )
-        ],
         help_text="Ingrese solo números"
     )
     
@@ -46,10 +58,11 @@ class Solicitud(models.Model):
     telefono_contacto = models.CharField(
         max_length=15,
         verbose_name="Teléfono de contacto",
+        # La longitud (7-15 dígitos) la comprueba validators.ESQUEMA
         validators=[
             RegexValidator(
-                regex=r'^\d{7,15}$',
-                message='El teléfono debe contener entre 7 y 15 números.'
+                regex=r'^\d+$',
+                message='El teléfono debe contener solo números.'
             )
         ],
         help_text="Ingrese solo números (7-15 dígitos)"
@@ -70,7 +83,7 @@ class Solicitud(models.Model):
     
     descripcion_detallada = models.TextField(
         verbose_name="Descripción detallada",
-        help_text="Proporcione una descripción completa de su solicitud"
+        help_text="Proporcione una descripción completa de su solicitud (mínimo 20 caracteres)"
     )
     
     fecha_solicitud = models.DateField(
@@ -81,12 +94,39 @@ class Solicitud(models.Model):
     
     archivo_adjunto = models.FileField(
         upload_to=upload_to_solicitudes,
+        storage=almacenamiento_adjuntos,
         blank=True,
         null=True,
         verbose_name="Archivo adjunto",
         validators=[validar_tamaño_archivo],
         help_text="Archivo opcional (máximo 5MB)"
     )
+
+    # Procesamiento en segundo plano del adjunto (ver adjuntos.py)
+    adjunto_estado = models.CharField(
+        max_length=12,
+        choices=ESTADO_ADJUNTO_CHOICES,
+        blank=True,
+        default='',
+        verbose_name="Estado del adjunto"
+    )
+    adjunto_pendiente = models.CharField(max_length=255, blank=True, editable=False)
+    adjunto_nombre = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Nombre original del adjunto"
+    )
+    adjunto_tamano = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Tamaño (bytes)")
+    adjunto_sha256 = models.CharField(max_length=64, blank=True, verbose_name="SHA-256")
+    adjunto_tipo_mime = models.CharField(max_length=100, blank=True, verbose_name="Tipo MIME")
+    adjunto_vista_previa = models.FileField(
+        upload_to=upload_to_vistas_previas,
+        storage=almacenamiento_adjuntos,
+        blank=True,
+        null=True,
+        verbose_name="Vista previa"
+    )
+    adjunto_error = models.TextField(blank=True, verbose_name="Error de procesamiento")
     
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
@@ -95,20 +135,62 @@ class Solicitud(models.Model):
         verbose_name = "Solicitud"
         verbose_name_plural = "Solicitudes"
         ordering = ['-fecha_solicitud']
+        indexes = [
+            # Paginación por cursor (fecha_creacion, id)
+            models.Index(fields=['fecha_creacion', 'id']),
+            # Cola de adjuntos por procesar
+            models.Index(
+                fields=['adjunto_estado', 'id'],
+                condition=models.Q(adjunto_estado__in=['pendiente', 'procesando']),
+                name='solicitud_adjunto_cola_idx',
+            ),
+        ]
         
     def __str__(self):
         return f"{self.nombre_solicitante} - {self.asunto} ({self.get_tipo_solicitud_display()})"
     
+    @property
+    def adjunto_en_proceso(self):
+        return self.adjunto_estado in (self.ADJUNTO_PENDIENTE, self.ADJUNTO_PROCESANDO)
+
     def clean(self):
-        """Validaciones adicionales del modelo"""
+        """Validaciones del modelo (reglas compartidas en validators.ESQUEMA)"""
         super().clean()
-        
-        # Validar que el asunto no esté vacío después de limpiar espacios
-        if self.asunto and not self.asunto.strip():
-            raise ValidationError({'asunto': 'El asunto no puede estar vacío.'})
-            
-        # Validar que la descripción tenga al menos 10 caracteres
-        if self.descripcion_detallada and len(self.descripcion_detallada.strip()) < 10:
-            raise ValidationError({
-                'descripcion_detallada': 'La descripción debe tener al menos 10 caracteres.'
-            })
\ No newline at end of file
+        # La regla del documento admite espacios en los extremos: se guardan sin ellos
+        if self.documento_identidad:
+            self.documento_identidad = self.documento_identidad.strip()
+        ESQUEMA.validar(self)
+
+
+class ArchivoContenido(models.Model):
+    """
+    Contenido único de un adjunto, guardado bajo su SHA-256 por
+    AlmacenamientoDeduplicado. `referencias` cuenta los campos de archivo de
+    Solicitud que lo usan; con cero lo elimina `recolectar_adjuntos`.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    tamano = models.PositiveBigIntegerField(verbose_name="Tamaño (bytes)")
+    referencias = models.PositiveIntegerField(default=0)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Última vez que se guardó este contenido: protege de la recolección a un
+    # blob sin referencias que se acaba de volver a subir
+    ultimo_uso = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Contenido de adjunto"
+        verbose_name_plural = "Contenidos de adjuntos"
+        indexes = [
+            # Candidatos de la recolección
+            models.Index(
+                fields=['ultimo_uso'],
+                condition=models.Q(referencias=0),
+                name='archivo_sin_referencias_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.referencias} referencia(s))"
+
+    @property
+    def nombre(self):
+        return nombre_blob(self.sha256)
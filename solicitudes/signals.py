@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .almacenamiento import ajustar_referencias
+from .models import Solicitud
+
+CAMPOS_ARCHIVO = ('archivo_adjunto', 'adjunto_vista_previa')
+
+
+def _nombres(solicitud):
+    return [getattr(solicitud, campo).name for campo in CAMPOS_ARCHIVO]
+
+
+@receiver(pre_save, sender=Solicitud)
+def recordar_archivos_anteriores(sender, instance, **kwargs):
+    """Guarda los archivos previos para ajustar las referencias de sus blobs"""
+    instance._archivos_anteriores = []
+    if not instance._state.adding:
+        anterior = sender._base_manager\
+            .filter(pk=instance.pk)\
+            .values_list(*CAMPOS_ARCHIVO)\
+            .first()
+        instance._archivos_anteriores = list(anterior or [])
+
+
+@receiver(post_save, sender=Solicitud)
+def referenciar_archivos(sender, instance, **kwargs):
+    ajustar_referencias(getattr(instance, '_archivos_anteriores', []), _nombres(instance))
+
+
+@receiver(post_delete, sender=Solicitud)
+def liberar_archivos(sender, instance, **kwargs):
+    ajustar_referencias(_nombres(instance), [])
@@ -0,0 +1,396 @@
+import json
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import adjuntos
+from .forms import SolicitudForm
+from .almacenamiento import almacenamiento_deduplicado, nombre_blob, recolectar
+from .models import ArchivoContenido, Solicitud
+
+
+def crear_solicitud(numero, **extra):
+    datos = {
+        'nombre_solicitante': 'Carlos Ruiz',
+        'documento_identidad': f'{200000 + numero}',
+        'correo_electronico': 'carlos@example.com',
+        'telefono_contacto': '3001234567',
+        'tipo_solicitud': 'academica',
+        'asunto': f'Solicitud número {numero}',
+        'descripcion_detallada': 'Descripción detallada de la solicitud de prueba.',
+    }
+    datos.update(extra)
+    return Solicitud.objects.create(**datos)
+
+
+class SolicitudListViewTest(TestCase):
+    @override_settings(PAGINACION_CURSOR=True)
+    def test_paginacion_por_cursor_conserva_filtros(self):
+        for i in range(15):
+            crear_solicitud(i, tipo_solicitud='tecnica' if i % 2 else 'academica')
+
+        url = reverse('solicitudes:solicitud_list')
+        response = self.client.get(url, {'tipo': 'academica'})
+        pagina = response.context['page_obj']
+        self.assertEqual(pagina.total, 8)
+        self.assertEqual(len(pagina), 8)
+        self.assertFalse(pagina.has_next())
+
+        response = self.client.get(url)
+        pagina = response.context['page_obj']
+        self.assertTrue(pagina.has_next())
+        self.assertContains(response, f'?cursor={pagina.cursor_siguiente}')
+
+        response = self.client.get(url, {'cursor': pagina.cursor_siguiente})
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+
+class SolicitudListaProyectadaTest(TestCase):
+    def test_resumen_de_descripcion_sin_leerla_completa(self):
+        crear_solicitud(1, descripcion_detallada=' '.join(['palabra'] * 400), tipo_solicitud='tecnica')
+
+        with self.assertNumQueries(2) as capturadas:
+            response = self.client.get(reverse('solicitudes:solicitud_list'))
+        sql = ' '.join(q['sql'] for q in capturadas.captured_queries)
+        self.assertIn('"descripcion_resumen"', sql)
+        self.assertNotIn('"descripcion_detallada" AS', sql)
+        self.assertContains(response, 'palabra palabra')
+        self.assertContains(response, 'Técnica')
+
+
+class SolicitudDetalleCondicionalTest(TestCase):
+    def test_304_hasta_que_cambia(self):
+        solicitud = crear_solicitud(1)
+        url = reverse('solicitudes:solicitud_detail', args=[solicitud.pk])
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        solicitud.asunto = 'Asunto corregido'
+        solicitud.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Asunto corregido')
+
+
+class BusquedaSolicitudesTest(TestCase):
+    def setUp(self):
+        self.url = reverse('solicitudes:solicitud_list')
+
+    def buscar(self, texto, **extra):
+        response = self.client.get(self.url, {'search': texto, **extra})
+        return list(response.context['solicitudes'])
+
+    def test_busca_en_todos_los_campos_indexados(self):
+        por_descripcion = crear_solicitud(1, descripcion_detallada='Necesito revisar la calificación final.')
+        por_documento = crear_solicitud(2, documento_identidad='987654321')
+        crear_solicitud(3)
+
+        self.assertEqual(self.buscar('calificacion'), [por_descripcion])
+        self.assertEqual(self.buscar('987654321'), [por_documento])
+        self.assertEqual(len(self.buscar('Rui')), 3)  # prefijos de palabra
+        self.assertEqual(self.buscar('uiz'), [])
+        self.assertEqual(len(self.buscar('Ruiz')), 3)
+
+    def test_ordena_por_relevancia(self):
+        en_descripcion = crear_solicitud(1, descripcion_detallada='Consulta sobre el certificado.')
+        en_asunto = crear_solicitud(2, asunto='Certificado de notas', descripcion_detallada='Certificado para beca.')
+
+        self.assertEqual(self.buscar('certificado'), [en_asunto, en_descripcion])
+
+    def test_indice_se_actualiza_al_guardar_y_eliminar(self):
+        solicitud = crear_solicitud(1)
+        self.assertEqual(self.buscar('homologación'), [])
+
+        solicitud.asunto = 'Homologación de materias'
+        solicitud.save()
+        self.assertEqual(self.buscar('homologacion'), [solicitud])
+
+        solicitud.delete()
+        self.assertEqual(self.buscar('homologacion'), [])
+
+    def test_combina_busqueda_y_filtro_de_tipo(self):
+        crear_solicitud(1, asunto='Cambio de horario')
+        tecnica = crear_solicitud(2, asunto='Cambio de contraseña', tipo_solicitud='tecnica')
+
+        self.assertEqual(self.buscar('cambio', tipo='tecnica'), [tecnica])
+
+    def test_texto_sin_palabras_no_devuelve_resultados(self):
+        crear_solicitud(1)
+        self.assertEqual(self.buscar('"*()'), [])
+
+    @override_settings(PAGINACION_CURSOR=True)
+    def test_busqueda_usa_paginacion_por_paginas(self):
+        crear_solicitud(1)
+        response = self.client.get(self.url, {'search': 'Ruiz'})
+        self.assertFalse(response.context['paginacion_cursor'])
+
+
+class AdjuntosTestCase(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajustes = override_settings(
+            MEDIA_ROOT=self.media,
+            SOLICITUDES_ADJUNTOS_PENDIENTES=f'{self.media}/pendientes',
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.contenido = b'%PDF-1.4\n' + b'x' * 4096
+        self.sha256 = hashlib.sha256(self.contenido).hexdigest()
+
+    def enviar(self, documento='123456', nombre='notas.pdf'):
+        return self.client.post(reverse('solicitudes:solicitud_create'), {
+            'nombre_solicitante': 'Carlos Ruiz',
+            'documento_identidad': documento,
+            'correo_electronico': 'carlos@example.com',
+            'telefono_contacto': '3001234567',
+            'tipo_solicitud': 'academica',
+            'asunto': 'Certificado de notas',
+            'descripcion_detallada': 'Solicito el certificado de notas del semestre.',
+            'archivo_adjunto': SimpleUploadedFile(nombre, self.contenido),
+        })
+
+
+class AdjuntoDiferidoTest(AdjuntosTestCase):
+
+    def test_la_peticion_no_procesa_el_adjunto(self):
+        with mock.patch.object(adjuntos, 'encolar') as encolar:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.enviar()
+
+        self.assertEqual(response.status_code, 302)
+        solicitud = Solicitud.objects.get()
+        self.assertEqual(solicitud.adjunto_estado, Solicitud.ADJUNTO_PENDIENTE)
+        self.assertFalse(solicitud.archivo_adjunto)
+        self.assertEqual(solicitud.adjunto_nombre, 'notas.pdf')
+        encolar.assert_called_once_with(solicitud.pk)
+
+    def test_adjunto_grande_llega_como_temporal_en_disco(self):
+        # Por encima de FILE_UPLOAD_MAX_MEMORY_SIZE el archivo se recibe en un
+        # temporal que se mueve a pendientes
+        self.contenido = b'%PDF-1.4\n' + b'x' * (2 * 1024 * 1024)
+        with mock.patch.object(adjuntos, 'encolar'):
+            response = self.enviar()
+
+        self.assertEqual(response.status_code, 302)
+        solicitud = Solicitud.objects.get()
+        pendiente = os.path.join(self.media, 'pendientes', solicitud.adjunto_pendiente)
+        self.assertEqual(os.path.getsize(pendiente), len(self.contenido))
+
+    def test_procesar_mueve_el_archivo_y_calcula_metadatos(self):
+        with mock.patch.object(adjuntos, 'encolar'):
+            self.enviar()
+        solicitud = Solicitud.objects.get()
+
+        self.assertTrue(adjuntos.procesar(solicitud.pk))
+        self.assertFalse(adjuntos.procesar(solicitud.pk))
+
+        solicitud.refresh_from_db()
+        self.assertEqual(solicitud.adjunto_estado, Solicitud.ADJUNTO_LISTO)
+        self.assertEqual(solicitud.archivo_adjunto.name, nombre_blob(self.sha256))
+        self.assertEqual(solicitud.archivo_adjunto.read(), self.contenido)
+        self.assertEqual(solicitud.adjunto_sha256, self.sha256)
+        self.assertEqual(solicitud.adjunto_tamano, len(self.contenido))
+        self.assertEqual(solicitud.adjunto_tipo_mime, 'application/pdf')
+        self.assertEqual(solicitud.adjunto_pendiente, '')
+
+    @override_settings(SOLICITUDES_ADJUNTOS_ASINCRONOS=False)
+    def test_modo_sincrono_guarda_en_la_peticion(self):
+        self.enviar()
+
+        solicitud = Solicitud.objects.get()
+        self.assertEqual(solicitud.adjunto_estado, '')
+        self.assertEqual(solicitud.archivo_adjunto.name, nombre_blob(self.sha256))
+
+    def test_error_queda_registrado_y_se_puede_reintentar(self):
+        with mock.patch.object(adjuntos, 'encolar'):
+            self.enviar()
+        solicitud = Solicitud.objects.get()
+
+        with mock.patch.object(adjuntos, 'huella', side_effect=OSError('disco lleno')), \
+                self.assertLogs('solicitudes.adjuntos', 'ERROR'):
+            self.assertFalse(adjuntos.procesar(solicitud.pk))
+        solicitud.refresh_from_db()
+        self.assertEqual(solicitud.adjunto_estado, Solicitud.ADJUNTO_ERROR)
+        self.assertIn('disco lleno', solicitud.adjunto_error)
+
+        self.assertEqual(adjuntos.reintentar(), 1)
+        self.assertEqual(adjuntos.procesar_pendientes(), 1)
+
+    def test_tipo_mime_por_firma(self):
+        self.assertEqual(adjuntos.tipo_mime(b'\x89PNG\r\n\x1a\n....', 'foto.pdf'), 'image/png')
+        self.assertEqual(
+            adjuntos.tipo_mime(b'PK\x03\x04', 'informe.docx'),
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        )
+        self.assertEqual(adjuntos.tipo_mime(b'????', 'sin_extension'), 'application/octet-stream')
+
+
+@override_settings(SOLICITUDES_ADJUNTOS_ASINCRONOS=False)
+class AlmacenamientoDeduplicadoTest(AdjuntosTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enviar('123456', 'notas.pdf')
+        self.enviar('654321', 'copia.pdf')
+        self.primera, self.segunda = Solicitud.objects.order_by('pk')
+
+    def test_mismo_contenido_se_guarda_una_vez(self):
+        self.assertEqual(self.primera.archivo_adjunto.name, self.segunda.archivo_adjunto.name)
+        blob = ArchivoContenido.objects.get()
+        self.assertEqual(blob.sha256, self.sha256)
+        self.assertEqual(blob.referencias, 2)
+        self.assertEqual(blob.tamano, len(self.contenido))
+
+    def test_recoleccion_borra_solo_contenidos_sin_referencias(self):
+        ruta = self.primera.archivo_adjunto.path
+        self.primera.delete()
+        self.assertEqual(recolectar(timedelta(0)), 0)
+
+        self.segunda.delete()
+        self.assertEqual(ArchivoContenido.objects.get().referencias, 0)
+        # Dentro del plazo de gracia el contenido se conserva
+        self.assertEqual(recolectar(timedelta(hours=1)), 0)
+        self.assertEqual(recolectar(timedelta(0)), 1)
+        self.assertFalse(ArchivoContenido.objects.exists())
+        self.assertFalse(os.path.exists(ruta))
+
+    def test_guardar_renueva_la_fila_antes_de_mirar_el_disco(self):
+        # Contenido sin referencias y viejo: candidato de la recolección
+        antiguo = timezone.now() - timedelta(days=1)
+        ArchivoContenido.objects.update(referencias=0, ultimo_uso=antiguo)
+        existe = os.path.exists
+        vistos = []
+
+        def comprobar(ruta):
+            if str(ruta).endswith(self.sha256):
+                vistos.append(ArchivoContenido.objects.get().ultimo_uso)
+            return existe(ruta)
+
+        with mock.patch('solicitudes.almacenamiento.os.path.exists', comprobar):
+            nombre = almacenamiento_deduplicado.save('otra.pdf', ContentFile(self.contenido))
+
+        self.assertEqual(nombre, nombre_blob(self.sha256))
+        self.assertGreater(vistos[0], antiguo)
+        self.assertEqual(recolectar(timedelta(hours=1)), 0)
+
+    def test_descarga_con_etag_y_rangos(self):
+        url = reverse('solicitudes:solicitud_adjunto', args=[self.segunda.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{self.sha256}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('copia.pdf', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), self.contenido)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{self.sha256}"')
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=0-7')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 0-7/{len(self.contenido)}')
+        self.assertEqual(b''.join(response.streaming_content), self.contenido[:8])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), self.contenido[-4:])
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(self.contenido)}-')
+        self.assertEqual(response.status_code, 416)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=0-7', HTTP_IF_RANGE='"otro"')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(API_TOKENS=['secreto'])
+class ApiSolicitudesTest(TestCase):
+    def setUp(self):
+        self.url = reverse('api_solicitudes:lista')
+
+    def test_alta_de_un_objeto_y_lote_invalido(self):
+        datos = {
+            'nombre_solicitante': 'Marta Díaz',
+            'documento_identidad': '300001',
+            'correo_electronico': 'marta@example.com',
+            'telefono_contacto': '300 123 4567',
+            'tipo_solicitud': 'tecnica',
+            'asunto': 'Acceso a la plataforma',
+            'descripcion_detallada': 'No puedo ingresar a la plataforma del curso.',
+        }
+        response = self.client.post(
+            self.url, json.dumps(datos), content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer secreto',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['telefono_contacto'], '3001234567')
+
+        lote = [dict(datos, documento_identidad='300002'), dict(datos, archivo_adjunto='x.pdf')]
+        response = self.client.post(
+            self.url, json.dumps(lote), content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer secreto',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['detalle']), ['1'])
+        self.assertEqual(Solicitud.objects.count(), 1)
+
+    def test_filtro_y_busqueda(self):
+        crear_solicitud(1, tipo_solicitud='tecnica', asunto='Problema con la impresora')
+        crear_solicitud(2)
+
+        datos = self.client.get(self.url, {'tipo': 'tecnica', 'campos': 'asunto'}).json()
+        self.assertEqual(datos['resultados'], [{'id': Solicitud.objects.get(tipo_solicitud='tecnica').pk,
+                                                 'asunto': 'Problema con la impresora'}])
+        datos = self.client.get(self.url, {'q': 'impresora'}).json()
+        self.assertEqual(len(datos['resultados']), 1)
+
+
+class SolicitudFormTest(TestCase):
+    def test_reglas_compartidas_y_normalizacion(self):
+        datos = {
+            'nombre_solicitante': 'Marta',
+            'documento_identidad': '000000',
+            'correo_electronico': 'marta@example.com',
+            'telefono_contacto': '(300) 123-4567',
+            'tipo_solicitud': 'otra',
+            'asunto': '  Hola  ',
+            'descripcion_detallada': 'Muy corta',
+        }
+        form = SolicitudForm(data=datos)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            set(form.errors),
+            {'nombre_solicitante', 'documento_identidad', 'asunto', 'descripcion_detallada'},
+        )
+        self.assertEqual(form.instance.telefono_contacto, '3001234567')
+
+
+class SolicitudModeloTest(TestCase):
+    def test_validacion_fuera_del_formulario(self):
+        solicitud = Solicitud(
+            nombre_solicitante='Marta Díaz',
+            documento_identidad=' 300001 ',
+            correo_electronico='marta@example.com',
+            telefono_contacto='300-123 4567',
+            tipo_solicitud='otra',
+            asunto='Acceso a la plataforma',
+            descripcion_detallada='No puedo ingresar a la plataforma del curso.',
+        )
+        with self.assertRaises(ValidationError) as error:
+            solicitud.full_clean()
+        self.assertEqual(error.exception.message_dict, {
+            'telefono_contacto': ['El teléfono debe contener solo números.'],
+        })
+
+        solicitud.telefono_contacto = '123456789012345'
+        solicitud.full_clean()
+        self.assertEqual(solicitud.documento_identidad, '300001')
@@ -3,6 +3,7 @@ from .views import (
     SolicitudListView,
     SolicitudCreateView,
     SolicitudDetailView,
+    SolicitudAdjuntoView,
     SolicitudUpdateView,
     SolicitudDeleteView,
     SolicitudConfirmacionView,
@@ -14,6 +15,12 @@ urlpatterns = [
     path('', SolicitudListView.as_view(), name='solicitud_list'),
     path('nuevo/', SolicitudCreateView.as_view(), name='solicitud_create'),
     path('<int:pk>/', SolicitudDetailView.as_view(), name='solicitud_detail'),
+    path('<int:pk>/adjunto/', SolicitudAdjuntoView.as_view(), name='solicitud_adjunto'),
+    path(
+        '<int:pk>/adjunto/vista-previa/',
+        SolicitudAdjuntoView.as_view(campo='adjunto_vista_previa'),
+        name='solicitud_vista_previa'
+    ),
     path('<int:pk>/editar/', SolicitudUpdateView.as_view(), name='solicitud_update'),
     path('<int:pk>/eliminar/', SolicitudDeleteView.as_view(), name='solicitud_delete'),
     path('confirmacion/', SolicitudConfirmacionView.as_view(), name='solicitud_confirmacion'),
@@ -0,0 +1,22 @@
+"""
+Reglas de validación de solicitudes sobre el motor de taller_formularios.validacion
+"""
+from django.utils.translation import gettext_lazy as _
+
+from taller_formularios import validacion
+
+ESQUEMA = validacion.Esquema(
+    campos={
+        'nombre_solicitante': validacion.nombre_completo,
+        'documento_identidad': validacion.documento_identidad,
+        'telefono_contacto': validacion.telefono(minimo=7, maximo=15),
+        'asunto': validacion.longitud(
+            minimo=5, maximo=200,
+            mensaje_corto=_('El asunto debe tener al menos 5 caracteres.'),
+            mensaje_largo=_('El asunto no puede exceder 200 caracteres.'),
+        ),
+        'descripcion_detallada': validacion.longitud(
+            minimo=20, mensaje_corto=_('La descripción debe tener al menos 20 caracteres.')
+        ),
+    },
+)
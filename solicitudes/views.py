@@ -1,37 +1,67 @@
+import os
+
 from django.views.generic import (
-    CreateView, TemplateView, ListView, DetailView, UpdateView, DeleteView
+    CreateView, TemplateView, ListView, DetailView, UpdateView, DeleteView, View
 )
+from django.views.generic.detail import SingleObjectMixin
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.db.models import Q
-
+from taller_formularios import busqueda
+from taller_formularios.condicional import GetCondicionalMixin
+from taller_formularios.descargas import respuesta_archivo
+from taller_formularios.paginacion import PaginacionCursorMixin
+from taller_formularios.proyeccion import ProyeccionListMixin
+
+from . import adjuntos
+from .almacenamiento import sha256_de
+from .lecturas import SolicitudEnLista
 from .models import Solicitud
 from .forms import SolicitudForm
 
 
-class SolicitudListView(ListView):
+class AdjuntoDiferidoMixin:
+    """
+    Guarda el formulario sin copiar el adjunto en la petición: el archivo se
+    procesa en segundo plano después de confirmar la solicitud
+    """
+
+    def form_valid(self, form):
+        self.object = adjuntos.guardar_formulario(form)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class SolicitudListView(ProyeccionListMixin, PaginacionCursorMixin, ListView):
     model = Solicitud
+    lectura = SolicitudEnLista
     template_name = 'solicitudes/solicitud_list.html'
     context_object_name = 'solicitudes'
     paginate_by = 10
 
     def get_queryset(self):
         qs = super().get_queryset()
-        q = self.request.GET.get('search')
+        q = self.request.GET.get('search', '').strip()
         tipo = self.request.GET.get('tipo')
-        if q:
-            qs = qs.filter(Q(nombre_solicitante__icontains=q) | Q(asunto__icontains=q))
         if tipo:
             qs = qs.filter(tipo_solicitud=tipo)
+        if q:
+            # Resultados ordenados por relevancia
+            qs = busqueda.buscar(qs, q)
         return qs
 
+    def usa_paginacion_cursor(self):
+        # El orden por relevancia no sirve de cursor: las búsquedas usan páginas
+        if self.request.GET.get('search', '').strip():
+            return False
+        return super().usa_paginacion_cursor()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['titulo'] = 'Lista de Solicitudes'
         return context
 
 
-class SolicitudCreateView(CreateView):
+class SolicitudCreateView(AdjuntoDiferidoMixin, CreateView):
     model = Solicitud
     form_class = SolicitudForm
     template_name = 'solicitudes/clean_form.html'
@@ -55,13 +85,45 @@ class SolicitudCreateView(CreateView):
         return super().form_invalid(form)
 
 
-class SolicitudDetailView(DetailView):
+class SolicitudDetailView(GetCondicionalMixin, DetailView):
     model = Solicitud
     template_name = 'solicitudes/solicitud_detail.html'
     context_object_name = 'solicitud'
 
 
-class SolicitudUpdateView(UpdateView):
+class SolicitudAdjuntoView(SingleObjectMixin, View):
+    """
+    Sirve el adjunto (o su vista previa) con ETag fuerte por contenido y
+    soporte de Range para reanudar descargas y ver PDF por partes
+    """
+    model = Solicitud
+    campo = 'archivo_adjunto'
+
+    def get(self, request, *args, **kwargs):
+        solicitud = self.get_object()
+        archivo = getattr(solicitud, self.campo)
+        if not archivo:
+            raise Http404('La solicitud no tiene este archivo.')
+
+        if self.campo == 'archivo_adjunto':
+            nombre = solicitud.adjunto_nombre or os.path.basename(archivo.name)
+            tipo = solicitud.adjunto_tipo_mime
+            etag = sha256_de(archivo.name) or solicitud.adjunto_sha256
+        else:
+            nombre = f'{os.path.splitext(solicitud.adjunto_nombre or "vista")[0]}.png'
+            tipo = 'image/png'
+            etag = sha256_de(archivo.name)
+
+        try:
+            contenido = archivo.storage.open(archivo.name, 'rb')
+        except FileNotFoundError:
+            raise Http404('El archivo ya no existe.')
+        return respuesta_archivo(
+            request, contenido, archivo.size, etag=etag, nombre=nombre, tipo=tipo
+        )
+
+
+class SolicitudUpdateView(AdjuntoDiferidoMixin, UpdateView):
     model = Solicitud
     form_class = SolicitudForm
     template_name = 'solicitudes/clean_form.html'
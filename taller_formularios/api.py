@@ -0,0 +1,352 @@
+"""
+API JSON mínima sobre los formularios existentes
+
+Cada RecursoAPI expone un modelo en dos rutas:
+
+    GET    <ruta>/              lista con filtros, ?campos=, ?q= y cursor
+    POST   <ruta>/              crea un objeto o una lista de objetos (lote)
+    PATCH  <ruta>/              actualiza una lista de objetos con "id" (lote)
+    GET    <ruta>/<pk>/         detalle
+    PATCH  <ruta>/<pk>/         actualiza un objeto
+
+La validación es la del ModelForm de la app, aplicada fila por fila; la
+unicidad se comprueba para todo el lote con una consulta (validar_lote) y el
+lote se guarda en una transacción: si una fila falla no se guarda ninguna.
+Las lecturas devuelven un ETag débil y responden 304 con If-None-Match; el de
+una colección sale de COUNT y MAX(fecha_actualizacion), sin leer las filas.
+
+Las escrituras requieren `Authorization: Bearer <token>` con uno de los
+tokens de API_TOKENS.
+"""
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Count, Max
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse
+from django.urls import path
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags, quote_etag
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from . import busqueda
+from .paginacion import PaginadorCursor
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+
+class ErrorAPI(Exception):
+    def __init__(self, mensaje, estado=400, detalle=None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.estado = estado
+        self.detalle = detalle
+
+    def respuesta(self):
+        cuerpo = {'error': self.mensaje}
+        if self.detalle is not None:
+            cuerpo['detalle'] = self.detalle
+        return JsonResponse(cuerpo, status=self.estado)
+
+
+def respuesta_json(datos, status=200, etag=None):
+    respuesta = JsonResponse(datos, status=status, encoder=DjangoJSONEncoder, safe=False)
+    if etag:
+        respuesta['ETag'] = etag
+    return respuesta
+
+
+def etag_debil(*partes):
+    huella = hashlib.sha1(
+        json.dumps(partes, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    ).hexdigest()
+    return f'W/{quote_etag(huella)}'
+
+
+def no_modificado(request, etag):
+    """True si el cliente ya tiene esta versión (comparación débil)"""
+    etiquetas = parse_etags(request.headers.get('If-None-Match', ''))
+    if '*' in etiquetas:
+        return True
+    limpio = etag.removeprefix('W/')
+    return any(e.removeprefix('W/') == limpio for e in etiquetas)
+
+
+def respuesta_304(etag):
+    respuesta = HttpResponse(status=304)
+    respuesta['ETag'] = etag
+    return respuesta
+
+
+def token_valido(request):
+    encabezado = request.headers.get('Authorization', '')
+    if not encabezado.startswith('Bearer '):
+        return False
+    token = encabezado[len('Bearer '):].strip()
+    return any(
+        hmac.compare_digest(token, valido)
+        for valido in getattr(settings, 'API_TOKENS', [])
+    )
+
+
+class RecursoAPI:
+    """
+    Describe cómo exponer un modelo. Las subclases fijan modelo, formulario,
+    campos (legibles), filtros ({parámetro: lookup}) y pueden redefinir los
+    ganchos valores_por_defecto, validar_lote, crear y actualizar.
+    """
+    modelo = None
+    formulario = None
+    campos = ()
+    filtros = {}
+    orden = ('-fecha_creacion', '-pk')
+    campo_version = 'fecha_actualizacion'
+
+    def queryset(self):
+        return self.modelo._default_manager.all()
+
+    # Lectura
+
+    def campos_pedidos(self, request):
+        pedidos = request.GET.get('campos')
+        if not pedidos:
+            return list(self.campos)
+        campos = [c.strip() for c in pedidos.split(',') if c.strip()]
+        desconocidos = sorted(set(campos) - set(self.campos))
+        if desconocidos:
+            raise ErrorAPI(f'Campos desconocidos: {", ".join(desconocidos)}')
+        return ['id'] + [c for c in campos if c != 'id']
+
+    def filtrar(self, request):
+        queryset = self.queryset()
+        condiciones = {}
+        for parametro, lookup in self.filtros.items():
+            valor = request.GET.get(parametro)
+            if valor is None or valor == '':
+                continue
+            campo = self.modelo._meta.get_field(lookup.split('__')[0])
+            if isinstance(campo, BooleanField):
+                # to_python acepta 'True'/'False' pero no 'true'/'false' de JSON
+                valor = valor.capitalize()
+            try:
+                condiciones[lookup] = campo.to_python(valor)
+            except ValidationError as e:
+                raise ErrorAPI(f'Valor inválido para {parametro}', detalle=e.messages)
+        return queryset.filter(**condiciones)
+
+    def limite(self, request):
+        try:
+            limite = int(request.GET.get('limite', LIMITE_POR_DEFECTO))
+        except ValueError:
+            raise ErrorAPI('limite debe ser un número entero')
+        return max(1, min(limite, LIMITE_MAXIMO))
+
+    def etag_coleccion(self, queryset, request):
+        agregado = queryset.order_by().aggregate(filas=Count('pk'), version=Max(self.campo_version))
+        return etag_debil(self.modelo._meta.label, sorted(request.GET.lists()), agregado)
+
+    def listar(self, request):
+        queryset = self.filtrar(request)
+        campos = self.campos_pedidos(request)
+        etag = self.etag_coleccion(queryset, request)
+        if no_modificado(request, etag):
+            return respuesta_304(etag)
+
+        limite = self.limite(request)
+        texto = request.GET.get('q', '').strip()
+        if texto:
+            # El orden por relevancia no sirve de cursor: solo la primera página
+            filas = list(busqueda.buscar(queryset, texto).values(*campos)[:limite])
+            return respuesta_json({'resultados': filas, 'siguiente': None}, etag=etag)
+
+        extra = [c.lstrip('-') for c in self.orden if c.lstrip('-') not in campos]
+        paginador = PaginadorCursor(
+            queryset.values(*campos, *extra), limite, campos=self.orden, contar_total=False
+        )
+        pagina = paginador.pagina(request.GET.get('cursor'))
+        filas = [{c: fila[c] for c in campos} for fila in pagina.object_list]
+        return respuesta_json({
+            'resultados': filas,
+            'siguiente': pagina.cursor_siguiente,
+            'anterior': pagina.cursor_anterior,
+        }, etag=etag)
+
+    def detalle(self, request, pk):
+        campos = self.campos_pedidos(request)
+        extra = [] if self.campo_version in campos else [self.campo_version]
+        fila = self.queryset().filter(pk=pk).values(*campos, *extra).first()
+        if fila is None:
+            raise ErrorAPI('No encontrado', estado=404)
+        etag = etag_debil(self.modelo._meta.label, pk, campos, fila[self.campo_version])
+        if no_modificado(request, etag):
+            return respuesta_304(etag)
+        return respuesta_json({c: fila[c] for c in campos}, etag=etag)
+
+    def serializar(self, objetos):
+        return [
+            {campo: getattr(obj, 'pk' if campo == 'id' else campo) for campo in self.campos}
+            for obj in objetos
+        ]
+
+    # Escritura
+
+    def valores_por_defecto(self):
+        """Valores de los campos omitidos al crear (el form los tomaría como vacíos)"""
+        return {}
+
+    def validar_lote(self, instancias):
+        """Errores {índice: {campo: [mensajes]}} que dependen de todo el lote"""
+        return {}
+
+    def crear(self, instancias):
+        for instancia in instancias:
+            instancia.save()
+        return instancias
+
+    def actualizar(self, instancias, campos):
+        for instancia in instancias:
+            instancia.save()
+        return instancias
+
+    def _formulario(self, datos, instancia=None):
+        formulario = self.formulario(data=datos, instance=instancia)
+        # La unicidad la valida validar_lote para todo el lote con una consulta
+        formulario.validate_unique = lambda: None
+        return formulario
+
+    def validar(self, elementos, instancias=None):
+        """
+        Valida cada elemento con el formulario. Retorna (instancias, campos
+        cambiados) o lanza ErrorAPI con los errores por índice.
+        """
+        if not elementos:
+            raise ErrorAPI('El lote está vacío')
+        limite = getattr(settings, 'API_LOTE_MAXIMO', LIMITE_MAXIMO)
+        if len(elementos) > limite:
+            raise ErrorAPI(f'El lote no puede tener más de {limite} elementos')
+
+        campos_form = list(self.formulario.base_fields)
+        errores = {}
+        validas = []
+        cambiados = set()
+        for indice, elemento in enumerate(elementos):
+            if not isinstance(elemento, dict):
+                errores[indice] = {'__all__': ['Se esperaba un objeto JSON.']}
+                continue
+            desconocidos = set(elemento) - set(campos_form) - {'id'}
+            if desconocidos:
+                errores[indice] = {c: ['Campo desconocido o de solo lectura.'] for c in sorted(desconocidos)}
+                continue
+            if instancias is None:
+                datos = {**self.valores_por_defecto(), **elemento}
+                instancia = None
+            else:
+                instancia = instancias[indice]
+                datos = {**model_to_dict(instancia, fields=campos_form), **elemento}
+                cambiados.update(set(elemento) - {'id'})
+            formulario = self._formulario(datos, instancia)
+            if formulario.is_valid():
+                validas.append(formulario.save(commit=False))
+            else:
+                errores[indice] = formulario.errors.get_json_data()
+
+        if not errores:
+            errores = self.validar_lote(validas)
+        if errores:
+            raise ErrorAPI('Datos inválidos', detalle={str(i): e for i, e in sorted(errores.items())})
+        return validas, cambiados
+
+    def _guardar(self, funcion, *args):
+        try:
+            with transaction.atomic():
+                return funcion(*args)
+        except IntegrityError as e:
+            raise ErrorAPI('Conflicto al guardar', estado=409, detalle=str(e))
+
+    def alta(self, request, datos):
+        lote = isinstance(datos, list)
+        instancias, _ = self.validar(datos if lote else [datos])
+        creadas = self._guardar(self.crear, instancias)
+        resultado = self.serializar(creadas)
+        return respuesta_json({'resultados': resultado} if lote else resultado[0], status=201)
+
+    def modificacion(self, request, elementos):
+        if not isinstance(elementos, list):
+            raise ErrorAPI('Se esperaba una lista de objetos con "id"')
+        ids = [e.get('id') if isinstance(e, dict) else None for e in elementos]
+        try:
+            existentes = self.queryset().in_bulk([i for i in ids if i is not None])
+        except ValidationError:
+            raise ErrorAPI('Hay identificadores inválidos')
+        # in_bulk usa como clave el valor convertido de la pk
+        por_texto = {str(pk): obj for pk, obj in existentes.items()}
+        faltantes = {str(i): ['No existe.'] for i, id_ in enumerate(ids) if str(id_) not in por_texto}
+        if faltantes:
+            raise ErrorAPI('Datos inválidos', detalle={i: {'id': m} for i, m in faltantes.items()})
+
+        instancias, cambiados = self.validar(elementos, [por_texto[str(i)] for i in ids])
+        actualizadas = self._guardar(self.actualizar, instancias, cambiados)
+        return respuesta_json({'resultados': self.serializar(actualizadas)})
+
+    # Rutas
+
+    def urls(self, conversor_pk='int'):
+        return [
+            path('', VistaColeccion.as_view(recurso=self), name='lista'),
+            path(f'<{conversor_pk}:pk>/', VistaElemento.as_view(recurso=self), name='detalle'),
+        ]
+
+
+def leer_json(request):
+    try:
+        return json.loads(request.body or b'null')
+    except ValueError:
+        raise ErrorAPI('El cuerpo no es JSON válido')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class VistaAPI(View):
+    """
+    Vista base: convierte ErrorAPI en respuestas JSON y exige token en las
+    escrituras. Sin cookies de sesión de por medio, CSRF no aplica.
+    """
+    recurso = None
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method not in ('GET', 'HEAD', 'OPTIONS') and not token_valido(request):
+                raise ErrorAPI('Se requiere un token de API válido', estado=401)
+            return super().dispatch(request, *args, **kwargs)
+        except ErrorAPI as e:
+            return e.respuesta()
+
+
+class VistaColeccion(VistaAPI):
+    def get(self, request):
+        return self.recurso.listar(request)
+
+    def post(self, request):
+        return self.recurso.alta(request, leer_json(request))
+
+    def patch(self, request):
+        return self.recurso.modificacion(request, leer_json(request))
+
+
+class VistaElemento(VistaAPI):
+    def get(self, request, pk):
+        return self.recurso.detalle(request, pk)
+
+    def patch(self, request, pk):
+        datos = leer_json(request)
+        if not isinstance(datos, dict):
+            raise ErrorAPI('Se esperaba un objeto JSON')
+        respuesta = self.recurso.modificacion(request, [{**datos, 'id': pk}])
+        resultado = json.loads(respuesta.content)['resultados'][0]
+        return respuesta_json(resultado)
@@ -3,6 +3,16 @@ ASGI config for taller_formularios project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Despliegue en producción (un proceso por núcleo, cada uno con su bucle de
+eventos):
+
+    gunicorn taller_formularios.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+
+Bajo ASGI se activan por defecto las vistas asíncronas de asistencias
+(VISTAS_ASINCRONAS) y el panel en vivo (PANEL_EN_VIVO). Las conexiones a la base de datos deben ser por
+petición, así que CONN_MAX_AGE es 0 por defecto (bajo WSGI, 600): Django las
+abre en los hilos de sync_to_async y las cierra con la señal request_finished.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +22,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taller_formularios.settings')
+os.environ.setdefault('VISTAS_ASINCRONAS', 'True')
+os.environ.setdefault('PANEL_EN_VIVO', 'True')
+os.environ.setdefault('CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,56 @@
+"""
+Utilidades para vistas asíncronas
+
+El ORM asíncrono de Django (acount, aiterator, afirst...) ejecuta cada
+consulta con sync_to_async(thread_sensitive=True): todas las consultas de
+una petición pasan por el mismo hilo y, aunque se lancen con
+asyncio.gather, corren una detrás de otra. `en_paralelo` ejecuta funciones
+síncronas independientes en hilos propios, cada una con su propia conexión,
+para que sus consultas sí se solapen.
+"""
+import asyncio
+import contextvars
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+def consultas_paralelas():
+    return getattr(settings, 'ASYNC_CONSULTAS_PARALELAS', True)
+
+
+def _ejecutar_con_conexion_propia(funcion):
+    try:
+        return funcion()
+    finally:
+        connections.close_all()
+
+
+def _en_contexto_nuevo(funcion):
+    # Las conexiones de Django se guardan por contexto (asgiref.Local); con un
+    # contexto vacío el hilo abre la suya en lugar de compartir la de la
+    # petición, y la cierra al terminar.
+    def envoltura():
+        return contextvars.Context().run(_ejecutar_con_conexion_propia, funcion)
+    return envoltura
+
+
+async def en_paralelo(*funciones):
+    """
+    Ejecuta a la vez funciones síncronas sin argumentos y retorna sus
+    resultados en el mismo orden. Con ASYNC_CONSULTAS_PARALELAS = False (o
+    dentro de una transacción, cuyas filas no verían otras conexiones) se
+    ejecutan en serie en el hilo del ORM.
+    """
+    # La transacción vive en la conexión del hilo del ORM, no en la del bucle
+    if not consultas_paralelas() or await sync_to_async(_en_transaccion)():
+        return [await sync_to_async(funcion)() for funcion in funciones]
+    return await asyncio.gather(*(
+        sync_to_async(_en_contexto_nuevo(funcion), thread_sensitive=False)()
+        for funcion in funciones
+    ))
+
+
+def _en_transaccion():
+    return any(conexion.in_atomic_block for conexion in connections.all(initialized_only=True))
@@ -0,0 +1,470 @@
+"""
+Búsqueda de texto completo para los modelos del proyecto
+
+Cada modelo registrado tiene una tabla de índice aparte, mantenida de forma
+incremental al guardar y eliminar. El motor depende de la base de datos:
+
+- SQLite: tabla virtual FTS5 (con tabla de contenido propia y triggers) y
+  orden por bm25.
+- PostgreSQL: columna tsvector con índice GIN y orden por ts_rank.
+- Otros motores: filtro icontains sobre los mismos campos, sin índice.
+
+La configuración BUSQUEDA_BACKEND ('fts5', 'postgres' o 'simple') permite
+forzar un motor concreto.
+"""
+import re
+import sqlite3
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.admin.views.main import ORDER_VAR
+from django.db import connections, router
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+PALABRAS = re.compile(r'\w+')
+TAMANO_LOTE = 1000
+
+
+@dataclass(frozen=True)
+class IndiceBusqueda:
+    """Tabla de índice y campos indexados de un modelo"""
+    tabla: str
+    campos: tuple
+    # Peso de cada campo en el ranking de PostgreSQL ('A' es el mayor)
+    pesos: tuple = ()
+
+    @classmethod
+    def para_modelo(cls, modelo, campos, pesos=()):
+        return cls(f'busqueda_{modelo._meta.db_table}', tuple(campos), tuple(pesos))
+
+    def peso(self, posicion):
+        return self.pesos[posicion] if posicion < len(self.pesos) else 'D'
+
+
+_registro = {}
+
+
+def registrar(modelo, campos, pesos=()):
+    """
+    Registra un modelo para la búsqueda de texto completo y conecta las
+    señales que mantienen su índice
+    """
+    indice = IndiceBusqueda.para_modelo(modelo, campos, pesos)
+    _registro[modelo] = indice
+    uid = f'busqueda_{modelo._meta.label_lower}'
+    post_save.connect(_al_guardar, sender=modelo, dispatch_uid=uid)
+    post_delete.connect(_al_eliminar, sender=modelo, dispatch_uid=uid)
+    return indice
+
+
+def indice_de(modelo):
+    return _registro.get(modelo._meta.concrete_model)
+
+
+def modelos_registrados():
+    return list(_registro)
+
+
+@lru_cache(maxsize=None)
+def soporta_fts5():
+    """Indica si la versión de SQLite enlazada incluye FTS5"""
+    conexion = sqlite3.connect(':memory:')
+    try:
+        conexion.execute('CREATE VIRTUAL TABLE prueba USING fts5(texto)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conexion.close()
+
+
+def palabras(texto):
+    return PALABRAS.findall((texto or '').lower())
+
+
+class BusquedaSimple:
+    """Motor sin índice: filtra con icontains sobre los campos indexados"""
+    nombre = 'simple'
+    # Orden por relevancia sobre `rango_busqueda`; None si el motor no la calcula
+    orden = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def crear(self, indice, tipo_pk):
+        pass
+
+    def eliminar_indice(self, indice):
+        pass
+
+    def vaciar(self, indice):
+        pass
+
+    def indexar(self, indice, filas):
+        """Inserta o reemplaza filas (pk, [valor por campo]) en el índice"""
+
+    def quitar(self, indice, pks):
+        pass
+
+    def buscar(self, indice, queryset, texto):
+        condicion = Q()
+        for campo in indice.campos:
+            condicion |= Q(**{f'{campo}__icontains': texto})
+        return queryset.filter(condicion)
+
+    def _columnas_modelo(self, queryset):
+        qn = self.connection.ops.quote_name
+        opts = queryset.model._meta
+        return qn(opts.db_table), qn(opts.pk.column)
+
+    def _anotar(self, queryset, coincidencias, rango):
+        """
+        Filtra por las pks de `coincidencias` y anota `rango` (subconsulta
+        correlacionada con la fila del modelo), ordenando por relevancia con
+        el orden previo del queryset como desempate
+        """
+        return queryset.filter(pk__in=RawSQL(*coincidencias)).annotate(
+            rango_busqueda=RawSQL(*rango, output_field=FloatField()),
+        ).order_by(self.orden, *queryset.query.order_by)
+
+
+class BusquedaFTS5(BusquedaSimple):
+    """
+    Índice FTS5 de contenido externo: la tabla `<tabla>_contenido` guarda el
+    texto y la pk del objeto, y sus triggers mantienen la tabla virtual
+    """
+    nombre = 'fts5'
+    orden = 'rango_busqueda'  # bm25: menor es más relevante
+
+    def _nombres(self, indice):
+        qn = self.connection.ops.quote_name
+        return qn(indice.tabla), qn(f'{indice.tabla}_contenido')
+
+    def crear(self, indice, tipo_pk):
+        tabla, contenido = self._nombres(indice)
+        columnas = ', '.join(indice.campos)
+        nuevas = ', '.join(f'new.{c}' for c in indice.campos)
+        viejas = ', '.join(f'old.{c}' for c in indice.campos)
+        prefijo = indice.tabla
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {contenido} ('
+                f'fila INTEGER PRIMARY KEY, objeto_id {tipo_pk} NOT NULL UNIQUE, '
+                + ', '.join(f'{c} TEXT' for c in indice.campos) + ')'
+            )
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {tabla} USING fts5('
+                f"{columnas}, content='{prefijo}_contenido', content_rowid='fila', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {prefijo}_ai AFTER INSERT ON {contenido} BEGIN '
+                f'INSERT INTO {tabla}(rowid, {columnas}) VALUES (new.fila, {nuevas}); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {prefijo}_ad AFTER DELETE ON {contenido} BEGIN '
+                f"INSERT INTO {tabla}({tabla}, rowid, {columnas}) VALUES ('delete', old.fila, {viejas}); END"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {prefijo}_au AFTER UPDATE ON {contenido} BEGIN '
+                f"INSERT INTO {tabla}({tabla}, rowid, {columnas}) VALUES ('delete', old.fila, {viejas}); "
+                f'INSERT INTO {tabla}(rowid, {columnas}) VALUES (new.fila, {nuevas}); END'
+            )
+
+    def eliminar_indice(self, indice):
+        tabla, contenido = self._nombres(indice)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {contenido}')
+            cursor.execute(f'DROP TABLE IF EXISTS {tabla}')
+
+    def vaciar(self, indice):
+        tabla, contenido = self._nombres(indice)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {contenido}')
+            cursor.execute(f"INSERT INTO {tabla}({tabla}) VALUES ('rebuild')")
+
+    def indexar(self, indice, filas):
+        filas = [(pk, *valores) for pk, valores in filas]
+        if not filas:
+            return
+        _, contenido = self._nombres(indice)
+        columnas = ', '.join(indice.campos)
+        marcadores = ', '.join(['%s'] * (len(indice.campos) + 1))
+        asignaciones = ', '.join(f'{c} = excluded.{c}' for c in indice.campos)
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {contenido} (objeto_id, {columnas}) VALUES ({marcadores}) '
+                f'ON CONFLICT (objeto_id) DO UPDATE SET {asignaciones}',
+                filas,
+            )
+
+    def quitar(self, indice, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        _, contenido = self._nombres(indice)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {contenido} WHERE objeto_id IN ({", ".join(["%s"] * len(pks))})',
+                pks,
+            )
+
+    @staticmethod
+    def consulta(texto):
+        # Cada palabra como prefijo entre comillas: evita la sintaxis de FTS5
+        return ' '.join(f'"{p}"*' for p in palabras(texto))
+
+    def buscar(self, indice, queryset, texto):
+        consulta = self.consulta(texto)
+        if not consulta:
+            return queryset.none()
+        tabla, contenido = self._nombres(indice)
+        tabla_modelo, pk = self._columnas_modelo(queryset)
+        coincidencias = (
+            f'SELECT {contenido}.objeto_id FROM {tabla} '
+            f'JOIN {contenido} ON {contenido}.fila = {tabla}.rowid WHERE {tabla} MATCH %s',
+            [consulta],
+        )
+        rango = (
+            f'SELECT bm25({tabla}) FROM {tabla} WHERE {tabla} MATCH %s AND {tabla}.rowid = '
+            f'(SELECT fila FROM {contenido} WHERE objeto_id = {tabla_modelo}.{pk})',
+            [consulta],
+        )
+        return self._anotar(queryset, coincidencias, rango)
+
+
+class BusquedaPostgres(BusquedaSimple):
+    """Índice tsvector con GIN; el texto se pondera por campo con setweight"""
+    nombre = 'postgres'
+    orden = '-rango_busqueda'
+
+    @property
+    def configuracion(self):
+        return getattr(settings, 'BUSQUEDA_CONFIGURACION_PG', 'spanish')
+
+    def crear(self, indice, tipo_pk):
+        qn = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {qn(indice.tabla)} ('
+                f'objeto_id {tipo_pk} PRIMARY KEY, documento tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {qn(indice.tabla + "_gin")} '
+                f'ON {qn(indice.tabla)} USING GIN (documento)'
+            )
+
+    def eliminar_indice(self, indice):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.connection.ops.quote_name(indice.tabla)}')
+
+    def vaciar(self, indice):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.connection.ops.quote_name(indice.tabla)}')
+
+    def indexar(self, indice, filas):
+        filas = [
+            (pk, *(p for valor in valores for p in (self.configuracion, valor or '')))
+            for pk, valores in filas
+        ]
+        if not filas:
+            return
+        documento = ' || '.join(
+            f"setweight(to_tsvector(%s::regconfig, %s), '{indice.peso(i)}')"
+            for i in range(len(indice.campos))
+        )
+        tabla = self.connection.ops.quote_name(indice.tabla)
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {tabla} (objeto_id, documento) VALUES (%s, {documento}) '
+                f'ON CONFLICT (objeto_id) DO UPDATE SET documento = EXCLUDED.documento',
+                filas,
+            )
+
+    def quitar(self, indice, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        tabla = self.connection.ops.quote_name(indice.tabla)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {tabla} WHERE objeto_id = ANY(%s)', [pks])
+
+    @staticmethod
+    def consulta(texto):
+        return ' & '.join(f'{p}:*' for p in palabras(texto))
+
+    def buscar(self, indice, queryset, texto):
+        consulta = self.consulta(texto)
+        if not consulta:
+            return queryset.none()
+        tabla = self.connection.ops.quote_name(indice.tabla)
+        tabla_modelo, pk = self._columnas_modelo(queryset)
+        tsquery = 'to_tsquery(%s::regconfig, %s)'
+        coincidencias = (
+            f'SELECT objeto_id FROM {tabla} WHERE documento @@ {tsquery}',
+            [self.configuracion, consulta],
+        )
+        rango = (
+            f'SELECT ts_rank(documento, {tsquery}) FROM {tabla} '
+            f'WHERE objeto_id = {tabla_modelo}.{pk}',
+            [self.configuracion, consulta],
+        )
+        return self._anotar(queryset, coincidencias, rango)
+
+
+BACKENDS = {
+    'simple': BusquedaSimple,
+    'fts5': BusquedaFTS5,
+    'postgres': BusquedaPostgres,
+}
+
+BACKEND_POR_MOTOR = {
+    'sqlite': 'fts5',
+    'postgresql': 'postgres',
+}
+
+
+def backend(connection):
+    """Motor de búsqueda para una conexión (o alias de conexión)"""
+    if isinstance(connection, str):
+        connection = connections[connection]
+    nombre = getattr(settings, 'BUSQUEDA_BACKEND', None)\
+        or BACKEND_POR_MOTOR.get(connection.vendor, 'simple')
+    if nombre == 'fts5' and (connection.vendor != 'sqlite' or not soporta_fts5()):
+        nombre = 'simple'
+    if nombre == 'postgres' and connection.vendor != 'postgresql':
+        nombre = 'simple'
+    return BACKENDS[nombre](connection)
+
+
+def _valores(indice, objeto):
+    return [
+        None if getattr(objeto, campo) is None else str(getattr(objeto, campo))
+        for campo in indice.campos
+    ]
+
+
+def _pk_db(modelo, pk, connection):
+    return modelo._meta.pk.get_db_prep_value(pk, connection)
+
+
+def indexar_objetos(modelo, objetos, using=None):
+    """Agrega o actualiza objetos ya guardados en el índice de su modelo"""
+    indice = indice_de(modelo)
+    if indice is None:
+        return
+    connection = connections[using or router.db_for_write(modelo)]
+    backend(connection).indexar(indice, [
+        (_pk_db(modelo, objeto.pk, connection), _valores(indice, objeto))
+        for objeto in objetos
+    ])
+
+
+def quitar_objetos(modelo, pks, using=None, lote=500):
+    """Quita del índice de su modelo las filas con esas pks (borrados sin señales)"""
+    indice = indice_de(modelo)
+    if indice is None:
+        return
+    connection = connections[using or router.db_for_write(modelo)]
+    pks = list(pks)
+    for i in range(0, len(pks), lote):
+        backend(connection).quitar(indice, [_pk_db(modelo, pk, connection) for pk in pks[i:i + lote]])
+
+
+def _indexar_queryset(indice, queryset, lote):
+    connection = connections[queryset.db]
+    motor = backend(connection)
+    pk = queryset.model._meta.pk
+    total = 0
+    bloque = []
+    filas = queryset.order_by().values_list('pk', *indice.campos).iterator(chunk_size=lote)
+    for valor_pk, *valores in filas:
+        bloque.append((
+            pk.get_db_prep_value(valor_pk, connection),
+            [None if v is None else str(v) for v in valores],
+        ))
+        if len(bloque) >= lote:
+            motor.indexar(indice, bloque)
+            total += len(bloque)
+            bloque = []
+    motor.indexar(indice, bloque)
+    return total + len(bloque)
+
+
+def reindexar(queryset, lote=TAMANO_LOTE):
+    """Vuelve a indexar las filas de un queryset, por bloques"""
+    indice = indice_de(queryset.model)
+    if indice is None:
+        return 0
+    return _indexar_queryset(indice, queryset, lote)
+
+
+def reconstruir(modelo, using='default', lote=TAMANO_LOTE):
+    """Vacía y reconstruye el índice completo de un modelo"""
+    indice = indice_de(modelo)
+    if indice is None:
+        return 0
+    backend(using).vaciar(indice)
+    return reindexar(modelo._base_manager.using(using).all(), lote=lote)
+
+
+def buscar(queryset, texto):
+    """
+    Filtra el queryset por el texto usando el índice del modelo.
+    Los resultados quedan anotados con `rango_busqueda` y ordenados por
+    relevancia, con el orden previo como desempate (salvo en el motor simple).
+    """
+    indice = indice_de(queryset.model)
+    if indice is None:
+        raise ValueError(f'{queryset.model._meta.label} no está registrado para búsqueda.')
+    return backend(queryset.db).buscar(indice, queryset, texto)
+
+
+def crear_indice(schema_editor, modelo, campos, pesos=()):
+    """
+    Crea la tabla de índice de un modelo e indexa las filas existentes;
+    pensado para usarse desde migraciones con el modelo histórico
+    """
+    connection = schema_editor.connection
+    indice = IndiceBusqueda.para_modelo(modelo, campos, pesos)
+    backend(connection).crear(indice, modelo._meta.pk.rel_db_type(connection))
+    _indexar_queryset(indice, modelo._base_manager.using(connection.alias).all(), TAMANO_LOTE)
+    return indice
+
+
+def eliminar_indice(schema_editor, modelo, campos):
+    indice = IndiceBusqueda.para_modelo(modelo, campos)
+    backend(schema_editor.connection).eliminar_indice(indice)
+
+
+def _al_guardar(sender, instance, using=None, update_fields=None, **kwargs):
+    if update_fields is not None and not set(indice_de(sender).campos) & set(update_fields):
+        return  # No cambió ningún campo indexado
+    indexar_objetos(sender, [instance], using=using)
+
+
+def _al_eliminar(sender, instance, using=None, **kwargs):
+    indice = indice_de(sender)
+    connection = connections[using]
+    backend(connection).quitar(indice, [_pk_db(sender, instance.pk, connection)])
+
+
+class BusquedaAdminMixin:
+    """
+    Hace que la caja de búsqueda del admin use el índice de texto completo
+    del modelo en lugar de search_fields con icontains. Con texto de
+    búsqueda la lista se ordena por relevancia, salvo que se elija una columna.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or indice_de(queryset.model) is None:
+            return super().get_search_results(request, queryset, search_term)
+        resultados = buscar(queryset, search_term)
+        if ORDER_VAR in request.GET:
+            # Orden elegido en la cabecera de la lista
+            resultados = resultados.order_by(*queryset.query.order_by)
+        return resultados, False
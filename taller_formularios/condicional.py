@@ -0,0 +1,84 @@
+"""
+GET condicional para páginas de detalle
+
+La versión de un objeto es su fecha de actualización: la página sale con un
+ETag débil derivado de ella y con Cache-Control "private, no-cache", así que
+el navegador la guarda y la revalida en cada visita. Si el objeto no cambió
+se responde 304 sin cargarlo completo ni renderizar la plantilla; la
+comprobación es una consulta de una columna.
+
+La página también lleva estado de la petición: el token CSRF de sus
+formularios y el usuario de la sesión entran en el ETag, así que tras un
+inicio de sesión o una rotación del token se renderiza de nuevo. No se envía
+Last-Modified, que no puede reflejar ese estado. Si hay mensajes pendientes
+la respuesta sale sin validadores, para que se muestren y no queden en la
+copia guardada.
+
+Un cambio de plantilla no cambia la versión: los navegadores siguen usando
+la página guardada hasta la siguiente escritura del objeto.
+"""
+from django.contrib.messages import get_messages
+from django.http import Http404
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .api import etag_debil
+
+
+def validador(request, pk, modificado):
+    """ETag de la página: versión del objeto, usuario y secreto CSRF"""
+    # Fija el secreto que usará {% csrf_token %} (o lo crea si no hay cookie)
+    get_token(request)
+    usuario = getattr(request, 'user', None)
+    return etag_debil(
+        str(pk), modificado, getattr(usuario, 'pk', None), request.META.get('CSRF_COOKIE')
+    )
+
+
+def mensajes_pendientes(request):
+    # len() carga los mensajes sin marcarlos como leídos
+    return len(get_messages(request)) > 0
+
+
+def no_modificada(request, pk, modificado):
+    """Respuesta 304 si el cliente ya tiene esta versión; None si hay que renderizar"""
+    if mensajes_pendientes(request):
+        return None
+    etag = validador(request, pk, modificado)
+    respuesta = get_conditional_response(request, etag=etag)
+    if respuesta is not None:
+        respuesta['ETag'] = etag
+        patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+
+def con_validadores(request, response, pk, modificado):
+    patch_cache_control(response, private=True, no_cache=True)
+    if not mensajes_pendientes(request):
+        response['ETag'] = validador(request, pk, modificado)
+    return response
+
+
+class GetCondicionalMixin:
+    """
+    Mixin para DetailView: responde 304 si la página del objeto no cambió
+    desde la copia del cliente (ver el docstring del módulo)
+    """
+    campo_version = 'fecha_actualizacion'
+
+    def version(self):
+        modificado = self.get_queryset()\
+            .filter(pk=self.kwargs[self.pk_url_kwarg])\
+            .values_list(self.campo_version, flat=True)\
+            .first()
+        if modificado is None:
+            raise Http404('No se encontró el objeto.')
+        return modificado
+
+    def get(self, request, *args, **kwargs):
+        pk = self.kwargs[self.pk_url_kwarg]
+        modificado = self.version()
+        respuesta = no_modificada(request, pk, modificado)
+        if respuesta is not None:
+            return respuesta
+        return con_validadores(request, super().get(request, *args, **kwargs), pk, modificado)
@@ -0,0 +1,99 @@
+"""
+Descarga de archivos con ETag fuerte y peticiones de rango (Range)
+
+`respuesta_archivo` responde 304 si el cliente ya tiene la versión
+(If-None-Match), 206 con el fragmento pedido para un rango simple
+("bytes=inicio-fin", "bytes=inicio-" o "bytes=-sufijo") y 416 si el rango
+no se puede satisfacer. Con varios rangos o If-Range desactualizado se
+envía el archivo completo, como permite el RFC 9110.
+"""
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_etags, quote_etag
+
+TAMANO_BLOQUE = 64 * 1024
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def rango_solicitado(cabecera, tamano):
+    """
+    Retorna (inicio, fin) inclusivos del rango pedido, None si no hay un
+    rango simple que aplicar, o False si el rango no se puede satisfacer
+    """
+    coincidencia = _RANGO.match((cabecera or '').replace(' ', ''))
+    if not coincidencia:
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        sufijo = int(fin)
+        if sufijo == 0 or tamano == 0:
+            return False
+        return max(tamano - sufijo, 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or fin < inicio:
+        return False
+    return inicio, fin
+
+
+def _fragmento(archivo, inicio, largo):
+    try:
+        archivo.seek(inicio)
+        while largo > 0:
+            bloque = archivo.read(min(TAMANO_BLOQUE, largo))
+            if not bloque:
+                break
+            largo -= len(bloque)
+            yield bloque
+    finally:
+        archivo.close()
+
+
+def respuesta_archivo(request, archivo, tamano, etag=None, nombre=None,
+                      tipo=None, ultima_modificacion=None):
+    """
+    Respuesta para descargar `archivo` (abierto en modo binario).
+    `etag` es el valor sin comillas, p. ej. el SHA-256 del contenido.
+    """
+    etag = quote_etag(etag) if etag else None
+    tipo = tipo or 'application/octet-stream'
+
+    if etag and etag in parse_etags(request.headers.get('If-None-Match', '')):
+        archivo.close()
+        respuesta = HttpResponse(status=304)
+        respuesta['ETag'] = etag
+        return respuesta
+
+    rango = None
+    if 'Range' in request.headers:
+        if_range = request.headers.get('If-Range')
+        if not if_range or (etag and if_range == etag):
+            rango = rango_solicitado(request.headers['Range'], tamano)
+
+    if rango is False:
+        archivo.close()
+        respuesta = HttpResponse(status=416)
+        respuesta['Content-Range'] = f'bytes */{tamano}'
+    elif rango:
+        inicio, fin = rango
+        largo = fin - inicio + 1
+        respuesta = StreamingHttpResponse(
+            _fragmento(archivo, inicio, largo), status=206, content_type=tipo
+        )
+        respuesta['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+        respuesta['Content-Length'] = str(largo)
+    else:
+        respuesta = FileResponse(archivo, content_type=tipo, filename=nombre or '')
+        respuesta['Content-Length'] = str(tamano)
+
+    respuesta['Accept-Ranges'] = 'bytes'
+    if etag:
+        respuesta['ETag'] = etag
+    if ultima_modificacion:
+        respuesta['Last-Modified'] = http_date(ultima_modificacion.timestamp())
+    if nombre and rango:
+        respuesta['Content-Disposition'] = content_disposition_header(False, nombre)
+    return respuesta
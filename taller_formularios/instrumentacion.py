@@ -0,0 +1,265 @@
+"""
+Instrumentación de consultas SQL y latencia por vista
+
+Con INSTRUMENTACION = True el middleware mide en cada petición el número de
+consultas, el tiempo total de SQL, las consultas más lentas, el tiempo de
+renderizado de plantillas y el tiempo total. Los datos se envían en la
+cabecera Server-Timing, en una línea de log JSON (logger
+`taller_formularios.instrumentacion`) y se acumulan por nombre de URL para
+la página del admin /admin/instrumentacion/.
+
+Con la opción desactivada el middleware lanza MiddlewareNotUsed y Django lo
+retira de la cadena: no añade ningún costo por petición.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.contrib import admin
+from django.db import connections
+from django.shortcuts import redirect, render
+from django.template.backends.django import Template as PlantillaDjango
+
+logger = logging.getLogger(__name__)
+
+_medicion_actual = ContextVar('medicion_actual', default=None)
+
+
+def _configuracion(nombre, por_defecto):
+    return getattr(settings, nombre, por_defecto)
+
+
+class Medicion:
+    """Datos recogidos durante una petición"""
+
+    def __init__(self, maximo_lentas):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.tiempo_plantillas = 0.0
+        self.lentas = []
+        self.maximo_lentas = maximo_lentas
+
+    def registrar_consulta(self, sql, duracion):
+        self.consultas += 1
+        self.tiempo_sql += duracion
+        if self.maximo_lentas:
+            self.lentas.append((duracion, sql))
+            if len(self.lentas) > self.maximo_lentas:
+                self.lentas.sort(reverse=True)
+                self.lentas.pop()
+
+    def consultas_lentas(self):
+        return [
+            {'ms': round(duracion * 1000, 2), 'sql': sql}
+            for duracion, sql in sorted(self.lentas, reverse=True)
+        ]
+
+
+class EstadisticasVistas:
+    """
+    Acumulado por nombre de URL de las peticiones medidas en este proceso
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vistas = {}
+
+    def agregar(self, vista, total, medicion):
+        with self._lock:
+            datos = self._vistas.setdefault(vista, {
+                'vista': vista,
+                'peticiones': 0,
+                'tiempo_total': 0.0,
+                'tiempo_maximo': 0.0,
+                'consultas': 0,
+                'consultas_maximo': 0,
+                'tiempo_sql': 0.0,
+                'tiempo_plantillas': 0.0,
+                'lentas': [],
+            })
+            datos['peticiones'] += 1
+            datos['tiempo_total'] += total
+            datos['tiempo_maximo'] = max(datos['tiempo_maximo'], total)
+            datos['consultas'] += medicion.consultas
+            datos['consultas_maximo'] = max(datos['consultas_maximo'], medicion.consultas)
+            datos['tiempo_sql'] += medicion.tiempo_sql
+            datos['tiempo_plantillas'] += medicion.tiempo_plantillas
+            datos['lentas'] = sorted(
+                datos['lentas'] + medicion.lentas, reverse=True
+            )[:medicion.maximo_lentas]
+
+    def resumen(self):
+        """Filas por vista con promedios en milisegundos, de la más lenta a la más rápida"""
+        with self._lock:
+            vistas = [dict(d, lentas=list(d['lentas'])) for d in self._vistas.values()]
+
+        filas = []
+        for datos in vistas:
+            n = datos['peticiones']
+            filas.append({
+                'vista': datos['vista'],
+                'peticiones': n,
+                'ms_promedio': round(datos['tiempo_total'] / n * 1000, 2),
+                'ms_maximo': round(datos['tiempo_maximo'] * 1000, 2),
+                'consultas_promedio': round(datos['consultas'] / n, 1),
+                'consultas_maximo': datos['consultas_maximo'],
+                'sql_ms_promedio': round(datos['tiempo_sql'] / n * 1000, 2),
+                'plantillas_ms_promedio': round(datos['tiempo_plantillas'] / n * 1000, 2),
+                'lentas': [
+                    {'ms': round(duracion * 1000, 2), 'sql': sql}
+                    for duracion, sql in datos['lentas']
+                ],
+            })
+        return sorted(filas, key=lambda f: f['ms_promedio'], reverse=True)
+
+    def reiniciar(self):
+        with self._lock:
+            self._vistas.clear()
+
+
+estadisticas = EstadisticasVistas()
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.registrar_consulta(sql, time.perf_counter() - inicio)
+
+
+_render_original = None
+
+
+def _instalar_medicion_plantillas():
+    """
+    Envuelve el render del backend de plantillas de Django para medir el
+    tiempo de las plantillas de primer nivel (render() y TemplateResponse)
+    """
+    global _render_original
+    if _render_original is not None:
+        return
+    _render_original = PlantillaDjango.render
+
+    def render(self, context=None, request=None):
+        medicion = _medicion_actual.get()
+        if medicion is None:
+            return _render_original(self, context, request)
+        inicio = time.perf_counter()
+        try:
+            return _render_original(self, context, request)
+        finally:
+            medicion.tiempo_plantillas += time.perf_counter() - inicio
+
+    PlantillaDjango.render = render
+
+
+def _nombre_vista(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    if coincidencia is None:
+        return '(sin resolver)'
+    return coincidencia.view_name or coincidencia._func_path
+
+
+def server_timing(vista, total, medicion):
+    return ', '.join([
+        f'vista;desc="{vista}"',
+        f'sql;dur={medicion.tiempo_sql * 1000:.2f};desc="{medicion.consultas} consultas"',
+        f'plantillas;dur={medicion.tiempo_plantillas * 1000:.2f}',
+        f'total;dur={total * 1000:.2f}',
+    ])
+
+
+class InstrumentacionMiddleware:
+    """
+    Mide consultas SQL, plantillas y latencia de cada petición.
+    Debe ir al principio de MIDDLEWARE para cubrir toda la cadena.
+    Funciona en modo síncrono (WSGI) y asíncrono (ASGI) sin adaptar la cadena.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not _configuracion('INSTRUMENTACION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.maximo_lentas = _configuracion('INSTRUMENTACION_CONSULTAS_LENTAS', 3)
+        self.cabecera = _configuracion('INSTRUMENTACION_SERVER_TIMING', True)
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+        _instalar_medicion_plantillas()
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        with self._medir() as medicion:
+            response = self.get_response(request)
+        return self._reportar(request, response, medicion)
+
+    async def __acall__(self, request):
+        with self._medir() as medicion:
+            response = await self.get_response(request)
+        return self._reportar(request, response, medicion)
+
+    @contextmanager
+    def _medir(self):
+        medicion = Medicion(self.maximo_lentas)
+        token = _medicion_actual.set(medicion)
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(_medir_consulta))
+                yield medicion
+        finally:
+            _medicion_actual.reset(token)
+
+    def _reportar(self, request, response, medicion):
+        total = time.perf_counter() - medicion.inicio
+        vista = _nombre_vista(request)
+        estadisticas.agregar(vista, total, medicion)
+
+        if self.cabecera:
+            response['Server-Timing'] = server_timing(vista, total, medicion)
+        logger.info(json.dumps({
+            'vista': vista,
+            'metodo': request.method,
+            'ruta': request.path,
+            'estado': response.status_code,
+            'ms': round(total * 1000, 2),
+            'consultas': medicion.consultas,
+            'sql_ms': round(medicion.tiempo_sql * 1000, 2),
+            'plantillas_ms': round(medicion.tiempo_plantillas * 1000, 2),
+            'lentas': medicion.consultas_lentas(),
+        }, ensure_ascii=False))
+        return response
+
+
+def panel_instrumentacion(request):
+    """
+    Página del admin con el acumulado por nombre de URL; reiniciar el
+    acumulado queda para los superusuarios
+    """
+    if request.method == 'POST' and 'reiniciar' in request.POST:
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        estadisticas.reiniciar()
+        return redirect('instrumentacion')
+
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Rendimiento por vista',
+        'activa': _configuracion('INSTRUMENTACION', False),
+        'vistas': estadisticas.resumen(),
+    }
+    return render(request, 'admin/instrumentacion.html', context)
@@ -0,0 +1,185 @@
+"""
+Paginación por cursor (keyset) para vistas de lista
+
+En lugar de OFFSET, cada página se pide a partir de los valores de orden de
+la última (o primera) fila de la página anterior, de modo que el costo de la
+página 10.000 es el mismo que el de la página 1 si el orden usa un índice.
+Los cursores se entregan firmados y opacos a las plantillas.
+"""
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+SAL_CURSOR = 'taller_formularios.paginacion'
+
+
+def _campo_y_direccion(orden):
+    if orden.startswith('-'):
+        return orden[1:], True
+    return orden, False
+
+
+def _condicion_despues(campos, valores, invertido=False):
+    """
+    Q que selecciona las filas posteriores a `valores` en el orden de `campos`
+    (comparación lexicográfica, p. ej. a < x OR (a = x AND b < y)).
+    Con invertido=True selecciona las filas anteriores.
+    """
+    condicion = Q()
+    iguales = {}
+    for orden, valor in zip(campos, valores):
+        nombre, descendente = _campo_y_direccion(orden)
+        if invertido:
+            descendente = not descendente
+        operador = 'lt' if descendente else 'gt'
+        condicion |= Q(**iguales, **{f'{nombre}__{operador}': valor})
+        iguales[nombre] = valor
+    return condicion
+
+
+def _invertir(campos):
+    return [c[1:] if c.startswith('-') else f'-{c}' for c in campos]
+
+
+class PaginaCursor:
+    """
+    Página de resultados obtenida por cursor. Expone la misma interfaz básica
+    que django.core.paginator.Page (has_next, has_previous, object_list)
+    """
+
+    def __init__(self, object_list, cursor_siguiente, cursor_anterior, total=None):
+        self.object_list = object_list
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class PaginadorCursor:
+    """
+    Pagina un queryset por los campos de orden indicados. El último campo
+    debe ser único (normalmente la pk) para desempatar.
+    """
+
+    def __init__(self, queryset, por_pagina, campos=('-fecha_creacion', '-pk'), contar_total=True):
+        self.queryset = queryset
+        self.por_pagina = por_pagina
+        self.campos = list(campos)
+        self.contar_total = contar_total
+
+    def _valores(self, obj):
+        valores = []
+        for orden in self.campos:
+            nombre, _ = _campo_y_direccion(orden)
+            if isinstance(obj, dict):
+                # Filas de .values(): la pk viene con el nombre con que se pidió
+                valor = obj[nombre]
+            else:
+                valor = getattr(obj, nombre)
+            valores.append(valor.isoformat() if hasattr(valor, 'isoformat') else str(valor))
+        return valores
+
+    def _convertir(self, valores):
+        modelo = self.queryset.model
+        convertidos = []
+        for orden, valor in zip(self.campos, valores):
+            nombre, _ = _campo_y_direccion(orden)
+            campo = modelo._meta.pk if nombre == 'pk' else modelo._meta.get_field(nombre)
+            convertidos.append(campo.to_python(valor))
+        return convertidos
+
+    def codificar(self, obj, direccion):
+        return signing.dumps([direccion, self._valores(obj)], salt=SAL_CURSOR, compress=True)
+
+    def decodificar(self, cursor):
+        try:
+            direccion, valores = signing.loads(cursor, salt=SAL_CURSOR)
+            if direccion not in ('siguiente', 'anterior') or len(valores) != len(self.campos):
+                raise ValueError
+            return direccion, self._convertir(valores)
+        except (signing.BadSignature, ValidationError, ValueError, TypeError):
+            raise Http404('Cursor de paginación inválido.')
+
+    def pagina(self, cursor=None):
+        """Retorna la PaginaCursor correspondiente al cursor (o la primera)"""
+        queryset = self.queryset.order_by(*self.campos)
+        direccion, valores = self.decodificar(cursor) if cursor else ('siguiente', None)
+
+        if direccion == 'siguiente':
+            if valores is not None:
+                queryset = queryset.filter(_condicion_despues(self.campos, valores))
+            filas = list(queryset[:self.por_pagina + 1])
+            hay_mas = len(filas) > self.por_pagina
+            filas = filas[:self.por_pagina]
+            hay_siguiente, hay_anterior = hay_mas, valores is not None
+        else:
+            queryset = queryset.filter(
+                _condicion_despues(self.campos, valores, invertido=True)
+            ).order_by(*_invertir(self.campos))
+            filas = list(queryset[:self.por_pagina + 1])
+            hay_mas = len(filas) > self.por_pagina
+            filas = filas[:self.por_pagina][::-1]
+            hay_siguiente, hay_anterior = True, hay_mas
+
+        total = self.queryset.count() if self.contar_total else None
+        return PaginaCursor(
+            filas,
+            cursor_siguiente=self.codificar(filas[-1], 'siguiente') if filas and hay_siguiente else None,
+            cursor_anterior=self.codificar(filas[0], 'anterior') if filas and hay_anterior else None,
+            total=total,
+        )
+
+
+class PaginacionCursorMixin:
+    """
+    Mixin para ListView que activa la paginación por cursor.
+    Por defecto sigue la configuración PAGINACION_CURSOR (desactivada) y
+    PAGINACION_CONTAR_TOTAL; cada vista puede fijarlas con atributos.
+    """
+    paginacion_cursor = None
+    contar_total = None
+    campos_cursor = ('-fecha_creacion', '-pk')
+
+    def usa_paginacion_cursor(self):
+        if self.paginacion_cursor is None:
+            return getattr(settings, 'PAGINACION_CURSOR', False)
+        return self.paginacion_cursor
+
+    def debe_contar_total(self):
+        if self.contar_total is None:
+            return getattr(settings, 'PAGINACION_CONTAR_TOTAL', True)
+        return self.contar_total
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.usa_paginacion_cursor():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginador = PaginadorCursor(
+            queryset,
+            page_size,
+            campos=self.campos_cursor,
+            contar_total=self.debe_contar_total(),
+        )
+        pagina = paginador.pagina(self.request.GET.get('cursor'))
+        return (paginador, pagina, pagina.object_list, pagina.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['paginacion_cursor'] = self.usa_paginacion_cursor()
+        return context
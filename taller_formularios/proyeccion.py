@@ -0,0 +1,134 @@
+"""
+Proyección de columnas para listas
+
+Las listas solo leen las columnas que muestran sus plantillas:
+
+- `Lectura` es un modelo de lectura: se declara con el modelo y los campos
+  (o expresiones) que la plantilla usa, se consulta con .values() y cada
+  fila se envuelve en un objeto con acceso por atributo, `pk` y los
+  get_<campo>_display de los campos con choices. Leer un campo que no se
+  proyectó lanza CampoNoProyectado en lugar de devolver vacío o hacer otra
+  consulta, así que un cambio de plantilla que necesite otra columna falla
+  en las pruebas.
+- `ProyeccionListMixin` aplica una Lectura a una ListView (con paginación
+  por páginas o por cursor).
+- `ProyeccionAdminMixin` limita con only() las columnas de la lista de
+  cambios del admin a `campos_lista`; el formulario de edición y las
+  acciones siguen usando el queryset completo.
+"""
+
+
+class CampoNoProyectado(Exception):
+    """
+    No hereda de AttributeError a propósito: las plantillas de Django
+    silencian AttributeError y mostrarían un valor vacío
+    """
+
+
+class Lectura:
+    """
+    Fila de solo lectura de una proyección. Las subclases declaran `modelo`,
+    `campos` (nombres de campo, 'pk' incluido si se necesita) y `anotaciones`
+    ({nombre: expresión}) para valores calculados en la consulta.
+    """
+    modelo = None
+    campos = ()
+    anotaciones = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.modelo is None:
+            return
+        for nombre in cls.campos:
+            if nombre == 'pk':
+                continue
+            campo = cls.modelo._meta.get_field(nombre)
+            if campo.choices:
+                setattr(cls, f'get_{nombre}_display', _display(nombre, dict(campo.flatchoices)))
+
+    def __init__(self, fila):
+        self.__dict__.update(fila)
+
+    def __getattr__(self, nombre):
+        # Solo se llama para atributos que no están en la fila
+        if nombre.startswith('__'):
+            raise AttributeError(nombre)
+        raise CampoNoProyectado(
+            f'{type(self).__name__} no proyecta "{nombre}"; agréguelo a campos o anotaciones.'
+        )
+
+    def __eq__(self, otro):
+        # Como los modelos de Django: iguales si son la misma fila
+        if isinstance(otro, Lectura):
+            return otro.modelo is self.modelo and otro.pk == self.pk
+        if self.modelo is not None and isinstance(otro, self.modelo):
+            return otro.pk == self.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.modelo, self.__dict__.get('pk')))
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.__dict__.get("pk")}>'
+
+    @classmethod
+    def proyectar(cls, queryset):
+        """Queryset de diccionarios con solo las columnas declaradas"""
+        if cls.anotaciones:
+            queryset = queryset.annotate(**cls.anotaciones)
+        return queryset.values(*cls.campos, *cls.anotaciones)
+
+    @classmethod
+    def envolver(cls, filas):
+        return [cls(fila) for fila in filas]
+
+    @classmethod
+    def leer(cls, queryset):
+        """Lista de lecturas del queryset"""
+        return cls.envolver(cls.proyectar(queryset))
+
+
+def _display(nombre, opciones):
+    def display(self):
+        valor = getattr(self, nombre)
+        return str(opciones.get(valor, valor))
+    display.__name__ = f'get_{nombre}_display'
+    return display
+
+
+class ProyeccionListMixin:
+    """
+    Mixin para ListView paginada: la página se consulta con
+    `lectura.proyectar` (después de los filtros de get_queryset) y la
+    plantilla recibe objetos `lectura` en lugar de instancias del modelo
+    """
+    lectura = None
+
+    def paginate_queryset(self, queryset, page_size):
+        paginador, pagina, filas, hay_paginas = super().paginate_queryset(
+            self.lectura.proyectar(queryset), page_size
+        )
+        pagina.object_list = self.lectura.envolver(filas)
+        return paginador, pagina, pagina.object_list, hay_paginas
+
+
+class ProyeccionAdminMixin:
+    """
+    Mixin para ModelAdmin: la lista de cambios carga solo `campos_lista`
+    (las columnas de list_display y lo que usan sus métodos)
+    """
+    campos_lista = ()
+
+    def get_changelist(self, request, **kwargs):
+        base = super().get_changelist(request, **kwargs)
+        campos = self.campos_lista
+        if not campos:
+            return base
+
+        class ChangeListProyectada(base):
+            def get_results(self, request):
+                # Solo la página mostrada; get_queryset() queda completo para las acciones
+                self.queryset = self.queryset.only(*campos)
+                super().get_results(request)
+
+        return ChangeListProyectada
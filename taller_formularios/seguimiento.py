@@ -0,0 +1,99 @@
+"""
+Seguimiento de los campos modificados de una instancia de modelo
+
+SeguimientoCambiosMixin recuerda los valores con que se cargó cada fila (o
+con que se guardó por última vez) y con eso:
+
+- full_clean() solo valida los campos que cambiaron: clean_fields() y
+  validate_unique() excluyen los que no, de modo que la consulta de
+  unique_together se omite si no cambió ninguno de sus campos;
+- save() escribe solo las columnas modificadas (update_fields) y no hace
+  nada si no cambió ninguna.
+
+Las instancias nuevas, o que no se cargaron de la base de datos (p. ej.
+tras un bulk_create), no tienen valores de referencia y se tratan como
+cambiadas por completo. El clean() del modelo puede usar
+campos_modificados() para limitar sus propias reglas.
+"""
+
+
+class SeguimientoCambiosMixin:
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._recordar_valores()
+        return instancia
+
+    def _recordar_valores(self, campos=None):
+        cargados = self.__dict__.setdefault('_valores_cargados', {})
+        for campo in self._meta.concrete_fields:
+            if campos is not None and campo.name not in campos and campo.attname not in campos:
+                continue
+            if campo.attname in self.__dict__:
+                cargados[campo.attname] = self.__dict__[campo.attname]
+
+    def valores_cargados(self):
+        """Valores (por attname) de la última carga o del último guardado"""
+        return dict(self.__dict__.get('_valores_cargados', {}))
+
+    def campos_modificados(self):
+        """
+        Nombres de los campos que cambiaron desde la carga, o None si no hay
+        valores de referencia (instancia nueva o creada en memoria)
+        """
+        cargados = self.__dict__.get('_valores_cargados')
+        if cargados is None or self._state.adding:
+            return None
+        cambios = set()
+        for campo in self._meta.concrete_fields:
+            if campo.attname not in self.__dict__:
+                continue  # diferido y sin tocar
+            if campo.attname not in cargados or cargados[campo.attname] != self.__dict__[campo.attname]:
+                cambios.add(campo.name)
+        return cambios
+
+    def _campos_sin_validar(self, cambios):
+        """Campos que no cambiaron y no comparten una restricción única con uno que sí"""
+        sin_cambios = {campo.name for campo in self._meta.concrete_fields} - cambios
+        grupos = [set(grupo) for grupo in self._meta.unique_together]
+        grupos += [
+            set(restriccion.fields) for restriccion in self._meta.total_unique_constraints
+        ]
+        for grupo in grupos:
+            if grupo & cambios:
+                sin_cambios -= grupo
+        return sin_cambios
+
+    def clean_fields(self, exclude=None):
+        cambios = self.campos_modificados()
+        if cambios is not None:
+            exclude = set(exclude or ()) | ({campo.name for campo in self._meta.concrete_fields} - cambios)
+        super().clean_fields(exclude=exclude)
+
+    def validate_unique(self, exclude=None):
+        cambios = self.campos_modificados()
+        if cambios is not None:
+            exclude = set(exclude or ()) | self._campos_sin_validar(cambios)
+        super().validate_unique(exclude=exclude)
+
+    def save(self, *args, **kwargs):
+        cambios = self.campos_modificados()
+        if (cambios is not None and not args and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            if not cambios:
+                return
+            # auto_now solo se aplica a las columnas que se escriben
+            cambios |= {
+                campo.name for campo in self._meta.concrete_fields
+                if getattr(campo, 'auto_now', False)
+            }
+            kwargs['update_fields'] = cambios
+        super().save(*args, **kwargs)
+        self._recordar_valores(kwargs.get('update_fields'))
+
+    save.alters_data = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._recordar_valores(fields)
@@ -2,9 +2,18 @@ from django.urls import path, include
 from django.views.generic import RedirectView
 from django.contrib import admin
 
+from .instrumentacion import panel_instrumentacion
+
 urlpatterns = [
+    path(
+        'admin/instrumentacion/',
+        admin.site.admin_view(panel_instrumentacion),
+        name='instrumentacion',
+    ),
     path('admin/', admin.site.urls),
     path('asistencia/', include('asistencia.urls')),
     path('solicitudes/', include('solicitudes.urls')),
+    path('api/asistencias/', include('asistencia.api')),
+    path('api/solicitudes/', include('solicitudes.api')),
     path('', RedirectView.as_view(url='/asistencia/', permanent=False), name='home'),
 ]
@@ -0,0 +1,251 @@
+"""
+Motor de reglas de validación compartido por asistencia y solicitudes
+
+Las reglas de campo son funciones `regla(valor) -> mensaje | None` que
+reciben un valor no vacío; las expresiones regulares se compilan una sola
+vez al importar el módulo y los mensajes se formatean solo al fallar.
+
+Un Esquema agrupa las reglas de un registro y las comprobaciones entre
+campos (Cruzada) y devuelve todos los errores de una pasada, como
+{campo: [mensajes]}; errores_lote hace lo mismo para una lista de registros
+compartiendo el contexto (la fecha de hoy, p. ej.).
+
+Los registros pueden ser diccionarios o instancias de modelo.
+"""
+import re
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.translation import get_language, gettext_lazy as _
+
+LETRAS_NOMBRE = re.compile(r"^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s.']+$")
+NO_DIGITOS = re.compile(r'\D')
+
+MENSAJES = {
+    'documento_digitos': _('El documento de identidad debe contener solo números.'),
+    'documento_corto': _('El documento debe tener al menos 6 dígitos.'),
+    'documento_largo': _('El documento no puede tener más de 20 dígitos.'),
+    'documento_ceros': _('El documento no puede ser solo ceros.'),
+    'nombre_corto': _('El nombre debe tener al menos 2 caracteres.'),
+    'nombre_largo': _('El nombre no puede exceder los 150 caracteres.'),
+    'nombre_caracteres': _('El nombre solo puede contener letras, espacios, puntos y apostrofes.'),
+    'nombre_palabras': _('Debe ingresar al menos nombre y apellido.'),
+    'nombre_palabra_corta': _('Cada palabra del nombre debe tener al menos 2 caracteres.'),
+    'nombre_muchas_palabras': _('El nombre no puede tener más de 5 palabras.'),
+    'telefono_corto': _('El número de teléfono debe tener al menos %(minimo)s dígitos.'),
+    'telefono_largo': _('El número de teléfono no puede tener más de %(maximo)s dígitos.'),
+    'telefono_celular': _('Los números de celular deben iniciar con %(prefijo)s.'),
+    'texto_corto': _('El texto debe tener al menos %(minimo)s caracteres.'),
+    'texto_largo': _('El texto no puede exceder %(maximo)s caracteres.'),
+    'fecha_futura': _('La fecha no puede ser futura.'),
+    'horas_orden': _('La hora de salida debe ser posterior a la hora de ingreso.'),
+    'horas_maximo': _('La diferencia entre ingreso y salida no puede exceder %(horas)s horas.'),
+    'horas_minimo': _('La diferencia mínima entre ingreso y salida debe ser %(minutos)s minutos.'),
+}
+
+
+def solo_digitos(valor):
+    return NO_DIGITOS.sub('', str(valor))
+
+
+# Reglas de campo
+
+def documento_identidad(valor):
+    documento = str(valor).strip()
+    if not documento.isdigit():
+        return MENSAJES['documento_digitos']
+    if len(documento) < 6:
+        return MENSAJES['documento_corto']
+    if len(documento) > 20:
+        return MENSAJES['documento_largo']
+    if not documento.strip('0'):
+        return MENSAJES['documento_ceros']
+    return None
+
+
+def nombre_completo(valor):
+    nombre = str(valor).strip()
+    if len(nombre) < 2:
+        return MENSAJES['nombre_corto']
+    if len(nombre) > 150:
+        return MENSAJES['nombre_largo']
+    if not LETRAS_NOMBRE.match(nombre):
+        return MENSAJES['nombre_caracteres']
+    palabras = nombre.split()
+    if len(palabras) < 2:
+        return MENSAJES['nombre_palabras']
+    if len(min(palabras, key=len)) < 2:
+        return MENSAJES['nombre_palabra_corta']
+    if len(palabras) > 5:
+        return MENSAJES['nombre_muchas_palabras']
+    return None
+
+
+def telefono(minimo=7, maximo=10, prefijo_celular=None):
+    """Regla de teléfono; ignora espacios, guiones y demás separadores"""
+    def regla(valor):
+        digitos = solo_digitos(valor)
+        if len(digitos) < minimo:
+            return MENSAJES['telefono_corto'] % {'minimo': minimo}
+        if len(digitos) > maximo:
+            return MENSAJES['telefono_largo'] % {'maximo': maximo}
+        if prefijo_celular and len(digitos) == maximo and not digitos.startswith(prefijo_celular):
+            return MENSAJES['telefono_celular'] % {'prefijo': prefijo_celular}
+        return None
+    return regla
+
+
+def longitud(minimo=0, maximo=None, mensaje_corto=None, mensaje_largo=None):
+    """Regla de longitud del texto sin espacios en los extremos"""
+    def regla(valor):
+        tamano = len(str(valor).strip())
+        if tamano < minimo:
+            return mensaje_corto or MENSAJES['texto_corto'] % {'minimo': minimo}
+        if maximo is not None and tamano > maximo:
+            return mensaje_largo or MENSAJES['texto_largo'] % {'maximo': maximo}
+        return None
+    return regla
+
+
+# Comprobaciones entre campos (o que dependen del contexto)
+
+class Cruzada:
+    """
+    Comprobación sobre varios campos: `funcion(contexto, *valores)` retorna
+    un mensaje o None y el error se asigna a `campo_error` (por defecto el
+    último campo). Se omite si algún campo está vacío o ya tiene errores.
+    """
+
+    def __init__(self, campos, funcion, campo_error=None):
+        self.campos = tuple(campos)
+        self.funcion = funcion
+        self.campo_error = campo_error or self.campos[-1]
+
+
+def fecha_no_futura(campo, mensaje=None):
+    mensaje = mensaje or MENSAJES['fecha_futura']
+
+    def comprobar(contexto, fecha):
+        if isinstance(fecha, datetime):
+            fecha = timezone.localtime(fecha).date() if timezone.is_aware(fecha) else fecha.date()
+        return mensaje if fecha > contexto['hoy'] else None
+    return Cruzada([campo], comprobar)
+
+
+def _segundos(hora):
+    return hora.hour * 3600 + hora.minute * 60 + hora.second
+
+
+def rango_horas(campo_inicio, campo_fin, minimo_minutos=None, maximo_horas=None):
+    def comprobar(contexto, inicio, fin):
+        if fin <= inicio:
+            return MENSAJES['horas_orden']
+        diferencia = _segundos(fin) - _segundos(inicio)
+        if maximo_horas is not None and diferencia > maximo_horas * 3600:
+            return MENSAJES['horas_maximo'] % {'horas': maximo_horas}
+        if minimo_minutos is not None and diferencia < minimo_minutos * 60:
+            return MENSAJES['horas_minimo'] % {'minutos': minimo_minutos}
+        return None
+    return Cruzada([campo_inicio, campo_fin], comprobar)
+
+
+def _vacio(valor):
+    return valor is None or valor == ''
+
+
+_traducciones = {}
+
+
+def _texto(mensaje):
+    """
+    Traduce un mensaje perezoso; las traducciones se memorizan por idioma
+    porque los lotes con muchos errores repiten los mismos pocos mensajes
+    """
+    if isinstance(mensaje, str):
+        return mensaje
+    clave = (id(mensaje), get_language())
+    texto = _traducciones.get(clave)
+    if texto is None:
+        texto = _traducciones[clave] = str(mensaje)
+    return texto
+
+
+class Esquema:
+    """
+    Reglas de un registro: `campos` es {campo: regla o lista de reglas} (la
+    primera que falla da el error del campo) y `cruzadas` una lista de Cruzada
+    """
+
+    def __init__(self, campos, cruzadas=()):
+        self.campos = tuple(
+            (campo, tuple(reglas) if isinstance(reglas, (list, tuple)) else (reglas,))
+            for campo, reglas in campos.items()
+        )
+        self.cruzadas = tuple(cruzadas)
+
+    def contexto(self):
+        return {'hoy': timezone.localdate()}
+
+    def errores(self, registro, contexto=None, campos=None):
+        """
+        Todos los errores del registro: {campo: [mensajes]}. Con `campos` solo
+        se aplican las reglas que dependen de alguno de esos campos.
+        """
+        contexto = contexto or self.contexto()
+        if isinstance(registro, dict):
+            obtener = registro.get
+        else:
+            def obtener(campo):
+                return getattr(registro, campo, None)
+
+        errores = {}
+        for campo, reglas in self.campos:
+            if campos is not None and campo not in campos:
+                continue
+            valor = obtener(campo)
+            if valor is None or valor == '':
+                continue
+            for regla in reglas:
+                mensaje = regla(valor)
+                if mensaje:
+                    errores[campo] = [_texto(mensaje)]
+                    break
+
+        for cruzada in self.cruzadas:
+            if errores and not errores.keys().isdisjoint(cruzada.campos):
+                continue
+            if campos is not None and campos.isdisjoint(cruzada.campos):
+                continue
+            valores = [obtener(campo) for campo in cruzada.campos]
+            if None in valores or '' in valores:
+                continue
+            mensaje = cruzada.funcion(contexto, *valores)
+            if mensaje:
+                errores.setdefault(cruzada.campo_error, []).append(_texto(mensaje))
+        return errores
+
+    def errores_lote(self, registros):
+        """Errores de varios registros en una pasada: {índice: errores}"""
+        contexto = self.contexto()
+        resultado = {}
+        for indice, registro in enumerate(registros):
+            errores = self.errores(registro, contexto)
+            if errores:
+                resultado[indice] = errores
+        return resultado
+
+    def validar(self, registro, contexto=None, campos=None):
+        """Lanza ValidationError con todos los errores del registro"""
+        errores = self.errores(registro, contexto, campos)
+        if errores:
+            raise ValidationError(errores)
+
+
+def aplicar(regla, valor):
+    """Ejecuta una regla de campo como validador de Django"""
+    if _vacio(valor):
+        return
+    mensaje = regla(valor)
+    if mensaje:
+        raise ValidationError(mensaje)